@@ -1,19 +1,38 @@
-from .enums import FieldTypePydantic, ModelType
+from .enums import FieldTypePydantic, ModelType, JobPriority, ExportFormat, ExportEncoding
 from .fields import SchemaField
 from .schema import SchemaDefinition
 from .config import CrawlConfig, ScraperConfig
-from .job import JobRequest
-from .report import Report, ReportFilter, ReportMetadata
+from .job import JobRequest, BatchJobRequest
+from .report import (
+    Report, ReportFilter, ReportMetadata, ReportCursor, ReportPage, ReportQuery, ReportItem, StoredReport,
+    RetentionPolicyBase, RetentionPolicy, ItemChange, ReportDiff, BulkReportCreate, BulkReportDelete, BulkReportResult
+)
 
 __all__ = [
     'FieldTypePydantic',
     'ModelType',
+    'JobPriority',
+    'ExportFormat',
+    'ExportEncoding',
     'SchemaField',
     'SchemaDefinition',
     'CrawlConfig',
     'ScraperConfig',
     'JobRequest',
+    'BatchJobRequest',
     'Report',
     'ReportFilter',
-    'ReportMetadata'
+    'ReportMetadata',
+    'ReportCursor',
+    'ReportPage',
+    'ReportQuery',
+    'ReportItem',
+    'StoredReport',
+    'RetentionPolicyBase',
+    'RetentionPolicy',
+    'ItemChange',
+    'ReportDiff',
+    'BulkReportCreate',
+    'BulkReportDelete',
+    'BulkReportResult'
 ] 
\ No newline at end of file
@@ -1,12 +1,113 @@
+from typing import List
+
 from pydantic import BaseModel, Field
 
+from core.settings import DEFAULT_PAGE_CLUSTER_SIMILARITY
+
 class CrawlConfig(BaseModel):
     enable_crawling: bool = Field(default=False)
     max_depth: int = Field(default=2, ge=1, le=10)
     max_urls: int = Field(default=3, ge=1, le=1000)
     enable_chunking: bool = Field(default=True)
     chunk_size: int = Field(default=5000, ge=1000, le=1000000)
-    chunk_overlap: int = Field(default=100, ge=0, le=100000)
+    chunk_overlap: int = Field(
+        default=100,
+        ge=0,
+        le=100000,
+        description="Characters shared by consecutive parts of a block too long for one chunk. Chunks otherwise end "
+                    "at block boundaries and repeat the section headings and table header instead of overlapping."
+    )
+    enable_main_content: bool = Field(
+        default=False,
+        description="Only send the main content of pages to the LLM, without navigation, footers, sidebars and banners"
+    )
+    enable_template_removal: bool = Field(
+        default=False,
+        description="Remove blocks that most crawled pages share (header, navigation, footer) from all pages but one"
+    )
+    template_page_fraction: float = Field(
+        default=0.6,
+        gt=0,
+        le=1,
+        description="Share of the crawled pages a block has to appear on to be removed as template"
+    )
+    enable_near_duplicates: bool = Field(
+        default=False,
+        description="Skip pages that are near-duplicates of another page of the crawl, e.g. print views or copies "
+                    "under tracking parameters"
+    )
+    near_duplicate_distance: int = Field(
+        default=4,
+        ge=0,
+        le=15,
+        description="Bits the 64-bit SimHash fingerprints of two pages may differ in for them to be near-duplicates. "
+                    "Lines shared by most pages of the crawl, like navigation, are not fingerprinted"
+    )
+    skip_unchanged_pages: bool = Field(
+        default=False,
+        description="With enable_near_duplicates, also skip pages unchanged since the last run with the same schema "
+                    "and URLs. The result then only covers new and changed pages: the job is reported as partial "
+                    "and no diff against the previous report is stored, since items of skipped pages would show as "
+                    "removed. A run where no page changed finishes with status 'unchanged' and creates no report."
+    )
+    enable_structured_data: bool = Field(
+        default=False,
+        description="Read schema fields from the JSON-LD, microdata and OpenGraph data of pages. Pages whose "
+                    "required fields are all found there are not sent to the LLM."
+    )
+    enable_selector_templates: bool = Field(
+        default=False,
+        description="Learn CSS selectors from the LLM results of the first pages of each site template and extract "
+                    "the other pages of the template with them. Templates are kept per domain for later runs."
+    )
+    selector_template_training_pages: int = Field(
+        default=2,
+        ge=1,
+        le=10,
+        description="Pages of a template the LLM extracts to learn selectors from, before one more that checks them"
+    )
+    enable_page_clustering: bool = Field(
+        default=False,
+        description="Group the crawled pages by template from their tag paths and class names, and report the "
+                    "clusters in the job stats"
+    )
+    page_cluster_similarity: float = Field(
+        default=DEFAULT_PAGE_CLUSTER_SIMILARITY,
+        ge=0.0,
+        le=1.0,
+        description="Structural similarity a page needs to join a cluster, 1 only groups pages of identical structure"
+    )
+    listing_pages_per_cluster: int = Field(
+        default=0,
+        ge=0,
+        description="Pages extracted from each cluster of listing pages, such as category or search pages, when "
+                    "page clustering is on. 0 extracts all of them; detail pages are always extracted."
+    )
+    enable_relevance_filter: bool = Field(
+        default=False,
+        description="Score chunks against the words of the schema's field names and descriptions and skip those "
+                    "that share almost none, such as privacy policies or login forms"
+    )
+    relevance_hints: List[str] = Field(
+        default_factory=list,
+        description="Extra words relevant chunks contain, e.g. \"concert\" or \"lineup\" for an event schema"
+    )
+    relevance_min_score: float = Field(
+        default=0.1,
+        ge=0.0,
+        le=1.0,
+        description="Share of the best chunk's relevance score a chunk needs to be extracted"
+    )
+    relevance_min_chunks: int = Field(
+        default=2,
+        ge=1,
+        description="Chunks extracted whatever their relevance score"
+    )
+    enable_token_compaction: bool = Field(
+        default=False,
+        description="Collapse whitespace, strip tracking parameters from links and send URLs linked more than once "
+                    "in a chunk once, in a reference table. URLs are restored in the results."
+    )
 
 class ScraperConfig(BaseModel):
     max_hallucination_checks: int = Field(default=2, ge=0, le=5)
@@ -13,4 +13,20 @@ class ModelType(str, Enum):
     ollama = "Ollama"
     claude = "Claude"
     openai = "OpenAI"
-    gemini = "Gemini"
\ No newline at end of file
+    gemini = "Gemini"
+
+class JobPriority(str, Enum):
+    interactive = "interactive"
+    bulk = "bulk"
+
+class ExportFormat(str, Enum):
+    json = "json"
+    ndjson = "ndjson"
+    csv = "csv"
+    parquet = "parquet"
+    arrow = "arrow"
+
+class ExportEncoding(str, Enum):
+    identity = "identity"
+    gzip = "gzip"
+    zstd = "zstd"
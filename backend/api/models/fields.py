@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, Any
+from pydantic import BaseModel, Field
+from typing import Optional, Any, List
 from .enums import FieldTypePydantic
 
 class SchemaField(BaseModel):
@@ -8,4 +8,13 @@ class SchemaField(BaseModel):
     description: Optional[str] = None
     required: bool = True
     list_item_type: Optional[FieldTypePydantic] = None
-    default_value: Optional[Any] = None 
\ No newline at end of file
+    default_value: Optional[Any] = None
+    is_key: bool = Field(
+        default=False,
+        description="Identifies items across report runs. Items with equal key fields are versions of the same item."
+    )
+    aliases: List[str] = Field(
+        default_factory=list,
+        description="Structured data properties (JSON-LD, microdata, OpenGraph) this field is read from, e.g. "
+                    "startDate, location.name or og:title. Dotted paths read nested properties."
+    )
\ No newline at end of file
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional
-from .enums import ModelType
+from .enums import ModelType, JobPriority
 from .config import CrawlConfig, ScraperConfig
 from core.settings import Settings
 
@@ -21,6 +21,20 @@ class JobRequest(BaseModel):
         default=settings.DEFAULT_LLM_MODEL,
         description="Name of the LLM model to use for processing."
     )
+    priority: JobPriority = Field(
+        default=JobPriority.interactive,
+        description="Scheduling lane for LLM calls. Interactive jobs are served before bulk jobs when providers are busy."
+    )
+    deadline_seconds: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Wall clock budget for the job. When it runs out, crawling and grading stop and the best result so far is returned."
+    )
+    max_llm_tokens: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Maximum number of LLM tokens (prompt and completion, estimated) the job may use."
+    )
     crawl_config: Optional[CrawlConfig] = Field(
         default_factory=lambda: CrawlConfig(
             enable_crawling=settings.ENABLE_CRAWLING,
@@ -28,7 +42,23 @@ class JobRequest(BaseModel):
             max_urls=settings.MAX_URLS,
             enable_chunking=settings.ENABLE_CHUNKING,
             chunk_size=settings.CHUNK_SIZE,
-            chunk_overlap=settings.CHUNK_OVERLAP
+            chunk_overlap=settings.CHUNK_OVERLAP,
+            enable_main_content=settings.ENABLE_MAIN_CONTENT,
+            enable_template_removal=settings.ENABLE_TEMPLATE_REMOVAL,
+            template_page_fraction=settings.TEMPLATE_PAGE_FRACTION,
+            enable_near_duplicates=settings.ENABLE_NEAR_DUPLICATES,
+            near_duplicate_distance=settings.NEAR_DUPLICATE_DISTANCE,
+            skip_unchanged_pages=settings.SKIP_UNCHANGED_PAGES,
+            enable_structured_data=settings.ENABLE_STRUCTURED_DATA,
+            enable_selector_templates=settings.ENABLE_SELECTOR_TEMPLATES,
+            selector_template_training_pages=settings.SELECTOR_TEMPLATE_TRAINING_PAGES,
+            enable_page_clustering=settings.ENABLE_PAGE_CLUSTERING,
+            page_cluster_similarity=settings.PAGE_CLUSTER_SIMILARITY,
+            listing_pages_per_cluster=settings.LISTING_PAGES_PER_CLUSTER,
+            enable_relevance_filter=settings.ENABLE_RELEVANCE_FILTER,
+            relevance_min_score=settings.RELEVANCE_MIN_SCORE,
+            relevance_min_chunks=settings.RELEVANCE_MIN_CHUNKS,
+            enable_token_compaction=settings.ENABLE_TOKEN_COMPACTION
         )
     )
     scraper_config: Optional[ScraperConfig] = Field(
@@ -38,4 +68,12 @@ class JobRequest(BaseModel):
             enable_quality_check=settings.ENABLE_QUALITY_CHECK,
             enable_hallucination_check=settings.ENABLE_HALLUCINATION_CHECK
         )
-    ) 
\ No newline at end of file
+    )
+
+class BatchJobRequest(BaseModel):
+    jobs: List[JobRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.MAX_BATCH_SIZE,
+        description="Jobs to enqueue"
+    )
@@ -1,6 +1,11 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, List, Optional
 from datetime import datetime
+import base64
+import json
+from core.settings import Settings
+
+settings = Settings()
 
 class ReportBase(BaseModel):
     name: str = Field(..., description="Unique name of the report")
@@ -8,6 +13,17 @@ class ReportBase(BaseModel):
 
 class ReportMetadata(ReportBase):
     timestamp: datetime = Field(default_factory=datetime.utcnow, frozen=True)
+    content_size: Optional[int] = Field(default=None, description="Size of the report content as JSON, in bytes")
+    content_hash: Optional[str] = Field(default=None, description="sha256 of the report content as JSON")
+
+class StoredReport(ReportMetadata):
+    """How a report is stored: inline content, or a list of items kept in the item store"""
+    items_key: Optional[str] = Field(default=None, description="Key of the item list in the report content")
+    content: Optional[dict] = Field(
+        default=None, description="Inline content, None if the items are in the item store or the content is compressed"
+    )
+    compressed_content: Optional[bytes] = Field(default=None, exclude=True)
+    content_encoding: Optional[str] = None
 
 class ReportCreate(ReportBase):
     content: dict = Field(..., min_length=1)
@@ -15,8 +31,95 @@ class ReportCreate(ReportBase):
 class Report(ReportCreate, ReportMetadata):
     pass
  
+class ReportCursor(BaseModel):
+    """
+    Position in the report listing: the (timestamp, name) of the last report of the previous page.
+    Encoded as an opaque url-safe string for clients.
+    """
+    timestamp: datetime
+    name: str
+
+    def encode(self) -> str:
+        payload = json.dumps({"t": self.timestamp.isoformat(), "n": self.name}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "ReportCursor":
+        """
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            return cls(timestamp=payload["t"], name=payload["n"])
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
 class ReportFilter(BaseModel):
     schema_name: Optional[str] = None
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
-    limit: int = Field(default=10, ge=1, le=100) 
\ No newline at end of file
+    limit: int = Field(default=10, ge=1, le=100)
+    cursor: Optional[ReportCursor] = Field(default=None, description="Return reports after this position")
+
+class ReportPage(BaseModel):
+    reports: List[ReportMetadata]
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page, None on the last page") 
+
+class ReportQuery(BaseModel):
+    """Filters and projects items inside report content"""
+    schema_name: Optional[str] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    items_path: str = Field(
+        default="$.*[*]",
+        description="JSON path selecting the items of a report. The default selects the elements of top-level lists; "
+                    "use '$' to treat a whole single-object report as one item."
+    )
+    where: Optional[str] = Field(
+        default=None,
+        description="JSON path predicate evaluated on each item, e.g. '@.price > 10 && @.city == \"Berlin\"'"
+    )
+    contains: Optional[dict] = Field(default=None, description="Only return items containing this JSON object")
+    text: Optional[str] = Field(default=None, description="Full-text search over the string values of each item")
+    fields: Optional[List[str]] = Field(default=None, description="Top-level item keys to return, all if not set")
+    limit: int = Field(default=100, ge=1, le=1000)
+
+class ReportItem(BaseModel):
+    report_name: str
+    schema_name: Optional[str] = None
+    timestamp: datetime
+    item_index: int = Field(..., description="Position of the item among the items of its report")
+    item: Any
+class RetentionPolicyBase(BaseModel):
+    retention_days: int = Field(..., ge=1, description="Reports older than this many days are deleted")
+
+class RetentionPolicy(RetentionPolicyBase):
+    schema_name: str
+
+class ItemChange(BaseModel):
+    key: Optional[dict] = Field(default=None, description="Key field values of the item, None if the schema has none")
+    patch: Any = Field(..., description="JSON merge patch (RFC 7386) from the base item to the new item")
+
+class ReportDiff(BaseModel):
+    report_name: str
+    base_report_name: str = Field(..., description="Report the changes are relative to")
+    key_fields: List[str] = Field(default_factory=list, description="Schema fields items are matched on")
+    added: List[Any] = Field(default_factory=list, description="Items that are not in the base report")
+    removed: List[Any] = Field(
+        default_factory=list,
+        description="Key field values of items that are no longer present, or the whole items without key fields"
+    )
+    changed: List[ItemChange] = Field(default_factory=list)
+    unchanged_count: int = 0
+
+class BulkReportCreate(BaseModel):
+    reports: List[ReportCreate] = Field(..., min_length=1, max_length=settings.MAX_BULK_REPORTS)
+
+class BulkReportDelete(BaseModel):
+    names: List[str] = Field(..., min_length=1, max_length=settings.MAX_BULK_REPORTS)
+
+class BulkReportResult(BaseModel):
+    name: str
+    status: str = Field(..., description="created, deleted, or why the report was skipped: exists, not_found, invalid")
+    error: Optional[str] = None
@@ -17,7 +17,8 @@ class SchemaDefinition(BaseModel):
                     "description": field.description,
                     "required": field.required,
                     "list_item_type": field.list_item_type,
-                    "default_value": field.default_value
+                    "default_value": field.default_value,
+                    "aliases": field.aliases
                 }
                 for field in self.fields
             ]
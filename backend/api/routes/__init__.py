@@ -2,10 +2,12 @@ from .schema_routes import router as schema_router
 from .scrape_routes import router as scraping_router
 from .reports_routes import router as reports_router
 from .project import router as project_router
+from .system_routes import router as system_router
 
 __all__ = [
     "schema_router",
     "scraping_router",
     "reports_router",
     "project_router",
+    "system_router",
 ]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from typing import List, Optional
 import uuid
 from datetime import datetime
@@ -7,6 +7,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 # Import the actual database session dependency and the adapter
 from core.database.postgres_database import get_db
 from core.adapters.postgres_adapter import PostgresAdapter
+from core.job_submission import JobSubmitter, build_schema_dict
+from core.admission_control import get_tenant
+from core.redis_client import get_async_redis, get_async_broker_redis
+from core.schema_cache import schema_cache
+from api.models import JobRequest, JobPriority, ModelType
 from api.models.project import Project, ProjectBase
 from core.models.project import Project as ProjectDBModel
 
@@ -46,3 +51,49 @@ async def delete_project(project_name: str, db: AsyncSession = Depends(get_db)):
     if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Project '{project_name}' not found")
     return None
+
+def project_to_job_request(project: Project, return_schema_list: bool, priority: JobPriority) -> JobRequest:
+    """Builds the scrape job for a stored project, using the job defaults for anything the project does not set"""
+    model_types = {model_type.value.lower(): model_type for model_type in ModelType}
+    llm_model_type = model_types.get((project.llm_type or "").lower())
+    if llm_model_type is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Project '{project.name}' has an unsupported llm_type '{project.llm_type}'"
+        )
+
+    job_request = JobRequest(
+        urls=[str(url) for url in project.urls],
+        schema_name=project.schema_name,
+        return_schema_list=return_schema_list,
+        llm_model_type=llm_model_type,
+        llm_model_name=project.llm_model_name,
+        priority=priority
+    )
+    job_request.crawl_config = job_request.crawl_config.model_copy(update=project.crawl_config.model_dump())
+    return job_request
+
+@router.post("/{project_name}/run")
+async def run_project(
+    project_name: str,
+    return_schema_list: bool = Query(True),
+    priority: JobPriority = Query(JobPriority.interactive),
+    db: AsyncSession = Depends(get_db),
+    tenant: str = Depends(get_tenant)
+):
+    """Start a scraping job for a stored project"""
+    adapter = PostgresAdapter()
+    project = await adapter.get_project_by_name(db, project_name)
+    if project is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Project '{project_name}' not found")
+    if not project.schema_name:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Project '{project_name}' has no schema")
+    if not project.urls:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Project '{project_name}' has no URLs")
+
+    job_request = project_to_job_request(project, return_schema_list, priority)
+    schema = await schema_cache.get(db, project.schema_name)
+
+    submitter = JobSubmitter(get_async_redis(), get_async_broker_redis())
+    responses = await submitter.submit([job_request], [build_schema_dict(schema, return_schema_list)], tenant=tenant)
+    return {"project_name": project_name, **responses[0]}
@@ -1,14 +1,17 @@
-import os
-from fastapi import APIRouter, HTTPException, Depends, Query
-from fastapi.responses import FileResponse
-from starlette.background import BackgroundTask
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from core.database.postgres_database import get_db
+from core.database.postgres_database import get_db, db as database
 from core.adapters.postgres_adapter import PostgresAdapter
-from api.models import Report, ReportFilter, ReportMetadata
-import json
-import tempfile
+from core.items import split_list_content
+from core.maintenance_task import maintain_reports
+from core.report_export import ExportError, FILE_EXTENSIONS, MEDIA_TYPES, stream_compressed_json, stream_export
+from core.report_storage import decode_content
+from api.models import (
+    Report, ReportFilter, ReportMetadata, ReportCursor, ReportQuery, ReportItem, StoredReport, ExportFormat,
+    ExportEncoding, RetentionPolicyBase, RetentionPolicy, ReportDiff, BulkReportCreate, BulkReportDelete
+)
 from datetime import datetime
 
 router = APIRouter(
@@ -19,21 +22,95 @@ router = APIRouter(
 
 @router.get("/", response_model=List[ReportMetadata])
 async def list_reports(
+    response: Response,
     schema_name: Optional[str] = Query(None),
     start_time: Optional[datetime] = Query(None),
     end_time: Optional[datetime] = Query(None),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Value of the X-Next-Cursor header of the previous page"),
+    include_total: bool = Query(False, description="Return an estimated total count in the X-Total-Count-Estimate header"),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get list of reports with optional filtering"""
+    """
+    Get list of reports with optional filtering, newest first.
+    When more reports are available, the X-Next-Cursor response header holds the cursor of the next page.
+    """
+    try:
+        report_cursor = ReportCursor.decode(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     adapter = PostgresAdapter()
     filters = ReportFilter(
         schema_name=schema_name,
         start_time=start_time,
         end_time=end_time,
-        limit=limit
+        limit=limit,
+        cursor=report_cursor
+    )
+    page = await adapter.get_reports(db, filters)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if include_total:
+        response.headers["X-Total-Count-Estimate"] = str(await adapter.estimate_report_count(db, filters))
+    return page.reports
+
+@router.post("/query", response_model=List[ReportItem])
+async def query_reports(query: ReportQuery, db: AsyncSession = Depends(get_db)):
+    """
+    Search inside report content and return the matching items, not whole reports.
+    Items can be filtered with a JSON path predicate, JSON containment and full-text search, and projected to a
+    subset of their fields.
+    """
+    adapter = PostgresAdapter()
+    return await adapter.query_report_items(db, query)
+
+@router.get("/retention", response_model=List[RetentionPolicy])
+async def list_retention_policies(db: AsyncSession = Depends(get_db)):
+    """Get the retention policies of all schemas. Schemas without a policy use REPORT_RETENTION_DAYS."""
+    adapter = PostgresAdapter()
+    return await adapter.get_retention_policies(db)
+
+@router.put("/retention/{schema_name}", response_model=RetentionPolicy)
+async def set_retention_policy(schema_name: str, policy: RetentionPolicyBase, db: AsyncSession = Depends(get_db)):
+    """Keep the reports of a schema for the given number of days. Applied by the next maintenance run."""
+    adapter = PostgresAdapter()
+    return await adapter.upsert_retention_policy(
+        db, RetentionPolicy(schema_name=schema_name, retention_days=policy.retention_days)
     )
-    return await adapter.get_reports(db, filters)
+
+@router.delete("/retention/{schema_name}")
+async def delete_retention_policy(schema_name: str, db: AsyncSession = Depends(get_db)):
+    """Delete the retention policy of a schema"""
+    adapter = PostgresAdapter()
+    deleted = await adapter.delete_retention_policy(db, schema_name)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Retention policy not found")
+    return {"message": "Retention policy deleted successfully"}
+
+@router.post("/retention/run")
+async def run_report_maintenance():
+    """Run report partition maintenance and retention now instead of waiting for the schedule"""
+    task = maintain_reports.delay()
+    return {"task_id": task.id, "message": "Report maintenance queued"}
+
+@router.post("/bulk")
+async def create_reports(bulk: BulkReportCreate, db: AsyncSession = Depends(get_db)):
+    """
+    Create many reports in one transaction.
+    Returns a result per report, in order: created, exists, or invalid with the error. Diffs against previous runs
+    are not stored for bulk-created reports.
+    """
+    adapter = PostgresAdapter()
+    results = await adapter.create_reports(db, bulk.reports)
+    return {"results": results, "created": sum(result.status == "created" for result in results)}
+
+@router.post("/bulk-delete")
+async def delete_reports(bulk: BulkReportDelete, db: AsyncSession = Depends(get_db)):
+    """Delete many reports in one transaction. Returns a result per name, in order: deleted or not_found."""
+    adapter = PostgresAdapter()
+    results = await adapter.delete_reports(db, bulk.names)
+    return {"results": results, "deleted": sum(result.status == "deleted" for result in results)}
 
 @router.get("/{name}", response_model=Report)
 async def get_report(name: str, db: AsyncSession = Depends(get_db)):
@@ -41,23 +118,92 @@ async def get_report(name: str, db: AsyncSession = Depends(get_db)):
     adapter = PostgresAdapter()
     return await adapter.get_report_by_name(db, name)
 
+async def report_items(stored_report: StoredReport) -> AsyncIterator[Any]:
+    """Items of a report for export; the whole content is a single item for reports that are not list-shaped"""
+    if not stored_report.items_key:
+        content = stored_report.content
+        if stored_report.compressed_content is not None:
+            content = decode_content(stored_report.compressed_content, stored_report.content_encoding)
+        list_content = split_list_content(content)
+        for item in (list_content[1] if list_content else [content]):
+            yield item
+        return
+    # The request's session is closed before a streaming response is sent, so items are read with a session of their own
+    async with database.async_session() as session:
+        async for item in PostgresAdapter().stream_report_items(session, stored_report.name, stored_report.timestamp):
+            yield item
+
+async def export_response(
+    db: AsyncSession,
+    name: str,
+    export_format: ExportFormat,
+    encoding: ExportEncoding,
+    filename: str
+) -> StreamingResponse:
+    adapter = PostgresAdapter()
+    stored_report = await adapter.get_stored_report(db, name)
+    items_key = stored_report.items_key
+    if items_key is None and stored_report.content is not None:
+        list_content = split_list_content(stored_report.content)
+        items_key = list_content[0] if list_content else None
+
+    schemas = await adapter.get_schemas_by_names(db, [stored_report.schema_name])
+    schema = schemas.get(stored_report.schema_name)
+    columns = [field.name for field in schema.fields] if schema else None
+    field_types = {field.name: field.field_type.value for field in schema.fields} if schema else {}
+
+    try:
+        if export_format == ExportFormat.json and stored_report.compressed_content is not None and not items_key:
+            chunks = stream_compressed_json(stored_report.compressed_content, stored_report.content_encoding, encoding)
+        else:
+            chunks = stream_export(
+                report_items(stored_report),
+                export_format,
+                encoding=encoding,
+                items_key=items_key,
+                columns=columns,
+                field_types=field_types
+            )
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if encoding != ExportEncoding.identity:
+        headers["Content-Encoding"] = encoding.value
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[export_format], headers=headers)
+
+@router.get("/{name}/diff", response_model=ReportDiff)
+async def get_report_diff_vs_previous(name: str, db: AsyncSession = Depends(get_db)):
+    """Get the changes of a report since the previous report of the same schema, stored when it was created"""
+    adapter = PostgresAdapter()
+    return await adapter.get_stored_diff(db, name)
+
+@router.get("/{name}/diff/{other}", response_model=ReportDiff)
+async def get_report_diff(name: str, other: str, db: AsyncSession = Depends(get_db)):
+    """
+    Get the changes that turn report `other` into report `name`: added items, removed items (by their key fields)
+    and a JSON merge patch per changed item. Items are matched on the key fields of the report's schema.
+    """
+    adapter = PostgresAdapter()
+    return await adapter.get_report_diff(db, name, other)
+
 @router.get("/file/{name}")
 async def download_report(name: str, db: AsyncSession = Depends(get_db)):
     """Download report as a JSON file"""
-    adapter = PostgresAdapter()
-    report = await adapter.get_report_by_name(db, name)
-    
-    # Create a temporary file
-    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.json') as tmp_file:
-        json.dump(report.content, tmp_file, indent=2)
-        tmp_file_path = tmp_file.name
-    
-    return FileResponse(
-        path=tmp_file_path,
-        filename=f"{name}.json",
-        media_type='application/json',
-        background=BackgroundTask(lambda: os.unlink(tmp_file_path))
-    )
+    return await export_response(db, name, ExportFormat.json, ExportEncoding.identity, f"{name}.json")
+
+@router.get("/export/{name}")
+async def export_report(
+    name: str,
+    format: ExportFormat = Query(ExportFormat.ndjson, description="json, ndjson, csv, parquet or arrow (IPC stream)"),
+    encoding: ExportEncoding = Query(ExportEncoding.identity, description="Content encoding of the response"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream a report in the requested format without loading it into memory.
+    Tabular formats (csv, parquet, arrow) write one row per item of list reports; nested values are written as JSON.
+    """
+    return await export_response(db, name, format, encoding, f"{name}.{FILE_EXTENSIONS[format]}")
 
 @router.delete("/{name}")
 async def delete_report(name: str, db: AsyncSession = Depends(get_db)):
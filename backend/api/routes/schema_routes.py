@@ -3,6 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.database.postgres_database import get_db
 from core.adapters.postgres_adapter import PostgresAdapter
+from core.redis_client import get_async_redis
+from core.schema_cache import schema_cache
 from api.models import SchemaDefinition
 from api.examples.schema_examples import SCHEMA_EXAMPLES
 
@@ -40,10 +42,14 @@ async def get_schema(schema_name: str, db: AsyncSession = Depends(get_db)):
 async def register_schema(schema_def: SchemaDefinition, db: AsyncSession = Depends(get_db)):
     """Adds a new schema definition or updates an existing one"""
     adapter = PostgresAdapter()
-    return await adapter.upsert_schema(db, schema_def)
+    schema = await adapter.upsert_schema(db, schema_def)
+    await schema_cache.invalidate(get_async_redis(), schema_def.name)
+    return schema
 
 @router.delete("/{schema_name}")
 async def delete_schema(schema_name: str, db: AsyncSession = Depends(get_db)):
     """Delete a registered schema definition"""
     adapter = PostgresAdapter()
-    return await adapter.delete_schema(db, schema_name)
\ No newline at end of file
+    deleted = await adapter.delete_schema(db, schema_name)
+    await schema_cache.invalidate(get_async_redis(), schema_name)
+    return deleted
\ No newline at end of file
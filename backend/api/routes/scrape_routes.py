@@ -1,11 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
 from api.models.report import Report
 from core.database.postgres_database import get_db
 from core.adapters.postgres_adapter import PostgresAdapter
+from core.admission_control import AdmissionController, get_tenant
+from core.job_coalescer import JobCoalescer
+from core.job_budget import request_cancellation
+from core.job_submission import JobSubmitter, build_schema_dict
+from core.celery_app import celery_app
+from core.redis_client import get_async_redis, get_async_broker_redis
 from core.scraper_task import scrape_urls
-from api.models import JobRequest
+from core.schema_cache import schema_cache
+from api.models import JobRequest, BatchJobRequest
 from datetime import datetime, timezone
+import time
 
 router = APIRouter(
     prefix="/scrape",
@@ -15,32 +24,11 @@ router = APIRouter(
 
 async def get_schema_dict(db: AsyncSession, schema_name: str, return_as_list: bool = False) -> dict:
     """
-    Gets a schema from the database in a dictionary format, optionally wrapping it in a list structure.
+    Gets a schema in a dictionary format, optionally wrapping it in a list structure. Schemas are read through the
+    process-wide schema cache.
     """
-    adapter = PostgresAdapter()
-    schema = await adapter.get_schema_by_name(db, schema_name)
-    
-    base_schema = schema.to_dict()
-    
-    if not return_as_list:
-        return base_schema
-        
-    return {
-        "name": f"{schema.name}_list",
-        "fields": [
-            {
-                "name": schema.name,
-                "field_type": "list",
-                "description": f"List of {schema.name} items",
-                "required": True,
-                "list_item_type": "schema",
-                "item_schema": {
-                    "name": schema.name,
-                    "fields": base_schema["fields"]
-                }
-            }
-        ]
-    }
+    schema = await schema_cache.get(db, schema_name)
+    return build_schema_dict(schema, return_as_list)
 
 @router.post("/start", 
     openapi_extra={
@@ -57,37 +45,113 @@ async def get_schema_dict(db: AsyncSession, schema_name: str, return_as_list: bo
         }
     }
 )
-async def start_job(job_request: JobRequest, db: AsyncSession = Depends(get_db)):
-    """Start a new scraping job"""
+async def start_job(job_request: JobRequest, response: Response, db: AsyncSession = Depends(get_db),
+                    tenant: str = Depends(get_tenant)):
+    """
+    Start a new scraping job.
+    Identical requests attach to a job that is still in flight, or get the report of one that finished recently.
+    Returns 429 with a Retry-After header when the queue or the caller's in-flight jobs are at capacity.
+    The Server-Timing response header reports the time spent on the schema lookup and on submission.
+    """
     try:
-        crawl_config = job_request.crawl_config.model_dump()
-        scraper_config = job_request.scraper_config.model_dump()
-        
+        started_at = time.perf_counter()
         schema_dict = await get_schema_dict(db, job_request.schema_name, job_request.return_schema_list)
+        schema_done_at = time.perf_counter()
 
-        # Start Celery task
-        task = scrape_urls.delay(
-            schema=schema_dict,
-            schema_name=job_request.schema_name,
-            urls=job_request.urls,
-            model_type=job_request.llm_model_type,
-            model_name=job_request.llm_model_name,
-            crawl_config=crawl_config,
-            scraper_config=scraper_config
+        submitter = JobSubmitter(get_async_redis(), get_async_broker_redis())
+        responses = await submitter.submit([job_request], [schema_dict], tenant=tenant)
+        response.headers["Server-Timing"] = (
+            f"schema;dur={(schema_done_at - started_at) * 1000:.2f}, "
+            f"submit;dur={(time.perf_counter() - schema_done_at) * 1000:.2f}"
         )
-        
+        return responses[0]
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to start scraping job: {str(e)}"
+        )
+
+@router.post("/batch")
+async def start_batch(batch_request: BatchJobRequest, db: AsyncSession = Depends(get_db), tenant: str = Depends(get_tenant)):
+    """
+    Start many scraping jobs at once.
+    Schemas are validated with a single query; jobs whose schema does not exist are rejected individually.
+    The batch is admitted as a whole, or rejected with 429 if it does not fit the queue or the caller's limits.
+    """
+    try:
+        schemas = await schema_cache.get_many(db, [job.schema_name for job in batch_request.jobs])
+
+        accepted = [
+            index for index, job in enumerate(batch_request.jobs) if job.schema_name in schemas
+        ]
+        submitter = JobSubmitter(get_async_redis(), get_async_broker_redis())
+        submitted = await submitter.submit(
+            [batch_request.jobs[index] for index in accepted],
+            [
+                build_schema_dict(schemas[batch_request.jobs[index].schema_name], batch_request.jobs[index].return_schema_list)
+                for index in accepted
+            ],
+            tenant=tenant
+        )
+
+        jobs = [None] * len(batch_request.jobs)
+        for index, response in zip(accepted, submitted):
+            jobs[index] = response
+        for index, job in enumerate(batch_request.jobs):
+            if jobs[index] is None:
+                jobs[index] = {
+                    "job_id": None,
+                    "status": "rejected",
+                    "error": f"Schema with name '{job.schema_name}' not found."
+                }
+
+        batch_id = await submitter.create_batch(jobs)
         return {
-            "job_id": task.id,
-            "message": "Job queued for processing"
+            "batch_id": batch_id,
+            "total": len(jobs),
+            "queued": sum(1 for job in jobs if job["job_id"] and not job["coalesced"]),
+            "coalesced": sum(1 for job in jobs if job["job_id"] and job["coalesced"]),
+            "rejected": sum(1 for job in jobs if not job["job_id"]),
+            "jobs": jobs
         }
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to start scraping job: {str(e)}"
+            detail=f"Failed to start batch: {str(e)}"
         )
 
+@router.get("/batch/{batch_id}")
+async def get_batch_status(batch_id: str):
+    """Get the aggregate status of a batch and the status of each of its jobs"""
+    submitter = JobSubmitter(get_async_redis())
+    batch = await submitter.get_batch(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail=f"Batch '{batch_id}' not found")
+
+    job_ids = [job_id for job_id in batch["job_ids"] if job_id]
+    # Celery reads the results with a blocking Redis client, which must not run on the event loop
+    statuses = await run_in_threadpool(JobSubmitter.get_job_statuses, job_ids)
+    jobs = [
+        {"job_id": job_id, "status": statuses[job_id] if job_id else "rejected"}
+        for job_id in batch["job_ids"]
+    ]
+    counts = {}
+    for job in jobs:
+        counts[job["status"]] = counts.get(job["status"], 0) + 1
+
+    return {
+        "batch_id": batch_id,
+        "created_at": batch["created_at"],
+        "total": len(jobs),
+        "done": all(job["status"] != "pending" for job in jobs),
+        "counts": counts,
+        "jobs": jobs
+    }
+
 @router.get("/{job_id}")
 async def get_job_status(job_id: str, db: AsyncSession = Depends(get_db)):
     """Get the status and result of a job"""
@@ -97,34 +161,52 @@ async def get_job_status(job_id: str, db: AsyncSession = Depends(get_db)):
         response = {
             'status': 'pending'
         }
-    elif task.state == 'FAILURE' or task.info.get('status') == 'failed':
+    elif task.state == 'REVOKED':
+        response = {
+            'status': 'cancelled'
+        }
+    elif task.state == 'FAILURE' or task.info.get('status') in ('failed', 'cancelled'):
+        response = task.info
+    elif task.state == 'SUCCESS' and task.info.get('status') == 'unchanged':
+        # No page changed since the previous run (skip_unchanged_pages), so there is no new report
         response = task.info
     elif task.state == 'SUCCESS' and task.info.get('status') == 'completed':
-        try:
-            # Create report name using timestamp
-            report_name = f"{task.info.get('schema_name')}_{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}"
-            
-            # Create report object
-            report = Report(
-                name=report_name,
-                schema_name=task.info.get('schema_name'),
-                content=task.info.get('result')
-            )
-
-            # Save report
-            adapter = PostgresAdapter()
-            print(f"Report object: {report}")
-            await adapter.create_report(db, report)
-
+        coalescer = JobCoalescer(get_async_redis())
+        # Create report name using timestamp; the job id keeps names unique when many jobs finish together
+        report_name = f"{task.info.get('schema_name')}_{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}_{job_id[:8]}"
+        existing_report_name = await coalescer.reserve_report_name(job_id, report_name)
+        if existing_report_name:
+            # The report was already saved by an earlier poll of this job
             response = {
                 'status': 'success',
-                'report_name': report_name
-            }
-        except Exception as e:
-            response = {
-                'status': 'failed',
-                'error': f"Failed to create report: {str(e)}"
+                'report_name': existing_report_name
             }
+        else:
+            try:
+                # Create report object
+                report = Report(
+                    name=report_name,
+                    schema_name=task.info.get('schema_name'),
+                    content=task.info.get('result')
+                )
+
+                # Save report
+                adapter = PostgresAdapter()
+                print(f"Report object: {report}")
+                # Items missing from a partial result were not extracted rather than removed, so no diff is stored
+                await adapter.create_report(db, report, store_diff=not task.info.get('partial', False))
+                await coalescer.mark_report_created(job_id, report_name)
+
+                response = {
+                    'status': 'success',
+                    'report_name': report_name
+                }
+            except Exception as e:
+                await coalescer.unreserve_report_name(job_id)
+                response = {
+                    'status': 'failed',
+                    'error': f"Failed to create report: {str(e)}"
+                }
     else:
         response = {
             'status': task.state.lower(),
@@ -132,4 +214,31 @@ async def get_job_status(job_id: str, db: AsyncSession = Depends(get_db)):
             'error': "Unexpected task state. Please contact support."
         }
     
-    return response 
\ No newline at end of file
+    return response 
+
+@router.delete("/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    Cancel a job. Queued jobs never start; running jobs stop cooperatively at the next crawl or LLM step,
+    releasing their browser and LLM capacity. Returns 404 for job ids that were never submitted.
+    """
+    # The result backend and the broker are read and written with blocking clients
+    state = await run_in_threadpool(lambda: scrape_urls.AsyncResult(job_id).state)
+    if state in ('SUCCESS', 'FAILURE', 'REVOKED'):
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' has already finished")
+
+    redis_client = get_async_redis()
+    # Celery reports unknown job ids as PENDING
+    if state == 'PENDING' and not await JobSubmitter(redis_client).was_submitted(job_id):
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+
+    await request_cancellation(redis_client, job_id)
+    await JobCoalescer(redis_client).release_job(job_id)
+    await AdmissionController(redis_client, get_async_broker_redis()).release_job(job_id)
+    await run_in_threadpool(celery_app.control.revoke, job_id)
+
+    return {
+        "job_id": job_id,
+        "status": "cancelling",
+        "message": "Cancellation requested"
+    }
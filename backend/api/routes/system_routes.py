@@ -0,0 +1,18 @@
+from fastapi import APIRouter, HTTPException
+
+from core.database.postgres_database import db as database
+
+router = APIRouter(
+    prefix="/system",
+    tags=["System"]
+)
+
+@router.get("/database")
+async def get_database_status():
+    """
+    Get connection pool usage and database metrics of this API process: checkout wait time, pool saturation and
+    statement latency by adapter operation. Metrics are only recorded with ENABLE_DB_METRICS.
+    """
+    if not await database.health_check():
+        raise HTTPException(status_code=503, detail="Database is not reachable")
+    return database.pool_status()
@@ -0,0 +1,82 @@
+"""
+Compares the structure-aware chunker (scraper/chunking.py) with character chunking with overlap, as
+RecursiveCharacterTextSplitter split pages before it, on the fixture corpus in tests/fixture_pages.py.
+
+For every chunk size, pages are serialized and split, and the benchmark counts the chunks (LLM calls), the tokens
+sent, the blocks of several lines (list items and cards with their text, headings with their first paragraph) and
+the facts cut at a chunk edge, which cannot be extracted whole, and the facts sent twice, which come back as
+duplicate items to merge. Run from the backend directory:
+
+    python -m benchmarks.chunking_benchmark
+"""
+import argparse
+from typing import Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+from core.utils import Utils
+from scraper.chunking import StructuredChunker, parse_blocks
+from scraper.dom_serializer import serialize_dom
+from tests.fixture_pages import FIXTURE_PAGES
+
+
+def character_chunks(text: str, size: int, overlap: int) -> List[str]:
+    """
+    Lines merged into chunks of up to `size` characters, each starting with the last `overlap` characters of lines
+    of the previous one, which is how RecursiveCharacterTextSplitter splits text with one block per line
+    """
+    chunks, current = [], []
+    for line in text.split("\n"):
+        pieces = [line[start:start + size] for start in range(0, len(line), size)] or [line]
+        for piece in pieces:
+            if current and len("\n".join(current + [piece])) > size:
+                chunks.append("\n".join(current))
+                while current and (len("\n".join(current)) > overlap or len("\n".join(current + [piece])) > size):
+                    current.pop(0)
+            current.append(piece)
+    return chunks + ["\n".join(current)] if current else chunks
+
+
+def splitters(size: int, overlap: int) -> Dict[str, Callable[[str], List[str]]]:
+    chunker = StructuredChunker(size, overlap)
+    return {
+        "character": lambda text: character_chunks(text, size, overlap) if len(text) > size else [text],
+        "structured": chunker.split,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, action="append", help="Characters per chunk, can be repeated")
+    parser.add_argument("--chunk-overlap", type=int, default=100, help="Characters of overlap")
+    args = parser.parse_args()
+
+    texts = {name: serialize_dom(BeautifulSoup(page["html"], "html.parser")) for name, page in FIXTURE_PAGES.items()}
+    blocks = {
+        name: ["\n".join(block.lines) for block in parse_blocks(text) if len(block.lines) > 1]
+        for name, text in texts.items()
+    }
+    print(
+        f"{'chunk size':>10} {'splitter':<12} {'chunks':>7} {'tokens':>7} {'blocks cut':>11} {'facts cut':>10} "
+        f"{'facts twice':>12}"
+    )
+    for size in args.chunk_size or [300, 600, 1200]:
+        for name, split in splitters(size, args.chunk_overlap).items():
+            chunks = tokens = blocks_cut = facts_cut = twice = 0
+            for page_name, page in FIXTURE_PAGES.items():
+                page_chunks = split(texts[page_name])
+                chunks += len(page_chunks)
+                tokens += sum(Utils.estimate_tokens(chunk) for chunk in page_chunks)
+                blocks_cut += sum(
+                    not any(block in chunk for chunk in page_chunks)
+                    for block in blocks[page_name] if len(block) <= size
+                )
+                for fact in page["facts"]:
+                    found = sum(fact in chunk for chunk in page_chunks)
+                    facts_cut += fact in texts[page_name] and not found
+                    twice += found > 1
+            print(f"{size:10d} {name:<12} {chunks:7d} {tokens:7d} {blocks_cut:11d} {facts_cut:10d} {twice:12d}")
+
+
+if __name__ == "__main__":
+    main()
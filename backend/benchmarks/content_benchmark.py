@@ -0,0 +1,117 @@
+"""
+Benchmarks the content pipeline on the fixture corpus in tests/fixture_pages.py: tokens sent to the LLM against
+extraction accuracy.
+
+Accuracy is measured as fact recall, the share of the values an extraction of the page has to return that are
+still in the text sent to the LLM. Values missing from the input cannot be extracted, so recall bounds the
+accuracy of any model. Boilerplate counts the known template snippets (cookie banners, footers, newsletters) that
+are still sent. Run from the backend directory:
+
+    python -m benchmarks.content_benchmark
+
+With --url, live pages are fetched instead (without running their JavaScript) and only tokens are compared:
+
+    python -m benchmarks.content_benchmark --url https://example.com/events --url https://example.com/blog
+"""
+import argparse
+import urllib.request
+from typing import Callable, Dict
+
+from bs4 import BeautifulSoup
+
+from core.utils import Utils
+from scraper.data_fetcher import DataFetcher
+from scraper.main_content import MainContentExtractor
+from tests.fixture_pages import FIXTURE_PAGES
+
+
+def parse(html: str) -> BeautifulSoup:
+    return DataFetcher.remove_unwanted_tags(BeautifulSoup(html, "html.parser"))
+
+
+def legacy_tags(html: str) -> str:
+    """The previous serializer: get_text() of every h1-h3, span, a and p, so nested matches repeat their text"""
+    text_parts = []
+    for element in parse(html).descendants:
+        if hasattr(element, "name") and element.name in ["h1", "h2", "h3", "span", "a", "href", "p"]:
+            href = element.get("href") if element.name == "a" else None
+            text_parts.append(f"**{element.get_text()}** ({href})" if href else element.get_text())
+    lines = [line.strip() for line in " ".join(text_parts).split("\n")]
+    seen = set()
+    return "".join(line for line in lines if line and not (line in seen or seen.add(line)))
+
+
+def serializer(html: str) -> str:
+    return DataFetcher.serialize(parse(html))
+
+
+def main_content(html: str) -> str:
+    return DataFetcher.serialize(MainContentExtractor().extract(parse(html)))
+
+
+VARIANTS: Dict[str, Callable[[str], str]] = {
+    "legacy tags": legacy_tags,
+    "serializer": serializer,
+    "main content": main_content,
+}
+BASELINE = "legacy tags"
+
+
+def measure(page: dict, text: str) -> dict:
+    return {
+        "tokens": Utils.estimate_tokens(text),
+        "recall": sum(fact in text for fact in page["facts"]) / len(page["facts"]),
+        "boilerplate": sum(snippet in text for snippet in page["boilerplate"])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true", help="Print the text of every page and variant")
+    parser.add_argument("--url", action="append", default=[], help="Benchmark a live page instead of the corpus")
+    args = parser.parse_args()
+
+    if args.url:
+        benchmark_urls(args.url, args.verbose)
+    else:
+        benchmark_corpus(args.verbose)
+
+
+def benchmark_urls(urls: list, verbose: bool) -> None:
+    print(f"{'page':<60} {'variant':<16} {'tokens':>7}")
+    for url in urls:
+        request = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0 (WebSlayer benchmark)"})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            html = response.read().decode(response.headers.get_content_charset() or "utf-8", errors="replace")
+        for name, variant in VARIANTS.items():
+            text = variant(html)
+            print(f"{url[:60]:<60} {name:<16} {Utils.estimate_tokens(text):7d}")
+            if verbose:
+                print(f"\n{text}\n")
+
+
+def benchmark_corpus(verbose: bool) -> None:
+    print(f"{'page':<22} {'variant':<16} {'tokens':>7} {'recall':>7} {'boilerplate':>12}")
+    totals = {name: {"tokens": 0, "recall": 0.0, "boilerplate": 0} for name in VARIANTS}
+    for page_name, page in FIXTURE_PAGES.items():
+        for name, variant in VARIANTS.items():
+            text = variant(page["html"])
+            result = measure(page, text)
+            for key in totals[name]:
+                totals[name][key] += result[key]
+            print(f"{page_name:<22} {name:<16} {result['tokens']:7d} {result['recall']:7.0%} {result['boilerplate']:12d}")
+            if verbose:
+                print(f"\n{text}\n")
+
+    print()
+    base_tokens = totals[BASELINE]["tokens"]
+    for name, total in totals.items():
+        saved = 1 - total["tokens"] / base_tokens if base_tokens else 0.0
+        print(
+            f"{'all pages':<22} {name:<16} {total['tokens']:7d} {total['recall'] / len(FIXTURE_PAGES):7.0%} "
+            f"{total['boilerplate']:12d}   {saved:.0%} fewer tokens than {BASELINE}"
+        )
+
+
+if __name__ == "__main__":
+    main()
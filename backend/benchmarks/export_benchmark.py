@@ -0,0 +1,97 @@
+"""
+Benchmarks report export on a synthetic list report.
+
+Compares the previous download path (json.dump with indent=2 into a temporary file, then reading it back) with
+the streaming exporter in every format and encoding. Items are generated up front, so the numbers cover
+serialization only. Peak memory counts Python allocations (tracemalloc); Arrow buffers are not included.
+Run from the backend directory:
+
+    python -m benchmarks.export_benchmark --size-mb 300
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from api.models import ExportEncoding, ExportFormat
+from core.report_export import iterate, stream_export
+
+COLUMNS = ["title", "url", "price", "rating", "in_stock", "description", "tags"]
+FIELD_TYPES = {"price": "float", "rating": "integer", "in_stock": "boolean"}
+
+
+def make_items(size_mb: int) -> list:
+    item_count = size_mb * 1024 * 1024 // 400  # ~400 bytes of JSON per item
+    return [
+        {
+            "title": f"Item {i}",
+            "url": f"https://example.com/items/{i}",
+            "price": i * 0.01,
+            "rating": i % 5,
+            "in_stock": i % 3 == 0,
+            "description": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4,
+            "tags": ["alpha", "beta", str(i % 100)]
+        }
+        for i in range(item_count)
+    ]
+
+
+def legacy_download(content: dict) -> int:
+    with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".json") as tmp_file:
+        json.dump(content, tmp_file, indent=2)
+        tmp_file_path = tmp_file.name
+    try:
+        size = 0
+        with open(tmp_file_path, "rb") as f:
+            while chunk := f.read(64 * 1024):
+                size += len(chunk)
+        return size
+    finally:
+        os.unlink(tmp_file_path)
+
+
+async def streaming_export(items: list, export_format: ExportFormat, encoding: ExportEncoding) -> int:
+    size = 0
+    chunks = stream_export(iterate(items), export_format, encoding=encoding, items_key="items", columns=COLUMNS,
+                           field_types=FIELD_TYPES)
+    async for chunk in chunks:
+        size += len(chunk)
+    return size
+
+
+def measure(label: str, run) -> None:
+    started = time.perf_counter()
+    size = run()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<24} {elapsed:8.2f}s {size / 1024 / 1024:10.1f} MB {peak / 1024 / 1024:12.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=300, help="Approximate size of the report as JSON")
+    args = parser.parse_args()
+
+    items = make_items(args.size_mb)
+    print(f"{len(items)} items\n")
+    print(f"{'export':<24} {'time':>9} {'output':>13} {'peak memory':>15}")
+
+    measure("legacy json (tempfile)", lambda: legacy_download({"items": items}))
+    for export_format in ExportFormat:
+        for encoding in ExportEncoding:
+            measure(
+                f"{export_format.value} {encoding.value}",
+                lambda: asyncio.run(streaming_export(items, export_format, encoding))
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Checks that the relevance filter of chunks (scraper/relevance.py) keeps the facts of the fixture corpus in
+tests/fixture_pages.py while it skips the irrelevant pages a crawl reaches, like privacy policies and login forms.
+
+Each site of the corpus is crawled with its irrelevant pages, its pages are reduced to their main content and split
+into chunks, and the chunks are filtered for a schema of the site at several thresholds. Recall is the share of the
+facts of the site that are still in the kept chunks; it has to stay at 100% for the filter to be safe. Run from the
+backend directory:
+
+    python -m benchmarks.relevance_benchmark
+"""
+import argparse
+from typing import List, Tuple
+
+from bs4 import BeautifulSoup
+
+from core.utils import Utils
+from scraper.data_fetcher import DataFetcher
+from scraper.main_content import MainContentExtractor
+from scraper.relevance import RelevanceFilter, schema_terms
+from tests.fixture_pages import FIXTURE_PAGES, IRRELEVANT_PAGES
+
+
+def item_schema(name: str, *field_names: str) -> dict:
+    return {
+        "name": f"{name}_list",
+        "fields": [{
+            "name": name, "field_type": "list", "list_item_type": "schema",
+            "item_schema": {"name": name, "fields": [{"name": field, "field_type": "string"} for field in field_names]}
+        }]
+    }
+
+
+# Sites of the corpus, the schema extracted from them and their pages, irrelevant ones included
+SITES = {
+    "city events": (
+        item_schema("event", "title", "date", "venue", "price", "performers", "description"),
+        ["events_listing", "event_detail", "events_cards", "privacy_policy", "login"]
+    ),
+    "gear shop": (
+        item_schema("product", "name", "price", "availability", "weight", "packed_size", "rating"),
+        ["product"]
+    ),
+    "old mill": (
+        item_schema("event", "title", "date", "price", "description"),
+        ["venue_programme"]
+    ),
+}
+THRESHOLDS = [0.0, 0.05, 0.1, 0.2, 0.3]
+
+
+def chunk(text: str, size: int) -> List[str]:
+    """Lines of a text packed into chunks of up to `size` characters"""
+    chunks, current = [], ""
+    for line in text.splitlines():
+        if current and len(current) + len(line) + 1 > size:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    return chunks + [current] if current else chunks
+
+
+def site_chunks(page_names: List[str], size: int) -> Tuple[List[str], List[int]]:
+    """Chunks of the main content of the pages of a site, and the page of each chunk"""
+    chunks, pages = [], []
+    for page_index, name in enumerate(page_names):
+        page = FIXTURE_PAGES.get(name) or IRRELEVANT_PAGES[name]
+        soup = DataFetcher.remove_unwanted_tags(BeautifulSoup(page["html"], "html.parser"))
+        page_chunks = chunk(DataFetcher.serialize(MainContentExtractor().extract(soup)), size)
+        chunks += page_chunks
+        pages += [page_index] * len(page_chunks)
+    return chunks, pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=600, help="Characters per chunk")
+    parser.add_argument("--min-chunks", type=int, default=2, help="Chunks kept whatever their score")
+    args = parser.parse_args()
+
+    print(f"{'site':<12} {'min score':>9} {'chunks':>7} {'skipped':>8} {'tokens skipped':>15} {'recall':>7}")
+    for site, (schema, page_names) in SITES.items():
+        chunks, pages = site_chunks(page_names, args.chunk_size)
+        facts = [fact for name in page_names for fact in FIXTURE_PAGES.get(name, {}).get("facts", [])]
+        tokens = sum(Utils.estimate_tokens(text) for text in chunks)
+        for threshold in THRESHOLDS:
+            relevance_filter = RelevanceFilter(schema_terms(schema), threshold, args.min_chunks)
+            kept, _, stats = relevance_filter.filter(chunks, pages)
+            text = "\n".join(chunks[index] for index in kept)
+            recall = sum(fact in text for fact in facts) / len(facts)
+            print(
+                f"{site:<12} {threshold:9.2f} {stats['chunks']:7d} {stats['chunks_skipped']:8d} "
+                f"{stats['tokens_skipped']:8d} ({stats['tokens_skipped'] / tokens:4.0%}) {recall:7.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from api.models import SchemaDefinition
 
@@ -16,6 +16,11 @@ class DataAdapterInterface(ABC):
         """Get a specific schema by name"""
         pass
     
+    @abstractmethod
+    async def get_schemas_by_names(self, db: AsyncSession, names: List[str]) -> Dict[str, SchemaDefinition]:
+        """Get many schemas by name"""
+        pass
+    
     @abstractmethod
     async def upsert_schema(self, db: AsyncSession, schema: SchemaDefinition) -> SchemaDefinition:
         """Create a new schema or update an existing one"""
@@ -1,18 +1,36 @@
-from typing import List, Optional
-from sqlalchemy import select, delete
+from typing import AsyncIterator, Dict, Hashable, List, Optional, Tuple
+from sqlalchemy import String, any_, bindparam, select, delete, insert, literal, text, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from api.models import SchemaDefinition as SchemaDefinitionPydantic, Report as ReportPydantic, ReportFilter
-from api.models.report import ReportMetadata
+from api.models.report import ReportMetadata, ReportCursor, ReportPage, ReportQuery, ReportItem, StoredReport
+from api.models.report import RetentionPolicy as RetentionPolicyPydantic, ItemChange, ReportDiff
+from api.models.report import ReportCreate, BulkReportResult
 from api.models.project import Project as ProjectPydantic
 from core.adapters.data_adapter_interface import DataAdapterInterface
 from core.models.schema import SchemaDefinition, SchemaField
 from core.models.project import Project as ProjectDBModel
 from core.models.report import Report
-from sqlalchemy.orm import selectinload
+from core.models.item import SchemaItem, ReportItemRef
+from core.models.retention_policy import RetentionPolicy
+from core.items import content_hash, item_key, split_list_content
+from core.report_diff import ItemVersion, diff_versions, item_key_values, item_versions, merge_patch
+from core.database.db_metrics import instrument_operations
+from core.report_storage import content_digest, decode_content, encode_content
+from core.settings import Settings
+from sqlalchemy.orm import selectinload, joinedload
+import json
+import logging
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+@instrument_operations
 class PostgresAdapter(DataAdapterInterface):
     async def get_all_schemas(self, db: AsyncSession) -> List[SchemaDefinitionPydantic]:
         try:
@@ -48,6 +66,24 @@ class PostgresAdapter(DataAdapterInterface):
                 detail=f"Database error: {str(e)}"
             )
 
+    async def get_schemas_by_names(self, db: AsyncSession, names: List[str]) -> Dict[str, SchemaDefinitionPydantic]:
+        """Gets many schemas in a single round trip. Names that do not exist are left out of the result."""
+        try:
+            result = await db.execute(
+                select(SchemaDefinition)
+                .where(SchemaDefinition.name.in_(set(names)))
+                .options(joinedload(SchemaDefinition.fields))
+            )
+            schemas = result.unique().scalars().all()
+            return {schema.name: schema.to_pydantic() for schema in schemas}
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Database error: {str(e)}"
+            )
+
     async def upsert_schema(self, db: AsyncSession, schema: SchemaDefinitionPydantic) -> SchemaDefinitionPydantic:
         try:
             async with db.begin():
@@ -83,26 +119,53 @@ class PostgresAdapter(DataAdapterInterface):
                 detail=f"Database error: {str(e)}"
             )
 
-    async def create_report(self, db: AsyncSession, report: ReportPydantic) -> ReportPydantic:
+    async def create_report(self, db: AsyncSession, report: ReportPydantic, store_diff: bool = True) -> ReportPydantic:
+        """
+        Saves a report. With ENABLE_ITEM_STORE, the items of list-shaped content are upserted into schema_items
+        and the report only references them, so items repeated across runs are stored once.
+
+        With ENABLE_REPORT_DIFF the changes since the previous report of the schema are stored too, unless
+        `store_diff` is False. Partial reports, e.g. of jobs that skipped unchanged pages, pass False: items of the
+        pages they left out would show up as removed.
+        """
         try:
             schema_exists = await db.execute(
                 select(SchemaDefinition).where(SchemaDefinition.name == report.schema_name)
             )
-            if not schema_exists.scalar_one_or_none():
+            schema = schema_exists.scalar_one_or_none()
+            if not schema:
                 raise HTTPException(
                     status_code=404,
                     detail=f"Schema '{report.schema_name}' not found"
                 )
+            # Names are only unique per partition, see the primary key of reports
+            await self._lock_report_names(db, [report.name])
+            existing = await db.execute(select(Report.name).where(Report.name == report.name).limit(1))
+            if existing.scalar_one_or_none():
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Report '{report.name}' already exists"
+                )
 
-            db_report = Report(
-                name=report.name,
-                schema_name=report.schema_name,
-                content=report.content,
-            )
+            values, items = self._new_report_values(report, datetime.now(timezone.utc))
+            db_report = Report(**values)
             db.add(db_report)
+            await db.flush()
+            if items is not None:
+                key_fields = [field.name for field in schema.fields if field.is_key]
+                await self._store_items(db, [(db_report, items, key_fields)])
+            if settings.ENABLE_REPORT_DIFF and store_diff:
+                await self._store_previous_diff(db, db_report)
             await db.commit()
             await db.refresh(db_report)
-            return db_report
+            return ReportPydantic(
+                name=db_report.name,
+                schema_name=db_report.schema_name,
+                content=report.content,
+                timestamp=db_report.timestamp,
+                content_size=db_report.content_size,
+                content_hash=db_report.content_hash
+            )
         except HTTPException:
             raise
         except Exception as e:
@@ -112,6 +175,236 @@ class PostgresAdapter(DataAdapterInterface):
                 detail=f"Failed to create report: {str(e)}"
             )
 
+    @staticmethod
+    def _new_report_values(report: ReportCreate, timestamp: datetime) -> Tuple[dict, Optional[List[dict]]]:
+        """
+        Column values of a new report, and the items to keep in the item store (None if the content is stored as
+        a whole). Content above the compression threshold is compressed.
+        """
+        list_content = split_list_content(report.content) if settings.ENABLE_ITEM_STORE else None
+        stored_content = {list_content[0]: []} if list_content else report.content
+        encoded = encode_content(stored_content)
+        report_hash, report_size = (
+            content_digest(report.content) if list_content else (encoded.content_hash, encoded.size)
+        )
+        values = dict(
+            name=report.name,
+            schema_name=report.schema_name,
+            content=encoded.content,
+            items_key=list_content[0] if list_content else None,
+            content_compressed=encoded.compressed,
+            content_encoding=encoded.encoding,
+            content_hash=report_hash,
+            content_size=report_size,
+            timestamp=timestamp
+        )
+        return values, list_content[1] if list_content else None
+
+    async def create_reports(self, db: AsyncSession, reports: List[ReportCreate]) -> List[BulkReportResult]:
+        """
+        Saves many reports in one transaction and returns a result per report, in order.
+
+        Schemas and existing names are checked with one query each for the whole batch, under the same per-name
+        advisory locks as create_report, so a name created concurrently is reported as existing. Rows are written
+        with multi-row INSERTs and the items of all list-shaped reports are upserted together. Reports that fail
+        validation are skipped; an error while writing rolls back the whole batch. Diffs against previous runs are
+        not stored for bulk-created reports.
+        """
+        try:
+            result = await db.execute(
+                select(SchemaDefinition).where(SchemaDefinition.name.in_({report.schema_name for report in reports}))
+            )
+            key_fields = {
+                schema.name: [field.name for field in schema.fields if field.is_key]
+                for schema in result.scalars().all()
+            }
+            await self._lock_report_names(db, [report.name for report in reports])
+            result = await db.execute(
+                select(Report.name).where(Report.name == any_(self._names_param([report.name for report in reports])))
+            )
+            existing = set(result.scalars().all())
+
+            timestamp = datetime.now(timezone.utc)
+            results = []
+            rows = []
+            item_reports = []
+            seen = set()
+            for report in reports:
+                if report.schema_name not in key_fields:
+                    results.append(BulkReportResult(
+                        name=report.name, status="invalid", error=f"Schema '{report.schema_name}' not found"
+                    ))
+                elif report.name in existing:
+                    results.append(BulkReportResult(
+                        name=report.name, status="exists", error=f"Report '{report.name}' already exists"
+                    ))
+                elif report.name in seen:
+                    results.append(BulkReportResult(
+                        name=report.name, status="invalid", error="Report name is repeated in the request"
+                    ))
+                else:
+                    seen.add(report.name)
+                    values, items = self._new_report_values(report, timestamp)
+                    rows.append(values)
+                    if items is not None:
+                        item_reports.append((Report(**values), items, key_fields[report.schema_name]))
+                    results.append(BulkReportResult(name=report.name, status="created"))
+
+            batch_size = settings.BULK_REPORT_INSERT_BATCH_SIZE
+            for start in range(0, len(rows), batch_size):
+                await db.execute(insert(Report), rows[start:start + batch_size])
+            if item_reports:
+                await self._store_items(db, item_reports)
+            await db.commit()
+            return results
+        except HTTPException:
+            raise
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to create reports: {str(e)}"
+            )
+
+    async def _lock_report_names(self, db: AsyncSession, names: List[str]) -> None:
+        """
+        Takes a transaction-level advisory lock per report name. The primary key of reports only makes names unique
+        per partition, so concurrent creates of the same name are serialized here; the check for an existing name
+        that follows sees reports committed by whoever held the lock before. Locks are taken in name order, so
+        batches with overlapping names do not deadlock.
+        """
+        await db.execute(
+            text(
+                "SELECT pg_advisory_xact_lock(hashtext(n.name)) "
+                "FROM (SELECT DISTINCT unnest(:names) AS name ORDER BY 1) AS n"
+            ).bindparams(self._names_param(names))
+        )
+
+    @staticmethod
+    def _names_param(names: List[str]):
+        """Report names bound as a single array parameter, for `= ANY(...)`"""
+        return bindparam("names", list(names), type_=ARRAY(String))
+
+    async def _store_items(self, db: AsyncSession, reports: List[Tuple[Report, List[dict], List[str]]]) -> None:
+        """
+        Upserts item versions keyed by (schema, key fields, content hash) and references them from their reports.
+        Versions already stored only get their last_seen timestamp updated.
+
+        Args:
+            reports: (report, items, key fields of the report's schema) of one or many reports
+        """
+        versions = {}
+        positions = []
+        for report, items, key_fields in reports:
+            report_positions = []
+            for item in items:
+                version = (report.schema_name, item_key(item, key_fields), content_hash(item))
+                versions.setdefault(version, item)
+                report_positions.append(version)
+            positions.append(report_positions)
+
+        seen_at = datetime.now(timezone.utc)
+        item_ids = {}
+        rows = [
+            {
+                "schema_name": schema_name,
+                "item_key": key,
+                "content_hash": digest,
+                "content": item,
+                "first_seen": seen_at,
+                "last_seen": seen_at
+            }
+            for (schema_name, key, digest), item in versions.items()
+        ]
+        batch_size = settings.ITEM_STORE_BATCH_SIZE
+        for start in range(0, len(rows), batch_size):
+            statement = pg_insert(SchemaItem).values(rows[start:start + batch_size])
+            statement = statement.on_conflict_do_update(
+                constraint="uq_schema_items_version",
+                set_={"last_seen": statement.excluded.last_seen}
+            ).returning(SchemaItem.id, SchemaItem.schema_name, SchemaItem.item_key, SchemaItem.content_hash)
+            result = await db.execute(statement)
+            for item_id, schema_name, key, digest in result.all():
+                item_ids[(schema_name, key, digest)] = item_id
+
+        refs = [
+            {
+                "report_name": report.name,
+                "report_timestamp": report.timestamp,
+                "position": position,
+                "item_id": item_ids[version]
+            }
+            for (report, _, _), report_positions in zip(reports, positions)
+            for position, version in enumerate(report_positions)
+        ]
+        for start in range(0, len(refs), batch_size):
+            await db.execute(pg_insert(ReportItemRef).values(refs[start:start + batch_size]))
+
+    async def _load_content(self, db: AsyncSession, report: Report) -> dict:
+        """Decompresses report content and fills in the items kept in the item store"""
+        content = report.content
+        if report.content_encoding:
+            content = decode_content(await self._load_compressed(db, report), report.content_encoding)
+        if not report.items_key:
+            return content
+        result = await db.execute(
+            select(SchemaItem.content)
+            .join(ReportItemRef, ReportItemRef.item_id == SchemaItem.id)
+            .where(ReportItemRef.report_name == report.name, ReportItemRef.report_timestamp == report.timestamp)
+            .order_by(ReportItemRef.position)
+        )
+        return {**content, report.items_key: list(result.scalars().all())}
+
+    async def _load_compressed(self, db: AsyncSession, report: Report) -> bytes:
+        result = await db.execute(
+            select(Report.content_compressed).where(Report.name == report.name, Report.timestamp == report.timestamp)
+        )
+        return result.scalar_one()
+
+    async def get_stored_report(self, db: AsyncSession, name: str) -> StoredReport:
+        """Gets a report without reading the items it keeps in the item store"""
+        try:
+            result = await db.execute(select(Report).where(Report.name == name))
+            report = result.scalar_one_or_none()
+            if not report:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Report '{name}' not found"
+                )
+            return StoredReport(
+                name=report.name,
+                schema_name=report.schema_name,
+                timestamp=report.timestamp,
+                content_size=report.content_size,
+                content_hash=report.content_hash,
+                items_key=report.items_key,
+                content=None if report.items_key else report.content,
+                compressed_content=await self._load_compressed(db, report) if report.content_encoding else None,
+                content_encoding=report.content_encoding
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to retrieve report: {str(e)}"
+            )
+
+    async def stream_report_items(self, db: AsyncSession, name: str, timestamp: datetime) -> AsyncIterator[dict]:
+        """
+        Yields the items a report keeps in the item store, in order. Rows are fetched from a server-side cursor in
+        batches, so large reports are never loaded at once.
+        """
+        result = await db.stream(
+            select(SchemaItem.content)
+            .join(ReportItemRef, ReportItemRef.item_id == SchemaItem.id)
+            .where(ReportItemRef.report_name == name, ReportItemRef.report_timestamp == timestamp)
+            .order_by(ReportItemRef.position)
+            .execution_options(yield_per=settings.ITEM_STORE_BATCH_SIZE)
+        )
+        async for content in result.scalars():
+            yield content
+
     async def get_report_by_name(self, db: AsyncSession, name: str) -> ReportPydantic:
         try:
             result = await db.execute(
@@ -123,7 +416,14 @@ class PostgresAdapter(DataAdapterInterface):
                     status_code=404,
                     detail=f"Report '{name}' not found"
                 )
-            return report.to_pydantic()
+            return ReportPydantic(
+                name=report.name,
+                schema_name=report.schema_name,
+                content=await self._load_content(db, report),
+                timestamp=report.timestamp,
+                content_size=report.content_size,
+                content_hash=report.content_hash
+            )
         except HTTPException:
             raise
         except Exception as e:
@@ -132,13 +432,20 @@ class PostgresAdapter(DataAdapterInterface):
                 detail=f"Failed to retrieve report: {str(e)}"
             )
 
-    async def get_reports(self, db: AsyncSession, filters: ReportFilter) -> List[ReportMetadata]:
+    async def get_reports(self, db: AsyncSession, filters: ReportFilter) -> ReportPage:
+        """
+        Gets one page of report metadata, newest first.
+
+        Pages are keyset paginated on (timestamp, name), so each page is an index range scan no matter how deep
+        the client has paged.
+        """
         try:
             query = select(
                 Report.name,
                 Report.schema_name,
                 Report.timestamp,
-                Report.created_at
+                Report.content_size,
+                Report.content_hash
             )
             if filters.schema_name:
                 query = query.where(Report.schema_name == filters.schema_name)
@@ -146,20 +453,36 @@ class PostgresAdapter(DataAdapterInterface):
                 query = query.where(Report.timestamp >= filters.start_time)
             if filters.end_time:
                 query = query.where(Report.timestamp <= filters.end_time)
-            
-            query = query.order_by(Report.timestamp.desc())
-            query = query.limit(filters.limit)
-            
+            if filters.cursor:
+                # The row comparison alone does not prune partitions, the plain timestamp bound does
+                query = query.where(
+                    Report.timestamp <= literal(filters.cursor.timestamp, Report.timestamp.type),
+                    tuple_(Report.timestamp, Report.name) < tuple_(
+                        literal(filters.cursor.timestamp, Report.timestamp.type),
+                        literal(filters.cursor.name, Report.name.type)
+                    )
+                )
+
+            query = query.order_by(Report.timestamp.desc(), Report.name.desc())
+            # One extra row tells whether there is a next page
+            query = query.limit(filters.limit + 1)
+
             result = await db.execute(query)
             reports = result.all()
-            return [
+            page = [
                 ReportMetadata(
                     name=report.name,
                     schema_name=report.schema_name,
-                    timestamp=report.timestamp
+                    timestamp=report.timestamp,
+                    content_size=report.content_size,
+                    content_hash=report.content_hash
                 ) 
-                for report in reports
+                for report in reports[:filters.limit]
             ]
+            next_cursor = None
+            if len(reports) > filters.limit:
+                next_cursor = ReportCursor(timestamp=page[-1].timestamp, name=page[-1].name).encode()
+            return ReportPage(reports=page, next_cursor=next_cursor)
         except HTTPException:
             raise
         except Exception as e:
@@ -168,13 +491,343 @@ class PostgresAdapter(DataAdapterInterface):
                 detail=f"Failed to retrieve reports: {str(e)}"
             )
 
+    async def estimate_report_count(self, db: AsyncSession, filters: ReportFilter) -> int:
+        """
+        Estimates the number of reports matching the filters (ignoring the cursor) from the planner's row
+        estimate, without counting the rows.
+        """
+        try:
+            conditions = []
+            params = {}
+            if filters.schema_name:
+                conditions.append("schema_name = :schema_name")
+                params["schema_name"] = filters.schema_name
+            if filters.start_time:
+                conditions.append("timestamp >= :start_time")
+                params["start_time"] = filters.start_time
+            if filters.end_time:
+                conditions.append("timestamp <= :end_time")
+                params["end_time"] = filters.end_time
+            where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+            result = await db.execute(text(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM reports{where}"), params)
+            plan = result.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to estimate report count: {str(e)}"
+            )
+
+    # Report content with the items of item store reports filled back in
+    REPORT_CONTENT_SQL = """
+        CASE WHEN r.items_key IS NULL THEN r.content ELSE jsonb_set(r.content, ARRAY[r.items_key], COALESCE(
+            (SELECT jsonb_agg(si.content ORDER BY ref.position)
+             FROM report_item_refs ref JOIN schema_items si ON si.id = ref.item_id
+             WHERE ref.report_name = r.name AND ref.report_timestamp = r.timestamp),
+            '[]'::jsonb
+        )) END"""
+
+    @staticmethod
+    def _containment_path_filter(contains: dict) -> List[str]:
+        """
+        JSON path equality conditions for the scalar values of a containment filter. They let the GIN index on
+        report content narrow down candidate reports before items are checked for exact containment.
+        """
+        conditions = []
+        for key, value in contains.items():
+            if value is None or isinstance(value, (str, int, float, bool)):
+                conditions.append(f"@.{json.dumps(key)} == {json.dumps(value)}")
+        return conditions
+
+    async def query_report_items(self, db: AsyncSession, query: ReportQuery) -> List[ReportItem]:
+        """
+        Returns the items of reports that match the query, newest reports first.
+
+        Candidate reports are selected with the GIN indexes on report content (JSON path and full-text), then their
+        items are unnested with jsonb_path_query and filtered individually. The items of reports kept in the item
+        store are not in their stored content, so those reports are selected with the same filters applied to
+        schema_items, through its GIN indexes, and joined back through report_item_refs; only candidate reports are
+        reassembled. Reports stored compressed (ENABLE_REPORT_COMPRESSION) are not searched.
+        """
+        conditions = []
+        params = {"items_path": query.items_path, "limit": query.limit}
+        item_conditions = []
+        content_conditions = []
+        stored_conditions = []
+        stored_item_conditions = []
+
+        if query.schema_name:
+            conditions.append("r.schema_name = :schema_name")
+            stored_conditions.append("si.schema_name = :schema_name")
+            params["schema_name"] = query.schema_name
+        if query.start_time:
+            conditions.append("r.timestamp >= :start_time")
+            stored_conditions.append("ref.report_timestamp >= :start_time")
+            params["start_time"] = query.start_time
+        if query.end_time:
+            conditions.append("r.timestamp <= :end_time")
+            stored_conditions.append("ref.report_timestamp <= :end_time")
+            params["end_time"] = query.end_time
+
+        path_filters = []
+        if query.where:
+            path_filters.append(f"({query.where})")
+            item_conditions.append("jsonb_path_exists(i.item, CAST(:where_path AS jsonpath))")
+            stored_item_conditions.append("si.content @? CAST(:where_path AS jsonpath)")
+            params["where_path"] = f"$ ? ({query.where})"
+        if query.contains:
+            path_filters.extend(self._containment_path_filter(query.contains))
+            item_conditions.append("i.item @> CAST(:contains AS jsonb)")
+            stored_item_conditions.append("si.content @> CAST(:contains AS jsonb)")
+            params["contains"] = json.dumps(query.contains)
+        if path_filters:
+            content_conditions.append("r.content @? CAST(:match_path AS jsonpath)")
+            params["match_path"] = f"{query.items_path} ? ({' && '.join(path_filters)})"
+        if query.text:
+            content_conditions.append(
+                "jsonb_to_tsvector('simple', r.content, '[\"string\"]') @@ websearch_to_tsquery('simple', :text)"
+            )
+            item_conditions.append(
+                "jsonb_to_tsvector('simple', i.item, '[\"string\"]') @@ websearch_to_tsquery('simple', :text)"
+            )
+            stored_item_conditions.append(
+                "jsonb_to_tsvector('simple', si.content, '[\"string\"]') @@ websearch_to_tsquery('simple', :text)"
+            )
+            params["text"] = query.text
+
+        reports = "reports r"
+        if content_conditions:
+            # Reports whose content matches, and reports whose stored items match. Stored content of item store
+            # reports has an empty item list, so the first part only finds them through their other values.
+            content_where = " AND ".join(conditions + content_conditions)
+            stored_where = " AND ".join(stored_conditions + stored_item_conditions)
+            reports = f"""(
+                SELECT r.name, r.timestamp FROM reports r WHERE {content_where}
+                UNION
+                SELECT ref.report_name, ref.report_timestamp
+                FROM schema_items si JOIN report_item_refs ref ON ref.item_id = si.id
+                WHERE {stored_where}
+            ) c JOIN reports r ON r.name = c.name AND r.timestamp = c.timestamp"""
+
+        projection = "i.item"
+        if query.fields:
+            projection = (
+                "CASE WHEN jsonb_typeof(i.item) = 'object' THEN "
+                "(SELECT COALESCE(jsonb_object_agg(f.key, f.value), '{}'::jsonb) "
+                "FROM jsonb_each(i.item) AS f WHERE f.key = ANY(:fields)) ELSE i.item END"
+            )
+            params["fields"] = query.fields
+
+        where = " AND ".join(conditions + item_conditions) or "TRUE"
+        statement = f"""
+            SELECT r.name, r.schema_name, r.timestamp, i.ordinality - 1 AS item_index, {projection} AS item
+            FROM {reports}
+            CROSS JOIN LATERAL jsonb_path_query({self.REPORT_CONTENT_SQL}, CAST(:items_path AS jsonpath))
+                WITH ORDINALITY AS i(item, ordinality)
+            WHERE {where}
+            ORDER BY r.timestamp DESC, r.name DESC, i.ordinality
+            LIMIT :limit
+        """
+        try:
+            result = await db.execute(text(statement), params)
+            return [
+                ReportItem(
+                    report_name=row.name,
+                    schema_name=row.schema_name,
+                    timestamp=row.timestamp,
+                    item_index=row.item_index,
+                    item=json.loads(row.item) if isinstance(row.item, str) else row.item
+                )
+                for row in result.all()
+            ]
+        except DBAPIError as e:
+            # Invalid JSON paths or search expressions are client errors
+            sqlstate = getattr(e.orig, "sqlstate", None) or getattr(e.orig, "pgcode", None) or ""
+            if sqlstate.startswith("22") or sqlstate == "42601":
+                raise HTTPException(status_code=400, detail=f"Invalid query: {str(e.orig)}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to query reports: {str(e)}"
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to query reports: {str(e)}"
+            )
+
+    async def _key_fields(self, db: AsyncSession, schema_name: str) -> List[str]:
+        result = await db.execute(
+            select(SchemaField.name)
+            .where(SchemaField.schema_definition_name == schema_name, SchemaField.is_key.is_(True))
+            .order_by(SchemaField.id)
+        )
+        return list(result.scalars().all())
+
+    async def _item_versions(
+        self, db: AsyncSession, report: Report, key_fields: List[str], side: str
+    ) -> Tuple[List[ItemVersion], Dict[Hashable, object]]:
+        """
+        Item versions of a report. Item store reports only read the stored keys and hashes, referencing items by id;
+        the content of other reports is loaded and hashed.
+        """
+        if report.items_key:
+            result = await db.execute(
+                select(SchemaItem.item_key, SchemaItem.content_hash, SchemaItem.id)
+                .join(ReportItemRef, ReportItemRef.item_id == SchemaItem.id)
+                .where(ReportItemRef.report_name == report.name, ReportItemRef.report_timestamp == report.timestamp)
+                .order_by(ReportItemRef.position)
+            )
+            return [tuple(row) for row in result.all()], {}
+        return item_versions(await self._load_content(db, report), key_fields, side)
+
+    async def _diff_reports(self, db: AsyncSession, report: Report, base: Report) -> ReportDiff:
+        """
+        Changes from `base` to `report`, matching items on the key fields of the report's schema. Only the items
+        that were added, removed or changed are read from the item store.
+        """
+        key_fields = await self._key_fields(db, report.schema_name)
+        base_versions, contents = await self._item_versions(db, base, key_fields, "base")
+        new_versions, new_contents = await self._item_versions(db, report, key_fields, "new")
+        contents.update(new_contents)
+        diff = diff_versions(base_versions, new_versions)
+
+        changed_refs = [ref for pair in diff.changed for ref in pair]
+        stored_ids = {ref for ref in diff.added + diff.removed + changed_refs if ref not in contents}
+        if stored_ids:
+            result = await db.execute(select(SchemaItem.id, SchemaItem.content).where(SchemaItem.id.in_(stored_ids)))
+            contents.update({item_id: content for item_id, content in result.all()})
+
+        return ReportDiff(
+            report_name=report.name,
+            base_report_name=base.name,
+            key_fields=key_fields,
+            added=[contents[ref] for ref in diff.added],
+            removed=[item_key_values(contents[ref], key_fields) or contents[ref] for ref in diff.removed],
+            changed=[
+                ItemChange(
+                    key=item_key_values(contents[new_ref], key_fields),
+                    patch=merge_patch(contents[base_ref], contents[new_ref])
+                )
+                for base_ref, new_ref in diff.changed
+            ],
+            unchanged_count=diff.unchanged_count
+        )
+
+    async def _store_previous_diff(self, db: AsyncSession, report: Report) -> None:
+        """
+        Stores the changes since the previous report of the same schema with a new report. A failed diff is logged
+        and does not fail the report.
+        """
+        try:
+            async with db.begin_nested():
+                result = await db.execute(
+                    select(Report)
+                    .where(Report.schema_name == report.schema_name, Report.timestamp < report.timestamp)
+                    .order_by(Report.timestamp.desc(), Report.name.desc())
+                    .limit(1)
+                )
+                previous = result.scalar_one_or_none()
+                if previous is None:
+                    return
+                diff = await self._diff_reports(db, report, previous)
+                report.previous_report_name = previous.name
+                report.diff = diff.model_dump(mode="json")
+        except Exception as e:
+            logger.warning(f"Failed to diff report '{report.name}' against its previous run: {e}")
+
+    async def get_report_diff(self, db: AsyncSession, name: str, base_name: str) -> ReportDiff:
+        """Changes from report `base_name` to report `name`"""
+        try:
+            result = await db.execute(select(Report).where(Report.name.in_([name, base_name])))
+            reports = {report.name: report for report in result.scalars().all()}
+            for report_name in (name, base_name):
+                if report_name not in reports:
+                    raise HTTPException(
+                        status_code=404,
+                        detail=f"Report '{report_name}' not found"
+                    )
+            return await self._diff_reports(db, reports[name], reports[base_name])
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to diff reports: {str(e)}"
+            )
+
+    async def get_stored_diff(self, db: AsyncSession, name: str) -> ReportDiff:
+        """Changes since the previous report of the same schema, stored when the report was created"""
+        try:
+            result = await db.execute(select(Report.name, Report.diff).where(Report.name == name))
+            row = result.first()
+            if row is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Report '{name}' not found"
+                )
+            if row.diff is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Report '{name}' has no previous report to diff against"
+                )
+            return ReportDiff(**row.diff)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to retrieve report diff: {str(e)}"
+            )
+
+    async def delete_reports(self, db: AsyncSession, names: List[str]) -> List[BulkReportResult]:
+        """Deletes many reports and their item refs in one transaction and returns a result per name, in order"""
+        try:
+            result = await db.execute(
+                delete(Report)
+                .where(Report.name == any_(self._names_param(names)))
+                .returning(Report.name, Report.timestamp)
+            )
+            deleted = result.all()
+            if deleted:
+                await db.execute(
+                    text("""
+                        DELETE FROM report_item_refs ref
+                        USING unnest(CAST(:names AS varchar[]), CAST(:timestamps AS timestamptz[])) AS d(name, ts)
+                        WHERE ref.report_name = d.name AND ref.report_timestamp = d.ts
+                    """),
+                    {"names": [row.name for row in deleted], "timestamps": [row.timestamp for row in deleted]}
+                )
+            await db.commit()
+            deleted_names = {row.name for row in deleted}
+            return [
+                BulkReportResult(name=name, status="deleted" if name in deleted_names else "not_found")
+                for name in dict.fromkeys(names)
+            ]
+        except HTTPException:
+            raise
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to delete reports: {str(e)}"
+            )
+
     async def delete_report(self, db: AsyncSession, name: str) -> bool:
         try:
             result = await db.execute(
-                delete(Report).where(Report.name == name)
+                delete(Report).where(Report.name == name).returning(Report.timestamp)
             )
+            timestamps = list(result.scalars().all())
+            for timestamp in timestamps:
+                await db.execute(
+                    delete(ReportItemRef)
+                    .where(ReportItemRef.report_name == name, ReportItemRef.report_timestamp == timestamp)
+                )
             await db.commit()
-            return result.rowcount > 0
+            return len(timestamps) > 0
         except HTTPException:
             raise
         except Exception as e:
@@ -293,4 +946,47 @@ class PostgresAdapter(DataAdapterInterface):
             raise HTTPException(
                 status_code=500,
                 detail=f"Failed to delete project: {str(e)}"
-            )
\ No newline at end of file
+            )
+    # --- Report Retention Methods ---
+
+    async def get_retention_policies(self, db: AsyncSession) -> List[RetentionPolicyPydantic]:
+        try:
+            result = await db.execute(select(RetentionPolicy).order_by(RetentionPolicy.schema_name))
+            return [policy.to_pydantic() for policy in result.scalars().all()]
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to retrieve retention policies: {str(e)}"
+            )
+
+    async def upsert_retention_policy(self, db: AsyncSession, policy: RetentionPolicyPydantic) -> RetentionPolicyPydantic:
+        try:
+            statement = pg_insert(RetentionPolicy).values(
+                schema_name=policy.schema_name,
+                retention_days=policy.retention_days
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=[RetentionPolicy.schema_name],
+                set_={"retention_days": statement.excluded.retention_days}
+            )
+            await db.execute(statement)
+            await db.commit()
+            return policy
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to save retention policy: {str(e)}"
+            )
+
+    async def delete_retention_policy(self, db: AsyncSession, schema_name: str) -> bool:
+        try:
+            result = await db.execute(delete(RetentionPolicy).where(RetentionPolicy.schema_name == schema_name))
+            await db.commit()
+            return result.rowcount > 0
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to delete retention policy: {str(e)}"
+            )
@@ -0,0 +1,169 @@
+import hashlib
+import math
+import time
+from typing import List, Optional
+
+from fastapi import HTTPException, Request
+
+from core.settings import Settings
+
+settings = Settings()
+
+KEY_PREFIX = "webslayer:admission"
+COMPLETIONS_KEY = f"{KEY_PREFIX}:completions"
+
+
+def in_flight_key(tenant: str) -> str:
+    return f"{KEY_PREFIX}:inflight:{tenant}"
+
+
+def job_tenant_key(job_id: str) -> str:
+    return f"{KEY_PREFIX}:job-tenant:{job_id}"
+
+
+def get_tenant(request: Request) -> str:
+    """
+    Identifies the caller for admission limits: the X-API-Key header (hashed), else X-Tenant-ID, else anonymous.
+    """
+    api_key = request.headers.get("X-API-Key")
+    if api_key:
+        return "key-" + hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    return request.headers.get("X-Tenant-ID") or "anonymous"
+
+
+def record_job_finished(redis_client, job_id: str) -> None:
+    """
+    Called by workers when a job finishes. Frees the tenant's in-flight slot and records the completion for
+    throughput measurement.
+    """
+    now = time.time()
+    tenant = redis_client.get(job_tenant_key(job_id))
+    pipe = redis_client.pipeline(transaction=False)
+    if tenant:
+        pipe.zrem(in_flight_key(tenant), job_id)
+        pipe.delete(job_tenant_key(job_id))
+    pipe.zadd(COMPLETIONS_KEY, {job_id: now})
+    pipe.zremrangebyscore(COMPLETIONS_KEY, 0, now - settings.ADMISSION_THROUGHPUT_WINDOW_SECONDS)
+    pipe.execute()
+
+
+class AdmissionController:
+    """
+    Sheds load at job submission before the queue and the result backend grow without bound.
+
+    Jobs are admitted while the broker queue is shorter than ADMISSION_MAX_QUEUE_DEPTH and the tenant has fewer than
+    ADMISSION_MAX_IN_FLIGHT_PER_TENANT queued or running jobs. Wait estimates are based on the number of jobs
+    workers completed during the last ADMISSION_THROUGHPUT_WINDOW_SECONDS.
+    """
+    # Atomically checks the tenant's in-flight count and registers all new jobs, or none of them.
+    # KEYS: the tenant's in-flight set, then the tenant key of every job, in the order of the job ids in ARGV
+    ADMIT_SCRIPT = """
+        local now = tonumber(ARGV[1])
+        local stale_before = tonumber(ARGV[2])
+        local limit = tonumber(ARGV[3])
+        local ttl = tonumber(ARGV[4])
+        local tenant = ARGV[5]
+        redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, stale_before)
+        local in_flight = redis.call('ZCARD', KEYS[1])
+        local count = #ARGV - 5
+        if in_flight + count > limit then
+            return in_flight
+        end
+        for i = 6, #ARGV do
+            redis.call('ZADD', KEYS[1], now, ARGV[i])
+            redis.call('SET', KEYS[i - 4], tenant, 'EX', ttl)
+        end
+        redis.call('EXPIRE', KEYS[1], ttl)
+        return -1
+    """
+
+    def __init__(self, redis_client, broker_client):
+        self.redis = redis_client
+        self.broker = broker_client
+        self._admit = redis_client.register_script(self.ADMIT_SCRIPT)
+
+    async def get_queue_depth(self) -> int:
+        return await self.broker.llen(settings.CELERY_QUEUE_NAME)
+
+    async def get_throughput(self) -> float:
+        """Jobs completed per second over the measurement window"""
+        now = time.time()
+        window = settings.ADMISSION_THROUGHPUT_WINDOW_SECONDS
+        completed = await self.redis.zcount(COMPLETIONS_KEY, now - window, now)
+        return completed / window
+
+    def estimate_wait(self, jobs_ahead: int, throughput: float) -> Optional[float]:
+        """Seconds until `jobs_ahead` jobs are processed, or None without throughput data"""
+        if throughput <= 0:
+            return None
+        return round(jobs_ahead / throughput, 1)
+
+    def _reject(self, reason: str, jobs_over: int, throughput: float, queue_depth: int):
+        estimated_wait = self.estimate_wait(queue_depth, throughput)
+        drain_time = self.estimate_wait(jobs_over, throughput)
+        retry_after = settings.ADMISSION_DEFAULT_RETRY_AFTER_SECONDS if drain_time is None else drain_time
+        retry_after = int(min(max(1, math.ceil(retry_after)), settings.ADMISSION_MAX_RETRY_AFTER_SECONDS))
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "message": reason,
+                "retry_after": retry_after,
+                "estimated_wait_seconds": estimated_wait
+            },
+            headers={"Retry-After": str(retry_after)}
+        )
+
+    async def admit(self, tenant: str, job_ids: List[str]) -> Optional[float]:
+        """
+        Admits new jobs for a tenant, all or none.
+
+        Returns:
+            float: Estimated seconds until the new jobs start, or None if there is no throughput data yet.
+        Raises:
+            HTTPException: 429 with a Retry-After header when over capacity.
+        """
+        queue_depth = await self.get_queue_depth()
+        throughput = await self.get_throughput()
+        if not job_ids:
+            return self.estimate_wait(queue_depth, throughput)
+
+        max_depth = settings.ADMISSION_MAX_QUEUE_DEPTH
+        if queue_depth + len(job_ids) > max_depth:
+            self._reject(
+                f"Job queue is full ({queue_depth} queued). Please retry later.",
+                queue_depth + len(job_ids) - max_depth,
+                throughput,
+                queue_depth
+            )
+
+        now = time.time()
+        limit = settings.ADMISSION_MAX_IN_FLIGHT_PER_TENANT
+        in_flight = int(await self._admit(
+            keys=[in_flight_key(tenant), *[job_tenant_key(job_id) for job_id in job_ids]],
+            args=[now, now - settings.JOB_COALESCING_INFLIGHT_TTL_SECONDS, limit,
+                  settings.JOB_COALESCING_INFLIGHT_TTL_SECONDS, tenant, *job_ids]
+        ))
+        if in_flight >= 0:
+            self._reject(
+                f"Too many jobs in flight for this client ({in_flight} of {limit}). Please retry later.",
+                in_flight + len(job_ids) - limit,
+                throughput,
+                queue_depth
+            )
+
+        return self.estimate_wait(queue_depth, throughput)
+
+    async def release(self, tenant: str, job_ids: List[str]) -> None:
+        """Frees slots of jobs that were admitted but never enqueued or were revoked"""
+        if not job_ids:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zrem(in_flight_key(tenant), *job_ids)
+        pipe.delete(*[job_tenant_key(job_id) for job_id in job_ids])
+        await pipe.execute()
+
+    async def release_job(self, job_id: str) -> None:
+        """Frees the slot of a job without knowing its tenant"""
+        tenant = await self.redis.get(job_tenant_key(job_id))
+        if tenant:
+            await self.release(tenant, [job_id])
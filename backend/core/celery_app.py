@@ -7,7 +7,7 @@ celery_app = Celery(
     "webslayer",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
-    include=['core.scraper_task']
+    include=['core.scraper_task', 'core.maintenance_task']
 )
 
 celery_app.conf.update(
@@ -16,4 +16,10 @@ celery_app.conf.update(
     result_serializer='json',
     timezone='UTC',
     enable_utc=True,
+    beat_schedule={
+        'maintain-reports': {
+            'task': 'core.maintenance_task.maintain_reports',
+            'schedule': settings.REPORT_MAINTENANCE_INTERVAL_SECONDS,
+        },
+    },
 ) 
\ No newline at end of file
@@ -0,0 +1,133 @@
+import functools
+import inspect
+import logging
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from core.settings import Settings
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+# Name of the adapter method whose queries are running, set by `instrument_operations`
+current_operation: ContextVar[str] = ContextVar("db_operation", default="other")
+
+
+class LatencyStats:
+    """Count, total and maximum of a series of durations"""
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_seconds": round(self.total_seconds, 6),
+            "mean_seconds": round(self.total_seconds / self.count, 6) if self.count else 0.0,
+            "max_seconds": round(self.max_seconds, 6)
+        }
+
+
+class DatabaseMetrics:
+    """
+    Process-wide connection pool and query metrics.
+
+    Attributes:
+        checkout_wait: time spent waiting for a pooled connection
+        checkout_timeouts: checkouts that gave up after the pool timeout
+        peak_checked_out: most connections checked out at once
+        queries: statement latency by adapter operation
+        slow_query_seconds: statements slower than this are logged, None disables the log
+    """
+    def __init__(self, slow_query_seconds: Optional[float] = None):
+        self.slow_query_seconds = slow_query_seconds
+        self.reset()
+
+    def reset(self) -> None:
+        self.checkout_wait = LatencyStats()
+        self.checkout_timeouts = 0
+        self.peak_checked_out = 0
+        self.queries: Dict[str, LatencyStats] = {}
+
+    def record_checkout(self, wait_seconds: float, checked_out: int) -> None:
+        self.checkout_wait.record(wait_seconds)
+        self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def record_query(self, operation: str, seconds: float, statement: str) -> None:
+        self.queries.setdefault(operation, LatencyStats()).record(seconds)
+        if self.slow_query_seconds is not None and seconds >= self.slow_query_seconds:
+            logger.warning(f"Slow query in {operation} took {seconds:.3f}s: {statement[:200]}")
+
+    def snapshot(self) -> dict:
+        return {
+            "checkout_wait": self.checkout_wait.to_dict(),
+            "checkout_timeouts": self.checkout_timeouts,
+            "peak_checked_out": self.peak_checked_out,
+            "queries": {operation: stats.to_dict() for operation, stats in sorted(self.queries.items())}
+        }
+
+
+db_metrics = DatabaseMetrics(settings.DB_SLOW_QUERY_SECONDS)
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long every checkout waited for a connection"""
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            db_metrics.checkout_timeouts += 1
+            raise
+        db_metrics.record_checkout(time.perf_counter() - start, self.checkedout())
+        return connection
+
+
+def instrument_engine(sync_engine) -> None:
+    """Records the latency of every statement run by the engine under the current operation"""
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        db_metrics.record_query(current_operation.get(), time.perf_counter() - start, statement)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        if exception_context.connection is not None:
+            starts = exception_context.connection.info.get("query_start")
+            if starts:
+                starts.pop()
+
+
+def instrument_operations(cls):
+    """Class decorator that attributes the queries of every public coroutine method to that method"""
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(method):
+            continue
+        setattr(cls, name, _with_operation(f"{cls.__name__}.{name}", method))
+    return cls
+
+
+def _with_operation(operation: str, method):
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = current_operation.set(operation)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            current_operation.reset(token)
+    return wrapper
@@ -2,21 +2,47 @@ from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy import text
+import uuid
 
 from core.settings import Settings
 from core.database.database_interface import DatabaseInterface
+from core.database.db_metrics import InstrumentedAsyncPool, db_metrics, instrument_engine
 
 class Base(DeclarativeBase):
     """Base class for SQLAlchemy models"""
     pass
 
 class PostgresDatabase(DatabaseInterface):
+    """
+    Async engine with a configurable connection pool.
+
+    With DB_PGBOUNCER_MODE, asyncpg's prepared statement caches are disabled and statements get unique names, as
+    PgBouncer in transaction mode may run consecutive statements on different server connections. With
+    ENABLE_DB_METRICS, checkout waits and statement latency are recorded in `db_metrics`.
+    """
     def __init__(self, settings: Settings):
         self.settings = settings
+        statement_cache_size = 0 if settings.DB_PGBOUNCER_MODE else settings.DB_STATEMENT_CACHE_SIZE
+        connect_args = {
+            "statement_cache_size": statement_cache_size,
+            "prepared_statement_cache_size": statement_cache_size
+        }
+        if settings.DB_PGBOUNCER_MODE:
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+        pool_args = {"poolclass": InstrumentedAsyncPool} if settings.ENABLE_DB_METRICS else {}
         self.engine = create_async_engine(
             settings.database_url,
-            echo=settings.DEBUG,
+            echo=settings.DB_ECHO,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            connect_args=connect_args,
+            **pool_args
         )
+        if settings.ENABLE_DB_METRICS:
+            instrument_engine(self.engine.sync_engine)
         self.async_session = async_sessionmaker(
             self.engine,
             class_=AsyncSession,
@@ -35,6 +61,22 @@ class PostgresDatabase(DatabaseInterface):
         """Cleanup database connections"""
         await self.engine.dispose()
     
+    def pool_status(self) -> dict:
+        """Current pool usage and the metrics recorded since startup"""
+        pool = self.engine.pool
+        capacity = self.settings.DB_POOL_SIZE + self.settings.DB_MAX_OVERFLOW
+        checked_out = pool.checkedout()
+        return {
+            "pool_size": self.settings.DB_POOL_SIZE,
+            "max_overflow": self.settings.DB_MAX_OVERFLOW,
+            "checked_out": checked_out,
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+            "pgbouncer_mode": self.settings.DB_PGBOUNCER_MODE,
+            **db_metrics.snapshot()
+        }
+
     async def health_check(self) -> bool:
         """Check if database is healthy"""
         try:
@@ -0,0 +1,37 @@
+import hashlib
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+
+def canonical_json(value: Any) -> str:
+    """Serializes a value so that equal JSON documents produce equal strings"""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def content_hash(item: Any) -> str:
+    return hashlib.sha256(canonical_json(item).encode()).hexdigest()
+
+
+def item_key(item: Any, key_fields: Sequence[str]) -> str:
+    """
+    Identity of an item across report runs: a hash of its key fields, or of its whole content when the schema has
+    no key fields or the item lacks all of them.
+    """
+    if key_fields and isinstance(item, dict):
+        key_values = [item.get(field) for field in key_fields]
+        if any(value is not None for value in key_values):
+            return hashlib.sha256(canonical_json(key_values).encode()).hexdigest()
+    return content_hash(item)
+
+
+def split_list_content(content: Any) -> Optional[Tuple[str, List[dict]]]:
+    """
+    Returns the key and items of list-shaped report content, i.e. a single top-level list of objects such as
+    {"events": [{...}, {...}]}, or None for any other shape.
+    """
+    if not isinstance(content, dict) or len(content) != 1:
+        return None
+    items_key, items = next(iter(content.items()))
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        return None
+    return items_key, items
@@ -0,0 +1,130 @@
+import time
+from typing import Callable, Optional
+
+from core.settings import Settings
+
+settings = Settings()
+
+CANCEL_KEY_PREFIX = "webslayer:job:cancel"
+
+
+class JobBudgetExceeded(Exception):
+    """Raised when a job has no time or token budget left, or was cancelled"""
+    pass
+
+
+def cancel_key(job_id: str) -> str:
+    return f"{CANCEL_KEY_PREFIX}:{job_id}"
+
+
+def is_budget_exhausted(state) -> bool:
+    """Returns True if the job of a graph state was cancelled or ran out of time or tokens"""
+    budget = state.get("budget")
+    return budget is not None and budget.is_exhausted()
+
+
+async def request_cancellation(redis_client, job_id: str) -> None:
+    """Flags a job for cooperative cancellation. Running workers pick the flag up between steps."""
+    await redis_client.set(cancel_key(job_id), 1, ex=settings.JOB_REPORT_LINK_TTL_SECONDS)
+
+
+class JobBudget:
+    """
+    Tracks the deadline, LLM token budget and cancellation flag of a single job.
+
+    Every stage of the pipeline (crawler, extractor, graders) checks the budget cooperatively and stops with the
+    best result so far once it runs out.
+
+    Args:
+        job_id: id of the Celery task, used to look up cancellation requests
+        deadline_seconds: wall clock budget for the job, measured from creation of the budget
+        max_llm_tokens: maximum number of (estimated) prompt and completion tokens
+        redis_client: synchronous Redis client used to check for cancellation, optional
+    """
+    CANCELLED = "cancelled"
+    DEADLINE = "deadline"
+    TOKEN_BUDGET = "token_budget"
+
+    def __init__(self, job_id: Optional[str] = None, deadline_seconds: Optional[float] = None,
+                 max_llm_tokens: Optional[int] = None, redis_client=None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.job_id = job_id
+        self.deadline_seconds = deadline_seconds
+        self.max_llm_tokens = max_llm_tokens
+        self.redis = redis_client
+        self.clock = clock
+        self.started_at = clock()
+        self.tokens_used = 0
+        self.stopped_reason = None
+        self._cancelled = False
+        self._last_cancel_check = None
+
+    def record_tokens(self, tokens: int) -> None:
+        self.tokens_used += max(0, tokens)
+
+    def elapsed_seconds(self) -> float:
+        return self.clock() - self.started_at
+
+    def remaining_seconds(self) -> Optional[float]:
+        if self.deadline_seconds is None:
+            return None
+        return max(0.0, self.deadline_seconds - self.elapsed_seconds())
+
+    def remaining_tokens(self) -> Optional[int]:
+        if self.max_llm_tokens is None:
+            return None
+        return max(0, self.max_llm_tokens - self.tokens_used)
+
+    def is_cancelled(self) -> bool:
+        """Checks the cancellation flag, at most once per JOB_CANCEL_CHECK_INTERVAL_SECONDS"""
+        if self._cancelled or not self.job_id or self.redis is None:
+            return self._cancelled
+        now = self.clock()
+        if self._last_cancel_check is not None and now - self._last_cancel_check < settings.JOB_CANCEL_CHECK_INTERVAL_SECONDS:
+            return False
+        self._last_cancel_check = now
+        try:
+            self._cancelled = bool(self.redis.exists(cancel_key(self.job_id)))
+        except Exception:
+            # Cancellation is best effort; an unavailable Redis must not fail the job
+            return False
+        return self._cancelled
+
+    def exhausted_reason(self, upcoming_tokens: int = 0) -> Optional[str]:
+        """
+        Returns why the job should stop, or None if it may continue.
+
+        Args:
+            upcoming_tokens: tokens the next LLM call is expected to use
+        """
+        reason = None
+        if self.is_cancelled():
+            reason = self.CANCELLED
+        elif self.deadline_seconds is not None and self.elapsed_seconds() >= self.deadline_seconds:
+            reason = self.DEADLINE
+        elif self.max_llm_tokens is not None and self.tokens_used + upcoming_tokens > self.max_llm_tokens:
+            reason = self.TOKEN_BUDGET
+        if reason and not self.stopped_reason:
+            self.stopped_reason = reason
+        return reason
+
+    def is_exhausted(self) -> bool:
+        return self.exhausted_reason() is not None
+
+    def ensure_available(self, upcoming_tokens: int = 0) -> None:
+        """
+        Raises:
+            JobBudgetExceeded: If the job was cancelled or the next step would exceed its budget.
+        """
+        reason = self.exhausted_reason(upcoming_tokens)
+        if reason:
+            raise JobBudgetExceeded(reason)
+
+    def to_stats(self) -> dict:
+        return {
+            "elapsed_seconds": round(self.elapsed_seconds(), 3),
+            "llm_tokens_used": self.tokens_used,
+            "deadline_seconds": self.deadline_seconds,
+            "max_llm_tokens": self.max_llm_tokens,
+            "stopped_reason": self.stopped_reason,
+        }
@@ -0,0 +1,198 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from redis.exceptions import WatchError
+
+from api.models import JobRequest
+from core.settings import Settings
+
+settings = Settings()
+
+
+class CoalescedJob:
+    """
+    An existing job that an incoming request can reuse.
+
+    Attributes:
+        job_id: id of the existing Celery task
+        report_name: name of the finished report, if the job already completed
+    """
+    def __init__(self, job_id: str, report_name: Optional[str] = None):
+        self.job_id = job_id
+        self.report_name = report_name
+
+
+class JobCoalescer:
+    """
+    Deduplicates identical scrape requests using Redis.
+
+    A request fingerprint maps to the task id of the job that is processing it. Once that job's report is saved,
+    the fingerprint also maps to the report name for JOB_COALESCING_FRESHNESS_SECONDS.
+    """
+    KEY_PREFIX = "webslayer:job"
+    IN_FLIGHT_STATES = {"PENDING", "RECEIVED", "STARTED", "RETRY"}
+
+    def __init__(self, redis_client):
+        self.redis = redis_client
+
+    @staticmethod
+    def fingerprint(job_request: JobRequest) -> str:
+        """
+        Hashes the parts of a request that determine its result.
+        """
+        payload = {
+            "urls": job_request.urls,
+            "schema_name": job_request.schema_name,
+            "return_schema_list": job_request.return_schema_list,
+            "llm_model_type": job_request.llm_model_type.value,
+            "llm_model_name": job_request.llm_model_name,
+            "crawl_config": job_request.crawl_config.model_dump() if job_request.crawl_config else None,
+            "scraper_config": job_request.scraper_config.model_dump() if job_request.scraper_config else None,
+            "deadline_seconds": job_request.deadline_seconds,
+            "max_llm_tokens": job_request.max_llm_tokens,
+        }
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _fingerprint_key(self, fingerprint: str) -> str:
+        return f"{self.KEY_PREFIX}:fingerprint:{fingerprint}"
+
+    def _report_key(self, fingerprint: str) -> str:
+        return f"{self.KEY_PREFIX}:report:{fingerprint}"
+
+    def _task_fingerprint_key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}:task-fingerprint:{job_id}"
+
+    def _task_report_key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}:task-report:{job_id}"
+
+    async def find_fresh_reports(self, fingerprints: List[str]) -> List[Optional[CoalescedJob]]:
+        """Returns, per fingerprint, the report of an identical job that finished within the freshness window"""
+        pipe = self.redis.pipeline(transaction=False)
+        for fingerprint in fingerprints:
+            pipe.get(self._report_key(fingerprint))
+            pipe.get(self._fingerprint_key(fingerprint))
+        values = await pipe.execute()
+        finished_jobs = []
+        for report_name, job_id in zip(values[::2], values[1::2]):
+            finished_jobs.append(CoalescedJob(job_id=job_id, report_name=report_name) if report_name else None)
+        return finished_jobs
+
+    async def claim_many(self, fingerprints: List[str], job_ids: List[str], get_task_result) -> List[Optional[CoalescedJob]]:
+        """
+        Claims many fingerprints at once. Uncontended fingerprints are claimed in a single pipeline; the others
+        fall back to `claim`.
+        """
+        if not fingerprints:
+            return []
+        ttl = settings.JOB_COALESCING_INFLIGHT_TTL_SECONDS
+        pipe = self.redis.pipeline(transaction=False)
+        for fingerprint, job_id in zip(fingerprints, job_ids):
+            pipe.set(self._fingerprint_key(fingerprint), job_id, nx=True, ex=ttl)
+        claimed = await pipe.execute()
+
+        pipe = self.redis.pipeline(transaction=False)
+        for fingerprint, job_id, is_claimed in zip(fingerprints, job_ids, claimed):
+            if is_claimed:
+                pipe.set(self._task_fingerprint_key(job_id), fingerprint, ex=ttl)
+        await pipe.execute()
+
+        existing_jobs = []
+        for fingerprint, job_id, is_claimed in zip(fingerprints, job_ids, claimed):
+            existing_jobs.append(None if is_claimed else await self.claim(fingerprint, job_id, get_task_result))
+        return existing_jobs
+
+    async def claim(self, fingerprint: str, job_id: str, get_task_result) -> Optional[CoalescedJob]:
+        """
+        Registers `job_id` as the job for this fingerprint unless an identical job can be reused.
+
+        Args:
+            fingerprint: request fingerprint
+            job_id: id the new task will be enqueued with
+            get_task_result: callable returning the Celery AsyncResult of a task id
+
+        Returns:
+            CoalescedJob: the existing job to attach to, or None if `job_id` was registered.
+        """
+        key = self._fingerprint_key(fingerprint)
+        ttl = settings.JOB_COALESCING_INFLIGHT_TTL_SECONDS
+        while True:
+            if await self.redis.set(key, job_id, nx=True, ex=ttl):
+                await self.redis.set(self._task_fingerprint_key(job_id), fingerprint, ex=ttl)
+                return None
+
+            async with self.redis.pipeline() as pipe:
+                try:
+                    await pipe.watch(key)
+                    existing_job_id = await pipe.get(key)
+                    if existing_job_id is None:
+                        continue  # Expired in the meantime, try to claim again
+                    if await self._is_reusable(existing_job_id, get_task_result(existing_job_id)):
+                        return CoalescedJob(job_id=existing_job_id)
+
+                    # The previous job failed, was revoked or is too old; replace it unless someone else already did
+                    pipe.multi()
+                    pipe.set(key, job_id, ex=ttl)
+                    pipe.set(self._task_fingerprint_key(job_id), fingerprint, ex=ttl)
+                    await pipe.execute()
+                    return None
+                except WatchError:
+                    continue
+
+    async def _is_reusable(self, job_id: str, result) -> bool:
+        """
+        A job can be shared while it is queued or running, or if it finished within the freshness window and
+        its report has not been saved yet.
+        """
+        if result.state in self.IN_FLIGHT_STATES:
+            return True
+        if result.state != "SUCCESS" or await self.redis.exists(self._task_report_key(job_id)):
+            return False
+        # Failed scrapes are returned as successful tasks with a failed status
+        if not isinstance(result.info, dict) or result.info.get("status") != "completed":
+            return False
+        date_done = result.date_done
+        if date_done is None:
+            return False
+        if date_done.tzinfo is None:
+            date_done = date_done.replace(tzinfo=timezone.utc)
+        age = (datetime.now(timezone.utc) - date_done).total_seconds()
+        return age <= settings.JOB_COALESCING_FRESHNESS_SECONDS
+
+    async def release(self, fingerprint: str, job_id: str) -> None:
+        """Removes the fingerprint registration of a job that could not be enqueued"""
+        key = self._fingerprint_key(fingerprint)
+        if await self.redis.get(key) == job_id:
+            await self.redis.delete(key, self._task_fingerprint_key(job_id))
+
+    async def release_job(self, job_id: str) -> None:
+        """Stops identical requests from attaching to a job, e.g. because it is being cancelled"""
+        fingerprint = await self.redis.get(self._task_fingerprint_key(job_id))
+        if fingerprint:
+            await self.release(fingerprint, job_id)
+
+    async def reserve_report_name(self, job_id: str, report_name: str) -> Optional[str]:
+        """
+        Links a finished job to the report created from it. Only the first caller wins, so polling a job many
+        times (or from many coalesced clients) creates a single report.
+
+        Returns:
+            str: The already linked report name, or None if `report_name` was reserved.
+        """
+        key = self._task_report_key(job_id)
+        if await self.redis.set(key, report_name, nx=True, ex=settings.JOB_REPORT_LINK_TTL_SECONDS):
+            return None
+        return await self.redis.get(key)
+
+    async def unreserve_report_name(self, job_id: str) -> None:
+        await self.redis.delete(self._task_report_key(job_id))
+
+    async def mark_report_created(self, job_id: str, report_name: str) -> None:
+        """Makes the report of a finished job available to identical requests within the freshness window"""
+        fingerprint = await self.redis.get(self._task_fingerprint_key(job_id))
+        if fingerprint and settings.JOB_COALESCING_FRESHNESS_SECONDS > 0:
+            await self.redis.set(
+                self._report_key(fingerprint), report_name, ex=settings.JOB_COALESCING_FRESHNESS_SECONDS
+            )
@@ -0,0 +1,217 @@
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from api.models import JobRequest, SchemaDefinition
+from core.admission_control import AdmissionController
+from core.celery_app import celery_app
+from core.job_coalescer import JobCoalescer
+from core.scraper_task import scrape_urls
+from core.settings import Settings
+
+settings = Settings()
+
+BATCH_KEY_PREFIX = "webslayer:batch"
+SUBMITTED_KEY_PREFIX = "webslayer:job:submitted"
+
+
+def build_schema_dict(schema: SchemaDefinition, return_as_list: bool = False) -> dict:
+    """
+    Converts a schema to the dictionary format used by the scraper, optionally wrapping it in a list structure.
+    """
+    base_schema = schema.to_dict()
+
+    if not return_as_list:
+        return base_schema
+
+    return {
+        "name": f"{schema.name}_list",
+        "fields": [
+            {
+                "name": schema.name,
+                "field_type": "list",
+                "description": f"List of {schema.name} items",
+                "required": True,
+                "list_item_type": "schema",
+                "item_schema": {
+                    "name": schema.name,
+                    "fields": base_schema["fields"]
+                }
+            }
+        ]
+    }
+
+
+def build_task_kwargs(job_request: JobRequest, schema_dict: dict) -> dict:
+    """Keyword arguments of the scrape_urls task for a job request"""
+    return dict(
+        schema=schema_dict,
+        schema_name=job_request.schema_name,
+        urls=job_request.urls,
+        model_type=job_request.llm_model_type,
+        model_name=job_request.llm_model_name,
+        crawl_config=job_request.crawl_config.model_dump(),
+        scraper_config=job_request.scraper_config.model_dump(),
+        priority=job_request.priority,
+        deadline_seconds=job_request.deadline_seconds,
+        max_llm_tokens=job_request.max_llm_tokens,
+        submitted_at=time.time()
+    )
+
+
+def job_status_from_meta(meta: dict) -> str:
+    """Maps a Celery result meta (or the result of the scrape task) to a job status"""
+    state = meta.get("status")
+    if state == "SUCCESS":
+        result = meta.get("result")
+        return result.get("status", "completed") if isinstance(result, dict) else "completed"
+    if state == "FAILURE":
+        return "failed"
+    if state == "REVOKED":
+        return "cancelled"
+    return "pending"
+
+
+class JobSubmitter:
+    """
+    Enqueues scrape jobs, coalescing identical requests.
+
+    Redis lookups for many jobs are pipelined and all tasks are published through a single broker producer, so a
+    batch of hundreds of jobs needs a handful of round trips.
+    """
+    def __init__(self, redis_client, broker_client=None):
+        self.redis = redis_client
+        self.coalescer = JobCoalescer(redis_client)
+        self.admission = AdmissionController(redis_client, broker_client or redis_client)
+
+    async def submit(self, job_requests: List[JobRequest], schema_dicts: List[dict], tenant: str = "anonymous") -> List[dict]:
+        """
+        Submits jobs and returns one response per job, in order.
+
+        Args:
+            job_requests: job requests to enqueue
+            schema_dicts: scraper schema of every job request
+            tenant: caller the jobs are counted against for admission control
+        Raises:
+            HTTPException: 429 if the jobs are not admitted. No job of the call is enqueued in that case.
+        """
+        fingerprints = [JobCoalescer.fingerprint(job_request) for job_request in job_requests]
+        job_ids = [str(uuid.uuid4()) for _ in job_requests]
+        responses: List[Optional[dict]] = [None] * len(job_requests)
+
+        to_enqueue = list(range(len(job_requests)))
+        if settings.ENABLE_JOB_COALESCING:
+            to_enqueue = await self._coalesce(fingerprints, job_ids, responses)
+
+        admitted = False
+        estimated_wait = None
+        try:
+            if settings.ENABLE_ADMISSION_CONTROL:
+                estimated_wait = await self.admission.admit(tenant, [job_ids[index] for index in to_enqueue])
+                admitted = True
+            await self._mark_submitted([job_ids[index] for index in to_enqueue])
+
+            with celery_app.producer_or_acquire() as producer:
+                for index in to_enqueue:
+                    scrape_urls.apply_async(
+                        kwargs=build_task_kwargs(job_requests[index], schema_dicts[index]),
+                        task_id=job_ids[index],
+                        producer=producer
+                    )
+                    responses[index] = {
+                        "job_id": job_ids[index],
+                        "message": "Job queued for processing",
+                        "coalesced": False,
+                        "estimated_wait_seconds": estimated_wait
+                    }
+        except Exception:
+            not_enqueued = [index for index in to_enqueue if responses[index] is None]
+            if settings.ENABLE_JOB_COALESCING:
+                for index in not_enqueued:
+                    await self.coalescer.release(fingerprints[index], job_ids[index])
+            if admitted:
+                await self.admission.release(tenant, [job_ids[index] for index in not_enqueued])
+            if not_enqueued:
+                await self.redis.delete(*[f"{SUBMITTED_KEY_PREFIX}:{job_ids[index]}" for index in not_enqueued])
+            raise
+
+        return responses
+
+    async def _coalesce(self, fingerprints: List[str], job_ids: List[str], responses: List[Optional[dict]]) -> List[int]:
+        """
+        Fills in responses for jobs that can reuse an identical job and returns the indexes of jobs to enqueue.
+        """
+        finished_jobs = await self.coalescer.find_fresh_reports(fingerprints)
+        claim_indexes = []
+        for index, finished_job in enumerate(finished_jobs):
+            if finished_job:
+                responses[index] = {
+                    "job_id": finished_job.job_id,
+                    "message": "Identical job completed recently",
+                    "coalesced": True,
+                    "report_name": finished_job.report_name
+                }
+            else:
+                claim_indexes.append(index)
+
+        running_jobs = await self.coalescer.claim_many(
+            [fingerprints[index] for index in claim_indexes],
+            [job_ids[index] for index in claim_indexes],
+            scrape_urls.AsyncResult
+        )
+        to_enqueue = []
+        for index, running_job in zip(claim_indexes, running_jobs):
+            if running_job:
+                responses[index] = {
+                    "job_id": running_job.job_id,
+                    "message": "Attached to identical job in progress",
+                    "coalesced": True
+                }
+            else:
+                to_enqueue.append(index)
+        return to_enqueue
+
+    async def _mark_submitted(self, job_ids: List[str]) -> None:
+        """Records that jobs were enqueued, since Celery reports unknown job ids as pending"""
+        if not job_ids:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipe.set(f"{SUBMITTED_KEY_PREFIX}:{job_id}", 1, ex=settings.JOB_COALESCING_INFLIGHT_TTL_SECONDS)
+        await pipe.execute()
+
+    async def was_submitted(self, job_id: str) -> bool:
+        """True if the job was enqueued within the in-flight window"""
+        return bool(await self.redis.exists(f"{SUBMITTED_KEY_PREFIX}:{job_id}"))
+
+    async def create_batch(self, responses: List[dict]) -> str:
+        """Stores the job ids of a batch and returns the batch id"""
+        batch_id = str(uuid.uuid4())
+        batch = {
+            "job_ids": [response["job_id"] if response else None for response in responses],
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }
+        await self.redis.set(f"{BATCH_KEY_PREFIX}:{batch_id}", json.dumps(batch), ex=settings.JOB_REPORT_LINK_TTL_SECONDS)
+        return batch_id
+
+    async def get_batch(self, batch_id: str) -> Optional[dict]:
+        batch = await self.redis.get(f"{BATCH_KEY_PREFIX}:{batch_id}")
+        return json.loads(batch) if batch else None
+
+    @staticmethod
+    def get_job_statuses(job_ids: List[str]) -> Dict[str, str]:
+        """
+        Returns the status of many jobs, reading all results from the result backend in one request when supported.
+        """
+        backend = scrape_urls.backend
+        try:
+            values = backend.mget([backend.get_key_for_task(job_id) for job_id in job_ids])
+            metas = [backend.decode_result(value) if value else {"status": "PENDING"} for value in values]
+        except NotImplementedError:
+            metas = []
+            for job_id in job_ids:
+                task = scrape_urls.AsyncResult(job_id)
+                metas.append({"status": task.state, "result": task.info})
+        return {job_id: job_status_from_meta(meta) for job_id, meta in zip(job_ids, metas)}
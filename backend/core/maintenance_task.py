@@ -0,0 +1,23 @@
+import asyncio
+import logging
+
+from core.celery_app import celery_app
+from core.database.postgres_database import db as database
+from core.report_retention import ReportRetention
+from core.utils import Utils
+
+logger = logging.getLogger(__name__)
+Utils.setup_logging(logger, True)
+
+
+async def run_report_maintenance() -> dict:
+    async with database.async_session() as session:
+        return await ReportRetention(session).run()
+
+
+@celery_app.task
+def maintain_reports():
+    """Creates upcoming report partitions and applies report retention. Scheduled by Celery beat."""
+    logger.info("Starting report maintenance")
+    loop = asyncio.get_event_loop()
+    return loop.run_until_complete(run_report_maintenance())
@@ -0,0 +1,52 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from core.database.postgres_database import Base
+
+
+class SchemaItem(Base):
+    """
+    One version of an extracted item. Identical items of recurring runs share a row; `last_seen` moves forward
+    each time a report contains the item again.
+    """
+    __tablename__ = "schema_items"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    schema_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    item_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    content: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    first_seen: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_seen: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("schema_name", "item_key", "content_hash", name="uq_schema_items_version"),
+        Index("idx_schema_items_schema_name_last_seen", "schema_name", "last_seen"),
+        Index("idx_schema_items_content_path", content, postgresql_using="gin", postgresql_ops={"content": "jsonb_path_ops"}),
+        Index(
+            "idx_schema_items_content_fts",
+            text("jsonb_to_tsvector('simple', content, '[\"string\"]')"),
+            postgresql_using="gin"
+        ),
+    )
+
+
+class ReportItemRef(Base):
+    """
+    Position of an item version in a report. Partitioned like reports on the report's timestamp, so there is no
+    foreign key to reports; refs are deleted together with their report.
+    """
+    __tablename__ = "report_item_refs"
+
+    report_name: Mapped[str] = mapped_column(String(255), primary_key=True)
+    report_timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    position: Mapped[int] = mapped_column(Integer, primary_key=True)
+    item_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("schema_items.id"), nullable=False)
+
+    __table_args__ = (
+        Index("idx_report_item_refs_item_id", "item_id"),
+        {"postgresql_partition_by": "RANGE (report_timestamp)"},
+    )
@@ -1,6 +1,8 @@
-from sqlalchemy import DateTime, String, JSON, ForeignKey
+from sqlalchemy import BigInteger, DateTime, String, ForeignKey, Index, LargeBinary, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
+from typing import Optional
 from sqlalchemy.sql import func
 
 from core.database.postgres_database import Base
@@ -12,13 +14,40 @@ class Report(Base, CreatedAtMixin):
 
     name: Mapped[str] = mapped_column(String(255), primary_key=True)
     schema_name: Mapped[str] = mapped_column(String(255), ForeignKey("schema_definitions.name"))
-    content: Mapped[dict] = mapped_column(JSON)
+    content: Mapped[Optional[dict]] = mapped_column(JSONB(none_as_null=True), nullable=True)
+    # Set when the list under this key of `content` is stored in schema_items
+    items_key: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    # Large content is stored compressed instead of in `content`
+    content_compressed: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True, deferred=True)
+    content_encoding: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    content_size: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    # Changes since the previous report of the same schema, see api.models.ReportDiff
+    previous_report_name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    diff: Mapped[Optional[dict]] = mapped_column(JSONB(none_as_null=True), nullable=True, deferred=True)
+    # Partition key, hence part of the primary key
     timestamp: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), 
         server_default=func.now(),
+        primary_key=True,
         nullable=False
     )
 
+    __table_args__ = (
+        # Keyset pagination of the report listing, newest first
+        Index("idx_reports_timestamp_name", timestamp.desc(), name.desc()),
+        Index("idx_reports_schema_name_timestamp_name", schema_name, timestamp.desc(), name.desc()),
+        # Content queries: JSON path / containment and full-text search over string values
+        Index("idx_reports_content_path", content, postgresql_using="gin", postgresql_ops={"content": "jsonb_path_ops"}),
+        Index(
+            "idx_reports_content_fts",
+            text("jsonb_to_tsvector('simple', content, '[\"string\"]')"),
+            postgresql_using="gin"
+        ),
+        # Monthly partitions are created by ensure_report_partition (postgres-init.sql)
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
     def to_pydantic(self) -> ReportPydantic:
         """Convert SQLAlchemy model to Pydantic model"""
         return ReportPydantic(
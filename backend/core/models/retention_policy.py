@@ -0,0 +1,20 @@
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+from datetime import datetime
+
+from core.database.postgres_database import Base
+from core.models.base import TimestampMixin
+from api.models import RetentionPolicy as RetentionPolicyPydantic
+
+class RetentionPolicy(Base, TimestampMixin):
+    """Number of days reports of a schema are kept, overriding REPORT_RETENTION_DAYS"""
+    __tablename__ = "report_retention_policies"
+
+    schema_name: Mapped[str] = mapped_column(String(255), primary_key=True)
+    retention_days: Mapped[int] = mapped_column(Integer, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def to_pydantic(self) -> RetentionPolicyPydantic:
+        """Convert SQLAlchemy model to Pydantic model"""
+        return RetentionPolicyPydantic(schema_name=self.schema_name, retention_days=self.retention_days)
@@ -30,7 +30,9 @@ class SchemaDefinition(Base, TimestampMixin):
                     description=field.description,
                     required=field.required,
                     list_item_type=field.list_item_type,
-                    default_value=field.default_value
+                    default_value=field.default_value,
+                    is_key=field.is_key,
+                    aliases=field.aliases or []
                 )
                 for field in self.fields
             ]
@@ -43,6 +43,8 @@ class SchemaField(Base, TimestampMixin):
         nullable=True
     )
     default_value: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    is_key: Mapped[bool] = mapped_column(Boolean, default=False)
+    aliases: Mapped[list | None] = mapped_column(JSON, nullable=True)
 
     schema_definition: Mapped[SchemaDefinition] = relationship(
         "SchemaDefinition",
@@ -0,0 +1,284 @@
+import hashlib
+import logging
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+from api.models import JobPriority, ModelType
+from core.settings import Settings
+
+settings = Settings()
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitTimeoutError(Exception):
+    """Raised when an LLM call could not acquire rate limit capacity in time"""
+    pass
+
+
+class BucketSpec:
+    """
+    Describes a single token bucket: its capacity, refill rate and how much a call takes from it.
+    """
+    def __init__(self, key: str, capacity: float, refill_per_second: float, amount: float):
+        self.key = key
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.amount = amount
+
+
+class TokenBucketBackend(ABC):
+    """Interface for token bucket storage"""
+
+    @abstractmethod
+    def try_acquire(self, buckets: List[BucketSpec], reserve: float, now: float) -> float:
+        """
+        Atomically takes `amount` from every bucket if all of them have enough capacity left
+        (keeping `reserve` as a fraction of the capacity untouched).
+
+        Returns:
+            float: 0 if acquired, otherwise the number of seconds to wait before retrying.
+        """
+        pass
+
+    @abstractmethod
+    def consume(self, key: str, capacity: float, refill_per_second: float, amount: float, now: float) -> None:
+        """Takes `amount` from a bucket unconditionally. The bucket may go negative."""
+        pass
+
+
+class InMemoryTokenBucketBackend(TokenBucketBackend):
+    """
+    Process-local token buckets. Useful for tests and single-worker deployments.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, tuple] = {}
+
+    def _level(self, key, capacity, refill_per_second, now):
+        level, ts = self._buckets.get(key, (capacity, now))
+        return min(capacity, level + max(0.0, now - ts) * refill_per_second)
+
+    def try_acquire(self, buckets: List[BucketSpec], reserve: float, now: float) -> float:
+        with self._lock:
+            wait = 0.0
+            levels = []
+            for bucket in buckets:
+                level = self._level(bucket.key, bucket.capacity, bucket.refill_per_second, now)
+                levels.append(level)
+                needed = min(bucket.capacity, min(bucket.amount, bucket.capacity) + bucket.capacity * reserve)
+                if level < needed:
+                    wait = max(wait, (needed - level) / bucket.refill_per_second)
+            if wait > 0:
+                return wait
+            for bucket, level in zip(buckets, levels):
+                self._buckets[bucket.key] = (level - bucket.amount, now)
+            return 0.0
+
+    def consume(self, key: str, capacity: float, refill_per_second: float, amount: float, now: float) -> None:
+        with self._lock:
+            level = self._level(key, capacity, refill_per_second, now)
+            self._buckets[key] = (level - amount, now)
+
+
+class RedisTokenBucketBackend(TokenBucketBackend):
+    """
+    Token buckets stored in Redis so that every API process and Celery worker shares the same budget.
+    Both buckets of a call are checked and updated in a single Lua script. Refills are timed with the Redis server
+    clock rather than `now`, so clock skew between workers cannot over-refill a bucket or run its time backwards.
+    """
+    # Seconds since the epoch on the Redis server
+    NOW = """
+        local time = redis.call('TIME')
+        local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+    """
+
+    ACQUIRE_SCRIPT = NOW + """
+        local reserve = tonumber(ARGV[1])
+        local wait = 0
+        local levels = {}
+        for i = 1, #KEYS do
+            local base = 1 + (i - 1) * 3
+            local capacity = tonumber(ARGV[base + 1])
+            local rate = tonumber(ARGV[base + 2])
+            local amount = tonumber(ARGV[base + 3])
+            local state = redis.call('HMGET', KEYS[i], 'level', 'ts')
+            local level = tonumber(state[1]) or capacity
+            local ts = tonumber(state[2]) or now
+            level = math.min(capacity, level + math.max(0, now - ts) * rate)
+            levels[i] = level
+            local needed = math.min(capacity, math.min(amount, capacity) + capacity * reserve)
+            if level < needed then
+                wait = math.max(wait, (needed - level) / rate)
+            end
+        end
+        if wait == 0 then
+            for i = 1, #KEYS do
+                local base = 1 + (i - 1) * 3
+                local capacity = tonumber(ARGV[base + 1])
+                local rate = tonumber(ARGV[base + 2])
+                local amount = tonumber(ARGV[base + 3])
+                redis.call('HSET', KEYS[i], 'level', levels[i] - amount, 'ts', now)
+                redis.call('EXPIRE', KEYS[i], math.ceil(capacity / rate) + 60)
+            end
+        end
+        return tostring(wait)
+    """
+
+    CONSUME_SCRIPT = NOW + """
+        local capacity = tonumber(ARGV[1])
+        local rate = tonumber(ARGV[2])
+        local amount = tonumber(ARGV[3])
+        local state = redis.call('HMGET', KEYS[1], 'level', 'ts')
+        local level = tonumber(state[1]) or capacity
+        local ts = tonumber(state[2]) or now
+        level = math.min(capacity, level + math.max(0, now - ts) * rate)
+        redis.call('HSET', KEYS[1], 'level', level - amount, 'ts', now)
+        redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+        return 1
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._acquire = client.register_script(self.ACQUIRE_SCRIPT)
+        self._consume = client.register_script(self.CONSUME_SCRIPT)
+
+    def try_acquire(self, buckets: List[BucketSpec], reserve: float, now: float) -> float:
+        args = [reserve]
+        for bucket in buckets:
+            args += [bucket.capacity, bucket.refill_per_second, bucket.amount]
+        return float(self._acquire(keys=[bucket.key for bucket in buckets], args=args))
+
+    def consume(self, key: str, capacity: float, refill_per_second: float, amount: float, now: float) -> None:
+        self._consume(keys=[key], args=[capacity, refill_per_second, amount])
+
+
+class LLMRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter shared by every agent calling an LLM provider.
+
+    Buckets are keyed by provider, model and API key. Bulk jobs may only use a bucket while it holds more
+    than the configured reserve, so interactive jobs go first when a provider is busy.
+    """
+    KEY_PREFIX = "webslayer:ratelimit"
+    # Local models are not subject to provider quotas
+    UNLIMITED_MODEL_TYPES = {ModelType.ollama}
+
+    def __init__(self, backend: TokenBucketBackend, enabled: bool = True, limits: Optional[Dict[str, Dict[str, int]]] = None,
+                 default_requests_per_minute: int = 50, default_tokens_per_minute: int = 40000,
+                 bulk_reserve: float = 0.25, max_wait_seconds: float = 300,
+                 clock: Callable[[], float] = time.time, sleep: Callable[[float], None] = time.sleep):
+        self.backend = backend
+        self.enabled = enabled
+        self.limits = limits or {}
+        self.default_requests_per_minute = default_requests_per_minute
+        self.default_tokens_per_minute = default_tokens_per_minute
+        self.bulk_reserve = bulk_reserve
+        self.max_wait_seconds = max_wait_seconds
+        self.clock = clock
+        self.sleep = sleep
+
+    def get_limits(self, model_type, model_name) -> Dict[str, int]:
+        """
+        Returns the budgets for a provider and model. Model specific limits take precedence over provider limits.
+        """
+        provider = ModelType(model_type).value
+        limits = {
+            "requests_per_minute": self.default_requests_per_minute,
+            "tokens_per_minute": self.default_tokens_per_minute,
+        }
+        limits.update(self.limits.get(provider, {}))
+        limits.update(self.limits.get(f"{provider}:{model_name}", {}))
+        return limits
+
+    def bucket_key(self, model_type, model_name, api_key) -> str:
+        key_hash = hashlib.sha256((api_key or "").encode()).hexdigest()[:12]
+        return f"{self.KEY_PREFIX}:{ModelType(model_type).value}:{model_name}:{key_hash}"
+
+    def is_limited(self, model_type) -> bool:
+        return self.enabled and ModelType(model_type) not in self.UNLIMITED_MODEL_TYPES
+
+    def acquire(self, model_type, model_name, api_key, tokens: int, priority=JobPriority.interactive,
+                should_abort: Optional[Callable[[], bool]] = None) -> float:
+        """
+        Blocks until one request and `tokens` tokens are available for the given provider and model.
+
+        Returns:
+            float: Seconds spent waiting.
+        Raises:
+            RateLimitTimeoutError: If capacity could not be acquired within max_wait_seconds.
+        """
+        if not self.is_limited(model_type):
+            return 0.0
+
+        limits = self.get_limits(model_type, model_name)
+        key = self.bucket_key(model_type, model_name, api_key)
+        buckets = [
+            BucketSpec(f"{key}:requests", limits["requests_per_minute"], limits["requests_per_minute"] / 60, 1),
+            BucketSpec(f"{key}:tokens", limits["tokens_per_minute"], limits["tokens_per_minute"] / 60, tokens),
+        ]
+        reserve = self.bulk_reserve if JobPriority(priority) == JobPriority.bulk else 0.0
+
+        started = self.clock()
+        while True:
+            wait = self.backend.try_acquire(buckets, reserve, self.clock())
+            if wait <= 0:
+                return self.clock() - started
+
+            waited = self.clock() - started
+            if waited + wait > self.max_wait_seconds:
+                raise RateLimitTimeoutError(
+                    f"Rate limit for {ModelType(model_type).value}:{model_name} not available after {waited:.1f}s"
+                )
+            if should_abort and should_abort():
+                return waited
+
+            # Jitter keeps workers that were throttled together from retrying in lockstep
+            delay = wait + random.uniform(0, min(1.0, wait))
+            logger.debug(f"Rate limited on {key}, waiting {delay:.2f}s ({JobPriority(priority).value} lane).")
+            self.sleep(delay)
+
+    def record_usage(self, model_type, model_name, api_key, tokens: int) -> None:
+        """
+        Charges tokens that were not known when acquiring (e.g. the generated output) to the tokens bucket.
+        """
+        if not self.is_limited(model_type) or tokens <= 0:
+            return
+        limits = self.get_limits(model_type, model_name)
+        key = self.bucket_key(model_type, model_name, api_key)
+        self.backend.consume(
+            f"{key}:tokens", limits["tokens_per_minute"], limits["tokens_per_minute"] / 60, tokens, self.clock()
+        )
+
+
+_rate_limiter = None
+
+
+def create_backend(backend_name: str) -> TokenBucketBackend:
+    if backend_name == "memory":
+        return InMemoryTokenBucketBackend()
+    if backend_name == "redis":
+        from core.redis_client import get_redis
+        return RedisTokenBucketBackend(get_redis())
+    raise ValueError(f"Unsupported rate limit backend: {backend_name}")
+
+
+def get_rate_limiter() -> LLMRateLimiter:
+    """
+    Returns the process-wide rate limiter configured from settings.
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = LLMRateLimiter(
+            backend=create_backend(settings.LLM_RATE_LIMIT_BACKEND),
+            enabled=settings.ENABLE_LLM_RATE_LIMITING,
+            limits=settings.LLM_RATE_LIMITS,
+            default_requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+            default_tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+            bulk_reserve=settings.LLM_RATE_LIMIT_BULK_RESERVE,
+            max_wait_seconds=settings.LLM_RATE_LIMIT_MAX_WAIT_SECONDS,
+        )
+    return _rate_limiter
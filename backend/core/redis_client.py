@@ -0,0 +1,53 @@
+import redis
+import redis.asyncio as async_redis
+
+from core.settings import Settings
+
+settings = Settings()
+
+_redis_client = None
+_async_redis_client = None
+_async_broker_client = None
+
+
+def get_redis() -> redis.Redis:
+    """
+    Returns a process-wide synchronous Redis client. Used by Celery workers and other blocking code.
+    """
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis_client
+
+
+def get_async_redis() -> async_redis.Redis:
+    """
+    Returns a process-wide asyncio Redis client. Used by API routes.
+    """
+    global _async_redis_client
+    if _async_redis_client is None:
+        _async_redis_client = async_redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _async_redis_client
+
+
+def get_async_broker_redis() -> async_redis.Redis:
+    """
+    Returns an asyncio Redis client for the Celery broker, e.g. to inspect queue lengths.
+    """
+    global _async_broker_client
+    if settings.CELERY_BROKER_URL == settings.REDIS_URL:
+        return get_async_redis()
+    if _async_broker_client is None:
+        _async_broker_client = async_redis.Redis.from_url(settings.CELERY_BROKER_URL, decode_responses=True)
+    return _async_broker_client
+
+
+async def close_async_redis() -> None:
+    """Closes the asyncio Redis clients, if they were created"""
+    global _async_redis_client, _async_broker_client
+    if _async_redis_client is not None:
+        await _async_redis_client.aclose()
+        _async_redis_client = None
+    if _async_broker_client is not None:
+        await _async_broker_client.aclose()
+        _async_broker_client = None
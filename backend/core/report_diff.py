@@ -0,0 +1,94 @@
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from core.items import content_hash, item_key, split_list_content
+
+# An item of a report: (item key, content hash, reference to its content)
+ItemVersion = Tuple[str, str, Hashable]
+
+
+def merge_patch(old: Any, new: Any) -> Any:
+    """
+    JSON merge patch (RFC 7386) that turns `old` into `new`: changed and added fields with their new value, removed
+    fields as null. Nested objects are patched recursively; any other change replaces the whole value.
+    """
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return new
+    patch = {key: None for key in old if key not in new}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+        elif old[key] != value:
+            patch[key] = merge_patch(old[key], value)
+    return patch
+
+
+def item_versions(content: Any, key_fields: Sequence[str], side: str) -> Tuple[List[ItemVersion], Dict[Hashable, Any]]:
+    """
+    Item versions of report content and the items they reference, as (side, position). Content that is not
+    list-shaped is compared as a single item.
+    """
+    list_content = split_list_content(content)
+    items = list_content[1] if list_content else [content]
+    versions = []
+    contents = {}
+    for position, item in enumerate(items):
+        ref = (side, position)
+        versions.append((item_key(item, key_fields), content_hash(item), ref))
+        contents[ref] = item
+    return versions, contents
+
+
+class VersionDiff:
+    """
+    Result of matching the item versions of two reports.
+
+    Attributes:
+        added: references of new items whose key is not in the base report
+        removed: references of base items whose key is not in the new report
+        changed: (base reference, new reference) pairs of items with the same key and different content
+        unchanged_count: number of items with the same key and content in both reports
+    """
+    def __init__(self):
+        self.added: List[Hashable] = []
+        self.removed: List[Hashable] = []
+        self.changed: List[Tuple[Hashable, Hashable]] = []
+        self.unchanged_count = 0
+
+
+def diff_versions(base: List[ItemVersion], new: List[ItemVersion]) -> VersionDiff:
+    """
+    Matches items by key, and items sharing a key by content hash, so only hashes are compared and unchanged items
+    never need to be loaded. Items repeating a key that have no identical counterpart are paired in order and
+    reported as changed; the rest are added or removed.
+    """
+    base_by_key: Dict[str, List[Tuple[str, Hashable]]] = {}
+    for key, digest, ref in base:
+        base_by_key.setdefault(key, []).append((digest, ref))
+    new_by_key: Dict[str, List[Tuple[str, Hashable]]] = {}
+    for key, digest, ref in new:
+        new_by_key.setdefault(key, []).append((digest, ref))
+
+    diff = VersionDiff()
+    for key in list(new_by_key) + [key for key in base_by_key if key not in new_by_key]:
+        base_items = list(base_by_key.get(key, []))
+        unmatched_new = []
+        for digest, ref in new_by_key.get(key, []):
+            match = next((index for index, (base_digest, _) in enumerate(base_items) if base_digest == digest), None)
+            if match is None:
+                unmatched_new.append(ref)
+            else:
+                base_items.pop(match)
+                diff.unchanged_count += 1
+        unmatched_base = [ref for _, ref in base_items]
+        diff.changed.extend(zip(unmatched_base, unmatched_new))
+        diff.added.extend(unmatched_new[len(unmatched_base):])
+        diff.removed.extend(unmatched_base[len(unmatched_new):])
+    return diff
+
+
+def item_key_values(item: Any, key_fields: Sequence[str]) -> Optional[dict]:
+    """Key field values identifying an item to consumers, None if the item has none of the key fields"""
+    if not key_fields or not isinstance(item, dict):
+        return None
+    values = {field: item.get(field) for field in key_fields}
+    return values if any(value is not None for value in values.values()) else None
@@ -0,0 +1,254 @@
+import csv
+import io
+import zlib
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+import orjson
+
+from api.models import ExportEncoding, ExportFormat
+from core.report_storage import ZSTD, iter_decompressed
+
+CHUNK_SIZE = 64 * 1024
+ARROW_BATCH_SIZE = 10000
+
+MEDIA_TYPES = {
+    ExportFormat.json: "application/json",
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+    ExportFormat.parquet: "application/vnd.apache.parquet",
+    ExportFormat.arrow: "application/vnd.apache.arrow.stream",
+}
+
+FILE_EXTENSIONS = {
+    ExportFormat.json: "json",
+    ExportFormat.ndjson: "ndjson",
+    ExportFormat.csv: "csv",
+    ExportFormat.parquet: "parquet",
+    ExportFormat.arrow: "arrows",
+}
+
+
+class ExportError(Exception):
+    """Raised when a report cannot be exported in the requested format or encoding"""
+    pass
+
+
+def _check_dependencies(export_format: ExportFormat, encoding: ExportEncoding) -> None:
+    """
+    Raises:
+        ExportError: If an optional dependency of the format or encoding is not installed.
+    """
+    if export_format in (ExportFormat.parquet, ExportFormat.arrow):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ExportError(f"The {export_format.value} format requires pyarrow to be installed")
+    if encoding == ExportEncoding.zstd:
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            raise ExportError("zstd encoding requires zstandard to be installed")
+
+
+def _encode_value(value: Any) -> Any:
+    """Flattens nested values to JSON text for tabular formats"""
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value).decode()
+    return value
+
+
+async def _json_chunks(items: AsyncIterator[Any], items_key: Optional[str]) -> AsyncIterator[bytes]:
+    """Report content as a JSON document. List-shaped content is written item by item."""
+    if items_key is None:
+        async for item in items:
+            yield orjson.dumps(item)
+        return
+    yield b"{" + orjson.dumps(items_key) + b":["
+    first = True
+    async for item in items:
+        yield orjson.dumps(item) if first else b"," + orjson.dumps(item)
+        first = False
+    yield b"]}"
+
+
+async def _ndjson_chunks(items: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    async for item in items:
+        yield orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE)
+
+
+async def _csv_chunks(items: AsyncIterator[Any], columns: Optional[List[str]]) -> AsyncIterator[bytes]:
+    """
+    One row per item. Columns are the schema fields, or the keys of the first item for reports without a schema;
+    nested values are written as JSON.
+    """
+    buffer = io.StringIO()
+    writer = None
+    async for item in items:
+        if not isinstance(item, dict):
+            item = {"value": item}
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=columns or list(item.keys()), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow({key: _encode_value(value) for key, value in item.items()})
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if writer is None and columns:
+        csv.DictWriter(buffer, fieldnames=columns).writeheader()
+    yield buffer.getvalue().encode()
+
+
+def _arrow_schema(columns: Optional[List[str]], field_types: Dict[str, str], first_batch: List[dict]):
+    """
+    Arrow schema from the schema field types. Columns without a known scalar type, and all columns of reports
+    without a schema, are strings so that every batch of a stream has the same schema.
+    """
+    import pyarrow as pa
+
+    type_map = {
+        "integer": pa.int64(),
+        "float": pa.float64(),
+        "boolean": pa.bool_(),
+    }
+    if not columns:
+        columns = []
+        for item in first_batch:
+            columns.extend(key for key in item if key not in columns)
+    return pa.schema([(column, type_map.get(field_types.get(column), pa.string())) for column in columns])
+
+
+def _arrow_batch(schema, rows: List[dict]):
+    import pyarrow as pa
+
+    string_columns = {field.name for field in schema if pa.types.is_string(field.type)}
+    records = []
+    for row in rows:
+        record = {}
+        for column in schema.names:
+            value = row.get(column)
+            if column in string_columns and value is not None and not isinstance(value, str):
+                value = _encode_value(value) if isinstance(value, (dict, list)) else str(value)
+            record[column] = value
+        records.append(record)
+    return pa.RecordBatch.from_pylist(records, schema=schema)
+
+
+async def _arrow_chunks(items: AsyncIterator[Any], export_format: ExportFormat, columns: Optional[List[str]],
+                        field_types: Dict[str, str]) -> AsyncIterator[bytes]:
+    """Parquet file or Arrow IPC stream, written one record batch of ARROW_BATCH_SIZE items at a time"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = io.BytesIO()
+    writer = None
+    schema = None
+    batch = []
+
+    def write(rows):
+        nonlocal writer, schema
+        if writer is None:
+            schema = _arrow_schema(columns, field_types, rows)
+            if export_format == ExportFormat.parquet:
+                writer = pq.ParquetWriter(sink, schema, compression="zstd")
+            else:
+                writer = pa.ipc.new_stream(sink, schema)
+        writer.write_batch(_arrow_batch(schema, rows))
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    async for item in items:
+        batch.append(item if isinstance(item, dict) else {"value": item})
+        if len(batch) >= ARROW_BATCH_SIZE:
+            write(batch)
+            batch = []
+            yield drain()
+    if batch or writer is None:
+        write(batch)
+    writer.close()
+    yield drain()
+
+
+async def _buffered(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Joins small chunks so the response is written in CHUNK_SIZE pieces"""
+    pending = []
+    size = 0
+    async for chunk in chunks:
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= CHUNK_SIZE:
+            yield b"".join(pending)
+            pending = []
+            size = 0
+    if pending:
+        yield b"".join(pending)
+
+
+async def _compressed(chunks: AsyncIterator[bytes], encoding: ExportEncoding) -> AsyncIterator[bytes]:
+    if encoding == ExportEncoding.identity:
+        async for chunk in chunks:
+            yield chunk
+        return
+
+    if encoding == ExportEncoding.gzip:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        compress, flush = compressor.compress, compressor.flush
+    else:
+        import zstandard
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+        compress, flush = compressor.compress, compressor.flush
+
+    async for chunk in chunks:
+        data = compress(chunk)
+        if data:
+            yield data
+    yield flush()
+
+
+def stream_export(items: AsyncIterator[Any], export_format: ExportFormat, encoding: ExportEncoding = ExportEncoding.identity,
+                  items_key: Optional[str] = None, columns: Optional[List[str]] = None,
+                  field_types: Optional[Dict[str, str]] = None) -> AsyncIterator[bytes]:
+    """
+    Serializes report items straight into response chunks, optionally compressed.
+
+    Args:
+        items: items of the report, or its whole content as a single item for reports that are not list-shaped
+        export_format: output format
+        encoding: content encoding applied to the output
+        items_key: key of the item list in list-shaped content, used to rebuild the JSON document
+        columns: column names for tabular formats, usually the schema field names
+        field_types: schema field type per column, used for typed Arrow/Parquet columns
+    Raises:
+        ExportError: If an optional dependency of the format or encoding is not installed.
+    """
+    _check_dependencies(export_format, encoding)
+    if export_format == ExportFormat.json:
+        chunks = _json_chunks(items, items_key)
+    elif export_format == ExportFormat.ndjson:
+        chunks = _ndjson_chunks(items)
+    elif export_format == ExportFormat.csv:
+        chunks = _csv_chunks(items, columns)
+    else:
+        chunks = _arrow_chunks(items, export_format, columns, field_types or {})
+    return _compressed(_buffered(chunks), encoding)
+
+
+def stream_compressed_json(compressed: bytes, content_encoding: str,
+                           encoding: ExportEncoding = ExportEncoding.identity) -> AsyncIterator[bytes]:
+    """
+    JSON export of report content stored compressed, without parsing it. A zstd response reuses the stored bytes.
+    """
+    _check_dependencies(ExportFormat.json, encoding)
+    if encoding == ExportEncoding.zstd and content_encoding == ZSTD:
+        return iterate([compressed])
+    return _compressed(_buffered(iterate(iter_decompressed(compressed, content_encoding))), encoding)
+
+
+async def iterate(items: Iterable[Any]) -> AsyncIterator[Any]:
+    """Adapts an in-memory list of items to the async item stream expected by `stream_export`"""
+    for item in items:
+        yield item
@@ -0,0 +1,200 @@
+import logging
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.settings import Settings
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+PARTITION_NAME = re.compile(r"^reports_p(\d{4})(\d{2})$")
+# Item versions younger than this are never collected, a report referencing them may still be being saved
+ITEM_GRACE_PERIOD = timedelta(days=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after the month of `month`"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class ReportPartition:
+    """
+    A monthly partition of reports and its report_item_refs counterpart.
+
+    Attributes:
+        name: table name of the reports partition, reports_pYYYYMM
+        refs_name: table name of the report_item_refs partition
+        start: first timestamp in the partition
+        end: first timestamp after the partition
+    """
+    def __init__(self, name: str, start: datetime, end: datetime):
+        self.name = name
+        self.refs_name = "report_item_refs" + name[len("reports"):]
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def from_name(cls, name: str) -> Optional["ReportPartition"]:
+        match = PARTITION_NAME.match(name)
+        if not match:
+            return None
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        end = add_months(month, 1)
+        return cls(
+            name,
+            datetime(month.year, month.month, 1, tzinfo=timezone.utc),
+            datetime(end.year, end.month, 1, tzinfo=timezone.utc)
+        )
+
+
+class ReportRetention:
+    """
+    Maintains the monthly partitions of reports and enforces retention.
+
+    Reports are kept for the retention_days of their schema's policy, or REPORT_RETENTION_DAYS for schemas without
+    one (None keeps them forever). Partitions past the longest retention are dropped as a whole, which costs the
+    same no matter how many reports they hold; reports of schemas with shorter retention are deleted in batches
+    from the partitions that remain. Item versions that are no longer referenced by any report are deleted last.
+
+    Args:
+        db: session, committed after every step so long runs do not hold locks
+        now: reference time, defaults to the current time
+    """
+    def __init__(self, db: AsyncSession, now: Optional[datetime] = None):
+        self.db = db
+        self.now = now or datetime.now(timezone.utc)
+
+    async def get_partitions(self) -> List[ReportPartition]:
+        result = await self.db.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'reports'::regclass"
+        ))
+        partitions = [ReportPartition.from_name(name) for name in result.scalars().all()]
+        return sorted((partition for partition in partitions if partition), key=lambda partition: partition.start)
+
+    async def get_policies(self) -> Dict[str, int]:
+        result = await self.db.execute(text("SELECT schema_name, retention_days FROM report_retention_policies"))
+        return {row.schema_name: row.retention_days for row in result.all()}
+
+    async def ensure_partitions(self, months_ahead: int) -> List[str]:
+        """
+        Creates the partitions of the current month, the next `months_ahead` months and of any month that has
+        reports in the default partition. Returns the names of the created partitions.
+        """
+        current = date(self.now.year, self.now.month, 1)
+        months = {add_months(current, offset) for offset in range(months_ahead + 1)}
+        result = await self.db.execute(text(
+            "SELECT DISTINCT CAST(date_trunc('month', timestamp AT TIME ZONE 'UTC') AS date) FROM reports_default"
+        ))
+        months.update(result.scalars().all())
+
+        created = []
+        for month in sorted(months):
+            result = await self.db.execute(text("SELECT ensure_report_partition(:month)"), {"month": month})
+            name = result.scalar()
+            await self.db.commit()
+            if name:
+                created.append(name)
+        return created
+
+    async def drop_partition(self, partition: ReportPartition) -> None:
+        await self.db.execute(text(f'DROP TABLE IF EXISTS "{partition.refs_name}"'))
+        await self.db.execute(text(f'DROP TABLE IF EXISTS "{partition.name}"'))
+        await self.db.commit()
+
+    async def delete_expired_reports(self, cutoff: datetime, schema_condition: str, params: dict) -> int:
+        """Deletes reports older than `cutoff` matching `schema_condition`, and their item refs, in batches"""
+        statement = text(f"""
+            WITH expired AS (
+                SELECT name, timestamp FROM reports
+                WHERE timestamp < :cutoff AND {schema_condition}
+                LIMIT :batch_size
+            ), refs AS (
+                DELETE FROM report_item_refs ref USING expired e
+                WHERE ref.report_timestamp < :cutoff
+                    AND ref.report_name = e.name AND ref.report_timestamp = e.timestamp
+            )
+            DELETE FROM reports r USING expired e
+            WHERE r.timestamp < :cutoff AND r.name = e.name AND r.timestamp = e.timestamp
+        """)
+        batch_size = settings.REPORT_MAINTENANCE_BATCH_SIZE
+        deleted = 0
+        while True:
+            result = await self.db.execute(statement, {**params, "cutoff": cutoff, "batch_size": batch_size})
+            await self.db.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                return deleted
+
+    async def delete_orphaned_items(self) -> int:
+        """Deletes item versions no report references anymore, in batches"""
+        statement = text("""
+            DELETE FROM schema_items WHERE id IN (
+                SELECT si.id FROM schema_items si
+                WHERE si.last_seen < :before
+                    AND NOT EXISTS (SELECT 1 FROM report_item_refs ref WHERE ref.item_id = si.id)
+                LIMIT :batch_size
+            )
+        """)
+        batch_size = settings.REPORT_MAINTENANCE_BATCH_SIZE
+        deleted = 0
+        while True:
+            result = await self.db.execute(
+                statement, {"before": self.now - ITEM_GRACE_PERIOD, "batch_size": batch_size}
+            )
+            await self.db.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                return deleted
+
+    async def run(self) -> dict:
+        """Runs all maintenance steps and returns what was done"""
+        created = await self.ensure_partitions(settings.REPORT_PARTITION_MONTHS_AHEAD)
+        policies = await self.get_policies()
+        default_days = settings.REPORT_RETENTION_DAYS
+        partitions = await self.get_partitions()
+        dropped = []
+
+        if default_days is not None:
+            cutoff = self.now - timedelta(days=max([default_days, *policies.values()]))
+            for partition in partitions:
+                if partition.end <= cutoff:
+                    await self.drop_partition(partition)
+                    dropped.append(partition.name)
+
+        reports_deleted = 0
+        for schema_name, retention_days in policies.items():
+            reports_deleted += await self.delete_expired_reports(
+                self.now - timedelta(days=retention_days), "schema_name = :schema_name", {"schema_name": schema_name}
+            )
+        if default_days is not None:
+            reports_deleted += await self.delete_expired_reports(
+                self.now - timedelta(days=default_days),
+                "(schema_name IS NULL OR NOT (schema_name = ANY(:policy_schemas)))",
+                {"policy_schemas": list(policies)}
+            )
+
+        # Past partitions emptied by the deletes above
+        current_month = datetime(self.now.year, self.now.month, 1, tzinfo=timezone.utc)
+        for partition in partitions:
+            if partition.name in dropped or partition.end > current_month:
+                continue
+            result = await self.db.execute(text(f'SELECT EXISTS (SELECT 1 FROM "{partition.name}")'))
+            if not result.scalar():
+                await self.drop_partition(partition)
+                dropped.append(partition.name)
+
+        items_deleted = await self.delete_orphaned_items()
+        stats = {
+            "partitions_created": created,
+            "partitions_dropped": dropped,
+            "reports_deleted": reports_deleted,
+            "items_deleted": items_deleted
+        }
+        logger.info(f"Report maintenance finished: {stats}")
+        return stats
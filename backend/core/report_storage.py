@@ -0,0 +1,79 @@
+import hashlib
+from typing import Iterator, Optional, Tuple
+
+import orjson
+
+from core.settings import Settings
+
+settings = Settings()
+
+ZSTD = "zstd"
+DECOMPRESS_CHUNK_SIZE = 64 * 1024
+
+
+class EncodedContent:
+    """
+    Report content prepared for storage.
+
+    Attributes:
+        content: content to store as JSONB, None if it is compressed
+        compressed: zstd-compressed JSON of the content, if it was above the size threshold
+        encoding: encoding of `compressed`
+        content_hash: sha256 of the JSON of the content
+        size: size in bytes of the JSON of the content
+    """
+    def __init__(self, content: Optional[dict], compressed: Optional[bytes], encoding: Optional[str],
+                 content_hash: str, size: int):
+        self.content = content
+        self.compressed = compressed
+        self.encoding = encoding
+        self.content_hash = content_hash
+        self.size = size
+
+
+def content_digest(content: dict) -> Tuple[str, int]:
+    """sha256 and size in bytes of the JSON of report content"""
+    serialized = orjson.dumps(content)
+    return hashlib.sha256(serialized).hexdigest(), len(serialized)
+
+
+def encode_content(content: dict, compress: Optional[bool] = None, threshold: Optional[int] = None) -> EncodedContent:
+    """
+    Compresses content at least `threshold` bytes long when compression is enabled.
+
+    Args:
+        content: report content
+        compress: overrides ENABLE_REPORT_COMPRESSION
+        threshold: overrides REPORT_COMPRESSION_THRESHOLD_BYTES
+    """
+    serialized = orjson.dumps(content)
+    digest = hashlib.sha256(serialized).hexdigest()
+    compress = settings.ENABLE_REPORT_COMPRESSION if compress is None else compress
+    threshold = settings.REPORT_COMPRESSION_THRESHOLD_BYTES if threshold is None else threshold
+    if compress and len(serialized) >= threshold:
+        import zstandard
+        compressed = zstandard.ZstdCompressor(level=settings.REPORT_COMPRESSION_LEVEL).compress(serialized)
+        return EncodedContent(None, compressed, ZSTD, digest, len(serialized))
+    return EncodedContent(content, None, None, digest, len(serialized))
+
+
+def _check_encoding(encoding: str) -> None:
+    if encoding != ZSTD:
+        raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def decode_content(compressed: bytes, encoding: str) -> dict:
+    _check_encoding(encoding)
+    import zstandard
+    return orjson.loads(zstandard.ZstdDecompressor().decompress(compressed))
+
+
+def iter_decompressed(compressed: bytes, encoding: str) -> Iterator[bytes]:
+    """Yields the JSON of compressed content in chunks, without decompressing it all at once"""
+    _check_encoding(encoding)
+    import zstandard
+    decompressor = zstandard.ZstdDecompressor().decompressobj()
+    for start in range(0, len(compressed), DECOMPRESS_CHUNK_SIZE):
+        data = decompressor.decompress(compressed[start:start + DECOMPRESS_CHUNK_SIZE])
+        if data:
+            yield data
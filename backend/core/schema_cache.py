@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.models import SchemaDefinition
+from core.adapters.postgres_adapter import PostgresAdapter
+from core.items import content_hash
+from core.settings import Settings
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "webslayer:schema:invalidate"
+
+
+def schema_fingerprint(schema_dict: dict) -> str:
+    """Content hash of a schema dictionary, the version that derived objects are cached under"""
+    return content_hash(schema_dict)
+
+
+class LRUCache:
+    """A size-bounded mapping that evicts the least recently used entry"""
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_or_create(self, key: Hashable, create: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = create()
+            self.set(key, value)
+        return value
+
+    def pop(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SchemaCache:
+    """
+    Process-wide cache of schema definitions read at job submission.
+
+    Entries are evicted when a schema is saved or deleted: the process that changes a schema evicts it directly and
+    publishes the name on INVALIDATION_CHANNEL, which `listen` consumes in every API process. Entries also expire
+    after SCHEMA_CACHE_TTL_SECONDS, which bounds staleness if an event is missed while Redis is unreachable.
+    """
+    def __init__(self, ttl_seconds: float, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries = LRUCache(max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    def get_cached(self, name: str) -> Optional[SchemaDefinition]:
+        entry = self._entries.get(name)
+        if entry is None or self.clock() - entry[1] > self.ttl_seconds:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def put(self, schema: SchemaDefinition) -> None:
+        self._entries.set(schema.name, (schema, self.clock()))
+
+    def evict(self, name: Optional[str] = None) -> None:
+        """Evicts one schema, or all of them"""
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name)
+
+    async def get(self, db: AsyncSession, name: str) -> SchemaDefinition:
+        """
+        Raises:
+            HTTPException: 404 if the schema does not exist. Missing schemas are not cached.
+        """
+        schema = self.get_cached(name) if settings.ENABLE_SCHEMA_CACHE else None
+        if schema is None:
+            schema = await PostgresAdapter().get_schema_by_name(db, name)
+            self.put(schema)
+        return schema
+
+    async def get_many(self, db: AsyncSession, names: List[str]) -> Dict[str, SchemaDefinition]:
+        """Gets many schemas, reading the ones that are not cached in a single query. Missing names are left out."""
+        schemas = {}
+        missing = []
+        for name in set(names):
+            schema = self.get_cached(name) if settings.ENABLE_SCHEMA_CACHE else None
+            if schema is None:
+                missing.append(name)
+            else:
+                schemas[name] = schema
+        if missing:
+            loaded = await PostgresAdapter().get_schemas_by_names(db, missing)
+            for schema in loaded.values():
+                self.put(schema)
+            schemas.update(loaded)
+        return schemas
+
+    async def invalidate(self, redis_client, name: str) -> None:
+        """Evicts a schema in this process and publishes the eviction to the other processes"""
+        self.evict(name)
+        try:
+            await redis_client.publish(INVALIDATION_CHANNEL, name)
+        except Exception as e:
+            logger.warning(f"Failed to publish invalidation of schema '{name}': {e}")
+
+    async def listen(self, redis_client) -> None:
+        """Evicts schemas changed by other processes. Runs until cancelled, reconnecting after errors."""
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Events may have been missed while unsubscribed
+                self.evict()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.evict(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Schema invalidation listener failed, reconnecting: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+
+schema_cache = SchemaCache(settings.SCHEMA_CACHE_TTL_SECONDS, settings.SCHEMA_CACHE_MAX_ENTRIES)
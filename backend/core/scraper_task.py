@@ -6,7 +6,11 @@ from httpx import ConnectError
 from core.celery_app import celery_app
 from scraper.scraper import Scraper
 from core.utils import Utils
+from core.job_budget import JobBudget
+from core.redis_client import get_redis
+from core.admission_control import record_job_finished
 import asyncio
+import time
 
 logger = logging.getLogger(__name__)
 Utils.setup_logging(logger, True)
@@ -28,10 +32,35 @@ class ScraperTask(Task):
         logger.debug(f"Task return value: {retval}")
         super().on_success(retval, task_id, args, kwargs)
 
+    def after_return(self, status, retval, task_id, args, kwargs, einfo):
+        try:
+            record_job_finished(get_redis(), task_id)
+        except Exception as e:
+            logger.warning(f"Failed to record completion of task {task_id}: {e}")
+        super().after_return(status, retval, task_id, args, kwargs, einfo)
+
+def cancelled_result(budget: JobBudget) -> dict:
+    logger.info(f"Task {budget.job_id} was cancelled")
+    return {
+        'status': 'cancelled',
+        'stats': {'budget': budget.to_stats()}
+    }
+
 @celery_app.task(bind=True, base=ScraperTask)
-def scrape_urls(self, schema, schema_name, urls, model_type, model_name, crawl_config, scraper_config):
+def scrape_urls(self, schema, schema_name, urls, model_type, model_name, crawl_config, scraper_config, priority="interactive",
+                deadline_seconds=None, max_llm_tokens=None, submitted_at=None):
+    # Job-start latency: time the job spent queued before a worker picked it up
+    queue_seconds = round(time.time() - submitted_at, 3) if submitted_at else None
+    budget = JobBudget(
+        job_id=self.request.id,
+        deadline_seconds=deadline_seconds,
+        max_llm_tokens=max_llm_tokens,
+        redis_client=get_redis()
+    )
     try:
-        logger.info(f"Starting scraping task with config: model_type={model_type}, urls={urls}")
+        logger.info(f"Starting scraping task after {queue_seconds}s in queue with config: model_type={model_type}, urls={urls}")
+        if budget.exhausted_reason() == JobBudget.CANCELLED:
+            return cancelled_result(budget)
         loop = asyncio.get_event_loop()
         scraper = loop.run_until_complete(Scraper.create(
             schema=schema,
@@ -40,18 +69,36 @@ def scrape_urls(self, schema, schema_name, urls, model_type, model_name, crawl_c
             local_model_name=model_name,
             logger=logger,
             crawl_config=crawl_config,
-            scraper_config=scraper_config
+            scraper_config=scraper_config,
+            priority=priority,
+            budget=budget
         ))
         result = loop.run_until_complete(scraper.extract())
+        if budget.stopped_reason == JobBudget.CANCELLED:
+            return cancelled_result(budget)
+        if scraper.unchanged:
+            return {
+                'status': 'unchanged',
+                'schema_name': schema_name,
+                'stats': {**scraper.get_stats(), 'queue_seconds': queue_seconds}
+            }
         logger.info(f"Scraping completed successfully")
         logger.debug(f"Scraping result: {result}")
 
         return {
             'status': 'completed',
             'result': result,
-            'schema_name': schema_name
+            'schema_name': schema_name,
+            # Pages skipped as unchanged (skip_unchanged_pages) are missing from the result, like pages a stopped
+            # job did not get to
+            'partial': budget.stopped_reason is not None or bool(
+                scraper.near_duplicate_stats and scraper.near_duplicate_stats.get("unchanged")
+            ),
+            'stats': {**scraper.get_stats(), 'queue_seconds': queue_seconds}
         }
     except HTTPException as e:
+        if budget.stopped_reason == JobBudget.CANCELLED:
+            return cancelled_result(budget)
         return {
             'status': 'failed',
             'error': str(e.detail),
@@ -1,5 +1,8 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Optional, Dict
+
+# Structural similarity of two pages of the same template, shared by PageClusterer and CrawlConfig
+DEFAULT_PAGE_CLUSTER_SIMILARITY = 0.7
 
 class Settings(BaseSettings):
     # API Configuration
@@ -17,17 +20,85 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "webslayer_db"
     POSTGRES_HOST: str = "postgres"
     POSTGRES_PORT: int = 5432
+    DB_ECHO: bool = False  # Log every SQL statement
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100  # Prepared statements cached per connection
+    DB_PGBOUNCER_MODE: bool = False  # Disable prepared statement caching, for PgBouncer in transaction mode
+    ENABLE_DB_METRICS: bool = True
+    DB_SLOW_QUERY_SECONDS: Optional[float] = 1.0  # Queries slower than this are logged, None disables the log
 
     # Celery Configuration
     CELERY_BROKER_URL: str = "redis://redis:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://redis:6379/0"
 
+    # Redis Configuration (shared state between API and workers)
+    REDIS_URL: str = "redis://redis:6379/0"
+
+    # Job Coalescing Configuration
+    ENABLE_JOB_COALESCING: bool = True
+    JOB_COALESCING_FRESHNESS_SECONDS: int = 300  # Identical requests within this window reuse the finished report
+    JOB_COALESCING_INFLIGHT_TTL_SECONDS: int = 21600  # Upper bound on how long a job is considered in flight
+    JOB_REPORT_LINK_TTL_SECONDS: int = 86400  # Should match the Celery result expiry
+    MAX_BATCH_SIZE: int = 1000
+
+    # Admission Control Configuration
+    ENABLE_ADMISSION_CONTROL: bool = True
+    CELERY_QUEUE_NAME: str = "celery"
+    ADMISSION_MAX_QUEUE_DEPTH: int = 2000
+    ADMISSION_MAX_IN_FLIGHT_PER_TENANT: int = 500
+    ADMISSION_THROUGHPUT_WINDOW_SECONDS: int = 900
+    ADMISSION_DEFAULT_RETRY_AFTER_SECONDS: int = 30  # Used until throughput has been measured
+    ADMISSION_MAX_RETRY_AFTER_SECONDS: int = 600
+
+    # Job Budget Configuration
+    JOB_CANCEL_CHECK_INTERVAL_SECONDS: float = 1.0
+
+    # Schema Cache Configuration
+    ENABLE_SCHEMA_CACHE: bool = True
+    SCHEMA_CACHE_TTL_SECONDS: int = 300  # Bounds staleness if an invalidation event is missed
+    SCHEMA_CACHE_MAX_ENTRIES: int = 256  # Per process, also bounds the worker caches of models and graphs
+
+    # Item Store Configuration
+    ENABLE_ITEM_STORE: bool = True  # Store the items of list-shaped reports once per version instead of per report
+    ITEM_STORE_BATCH_SIZE: int = 1000
+
+    # Bulk Report Configuration
+    MAX_BULK_REPORTS: int = 1000  # Reports per bulk create or delete request
+    BULK_REPORT_INSERT_BATCH_SIZE: int = 100  # Rows per multi-row INSERT, bounds statement size for large content
+
+    # Report Diff Configuration
+    ENABLE_REPORT_DIFF: bool = True  # Store the changes since the previous report of the same schema with each report
+
+    # Report Storage Configuration
+    ENABLE_REPORT_COMPRESSION: bool = False  # Compressed reports are not searched by the report query API
+    REPORT_COMPRESSION_THRESHOLD_BYTES: int = 1048576
+    REPORT_COMPRESSION_LEVEL: int = 3
+
+    # Report Retention Configuration
+    REPORT_RETENTION_DAYS: Optional[int] = None  # For schemas without a retention policy, None keeps reports forever
+    REPORT_PARTITION_MONTHS_AHEAD: int = 2
+    REPORT_MAINTENANCE_INTERVAL_SECONDS: int = 3600
+    REPORT_MAINTENANCE_BATCH_SIZE: int = 10000
+
     # LLM Configuration
     OLLAMA_HOST: str = 'ollama'
     OLLAMA_PORT: int = 11434
     DEFAULT_LLM_MODEL: str = "llama3.1:8b-instruct-q5_0"
     DEFAULT_LLM_TYPE: str = "Ollama"
 
+    # LLM Rate Limiting Configuration
+    ENABLE_LLM_RATE_LIMITING: bool = True
+    LLM_RATE_LIMIT_BACKEND: str = "redis"  # "redis" or "memory"
+    LLM_REQUESTS_PER_MINUTE: int = 50
+    LLM_TOKENS_PER_MINUTE: int = 40000
+    LLM_RATE_LIMITS: Dict[str, Dict[str, int]] = {}  # e.g. {"Claude:claude-3-5-sonnet-latest": {"requests_per_minute": 50, "tokens_per_minute": 80000}}
+    LLM_RATE_LIMIT_BULK_RESERVE: float = 0.25  # Fraction of each bucket kept free for interactive jobs
+    LLM_RATE_LIMIT_MAX_WAIT_SECONDS: int = 300
+
     # Crawler Configuration
     ENABLE_CRAWLING: bool = False
     IGNORE_ROBOTS: bool = False
@@ -36,6 +107,26 @@ class Settings(BaseSettings):
     ENABLE_CHUNKING: bool = True
     CHUNK_SIZE: int = 15000
     CHUNK_OVERLAP: int = 200
+    ENABLE_MAIN_CONTENT: bool = False
+    ENABLE_TEMPLATE_REMOVAL: bool = False
+    TEMPLATE_PAGE_FRACTION: float = 0.6  # Share of crawled pages a block has to appear on to be template
+    ENABLE_NEAR_DUPLICATES: bool = False
+    NEAR_DUPLICATE_DISTANCE: int = 4  # Bits the SimHash of the non-template text of near-duplicate pages may differ in
+    SKIP_UNCHANGED_PAGES: bool = False
+    PAGE_FINGERPRINT_TTL_SECONDS: int = 2592000  # Fingerprints of jobs that are not run again expire after 30 days
+    ENABLE_STRUCTURED_DATA: bool = False  # Pages whose JSON-LD, microdata or OpenGraph fill the schema skip the LLM
+    ENABLE_SELECTOR_TEMPLATES: bool = False
+    SELECTOR_TEMPLATE_TRAINING_PAGES: int = 2
+    SELECTOR_TEMPLATE_MIN_AGREEMENT: float = 0.9  # Share of LLM values a learned template has to reproduce
+    SELECTOR_TEMPLATE_TTL_SECONDS: int = 2592000  # Templates of sites that are not crawled again expire after 30 days
+    ENABLE_PAGE_CLUSTERING: bool = False
+    PAGE_CLUSTER_SIMILARITY: float = DEFAULT_PAGE_CLUSTER_SIMILARITY
+    LISTING_PAGES_PER_CLUSTER: int = 0  # Listing pages extracted per template, 0 extracts all of them
+    ENABLE_RELEVANCE_FILTER: bool = False
+    RELEVANCE_MIN_SCORE: float = 0.1  # Share of the best chunk's BM25 score a chunk needs to be extracted
+    RELEVANCE_MIN_CHUNKS: int = 2  # Chunks extracted whatever their score
+    ENABLE_TOKEN_COMPACTION: bool = False
+    COMPACTION_MIN_URL_CHARS: int = 24  # Repeated URLs this long are sent once per chunk, in a reference table
 
     # Scraper Configuration
     MAX_HALLUCINATION_CHECKS: int = 2
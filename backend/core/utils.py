@@ -18,6 +18,17 @@ class Utils:
             return default
     
     
+    @staticmethod
+    def estimate_tokens(text) -> int:
+        """
+        Cheap token estimate (~4 characters per token) used for budgeting LLM calls.
+        """
+        if text is None:
+            return 0
+        if not isinstance(text, str):
+            text = str(text)
+        return (len(text) + 3) // 4
+
     @staticmethod
     def setup_logging(logger, is_debug):
         """
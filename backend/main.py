@@ -1,12 +1,15 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 import logging
 import uvicorn
 
-from api.routes import schema_router, scraping_router, reports_router, project_router
+from api.routes import schema_router, scraping_router, reports_router, project_router, system_router
 from core.settings import Settings
 from core.utils import Utils
 from core.database.postgres_database import db
+from core.redis_client import close_async_redis, get_async_redis
+from core.schema_cache import schema_cache
 
 settings = Settings()
 
@@ -16,9 +19,12 @@ Utils.setup_logging(logger, settings.DEBUG)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting up WebSlayer API")
+    schema_listener = asyncio.create_task(schema_cache.listen(get_async_redis()))
     yield
     logger.info("Shutting down WebSlayer API")
+    schema_listener.cancel()
     await db.shutdown()
+    await close_async_redis()
 
 # Initialize FastAPI with lifespan
 app = FastAPI(
@@ -34,6 +40,7 @@ app.include_router(schema_router, prefix="/webslayer")
 app.include_router(scraping_router, prefix="/webslayer")
 app.include_router(reports_router, prefix="/webslayer")
 app.include_router(project_router, prefix="/webslayer")
+app.include_router(system_router, prefix="/webslayer")
 
 if __name__ == "__main__":
     uvicorn.run(
@@ -0,0 +1,176 @@
+"""
+Converts the reports and report_item_refs tables of an existing database into monthly partitioned tables.
+
+The current tables are renamed, partitioned tables are created as in postgres-init.sql with a partition for every
+month that has reports, and all rows are copied over. The conversion runs in a single transaction, so it either
+completes or leaves the database untouched; reports cannot be written while it runs. Run from the backend
+directory, after migrations.report_storage:
+
+    python -m migrations.partition_reports
+"""
+import argparse
+import asyncio
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+
+from core.database.postgres_database import db
+from core.report_retention import add_months
+from core.settings import Settings
+from migrations.report_storage import update_schema
+
+settings = Settings()
+
+REPORT_COLUMNS = (
+    "name, schema_name, content, items_key, content_compressed, content_encoding, content_hash, content_size, "
+    "previous_report_name, diff, timestamp, created_at"
+)
+
+RENAME_TABLES = [
+    "ALTER TABLE reports RENAME TO reports_unpartitioned",
+    "ALTER TABLE reports_unpartitioned RENAME CONSTRAINT reports_pkey TO reports_unpartitioned_pkey",
+    "ALTER TABLE report_item_refs RENAME TO report_item_refs_unpartitioned",
+    "ALTER TABLE report_item_refs_unpartitioned RENAME CONSTRAINT report_item_refs_pkey "
+    "TO report_item_refs_unpartitioned_pkey",
+    "DROP INDEX IF EXISTS idx_reports_timestamp_name",
+    "DROP INDEX IF EXISTS idx_reports_schema_name_timestamp_name",
+    "DROP INDEX IF EXISTS idx_reports_content_path",
+    "DROP INDEX IF EXISTS idx_reports_content_fts",
+    "DROP INDEX IF EXISTS idx_report_item_refs_item_id",
+]
+
+CREATE_TABLES = [
+    """CREATE TABLE reports (
+        name VARCHAR(255) NOT NULL,
+        schema_name VARCHAR(255),
+        content JSONB,
+        items_key VARCHAR(255),
+        content_compressed BYTEA,
+        content_encoding VARCHAR(16),
+        content_hash VARCHAR(64),
+        content_size BIGINT,
+        previous_report_name VARCHAR(255),
+        diff JSONB,
+        timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        PRIMARY KEY (name, timestamp)
+    ) PARTITION BY RANGE (timestamp)""",
+    "CREATE TABLE reports_default PARTITION OF reports DEFAULT",
+    """CREATE TABLE report_item_refs (
+        report_name VARCHAR(255) NOT NULL,
+        report_timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+        position INTEGER NOT NULL,
+        item_id BIGINT NOT NULL REFERENCES schema_items(id),
+        PRIMARY KEY (report_name, report_timestamp, position)
+    ) PARTITION BY RANGE (report_timestamp)""",
+    "CREATE TABLE report_item_refs_default PARTITION OF report_item_refs DEFAULT",
+    """CREATE TABLE IF NOT EXISTS report_retention_policies (
+        schema_name VARCHAR(255) PRIMARY KEY,
+        retention_days INTEGER NOT NULL CHECK (retention_days > 0),
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL
+    )""",
+    "DROP TRIGGER IF EXISTS update_report_retention_policies_updated_at ON report_retention_policies",
+    """CREATE TRIGGER update_report_retention_policies_updated_at
+        BEFORE UPDATE ON report_retention_policies
+        FOR EACH ROW
+        EXECUTE FUNCTION update_updated_at_column()""",
+    "CREATE INDEX idx_reports_timestamp_name ON reports(timestamp DESC, name DESC)",
+    "CREATE INDEX idx_reports_schema_name_timestamp_name ON reports(schema_name, timestamp DESC, name DESC)",
+    "CREATE INDEX idx_reports_content_path ON reports USING GIN (content jsonb_path_ops)",
+    """CREATE INDEX idx_reports_content_fts ON reports
+        USING GIN (jsonb_to_tsvector('simple', content, '["string"]'))""",
+    "CREATE INDEX idx_report_item_refs_item_id ON report_item_refs(item_id)",
+    """CREATE OR REPLACE FUNCTION ensure_report_partition(month DATE)
+    RETURNS TEXT AS $$
+    DECLARE
+        start_ts TIMESTAMP WITH TIME ZONE := date_trunc('month', month::timestamp) AT TIME ZONE 'UTC';
+        end_ts TIMESTAMP WITH TIME ZONE := (date_trunc('month', month::timestamp) + INTERVAL '1 month') AT TIME ZONE 'UTC';
+        suffix TEXT := to_char(month, 'YYYYMM');
+    BEGIN
+        IF to_regclass('reports_p' || suffix) IS NOT NULL THEN
+            RETURN NULL;
+        END IF;
+
+        EXECUTE format('CREATE TABLE %I (LIKE reports INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', 'reports_p' || suffix);
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM reports_default WHERE timestamp >= $1 AND timestamp < $2 RETURNING *) '
+            'INSERT INTO %I SELECT * FROM moved', 'reports_p' || suffix
+        ) USING start_ts, end_ts;
+        EXECUTE format(
+            'ALTER TABLE reports ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', 'reports_p' || suffix, start_ts, end_ts
+        );
+
+        EXECUTE format(
+            'CREATE TABLE %I (LIKE report_item_refs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', 'report_item_refs_p' || suffix
+        );
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM report_item_refs_default WHERE report_timestamp >= $1 AND report_timestamp < $2 '
+            'RETURNING *) INSERT INTO %I SELECT * FROM moved', 'report_item_refs_p' || suffix
+        ) USING start_ts, end_ts;
+        EXECUTE format(
+            'ALTER TABLE report_item_refs ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+            'report_item_refs_p' || suffix, start_ts, end_ts
+        );
+        RETURN 'reports_p' || suffix;
+    END;
+    $$ language 'plpgsql'""",
+]
+
+COPY_ROWS = [
+    f"INSERT INTO reports ({REPORT_COLUMNS}) SELECT {REPORT_COLUMNS} FROM reports_unpartitioned",
+    """INSERT INTO report_item_refs (report_name, report_timestamp, position, item_id)
+        SELECT ref.report_name, r.timestamp, ref.position, ref.item_id
+        FROM report_item_refs_unpartitioned ref JOIN reports_unpartitioned r ON r.name = ref.report_name""",
+    "DROP TABLE report_item_refs_unpartitioned",
+    "DROP TABLE reports_unpartitioned",
+]
+
+
+async def is_partitioned(conn) -> bool:
+    result = await conn.exec_driver_sql("SELECT relkind FROM pg_class WHERE oid = 'reports'::regclass")
+    return result.scalar() == "p"
+
+
+async def partition_reports(months_ahead: int) -> None:
+    async with db.engine.begin() as conn:
+        if await is_partitioned(conn):
+            print("Reports are already partitioned")
+            return
+        await conn.exec_driver_sql("LOCK TABLE reports IN EXCLUSIVE MODE")
+        result = await conn.exec_driver_sql("SELECT min(timestamp), count(*) FROM reports")
+        oldest, count = result.one()
+
+        for statement in RENAME_TABLES + CREATE_TABLES:
+            await conn.exec_driver_sql(statement)
+
+        now = datetime.now(timezone.utc)
+        oldest = (oldest or now).astimezone(timezone.utc)
+        month = date(oldest.year, oldest.month, 1)
+        last_month = add_months(date(now.year, now.month, 1), months_ahead)
+        partitions = 0
+        while month <= last_month:
+            await conn.execute(text("SELECT ensure_report_partition(:month)"), {"month": month})
+            month = add_months(month, 1)
+            partitions += 1
+
+        for statement in COPY_ROWS:
+            await conn.exec_driver_sql(statement)
+    print(f"Done: {count} reports copied into {partitions} monthly partitions")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--months-ahead", type=int, default=settings.REPORT_PARTITION_MONTHS_AHEAD,
+                        help="Number of future months to create partitions for")
+    args = parser.parse_args()
+
+    try:
+        await update_schema()
+        await partition_reports(args.months_ahead)
+    finally:
+        await db.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
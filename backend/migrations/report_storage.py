@@ -0,0 +1,133 @@
+"""
+Brings an existing database up to date with postgres-init.sql and converts stored reports.
+
+Adds the columns, tables and indexes introduced since the database was created, then fills in the content hash
+and size of every report and, with --compress (or ENABLE_REPORT_COMPRESSION), moves content of at least
+--threshold-bytes into compressed storage. Reports are converted in batches, each in its own transaction, so the
+migration can be interrupted and resumed. Run from the backend directory:
+
+    python -m migrations.report_storage --compress
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import select, text, update
+
+from core.database.postgres_database import db
+from core.models.report import Report
+from core.report_storage import encode_content
+from core.settings import Settings
+
+settings = Settings()
+
+SCHEMA_UPDATES = [
+    "ALTER TABLE schema_fields ADD COLUMN IF NOT EXISTS is_key BOOLEAN DEFAULT FALSE",
+    "ALTER TABLE schema_fields ADD COLUMN IF NOT EXISTS aliases JSONB DEFAULT '[]'",
+    "ALTER TABLE reports ALTER COLUMN content DROP NOT NULL",
+    "ALTER TABLE reports ADD COLUMN IF NOT EXISTS items_key VARCHAR(255)",
+    "ALTER TABLE reports ADD COLUMN IF NOT EXISTS content_compressed BYTEA",
+    "ALTER TABLE reports ADD COLUMN IF NOT EXISTS content_encoding VARCHAR(16)",
+    "ALTER TABLE reports ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    "ALTER TABLE reports ADD COLUMN IF NOT EXISTS content_size BIGINT",
+    "ALTER TABLE reports ADD COLUMN IF NOT EXISTS previous_report_name VARCHAR(255)",
+    "ALTER TABLE reports ADD COLUMN IF NOT EXISTS diff JSONB",
+    """CREATE TABLE IF NOT EXISTS schema_items (
+        id BIGSERIAL PRIMARY KEY,
+        schema_name VARCHAR(255) NOT NULL,
+        item_key VARCHAR(64) NOT NULL,
+        content_hash VARCHAR(64) NOT NULL,
+        content JSONB NOT NULL,
+        first_seen TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        last_seen TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        CONSTRAINT uq_schema_items_version UNIQUE (schema_name, item_key, content_hash)
+    )""",
+    """CREATE TABLE IF NOT EXISTS report_item_refs (
+        report_name VARCHAR(255) REFERENCES reports(name) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        item_id BIGINT NOT NULL REFERENCES schema_items(id),
+        PRIMARY KEY (report_name, position)
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_reports_timestamp_name ON reports(timestamp DESC, name DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_reports_schema_name_timestamp_name ON reports(schema_name, timestamp DESC, name DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_reports_content_path ON reports USING GIN (content jsonb_path_ops)",
+    """CREATE INDEX IF NOT EXISTS idx_reports_content_fts ON reports
+        USING GIN (jsonb_to_tsvector('simple', content, '["string"]'))""",
+    "CREATE INDEX IF NOT EXISTS idx_schema_items_schema_name_last_seen ON schema_items(schema_name, last_seen)",
+    "CREATE INDEX IF NOT EXISTS idx_schema_items_content_path ON schema_items USING GIN (content jsonb_path_ops)",
+    """CREATE INDEX IF NOT EXISTS idx_schema_items_content_fts ON schema_items
+        USING GIN (jsonb_to_tsvector('simple', content, '["string"]'))""",
+    "CREATE INDEX IF NOT EXISTS idx_report_item_refs_item_id ON report_item_refs(item_id)",
+]
+
+
+async def update_schema() -> None:
+    async with db.engine.begin() as conn:
+        for statement in SCHEMA_UPDATES:
+            await conn.execute(text(statement))
+
+
+async def convert_reports(compress: bool, threshold: int, batch_size: int, dry_run: bool) -> None:
+    """Converts reports that have no content hash yet, i.e. were stored before this migration"""
+    converted = compressed = bytes_before = bytes_after = 0
+    last_name = ""
+    while True:
+        async with db.async_session() as session:
+            result = await session.execute(
+                select(Report.name, Report.content)
+                .where(Report.content_hash.is_(None), Report.content.is_not(None), Report.name > last_name)
+                .order_by(Report.name)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            for name, content in rows:
+                encoded = encode_content(content, compress=compress, threshold=threshold)
+                converted += 1
+                bytes_before += encoded.size
+                if encoded.compressed is not None:
+                    compressed += 1
+                    bytes_after += len(encoded.compressed)
+                else:
+                    bytes_after += encoded.size
+                if dry_run:
+                    continue
+                await session.execute(
+                    update(Report)
+                    .where(Report.name == name)
+                    .values(
+                        content=encoded.content,
+                        content_compressed=encoded.compressed,
+                        content_encoding=encoded.encoding,
+                        content_hash=encoded.content_hash,
+                        content_size=encoded.size
+                    )
+                )
+            if not dry_run:
+                await session.commit()
+            last_name = rows[-1].name
+        print(f"{converted} reports converted, {compressed} compressed")
+
+    print(f"Done: {converted} reports, {compressed} compressed, {bytes_before / 1024 / 1024:.1f} MB of JSON "
+          f"stored as {bytes_after / 1024 / 1024:.1f} MB{' (dry run)' if dry_run else ''}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--compress", action="store_true", default=settings.ENABLE_REPORT_COMPRESSION,
+                        help="Compress content of at least --threshold-bytes")
+    parser.add_argument("--threshold-bytes", type=int, default=settings.REPORT_COMPRESSION_THRESHOLD_BYTES)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be converted without writing")
+    args = parser.parse_args()
+
+    try:
+        if not args.dry_run:
+            await update_schema()
+        await convert_reports(args.compress, args.threshold_bytes, args.batch_size, args.dry_run)
+    finally:
+        await db.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -23,16 +23,59 @@ CREATE TABLE schema_fields (
     required BOOLEAN DEFAULT TRUE,
     list_item_type field_type,
     default_value JSONB,
+    is_key BOOLEAN DEFAULT FALSE,
+    aliases JSONB DEFAULT '[]',
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL
 );
 
+-- PARTITIONED BY MONTH ON timestamp, SEE ensure_report_partition. THE PRIMARY KEY HAS TO INCLUDE THE PARTITION KEY
 CREATE TABLE reports (
-    name VARCHAR(255) PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
     schema_name VARCHAR(255), -- NOT A FOREIGN KEY KEY BECAUSE REPORTS MAY EXIST EVEN AFTER THE SCHEMA IS DELETED
-    content JSONB NOT NULL,
+    content JSONB, -- NULL WHEN THE CONTENT IS STORED COMPRESSED
+    items_key VARCHAR(255), -- SET WHEN THE LIST UNDER THIS KEY OF content IS STORED IN schema_items
+    content_compressed BYTEA,
+    content_encoding VARCHAR(16),
+    content_hash VARCHAR(64),
+    content_size BIGINT,
+    previous_report_name VARCHAR(255), -- PREVIOUS RUN OF THE SAME SCHEMA, diff IS RELATIVE TO IT
+    diff JSONB,
     timestamp TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    PRIMARY KEY (name, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE reports_default PARTITION OF reports DEFAULT;
+
+-- ITEM VERSIONS OF LIST-SHAPED REPORTS, SHARED BY ALL REPORTS THAT CONTAIN THEM
+CREATE TABLE schema_items (
+    id BIGSERIAL PRIMARY KEY,
+    schema_name VARCHAR(255) NOT NULL,
+    item_key VARCHAR(64) NOT NULL,
+    content_hash VARCHAR(64) NOT NULL,
+    content JSONB NOT NULL,
+    first_seen TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    last_seen TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    CONSTRAINT uq_schema_items_version UNIQUE (schema_name, item_key, content_hash)
+);
+
+-- PARTITIONED LIKE reports SO THAT RETENTION DROPS BOTH TOGETHER. NOT A FOREIGN KEY TO reports FOR THE SAME REASON
+CREATE TABLE report_item_refs (
+    report_name VARCHAR(255) NOT NULL,
+    report_timestamp TIMESTAMP WITH TIME ZONE NOT NULL,
+    position INTEGER NOT NULL,
+    item_id BIGINT NOT NULL REFERENCES schema_items(id),
+    PRIMARY KEY (report_name, report_timestamp, position)
+) PARTITION BY RANGE (report_timestamp);
+
+CREATE TABLE report_item_refs_default PARTITION OF report_item_refs DEFAULT;
+
+CREATE TABLE report_retention_policies (
+    schema_name VARCHAR(255) PRIMARY KEY,
+    retention_days INTEGER NOT NULL CHECK (retention_days > 0),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL
 );
 
 CREATE TABLE projects (
@@ -48,6 +91,56 @@ CREATE TABLE projects (
 );
 
 CREATE INDEX idx_schema_fields_schema_definition_name ON schema_fields(schema_definition_name);
+-- Keyset pagination of reports on (timestamp, name), newest first, optionally filtered by schema
+CREATE INDEX idx_reports_timestamp_name ON reports(timestamp DESC, name DESC);
+CREATE INDEX idx_reports_schema_name_timestamp_name ON reports(schema_name, timestamp DESC, name DESC);
+-- Report content queries: JSON path and containment predicates, full-text search over string values
+CREATE INDEX idx_reports_content_path ON reports USING GIN (content jsonb_path_ops);
+CREATE INDEX idx_reports_content_fts ON reports USING GIN (jsonb_to_tsvector('simple', content, '["string"]'));
+CREATE INDEX idx_schema_items_schema_name_last_seen ON schema_items(schema_name, last_seen);
+CREATE INDEX idx_schema_items_content_path ON schema_items USING GIN (content jsonb_path_ops);
+CREATE INDEX idx_schema_items_content_fts ON schema_items USING GIN (jsonb_to_tsvector('simple', content, '["string"]'));
+CREATE INDEX idx_report_item_refs_item_id ON report_item_refs(item_id);
+
+-- Creates the monthly partitions of reports and report_item_refs containing `month`. Rows that were stored in the
+-- default partitions for that month are moved into the new partitions.
+CREATE OR REPLACE FUNCTION ensure_report_partition(month DATE)
+RETURNS TEXT AS $$
+DECLARE
+    start_ts TIMESTAMP WITH TIME ZONE := date_trunc('month', month::timestamp) AT TIME ZONE 'UTC';
+    end_ts TIMESTAMP WITH TIME ZONE := (date_trunc('month', month::timestamp) + INTERVAL '1 month') AT TIME ZONE 'UTC';
+    suffix TEXT := to_char(month, 'YYYYMM');
+BEGIN
+    IF to_regclass('reports_p' || suffix) IS NOT NULL THEN
+        RETURN NULL;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE reports INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', 'reports_p' || suffix);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM reports_default WHERE timestamp >= $1 AND timestamp < $2 RETURNING *) '
+        'INSERT INTO %I SELECT * FROM moved', 'reports_p' || suffix
+    ) USING start_ts, end_ts;
+    EXECUTE format(
+        'ALTER TABLE reports ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', 'reports_p' || suffix, start_ts, end_ts
+    );
+
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE report_item_refs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', 'report_item_refs_p' || suffix
+    );
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM report_item_refs_default WHERE report_timestamp >= $1 AND report_timestamp < $2 '
+        'RETURNING *) INSERT INTO %I SELECT * FROM moved', 'report_item_refs_p' || suffix
+    ) USING start_ts, end_ts;
+    EXECUTE format(
+        'ALTER TABLE report_item_refs ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        'report_item_refs_p' || suffix, start_ts, end_ts
+    );
+    RETURN 'reports_p' || suffix;
+END;
+$$ language 'plpgsql';
+
+SELECT ensure_report_partition(CURRENT_DATE);
+SELECT ensure_report_partition((CURRENT_DATE + INTERVAL '1 month')::date);
 
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -67,6 +160,11 @@ CREATE TRIGGER update_schema_fields_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER update_report_retention_policies_updated_at
+    BEFORE UPDATE ON report_retention_policies
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
 CREATE TRIGGER update_projects_updated_at
     BEFORE UPDATE ON projects
     FOR EACH ROW
@@ -82,7 +180,9 @@ SELECT
             'description', sf.description,
             'required', sf.required,
             'list_item_type', sf.list_item_type,
-            'default_value', sf.default_value
+            'default_value', sf.default_value,
+            'is_key', sf.is_key,
+            'aliases', sf.aliases
         )
     ) as fields
 FROM schema_definitions sd
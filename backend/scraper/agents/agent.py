@@ -1,16 +1,36 @@
 from abc import ABC, abstractmethod
+from functools import lru_cache
 
-from api.models import ModelType
+from api.models import ModelType, JobPriority
 from langchain_anthropic import ChatAnthropic
 from langchain_ollama import OllamaLLM
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableLambda
 from core.settings import Settings
+from core.rate_limiter import get_rate_limiter
+from core.utils import Utils
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 settings = Settings()
 
+
+@lru_cache(maxsize=settings.SCHEMA_CACHE_MAX_ENTRIES)
+def get_json_parser(schema) -> JsonOutputParser:
+    """
+    JSON parser of a response schema. Parsers are stateless, so agents of all jobs with the same schema model share
+    one; dynamic schema models are themselves cached per schema version by the scraper.
+    """
+    return JsonOutputParser(pydantic_object=schema)
+
+
+@lru_cache(maxsize=settings.SCHEMA_CACHE_MAX_ENTRIES)
+def get_format_instructions(schema) -> str:
+    """Format instructions of a response schema, rendered once per schema model"""
+    return get_json_parser(schema).get_format_instructions()
+
+
 class Agent(ABC):
     def __init__(self, model_type, local_model_name, schema=None):
         self.model_type = model_type
@@ -53,7 +73,7 @@ class Agent(ABC):
         self.prompt_template = PromptTemplate(
             template=prompt or self.prompt,
             input_variables=["data"],
-            partial_variables={"format_instructions": self.parser.get_format_instructions()},
+            partial_variables={"format_instructions": get_format_instructions(self.parser.pydantic_object)},
         )
 
     def configure_default_llm(self):
@@ -104,7 +124,7 @@ class Agent(ABC):
             Method configures the JSON parser instance.
         :param schema: The schema of the agent response.
         """
-        self.parser = JsonOutputParser(pydantic_object=schema or self.schema)
+        self.parser = get_json_parser(schema or self.schema)
 
     def configure_default_agent(self):
         """
@@ -115,7 +135,69 @@ class Agent(ABC):
         self.configure_default_llm()
 
     def get_chain(self):
-        return self.prompt_template | self.llm | self.parser
+        return (
+            self.prompt_template
+            | RunnableLambda(self.acquire_rate_limit)
+            | self.llm
+            | RunnableLambda(self.record_llm_usage)
+            | self.parser
+        )
+
+    @staticmethod
+    def run_config(state, **kwargs):
+        """
+            Builds the runnable config for a chain call, carrying per-job settings from the graph state.
+        :param state: The current graph state.
+        """
+        return {
+            **kwargs,
+            "configurable": {
+                "priority": state.get("priority", JobPriority.interactive),
+                "budget": state.get("budget"),
+            }
+        }
+
+    def acquire_rate_limit(self, prompt_value, config):
+        """
+            Waits for provider capacity before the prompt is sent to the LLM.
+            Raises JobBudgetExceeded if the job cannot afford the call.
+        """
+        configurable = config.get("configurable", {})
+        priority = configurable.get("priority", JobPriority.interactive)
+        budget = configurable.get("budget")
+        tokens = Utils.estimate_tokens(prompt_value.to_string())
+
+        if budget:
+            budget.ensure_available(tokens)
+        get_rate_limiter().acquire(
+            self.model_type,
+            self.local_model_name,
+            settings.API_KEY,
+            tokens=tokens,
+            priority=priority,
+            should_abort=budget.is_exhausted if budget else None
+        )
+        if budget:
+            budget.ensure_available(tokens)
+            budget.record_tokens(tokens)
+        return prompt_value
+
+    def record_llm_usage(self, response, config):
+        """
+            Charges the generated tokens to the provider budget and the job budget.
+        """
+        content = getattr(response, "content", response)
+        tokens = Utils.estimate_tokens(content)
+        get_rate_limiter().record_usage(
+            self.model_type,
+            self.local_model_name,
+            settings.API_KEY,
+            tokens=tokens
+        )
+        budget = config.get("configurable", {}).get("budget")
+        if budget:
+            budget.record_tokens(tokens)
+        return response
 
     @abstractmethod
     def act(self, state):
@@ -1,7 +1,10 @@
 import json
 
 from scraper.agents.agent import Agent
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from core.job_budget import JobBudgetExceeded
+from scraper.chunking import StructuredChunker
+from scraper.compaction import TokenCompactor
+from core.utils import Utils
 
 class DataExtractorAgent(Agent):
     """
@@ -24,11 +27,14 @@ class DataExtractorAgent(Agent):
         {comments}
         """
 
-    def __init__(self, model_type, local_model_name, schema, enable_chunking, chunk_size, chunk_overlap_size):
+    def __init__(self, model_type, local_model_name, schema, enable_chunking, chunk_size, chunk_overlap_size,
+                 relevance_filter=None, compactor=None):
         super().__init__(model_type=model_type, local_model_name=local_model_name, schema=schema)
         self.enable_chunking = enable_chunking
         self.chunk_size = chunk_size
         self.chunk_overlap_size = chunk_overlap_size
+        self.relevance_filter = relevance_filter
+        self.compactor = compactor
 
     @property
     def prompt(self):
@@ -70,25 +76,84 @@ class DataExtractorAgent(Agent):
     def act(self, state):
         state['logger'].info("Extracting data using LLM.")
 
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap_size,
-            length_function=len,
-        )
-        texts = []
-        for document in state["documents"]:
+        compaction_stats = state.get("compaction_stats")
+        if self.compactor is None:
+            texts, pages = self.split(state["documents"], state['logger'])
+            references = [{}] * len(texts)
+        else:
+            compacted = [self.compactor.compact_page(document) for document in state["documents"]]
+            texts, pages = self.split([text for text, _ in compacted], state['logger'])
+            compacted_chunks = [self.compactor.compact_chunk(text) for text in texts]
+            texts = [text for text, _ in compacted_chunks]
+            references = [chunk_references for _, chunk_references in compacted_chunks]
+            compaction_stats = self.compaction_stats(state, texts, pages)
+            compaction_stats["links_cleaned"] = sum(cleaned for _, cleaned in compacted)
+            compaction_stats["links_referenced"] = sum(len(chunk_references) for chunk_references in references)
+            state['logger'].info(
+                f"Compacted chunks from {compaction_stats['tokens_before']} "
+                f"to {compaction_stats['tokens_after']} tokens."
+            )
+
+        order, relevance_stats = list(range(len(texts))), state.get("relevance_stats")
+        if self.relevance_filter is not None and len(texts) > self.relevance_filter.min_chunks:
+            # The most relevant chunks go first, so a job that runs out of budget skips the least relevant ones
+            order, _, relevance_stats = self.relevance_filter.filter(texts, pages)
+            state['logger'].info(
+                f"Skipping {relevance_stats['chunks_skipped']} of {len(texts)} chunks as irrelevant to the schema."
+            )
+
+        chain = self.get_chain()
+        config = self.run_config(state)
+        results = {}
+        for position in order:
+            try:
+                result = chain.invoke({"data": texts[position], "comments": state["comments"] or ""}, config)
+                results[position] = TokenCompactor.rehydrate(result, references[position])
+            except JobBudgetExceeded as e:
+                state['logger'].info(f"Stopping extraction after {len(results)} of {len(order)} chunks: {e}")
+                break
+
+        if len(results) < len(order) and state.get("generation"):
+            # A regeneration that could not finish is not better than the previous complete answer
+            state['logger'].info("Keeping the previous generation.")
+            return state
+
+        # Combined in page order whatever order the chunks were extracted in
+        combined_result = self.combine_results([results[position] for position in sorted(results)])
+
+        state['logger'].debug("Data Extracted: " + json.dumps(combined_result))
+        return {
+            **state,
+            "generation": combined_result,
+            "relevance_stats": relevance_stats,
+            "compaction_stats": compaction_stats
+        }
+
+    def split(self, documents, logger):
+        """Chunks of the documents, and the position of the document of each chunk"""
+        chunker = StructuredChunker(self.chunk_size, self.chunk_overlap_size)
+        texts, pages = [], []
+        for page, document in enumerate(documents):
             if self.enable_chunking and len(document) > self.chunk_size:
-                split_docs = text_splitter.create_documents([document])
+                split_docs = chunker.split(document)
                 texts.extend(split_docs)
-                state['logger'].debug("Chunked document into " + str(len(split_docs)) + " chunks.")
+                pages.extend([page] * len(split_docs))
+                logger.debug("Chunked document into " + str(len(split_docs)) + " chunks.")
             else:
                 texts.append(document)
+                pages.append(page)
+        return texts, pages
 
-        results = self.get_chain().batch(
-            [{"data": document, "comments": state["comments"] or ""} for document in texts],
-            {"max_concurrency": 1},
-        )
-        combined_result = self.combine_results(results)
-
-        state['logger'].debug("Data Extracted: " + json.dumps(combined_result))
-        return {**state, "generation": combined_result}
+    def compaction_stats(self, state, texts, pages):
+        """Tokens of the chunks of each page without compaction, and of the compacted chunks sent instead"""
+        original_texts, original_pages = self.split(state["documents"], state['logger'])
+        per_page = [{"page": page, "tokens_before": 0, "tokens_after": 0} for page in range(len(state["documents"]))]
+        for text, page in zip(original_texts, original_pages):
+            per_page[page]["tokens_before"] += Utils.estimate_tokens(text)
+        for text, page in zip(texts, pages):
+            per_page[page]["tokens_after"] += Utils.estimate_tokens(text)
+        return {
+            "tokens_before": sum(entry["tokens_before"] for entry in per_page),
+            "tokens_after": sum(entry["tokens_after"] for entry in per_page),
+            "per_page": per_page
+        }
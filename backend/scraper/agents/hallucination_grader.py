@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 from typing import List
 from scraper.agents.agent import Agent
 from core.utils import Utils
+from core.job_budget import JobBudgetExceeded, is_budget_exhausted
 
 
 class HallucinationGraderSchema(BaseModel):
@@ -50,15 +51,26 @@ class HallucinationGraderAgent(Agent):
 
     def act(self, state):
         state['logger'].info("Checking for hallucinations.")
+        skipped_check = {
+            **state,
+            "are_there_hallucinations": False,
+            "hallucination_check_count": state["hallucination_check_count"] + 1
+        }
         if state["hallucination_check_count"] >= self.max_hallucination_checks:
             state['logger'].debug(f"---MAX HALLUCINATION CHECKS REACHED. PROCEEDING TO QUALITY CHECK.---")
-            return {
-                **state,
-                "are_there_hallucinations": False,
-                "hallucination_check_count": state["hallucination_check_count"] + 1
-            }
+            return skipped_check
+        if is_budget_exhausted(state):
+            state['logger'].info("---JOB BUDGET EXHAUSTED. SKIPPING HALLUCINATION CHECK.---")
+            return skipped_check
 
-        response = self.get_chain().invoke({"data": state["documents"], "response": state["generation"]})
+        try:
+            response = self.get_chain().invoke(
+                {"data": state["documents"], "response": state["generation"]},
+                self.run_config(state)
+            )
+        except JobBudgetExceeded as e:
+            state['logger'].info(f"---JOB BUDGET EXHAUSTED ({e}). SKIPPING HALLUCINATION CHECK.---")
+            return skipped_check
 
         are_there_hallucinations = Utils.get_value_or_default(response, "are_there_hallucinations", False, state["logger"])
         hallucinations = Utils.get_value_or_default(response, "hallucinations", [], state["logger"])
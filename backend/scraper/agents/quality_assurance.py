@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 from typing import List
 from scraper.agents.agent import Agent
 from core.utils import Utils
+from core.job_budget import JobBudgetExceeded, is_budget_exhausted
 
 class QualityAssuranceSchema(BaseModel):
     """
@@ -49,8 +50,18 @@ class QualityAssuranceAgent(Agent):
             state['logger'].info(f"---MAX QUALITY CHECKS REACHED. FINISHING.---")
             state["quality"] = 10
             return {**state, "quality": 10}
+        if is_budget_exhausted(state):
+            state['logger'].info("---JOB BUDGET EXHAUSTED. ACCEPTING CURRENT RESPONSE.---")
+            return {**state, "quality": 10}
 
-        response = self.get_chain().invoke({"document_content": state["documents"], "response": state["generation"]})
+        try:
+            response = self.get_chain().invoke(
+                {"document_content": state["documents"], "response": state["generation"]},
+                self.run_config(state)
+            )
+        except JobBudgetExceeded as e:
+            state['logger'].info(f"---JOB BUDGET EXHAUSTED ({e}). ACCEPTING CURRENT RESPONSE.---")
+            return {**state, "quality": 10}
         quality = Utils.get_value_or_default(response, "quality", 10, state["logger"])
         comments = Utils.get_value_or_default(response, "comments", [], state["logger"])
         state['logger'].debug(f"Quality checked. Found: {quality}. Details: {comments}")
@@ -1,6 +1,7 @@
 import json
 
 from scraper.agents.agent import Agent
+from core.job_budget import JobBudgetExceeded, is_budget_exhausted
 
 
 class ResponseCleanerAgent(Agent):
@@ -46,7 +47,14 @@ class ResponseCleanerAgent(Agent):
 
     def act(self, state):
         state['logger'].info("Editing response.")
-        response = self.get_chain().invoke({"data": state["generation"]})
+        if is_budget_exhausted(state):
+            state['logger'].info("Job budget exhausted. Returning response without editing.")
+            return state
+        try:
+            response = self.get_chain().invoke({"data": state["generation"]}, self.run_config(state))
+        except JobBudgetExceeded as e:
+            state['logger'].info(f"Job budget exhausted ({e}). Returning response without editing.")
+            return state
         state['logger'].debug("Response Cleaned: " + json.dumps(response))
         return {
             **state,
@@ -0,0 +1,162 @@
+import re
+from typing import List, Optional, Tuple
+
+HEADING = re.compile(r"^(#{1,6}) ")
+LIST_ITEM = re.compile(r"^( *)(?:- |\d+\. )")
+
+
+class Block:
+    """
+    Lines of a serialized page that belong together: a heading with the block it introduces, a list item with its
+    nested items and the paragraphs that follow its first line, a table row, or a paragraph.
+
+    Args:
+        lines: lines of the block
+        headings: lines of the headings of the sections the block is in, outermost first
+        table_header: header row of the table, for rows of a table that has one
+    """
+    def __init__(self, lines: List[str], headings: List[str], table_header: Optional[str] = None):
+        self.lines = lines
+        self.headings = headings
+        self.table_header = table_header
+
+
+def parse_blocks(text: str) -> List[Block]:
+    """Blocks of a page serialized by DomSerializer, which writes one DOM block per line"""
+    blocks: List[Block] = []
+    sections: List[Tuple[int, str]] = []
+    pending: List[str] = []
+    table_header = None
+    item_indent = None
+    for line in text.split("\n"):
+        heading = HEADING.match(line)
+        item = LIST_ITEM.match(line)
+        if heading:
+            level = len(heading.group(1))
+            sections = [section for section in sections if section[0] < level] + [(level, line)]
+            pending.append(line)
+            item_indent = table_header = None
+            continue
+        headings = [section_line for _, section_line in sections if section_line not in pending]
+        if line.startswith("| "):
+            previous = blocks[-1] if blocks and not pending else None
+            if previous is not None and previous.lines[-1].startswith("| "):
+                # The first row of a run of rows is the header of the table
+                table_header = table_header or previous.lines[-1]
+                blocks.append(Block(pending + [line], headings, table_header))
+            else:
+                table_header = None
+                blocks.append(Block(pending + [line], headings))
+            item_indent = None
+        elif item and (item_indent is None or len(item.group(1)) <= item_indent or pending):
+            blocks.append(Block(pending + [line], headings))
+            item_indent = len(item.group(1))
+            table_header = None
+        elif item_indent is not None and not pending:
+            # Nested items and the text of an item after its first line, e.g. the description of a card
+            blocks[-1].lines.append(line)
+        else:
+            blocks.append(Block(pending + [line], headings))
+            table_header = None
+        pending = []
+    if pending:
+        blocks.append(Block(pending, [section_line for _, section_line in sections if section_line not in pending]))
+    return blocks
+
+
+class StructuredChunker:
+    """
+    Splits a serialized page into chunks along its structure instead of at a character count, so no list item,
+    table row or paragraph is cut in half.
+
+    Whole blocks are packed into chunks of up to `chunk_size` characters. Instead of overlapping, a chunk that
+    starts inside a section repeats the headings of the section, and one that starts inside a table repeats its
+    header row, which costs a line or two rather than `chunk_overlap` characters and gives the LLM no item twice.
+    Only a block longer than a whole chunk is split, by lines and then by words, with `chunk_overlap` characters
+    of overlap where a line itself has to be cut.
+
+    Args:
+        chunk_size: characters per chunk
+        chunk_overlap: characters of overlap between the parts of a line longer than chunk_size
+    """
+    def __init__(self, chunk_size: int, chunk_overlap: int = 0):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = min(chunk_overlap, chunk_size // 2)
+
+    def split(self, text: str) -> List[str]:
+        if len(text) <= self.chunk_size:
+            return [text]
+        chunks: List[str] = []
+        current: List[str] = []
+        for block in parse_blocks(text):
+            context = self.context(block)
+            if current and len("\n".join(current + block.lines)) > self.chunk_size:
+                if current[-1] == block.table_header and len("\n".join(context + block.lines)) <= self.chunk_size:
+                    # The header row goes with the rows of the next chunk, which repeats it
+                    current.pop()
+                if current:
+                    chunks.append("\n".join(current))
+                current = []
+            if not current:
+                current = list(context) if len("\n".join(context + block.lines)) <= self.chunk_size else []
+            if len("\n".join(current + block.lines)) <= self.chunk_size:
+                current += block.lines
+                continue
+            for part in self.split_block(block.lines, context):
+                if current:
+                    chunks.append("\n".join(current))
+                current = part
+        if current:
+            chunks.append("\n".join(current))
+        return chunks
+
+    @staticmethod
+    def context(block: Block) -> List[str]:
+        """Lines that tell where a block is when a chunk starts with it"""
+        context = list(block.headings)
+        if block.table_header and block.table_header not in block.lines:
+            context.append(block.table_header)
+        return context
+
+    def split_block(self, lines: List[str], context: List[str]) -> List[List[str]]:
+        """Parts of a block longer than a chunk, each with as much of the context as fits"""
+        parts: List[List[str]] = []
+        current: List[str] = []
+        for line in lines:
+            # The first piece of a cut line fills the part it starts in, so a heading stays with its text
+            room = self.chunk_size - len("\n".join(current)) - 1 if current else self.chunk_size
+            for piece in self.split_line(line, room):
+                if current and len("\n".join(current + [piece])) > self.chunk_size:
+                    parts.append(current)
+                    current = []
+                if not current:
+                    current = list(context) if len("\n".join(context + [piece])) <= self.chunk_size else []
+                current.append(piece)
+        return parts + [current] if current else parts
+
+    def split_line(self, line: str, room: Optional[int] = None) -> List[str]:
+        """
+        A line longer than a chunk cut between words, consecutive pieces sharing up to chunk_overlap characters. The
+        first piece takes at most `room` characters, what is left of the chunk it goes into. Words longer than a
+        chunk are cut where the piece is full, so a list marker is never a piece of its own.
+        """
+        if len(line) <= self.chunk_size:
+            return [line]
+        limit = room if room and room > 0 else self.chunk_size
+        pieces, current = [], []
+        for word in line.split():
+            while len(" ".join(current + [word])) > limit:
+                space = limit - len(" ".join(current)) - (1 if current else 0)
+                if len(word) > self.chunk_size and space > 0:
+                    current.append(word[:space])
+                    word = word[space:]
+                if current:
+                    pieces.append(" ".join(current))
+                limit = self.chunk_size
+                overlap = []
+                while current and len(" ".join(current[-1:] + overlap)) <= self.chunk_overlap and \
+                        len(" ".join(current[-1:] + overlap + [word])) <= self.chunk_size:
+                    overlap.insert(0, current.pop())
+                current = overlap
+            current.append(word)
+        return pieces + [" ".join(current)]
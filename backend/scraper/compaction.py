@@ -0,0 +1,98 @@
+import re
+from typing import Any, Dict, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only identify the campaign, click or session a link was shared in
+TRACKING_PARAMS = {
+    "gclid", "gclsrc", "dclid", "fbclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "_ga", "_gl", "_hsenc",
+    "_hsmi", "mkt_tok", "ref_src", "ref_url", "spm", "srsltid", "trk", "vero_id", "wickedid", "oly_anon_id",
+    "oly_enc_id", "rb_clickid", "s_cid"
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_")
+# Link targets written by DomSerializer, [text](target)
+LINK_TARGET = re.compile(r"\]\(([^()\s]+)\)")
+# Reference ids the compacted text and the LLM output use in place of URLs
+REFERENCE = re.compile(r"(?<![\w.])@(\d+)\b")
+SPACES = re.compile(r"[ \t\f\v\u00a0]+")
+
+
+def strip_tracking(url: str) -> str:
+    """URL without its tracking query parameters, unchanged if it has none"""
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    kept = [
+        (key, value) for key, value in params
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    if len(kept) == len(params):
+        return url
+    return urlunsplit(parts._replace(query=urlencode(kept)))
+
+
+def collapse_whitespace(text: str) -> str:
+    """Runs of spaces collapsed and blank lines dropped, keeping the list indentation of DomSerializer"""
+    lines = []
+    for line in text.split("\n"):
+        indent = len(line) - len(line.lstrip(" "))
+        line = SPACES.sub(" ", line).strip()
+        if line:
+            lines.append(" " * indent + line)
+    return "\n".join(lines)
+
+
+class TokenCompactor:
+    """
+    Shrinks the text of pages before it is sent to the LLM, without dropping any content.
+
+    Pages get their whitespace collapsed and the tracking parameters of their links removed. In each chunk, URLs of
+    at least `min_url_chars` characters that are linked more than once are replaced by a reference like @1, and a
+    table of the references is appended to the chunk. `rehydrate` puts the URLs back into the LLM output.
+
+    Args:
+        min_url_chars: shorter URLs cost about as much as their reference and stay inline
+    """
+    def __init__(self, min_url_chars: int = 24):
+        self.min_url_chars = min_url_chars
+
+    def compact_page(self, text: str) -> Tuple[str, int]:
+        """Page text with whitespace collapsed and tracking parameters removed, and the number of links cleaned"""
+        cleaned = 0
+
+        def clean(match: re.Match) -> str:
+            nonlocal cleaned
+            url = strip_tracking(match.group(1))
+            cleaned += url != match.group(1)
+            return f"]({url})"
+
+        text = LINK_TARGET.sub(clean, collapse_whitespace(text))
+        return text, cleaned
+
+    def compact_chunk(self, text: str) -> Tuple[str, Dict[str, str]]:
+        """Chunk with its repeated long URLs replaced by references, and the URL of each reference"""
+        counts: Dict[str, int] = {}
+        for url in LINK_TARGET.findall(text):
+            counts[url] = counts.get(url, 0) + 1
+        # Texts that already contain something like @1 are left alone, as their output could not be rehydrated
+        repeated = [url for url, count in counts.items() if count > 1 and len(url) >= self.min_url_chars]
+        if not repeated or REFERENCE.search(text):
+            return text, {}
+        ids = {url: f"@{number}" for number, url in enumerate(repeated, start=1)}
+        text = LINK_TARGET.sub(lambda match: f"]({ids.get(match.group(1), match.group(1))})", text)
+        table = "\n".join(f"{reference} = {url}" for url, reference in ids.items())
+        return f"{text}\nLinks:\n{table}", {reference: url for url, reference in ids.items()}
+
+    @staticmethod
+    def rehydrate(value: Any, references: Dict[str, str]) -> Any:
+        """LLM output with the references of its chunk replaced by their URLs"""
+        if not references:
+            return value
+        if isinstance(value, dict):
+            return {key: TokenCompactor.rehydrate(item, references) for key, item in value.items()}
+        if isinstance(value, list):
+            return [TokenCompactor.rehydrate(item, references) for item in value]
+        if isinstance(value, str):
+            return REFERENCE.sub(lambda match: references.get(match.group(0), match.group(0)), value)
+        return value
+
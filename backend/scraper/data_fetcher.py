@@ -5,10 +5,18 @@ import urllib.robotparser
 from playwright.async_api import async_playwright
 import asyncio
 from core.settings import Settings
+from core.utils import Utils
+from scraper.dom_clustering import PageStructure
+from scraper.dom_serializer import serialize_dom
+from scraper.main_content import MainContentExtractor
+from scraper.structured_data import extract_structured_data
 settings = Settings()
 
 class DataFetcher:
-    def __init__(self, logger, should_crawl, max_depth, max_urls_to_search):
+    PAGE_LOAD_TIMEOUT_MS = 30000
+
+    def __init__(self, logger, should_crawl, max_depth, max_urls_to_search, budget=None, main_content=False,
+                 structured_data=False, keep_html=False, page_structure=False):
         self.validators = {}
         self.logger = logger
         self.should_crawl = should_crawl
@@ -17,6 +25,16 @@ class DataFetcher:
         self.max_urls_to_search = max_urls_to_search
         self.playwright = None
         self.browser = None
+        self.budget = budget
+        self.main_content = main_content
+        self.page_stats = []
+        self.document_urls = []  # URL of each fetched document, in order
+        self.structured_data = structured_data
+        self.page_structured_data = {}  # Entities embedded in each page, by URL
+        self.keep_html = keep_html
+        self.page_html = {}  # HTML of each page without scripts and styles, by URL
+        self.page_structure = page_structure
+        self.page_structures = {}  # Structural signature of each page, by URL
         self.initialization_task = asyncio.create_task(self.initialize_playwright())
 
     async def initialize_playwright(self):
@@ -64,9 +82,12 @@ class DataFetcher:
                     content = data
             else:
                 for url in urls:
+                    if self.should_stop():
+                        break
                     data = await self.get_single_page_data(url)
                     if data:
                         content.append(data)
+                        self.document_urls.append(url)
             self.logger.info(f"Fetched {len(content)} pages.")
             self.logger.debug(f"Content: {content}")
             return content
@@ -85,6 +106,9 @@ class DataFetcher:
                 if len(self.urls_visited) >= self.max_urls_to_search:
                     break
 
+                if self.should_stop():
+                    break
+
                 if url in self.urls_visited or depth > self.max_depth:
                     continue
 
@@ -96,7 +120,8 @@ class DataFetcher:
                 if soup:
                     urls = self.get_urls_from_page(soup, url, domain, urls_to_visit)
                     urls_to_visit += [(url, depth + 1) for url in urls]
-                    data.append(self.clean_data(soup))
+                    data.append(self.clean_data(soup, url))
+                    self.document_urls.append(url)
                     self.urls_visited.add(url)
                     self.logger.debug(f"URL visited: {url}.")
 
@@ -124,21 +149,40 @@ class DataFetcher:
             soup = await self.get_page(url)
             if soup:
                 self.urls_visited.add(url)
-                return self.clean_data(soup)
+                return self.clean_data(soup, url)
         except Exception as e:
             self.logger.error(f"Error fetching single page: {e}")
 
+    def should_stop(self) -> bool:
+        """
+        Returns True if the job was cancelled or ran out of time, in which case no more pages are fetched.
+        """
+        if self.budget is not None and self.budget.is_exhausted():
+            self.logger.info(f"Stopping fetch after {len(self.urls_visited)} pages: {self.budget.stopped_reason}.")
+            return True
+        return False
+
+    def get_page_timeout(self) -> float:
+        """Page load timeout in milliseconds, capped by the time the job has left"""
+        remaining = self.budget.remaining_seconds() if self.budget else None
+        if remaining is None:
+            return self.PAGE_LOAD_TIMEOUT_MS
+        return max(1000, min(self.PAGE_LOAD_TIMEOUT_MS, remaining * 1000))
+
     async def get_page(self, url):
+        page = None
         try:
             page = await self.browser.new_page()
-            await page.goto(url)
+            await page.goto(url, timeout=self.get_page_timeout())
             page_source = await page.content()
             soup = self.parse_html(page_source)
-            await page.close()
             return soup
         except Exception as e:
             self.logger.error(f"An error occurred: {e}")
             return None
+        finally:
+            if page:
+                await page.close()
 
     def parse_html(self, html_content):
         try:
@@ -148,10 +192,44 @@ class DataFetcher:
             self.logger.error(f"Error parsing HTML: {e}")
             return None
 
-    def clean_data(self, soup):
+    def clean_data(self, soup, url=None):
+        if self.structured_data and url is not None:
+            # Read before cleaning, which removes the JSON-LD scripts
+            self.page_structured_data[url] = extract_structured_data(soup)
         cleaned_tags = self.remove_unwanted_tags(soup)
-        extracted_content = self.extract_tags(cleaned_tags, ["h1", "h2", "h3", "span", "a", "href", "p"])  # Example tag list
-        return self.remove_unnecessary_lines(str(extracted_content))
+        if self.keep_html and url is not None:
+            self.page_html[url] = str(cleaned_tags)
+        if self.page_structure and url is not None:
+            self.page_structures[url] = PageStructure.from_soup(cleaned_tags)
+        content = self.serialize(cleaned_tags)
+        if not self.main_content:
+            return content
+        main_content = self.serialize(MainContentExtractor().extract(cleaned_tags))
+        tokens = Utils.estimate_tokens(main_content)
+        self.page_stats.append({
+            "url": url,
+            "tokens": tokens,
+            "tokens_removed": Utils.estimate_tokens(content) - tokens
+        })
+        return main_content
+
+    @staticmethod
+    def serialize(soup):
+        """Text of a page as sent to the LLM, in a compact markdown-like form"""
+        return serialize_dom(soup)
+
+    def get_content_stats(self):
+        """
+        Returns the tokens sent to the LLM and the tokens removed by the main-content stage, in total and per page.
+        """
+        if not self.page_stats:
+            return None
+        return {
+            "pages": len(self.page_stats),
+            "tokens": sum(page["tokens"] for page in self.page_stats),
+            "tokens_removed": sum(page["tokens_removed"] for page in self.page_stats),
+            "per_page": self.page_stats
+        }
 
     @staticmethod
     def remove_unwanted_tags(soup, unwanted_tags=["script", "style"]):
@@ -160,27 +238,6 @@ class DataFetcher:
                 element.decompose()
         return soup
 
-    @staticmethod
-    def extract_tags(soup, tags: list[str]):
-        """
-           This takes in HTML content and a list of tags, and returns a string
-           containing the text content of all elements with those tags, along with their href attribute if the
-           tag is an "a" tag.
-           """
-        text_parts = []
-        for element in soup.descendants:
-            if hasattr(element, 'name') and element.name in tags:
-                if element.name == "a":
-                    href = element.get('href')
-                    if href:
-                        text_parts.append(f"**{element.get_text()}** ({href})")
-                    else:
-                        text_parts.append(element.get_text())
-                else:
-                    text_parts.append(element.get_text())
-
-        return ' '.join(text_parts)
-
     def get_urls_from_page(self, soup, base_url, domain, urls_to_visit):
         """
         Returns all list of URLs from the given page soup
@@ -197,27 +254,6 @@ class DataFetcher:
                 self.logger.debug(f"Skipping URL: {full_url}. Not in domain.")
         return urls
 
-    @staticmethod
-    def remove_unnecessary_lines(content):
-        # Split content into lines
-        lines = content.split("\n")
-
-        # Strip whitespace for each line
-        stripped_lines = [line.strip() for line in lines]
-
-        # Filter out empty lines
-        non_empty_lines = [line for line in stripped_lines if line]
-
-        # Remove duplicated lines (while preserving order)
-        seen = set()
-        deduped_lines = [line for line in non_empty_lines if not (
-                line in seen or seen.add(line))]
-
-        # Join the cleaned lines without any separators (remove newlines)
-        cleaned_content = "".join(deduped_lines)
-
-        return cleaned_content
-
     def get_robots_validator(self, url):
         """
         Configures validator using robots.txt for url permissions
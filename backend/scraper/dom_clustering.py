@@ -0,0 +1,150 @@
+import math
+from collections import Counter
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup, Tag
+
+from core.settings import DEFAULT_PAGE_CLUSTER_SIMILARITY
+
+# Levels of the DOM below body that tag paths are taken from
+TAG_PATH_DEPTH = 10
+# Consecutive class tokens, in document order, that make up a class shingle
+CLASS_SHINGLE_SIZE = 2
+# Sibling elements of the same kind, each with a link and text of its own, that make a page list items
+MIN_LISTING_ITEMS = 3
+LISTING = "listing"
+DETAIL = "detail"
+
+
+class PageStructure:
+    """
+    Structural signature of a page: a histogram of its tag paths and of shingles of its class tokens, and the
+    largest group of repeated items it lists.
+
+    Pages rendered from the same template share most tag paths and class sequences whatever their text, while
+    detail and listing templates of one site only share their header and footer.
+    """
+    def __init__(self, features: Counter, repeated_items: int):
+        self.features = features
+        self.repeated_items = repeated_items
+
+    @classmethod
+    def from_soup(cls, soup: BeautifulSoup) -> "PageStructure":
+        features, classes = Counter(), []
+
+        def walk(node: Tag, path: str, depth: int) -> None:
+            for child in node.find_all(True, recursive=False):
+                child_path = f"{path}/{child.name}"
+                features["path:" + child_path] += 1
+                classes.extend(child.get("class") or [])
+                if depth < TAG_PATH_DEPTH:
+                    walk(child, child_path, depth + 1)
+
+        walk(soup.body or soup, "", 1)
+        for index in range(max(len(classes) - CLASS_SHINGLE_SIZE + 1, 0)):
+            features["class:" + " ".join(classes[index:index + CLASS_SHINGLE_SIZE])] += 1
+        return cls(features, repeated_items(soup))
+
+    @property
+    def kind(self) -> str:
+        return LISTING if self.repeated_items >= MIN_LISTING_ITEMS else DETAIL
+
+    def similarity(self, other: "PageStructure") -> float:
+        """
+        Weighted Jaccard similarity of two signatures. Counts are log-damped, so a listing with 50 rows and one with
+        5 rows of the same template stay similar.
+        """
+        keys = self.features.keys() | other.features.keys()
+        if not keys:
+            return 1.0
+        shared = total = 0.0
+        for key in keys:
+            a, b = damp(self.features.get(key, 0)), damp(other.features.get(key, 0))
+            shared += min(a, b)
+            total += max(a, b)
+        return shared / total
+
+
+def damp(count: int) -> float:
+    return 1 + math.log(count) if count else 0.0
+
+
+def repeated_items(soup: BeautifulSoup) -> int:
+    """
+    Size of the largest group of siblings with the same tag and classes that each hold a link and text besides it,
+    like the rows of an event table or the cards of a product grid. Menus hold nothing but their links.
+    """
+    largest = 0
+    for parent in soup.find_all(True):
+        groups = Counter()
+        for child in parent.find_all(True, recursive=False):
+            if is_item(child):
+                groups[(child.name, tuple(child.get("class") or []))] += 1
+        largest = max([largest, *groups.values()])
+    return largest
+
+
+def is_item(tag: Tag) -> bool:
+    links = tag.find_all("a", href=True)
+    if not links:
+        return False
+    text = len("".join(tag.get_text().split()))
+    link_text = sum(len("".join(link.get_text().split())) for link in links)
+    return text > link_text
+
+
+class PageCluster:
+    """Pages of a crawl that share a template. The first page added represents the cluster."""
+    def __init__(self, cluster_id: int, representative: PageStructure):
+        self.cluster_id = cluster_id
+        self.representative = representative
+        self.indices: List[int] = []
+        self.urls: List[str] = []
+        self.kinds: List[str] = []
+
+    @property
+    def kind(self) -> str:
+        """Listing if most pages of the cluster list items, detail otherwise"""
+        return LISTING if self.kinds.count(LISTING) * 2 > len(self.kinds) else DETAIL
+
+    def to_stats(self) -> dict:
+        return {"id": self.cluster_id, "kind": self.kind, "size": len(self.urls), "urls": self.urls}
+
+
+class PageClusterer:
+    """
+    Groups the pages of a crawl by template, so each group can be extracted with its own strategy.
+
+    A page joins the cluster whose representative it is most similar to, if that similarity reaches
+    `min_similarity`, and starts a new cluster otherwise. Comparing with one page per cluster keeps this linear in
+    the number of pages for the handful of templates a site has.
+
+    Args:
+        min_similarity: weighted Jaccard similarity of two pages of the same template, between 0 and 1
+    """
+    def __init__(self, min_similarity: float = DEFAULT_PAGE_CLUSTER_SIMILARITY):
+        self.min_similarity = min_similarity
+
+    def cluster(self, urls: List[str], structures: List[PageStructure]) -> List[PageCluster]:
+        clusters: List[PageCluster] = []
+        for index, (url, structure) in enumerate(zip(urls, structures)):
+            best: Optional[PageCluster] = None
+            best_similarity = self.min_similarity
+            for cluster in clusters:
+                similarity = structure.similarity(cluster.representative)
+                if similarity >= best_similarity:
+                    best, best_similarity = cluster, similarity
+            if best is None:
+                best = PageCluster(len(clusters), structure)
+                clusters.append(best)
+            best.indices.append(index)
+            best.urls.append(url)
+            best.kinds.append(structure.kind)
+        return clusters
+
+
+def cluster_stats(clusters: List[PageCluster]) -> Dict[str, object]:
+    return {
+        "pages": sum(len(cluster.urls) for cluster in clusters),
+        "clusters": [cluster.to_stats() for cluster in clusters]
+    }
@@ -0,0 +1,136 @@
+import re
+from typing import List, Optional
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+# Tags whose content is never sent to the LLM
+SKIPPED_TAGS = {
+    "script", "style", "noscript", "template", "head", "svg", "canvas", "iframe", "object", "button", "select",
+    "option", "textarea", "input", "datalist"
+}
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "body", "caption", "dd", "details", "dialog", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "header", "hr", "html", "legend", "li", "main", "nav", "ol",
+    "p", "section", "summary", "table", "tbody", "tfoot", "thead", "tr", "ul"
+}
+HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+# Repeated lines shorter than this are kept, as short labels (prices, "Free", field names) carry structure
+DEDUPE_MIN_CHARS = 30
+WHITESPACE = re.compile(r"\s+")
+
+
+class DomSerializer:
+    """
+    Serializes a page to compact markdown-like text in a single pass over the DOM.
+
+    Every text node is written exactly once, however deeply the elements around it nest. Block elements start a
+    new line; headings are prefixed with #, list items with - or their number, table rows are written as
+    | cell | cell |, and links as [text](target). Repeated lines of DEDUPE_MIN_CHARS or more are written once.
+    """
+    def __init__(self):
+        self.lines: List[str] = []
+        self.parts: List[str] = []
+        self.prefix = ""
+
+    def serialize(self, root: Tag) -> str:
+        self.walk(root, list_depth=0)
+        self.flush()
+        return "\n".join(self.dedupe(self.lines))
+
+    def serialize_inline(self, root: Tag) -> str:
+        """Text of an element on a single line, e.g. for a table cell"""
+        self.walk(root, list_depth=0)
+        self.flush()
+        return " ".join(self.lines)
+
+    def walk(self, node: Tag, list_depth: int) -> None:
+        item_number = 0
+        for child in node.children:
+            if isinstance(child, NavigableString):
+                # Comments, doctypes and CDATA are subclasses
+                if type(child) is NavigableString:
+                    self.parts.append(WHITESPACE.sub(" ", child))
+                continue
+            if not isinstance(child, Tag) or child.name in SKIPPED_TAGS:
+                continue
+            name = child.name
+            if name in HEADINGS:
+                self.write_block(child, "#" * HEADINGS[name] + " ", list_depth)
+            elif name == "li":
+                item_number += 1
+                marker = f"{item_number}. " if node.name == "ol" else "- "
+                self.write_block(child, "  " * max(list_depth - 1, 0) + marker, list_depth)
+            elif name in ("ul", "ol"):
+                self.flush()
+                self.walk(child, list_depth + 1)
+                self.flush()
+            elif name == "tr":
+                self.write_row(child)
+            elif name == "a":
+                self.write_link(child)
+            elif name == "br":
+                self.flush()
+            elif name == "pre":
+                self.flush()
+                self.lines.extend(line.rstrip() for line in child.get_text().splitlines() if line.strip())
+            elif name in BLOCK_TAGS:
+                self.flush()
+                self.walk(child, list_depth)
+                self.flush()
+            else:
+                self.walk(child, list_depth)
+
+    def write_block(self, tag: Tag, prefix: str, list_depth: int) -> None:
+        # A prefix with no text yet is kept, e.g. the marker of a list item that starts with a heading
+        self.flush()
+        self.prefix += prefix
+        self.walk(tag, list_depth)
+        self.flush()
+        self.prefix = ""
+
+    def write_row(self, row: Tag) -> None:
+        self.flush()
+        cells = [DomSerializer().serialize_inline(cell) for cell in row.find_all(["td", "th"], recursive=False)]
+        if any(cells):
+            self.lines.append("| " + " | ".join(cells) + " |")
+
+    def write_link(self, link: Tag) -> None:
+        text = DomSerializer().serialize_inline(link)
+        target = self.link_target(link.get("href"))
+        if text and target:
+            self.parts.append(f"[{text}]({target})")
+        elif text:
+            self.parts.append(text)
+
+    @staticmethod
+    def link_target(href: Optional[str]) -> Optional[str]:
+        if not href:
+            return None
+        href = href.strip()
+        if not href or href.startswith(("#", "javascript:")):
+            return None
+        return href
+
+    def flush(self) -> None:
+        text = " ".join("".join(self.parts).split())
+        if text:
+            self.lines.append(self.prefix + text)
+            self.prefix = ""
+        self.parts = []
+
+    @staticmethod
+    def dedupe(lines: List[str]) -> List[str]:
+        seen = set()
+        deduped = []
+        for line in lines:
+            if len(line) >= DEDUPE_MIN_CHARS:
+                if line in seen:
+                    continue
+                seen.add(line)
+            deduped.append(line)
+        return deduped
+
+
+def serialize_dom(soup: BeautifulSoup) -> str:
+    """Compact text of a page for the LLM, see DomSerializer"""
+    return DomSerializer().serialize(soup)
@@ -0,0 +1,200 @@
+import copy
+import re
+from typing import Dict, List
+
+from bs4 import BeautifulSoup, Tag
+
+# Tags that never hold content worth extracting
+BOILERPLATE_TAGS = ["nav", "footer", "aside", "form", "noscript", "iframe", "svg", "button", "dialog", "template"]
+BOILERPLATE_ROLES = {"navigation", "banner", "contentinfo", "complementary", "dialog", "alertdialog", "search"}
+UNLIKELY_CANDIDATES = re.compile(
+    r"-ad-|advert|banner|breadcrumb|combx|comment|community|consent|cookie|disqus|footer|gdpr|menu|modal|"
+    r"newsletter|pager|pagination|popup|promo|related|share|sharing|shoutbox|sidebar|social|sponsor|subscribe|"
+    r"masthead",
+    re.I
+)
+MAYBE_CANDIDATES = re.compile(r"article|body|column|content|main|post|entry|event|product|listing|result", re.I)
+POSITIVE_CLASSES = re.compile(r"article|body|content|entry|main|page|post|text|blog|story|event|product|listing", re.I)
+NEGATIVE_CLASSES = re.compile(
+    r"-ad-|advert|banner|comment|footer|masthead|media|menu|meta|promo|related|share|sidebar|social|sponsor",
+    re.I
+)
+# Elements whose text is scored and credited to their ancestors
+SCORED_TAGS = ["p", "pre", "td", "li", "dd", "blockquote"]
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt", "figure", "footer", "form", "h1", "h2",
+    "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table", "ul"
+}
+# Share of the page's text that has to survive boilerplate removal, below which the page is kept as it is
+MIN_KEPT_RATIO = 0.1
+# Lists and tables outside the main content are kept if they hold data rather than links
+STRUCTURED_TAGS = ["table", "ul", "ol", "dl"]
+
+
+class MainContentExtractor:
+    """
+    Readability-style extraction of the main content of a page.
+
+    Boilerplate (navigation, headers, footers, sidebars, cookie banners, forms) is removed by tag, ARIA role and
+    class or id. Text blocks are then scored by length and commas, the scores are credited to their ancestors, and
+    the ancestor with the best score, discounted by its link density, is kept with the siblings around it that hold
+    text rather than links.
+    Headings and data-bearing lists and tables outside that block are kept too, since extraction targets such as
+    event listings and spec tables often live there. When the chosen block holds too little text, the page is
+    returned with only the boilerplate removed, and when removing boilerplate leaves almost nothing (class names
+    that match everywhere), the page is returned as it is.
+
+    Args:
+        min_content_chars: text the chosen block needs to be used on its own
+        max_link_density: share of link text above which lists and tables are considered navigation
+    """
+    def __init__(self, min_content_chars: int = 250, max_link_density: float = 0.5):
+        self.min_content_chars = min_content_chars
+        self.max_link_density = max_link_density
+
+    def extract(self, soup: BeautifulSoup) -> BeautifulSoup:
+        """Returns a document with the main content of `soup`. `soup` may be modified."""
+        page_length = len(self.text(soup))
+        pruned = copy.copy(soup)
+        self.remove_boilerplate(pruned)
+        if len(self.text(pruned)) < page_length * MIN_KEPT_RATIO:
+            return soup
+        soup = pruned
+        body = soup.body or soup
+        scores = self.score_blocks(body)
+        if not scores:
+            return soup
+        top = max(scores, key=lambda tag: scores[tag] * (1 - self.link_density(tag)))
+        if top is body or len(self.text(top)) < self.min_content_chars:
+            return soup
+
+        kept = self.gather_siblings(top, scores)
+        for tag in body.find_all(["h1", *STRUCTURED_TAGS]):
+            if tag.name == "h1" or self.is_data_block(tag):
+                kept.append(tag)
+        return self.build_document(body, kept)
+
+    def remove_boilerplate(self, soup: BeautifulSoup) -> None:
+        for tag in soup.find_all(True):
+            if tag.decomposed or tag.name in ("html", "body", "main", "article"):
+                continue
+            if self.is_boilerplate(tag):
+                tag.decompose()
+
+    def is_boilerplate(self, tag: Tag) -> bool:
+        if tag.name in BOILERPLATE_TAGS or tag.get("role") in BOILERPLATE_ROLES:
+            return True
+        if tag.name == "header" and not tag.find_parent(["article", "main"]):
+            return True
+        if tag.has_attr("hidden") or tag.get("aria-hidden") == "true":
+            return True
+        if "display:none" in tag.get("style", "").replace(" ", ""):
+            return True
+        match_string = self.class_and_id(tag)
+        return (
+            tag.name not in ("a", "table", "tr", "td", "th")
+            and bool(UNLIKELY_CANDIDATES.search(match_string))
+            and not MAYBE_CANDIDATES.search(match_string)
+        )
+
+    def score_blocks(self, body: Tag) -> Dict[Tag, float]:
+        scores: Dict[Tag, float] = {}
+        for block in self.text_blocks(body):
+            text = self.text(block)
+            if len(text) < 25:
+                continue
+            score = 1 + text.count(",") + min(len(text) // 100, 3)
+            for level, ancestor in enumerate(block.parents):
+                if level == 3 or ancestor is None or ancestor.name in ("[document]", "html"):
+                    break
+                if ancestor not in scores:
+                    scores[ancestor] = self.initial_score(ancestor)
+                scores[ancestor] += score / (1 if level == 0 else 2 if level == 1 else level * 3)
+        return scores
+
+    @staticmethod
+    def text_blocks(body: Tag) -> List[Tag]:
+        """Scored elements, and divs and spans that only hold inline content, as Readability turns them into paragraphs"""
+        blocks = body.find_all(SCORED_TAGS)
+        for tag in body.find_all(["div", "section", "span"]):
+            if not any(child.name in BLOCK_TAGS for child in tag.find_all(True, recursive=False)):
+                blocks.append(tag)
+        return blocks
+
+    def initial_score(self, tag: Tag) -> float:
+        score = {
+            "div": 5, "article": 5, "main": 5, "section": 3, "pre": 3, "td": 3, "blockquote": 3,
+            "address": -3, "ol": -3, "ul": -3, "dl": -3, "dd": -3, "dt": -3, "li": -3, "form": -3,
+            "h1": -5, "h2": -5, "h3": -5, "h4": -5, "h5": -5, "h6": -5, "th": -5
+        }.get(tag.name, 0)
+        match_string = self.class_and_id(tag)
+        if NEGATIVE_CLASSES.search(match_string):
+            score -= 25
+        if POSITIVE_CLASSES.search(match_string):
+            score += 25
+        return score
+
+    def gather_siblings(self, top: Tag, scores: Dict[Tag, float]) -> List[Tag]:
+        """
+        The top block, its siblings that are not navigation, and the siblings of its parent and grandparent that
+        score well or are sections of text under a heading.
+        """
+        threshold = max(10.0, scores[top] * 0.2)
+        kept = [top]
+        for sibling in self.siblings(top):
+            if scores.get(sibling, 0) >= threshold or (self.text(sibling) and self.link_density(sibling) < 0.25):
+                kept.append(sibling)
+        for level, ancestor in enumerate(top.parents):
+            if level == 2 or ancestor.name in ("body", "[document]"):
+                break
+            for sibling in self.siblings(ancestor):
+                if scores.get(sibling, 0) >= threshold or self.is_text_section(sibling):
+                    kept.append(sibling)
+        return kept
+
+    @staticmethod
+    def siblings(tag: Tag) -> List[Tag]:
+        if tag.parent is None:
+            return []
+        return [sibling for sibling in tag.parent.find_all(True, recursive=False) if sibling is not tag]
+
+    def is_text_section(self, tag: Tag) -> bool:
+        """Whether an element is a heading followed by text, like a section of reviews or details"""
+        heading = tag.find(["h2", "h3", "h4"])
+        if heading is None:
+            return False
+        return len(self.text(tag)) - len(self.text(heading)) >= 50 and self.link_density(tag) < 0.25
+
+    def is_data_block(self, tag: Tag) -> bool:
+        """Whether a list or table holds data rather than navigation"""
+        if tag.name == "table":
+            if len(tag.find_all("tr")) < 2:
+                return False
+        elif len(tag.find_all(["li", "dt"])) < 2 or len(self.text(tag)) < 50:
+            return False
+        return self.link_density(tag) <= self.max_link_density
+
+    @staticmethod
+    def build_document(body: Tag, kept: List[Tag]) -> BeautifulSoup:
+        """A new document with the kept elements in page order, leaving out elements nested in other kept ones"""
+        kept_ids = {id(tag) for tag in kept}
+        document = BeautifulSoup("", "html.parser")
+        for tag in body.find_all(True):
+            if id(tag) in kept_ids and not any(id(parent) in kept_ids for parent in tag.parents):
+                document.append(tag.extract())
+        return document
+
+    @staticmethod
+    def text(tag: Tag) -> str:
+        return " ".join(tag.get_text(" ").split())
+
+    def link_density(self, tag: Tag) -> float:
+        text_length = len(self.text(tag))
+        if not text_length:
+            return 0.0
+        link_length = sum(len(self.text(link)) for link in tag.find_all("a"))
+        return min(link_length / text_length, 1.0)
+
+    @staticmethod
+    def class_and_id(tag: Tag) -> str:
+        return " ".join(tag.get("class") or []) + " " + (tag.get("id") or "")
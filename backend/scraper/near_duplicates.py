@@ -0,0 +1,152 @@
+import hashlib
+import math
+from typing import Dict, List, Optional, Tuple
+
+from scraper.template_blocks import normalize_line
+
+FINGERPRINT_BITS = 64
+FINGERPRINT_KEY_PREFIX = "webslayer:page-fingerprints:"
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """
+    64-bit SimHash of a text over its word shingles. Texts that share most of their shingles get fingerprints that
+    differ in few bits, so near-duplicates are found by Hamming distance.
+    """
+    words = text.lower().split()
+    shingles = {" ".join(words[index:index + shingle_size]) for index in range(max(len(words) - shingle_size + 1, 1))}
+    weights = [0] * FINGERPRINT_BITS
+    for shingle in shingles:
+        digest = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if digest >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class FingerprintIndex:
+    """
+    Finds fingerprints within `max_distance` bits of a query without comparing it to every fingerprint.
+
+    Fingerprints are split into max_distance + 1 bands: two fingerprints that differ in at most max_distance bits are
+    equal in at least one band, so only fingerprints sharing a band with the query are compared.
+    """
+    def __init__(self, max_distance: int = 4):
+        self.max_distance = max_distance
+        self.band_bits = FINGERPRINT_BITS // (max_distance + 1)
+        self.bands: List[Dict[int, List[Tuple[int, str]]]] = [{} for _ in range(max_distance + 1)]
+
+    def band_values(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.band_bits) - 1
+        # The last band takes the bits left over when 64 is not a multiple of the band count
+        values = [fingerprint >> (band * self.band_bits) & mask for band in range(len(self.bands) - 1)]
+        values.append(fingerprint >> ((len(self.bands) - 1) * self.band_bits))
+        return values
+
+    def add(self, fingerprint: int, key: str) -> None:
+        for band, value in zip(self.bands, self.band_values(fingerprint)):
+            band.setdefault(value, []).append((fingerprint, key))
+
+    def find(self, fingerprint: int) -> Optional[str]:
+        """Key of the closest indexed fingerprint within max_distance, or None"""
+        best = None
+        for band, value in zip(self.bands, self.band_values(fingerprint)):
+            for candidate, key in band.get(value, []):
+                distance = hamming_distance(candidate, fingerprint)
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, key)
+        return best[1] if best else None
+
+
+class NearDuplicateFilter:
+    """
+    Drops pages that are near-duplicates of an earlier page of the same crawl (print views, tracking parameter
+    variants, localized copies), and optionally pages whose fingerprint is unchanged since the previous run.
+
+    Pages are fingerprinted without the lines found on at least `template_fraction` of the pages of the crawl. The
+    header, navigation and footer of a site otherwise make up most of the shingles, and distinct pages built on the
+    same template would only be a few bits apart.
+
+    Args:
+        max_distance: bits two fingerprints may differ in to be near-duplicates, 0 only matches identical texts
+        previous: fingerprints by URL from the previous run, pages with the same fingerprint are dropped as unchanged.
+            Near-duplicates of the previous version are extracted again, since a changed price or date is a small edit
+        template_fraction: share of the pages a line has to appear on to be left out of fingerprints. It is kept high
+            so copies of one page, which share their lines too, do not pass for template
+        min_pages: crawls with fewer pages are fingerprinted on their whole text
+    """
+    def __init__(self, max_distance: int = 4, previous: Optional[Dict[str, int]] = None,
+                 template_fraction: float = 0.7, min_pages: int = 3):
+        self.max_distance = max_distance
+        self.previous = previous or {}
+        self.template_fraction = template_fraction
+        self.min_pages = min_pages
+        self.fingerprints: Dict[str, int] = {}
+
+    def content_texts(self, documents: List[str]) -> List[str]:
+        """Documents without the lines shared across the crawl, or whole if nothing else is left"""
+        if len(documents) < self.min_pages:
+            return documents
+        page_lines = [document.split("\n") for document in documents]
+        page_counts: Dict[str, int] = {}
+        for lines in page_lines:
+            for line in {normalize_line(line) for line in lines}:
+                page_counts[line] = page_counts.get(line, 0) + 1
+        min_count = max(self.min_pages, math.ceil(self.template_fraction * len(documents)))
+        texts = []
+        for document, lines in zip(documents, page_lines):
+            kept = [line for line in lines if page_counts[normalize_line(line)] < min_count]
+            texts.append("\n".join(kept) if any(line.strip() for line in kept) else document)
+        return texts
+
+    def filter(self, urls: List[str], documents: List[str]) -> Tuple[List[str], List[str], dict]:
+        """Returns the URLs and documents to extract, and stats. `fingerprints` holds those of all pages afterwards."""
+        stats = {"pages": len(documents), "duplicates": 0, "unchanged": 0, "skipped": []}
+        index = FingerprintIndex(self.max_distance)
+        kept_urls, kept_documents = [], []
+        for url, document, content in zip(urls, documents, self.content_texts(documents)):
+            fingerprint = simhash(content)
+            self.fingerprints[url] = fingerprint
+            duplicate_of = index.find(fingerprint)
+            if self.previous.get(url) == fingerprint:
+                # Kept in the index, so copies of an unchanged page are skipped as duplicates
+                index.add(fingerprint, url)
+                stats["unchanged"] += 1
+                stats["skipped"].append({"url": url, "reason": "unchanged"})
+            elif duplicate_of is not None:
+                stats["duplicates"] += 1
+                stats["skipped"].append({"url": url, "reason": "duplicate", "duplicate_of": duplicate_of})
+            else:
+                index.add(fingerprint, url)
+                kept_urls.append(url)
+                kept_documents.append(document)
+        return kept_urls, kept_documents, stats
+
+
+class FingerprintStore:
+    """
+    Page fingerprints of the last successful run of a job, in a Redis hash of URL to fingerprint.
+
+    Args:
+        redis_client: synchronous Redis client
+        scope: identifies recurring runs of the same job, e.g. a hash of the schema and start URLs
+        ttl_seconds: fingerprints of jobs that stop running expire after this
+    """
+    def __init__(self, redis_client, scope: str, ttl_seconds: int):
+        self.redis = redis_client
+        self.key = FINGERPRINT_KEY_PREFIX + scope
+        self.ttl_seconds = ttl_seconds
+
+    def load(self) -> Dict[str, int]:
+        return {url: int(fingerprint, 16) for url, fingerprint in self.redis.hgetall(self.key).items()}
+
+    def save(self, fingerprints: Dict[str, int]) -> None:
+        pipeline = self.redis.pipeline()
+        pipeline.delete(self.key)
+        if fingerprints:
+            pipeline.hset(self.key, mapping={url: f"{fingerprint:016x}" for url, fingerprint in fingerprints.items()})
+            pipeline.expire(self.key, self.ttl_seconds)
+        pipeline.execute()
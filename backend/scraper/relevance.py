@@ -0,0 +1,152 @@
+import math
+import re
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from core.utils import Utils
+
+WORD = re.compile(r"[^\W_]+")
+CAMEL_CASE_BOUNDARY = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "in", "is", "it", "its", "of", "on", "or",
+    "that", "the", "this", "to", "was", "were", "will", "with", "item", "items", "list", "value", "field", "name",
+    "what", "when", "where", "which", "who"
+}
+# Dates, times and prices are matched by their shape rather than by a word, as the fields holding them usually are
+DATE_TERM = "<date>"
+PRICE_TERM = "<price>"
+MONTHS = "jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec"
+DATE = re.compile(
+    rf"\b(?:(?:{MONTHS})[a-z]*\.?\s+\d{{1,2}}|\d{{1,2}}(?:st|nd|rd|th)?\s+(?:{MONTHS})[a-z]*"
+    r"|(?:mon|tues|wednes|thurs|fri|satur|sun)day|\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{2,4}"
+    r"|\d{1,2}(?:[:.]\d{2})?\s?[ap]m)\b",
+    re.I
+)
+PRICE = re.compile(r"[$€£¥]\s?\d|\b\d+(?:[.,]\d{2})?\s?(?:usd|eur|gbp)\b", re.I)
+DATE_WORDS = {"date", "time", "day", "start", "end", "datetime", "schedule"}
+PRICE_WORDS = {"price", "cost", "fee", "fare", "amount", "ticket"}
+# Share of the score of the best chunk of its page a chunk gets, so the rest of a relevant page, like the
+# description of an event below its title and date, is not skipped for lacking schema words of its own
+PAGE_CONTEXT_WEIGHT = 0.75
+# Characters of a chunk shown in the stats of skipped chunks
+PREVIEW_CHARS = 80
+
+
+def stem(word: str) -> str:
+    """Crude plural stripping, so "events" in a page matches an "event" field"""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Stemmed words of a text without stop words, and a shape term for each date, time and price in it"""
+    words = WORD.findall(CAMEL_CASE_BOUNDARY.sub(" ", text))
+    terms = [stem(word) for word in (word.lower() for word in words) if len(word) > 1 and word not in STOP_WORDS]
+    return terms + [DATE_TERM] * len(DATE.findall(text)) + [PRICE_TERM] * len(PRICE.findall(text))
+
+
+def schema_terms(schema_def: dict, hints: Optional[List[str]] = None) -> List[str]:
+    """
+    Query terms of a schema: the words of its name and of the names, descriptions and aliases of its fields, item
+    schemas included, and the shape terms of its date and price fields, followed by those of the hints.
+    """
+    terms = tokenize(schema_def.get("name") or "")
+    for field in schema_def.get("fields", []):
+        name_terms = tokenize(field["name"])
+        terms += name_terms + tokenize(" ".join([field.get("description") or ""] + list(field.get("aliases") or [])))
+        if field.get("field_type", "").lower() == "date" or DATE_WORDS & set(name_terms):
+            terms.append(DATE_TERM)
+        if PRICE_WORDS & set(name_terms):
+            terms.append(PRICE_TERM)
+        if field.get("item_schema"):
+            terms += schema_terms(field["item_schema"])
+    terms += tokenize(" ".join(hints or []))
+    return list(dict.fromkeys(terms))
+
+
+class BM25Index:
+    """
+    Okapi BM25 scores of a set of texts for a query, with the texts themselves as the corpus the term frequencies
+    and lengths are compared against.
+    """
+    def __init__(self, texts: List[str], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(tokenize(text)) for text in texts]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        self.document_frequency = Counter(term for counts in self.term_counts for term in counts)
+
+    def idf(self, term: str) -> float:
+        count, frequency = len(self.term_counts), self.document_frequency[term]
+        # Never negative, so a term in most texts still counts a little rather than against them
+        return math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+
+    def scores(self, query: List[str]) -> List[float]:
+        scores = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / self.average_length) if self.average_length else self.k1
+            scores.append(sum(
+                self.idf(term) * counts[term] * (self.k1 + 1) / (counts[term] + norm)
+                for term in query if counts[term]
+            ))
+        return scores
+
+
+class RelevanceFilter:
+    """
+    Drops the chunks of a job that share no vocabulary with its schema, like privacy policies, login prompts or
+    cookie notices, before they are sent to the LLM.
+
+    Chunks are scored with BM25 against the schema terms, raised to PAGE_CONTEXT_WEIGHT times the score of the best
+    chunk of their page, and kept if they score at least `min_score` times the best chunk. The `min_chunks` best
+    chunks are always kept, and nothing is dropped when no chunk matches any term, since the schema then says nothing
+    about which chunks matter.
+
+    Args:
+        terms: query terms, see schema_terms
+        min_score: share of the best chunk's score a chunk needs to be kept, between 0 and 1
+        min_chunks: chunks kept whatever their score
+    """
+    def __init__(self, terms: List[str], min_score: float = 0.1, min_chunks: int = 2):
+        self.terms = terms
+        self.min_score = min_score
+        self.min_chunks = min_chunks
+
+    def filter(self, chunks: List[str], pages: Optional[List[int]] = None) -> Tuple[List[int], List[float], dict]:
+        """
+        Positions of the chunks to extract, from the most to the least relevant, the score of every chunk, and stats.
+        `pages` gives the page of each chunk, by default every chunk is a page of its own.
+        """
+        scores = BM25Index(chunks).scores(self.terms) if chunks else []
+        if pages is not None:
+            page_scores = {}
+            for page, score in zip(pages, scores):
+                page_scores[page] = max(page_scores.get(page, 0.0), score)
+            scores = [max(score, PAGE_CONTEXT_WEIGHT * page_scores[page]) for page, score in zip(pages, scores)]
+        ranking = sorted(range(len(chunks)), key=lambda index: -scores[index])
+        best = scores[ranking[0]] if ranking else 0.0
+        if best > 0:
+            kept = ranking[:self.min_chunks] + [
+                index for index in ranking[self.min_chunks:] if scores[index] >= self.min_score * best
+            ]
+        else:
+            kept = ranking
+        skipped = sorted(set(range(len(chunks))) - set(kept))
+        stats = {
+            "chunks": len(chunks),
+            "chunks_skipped": len(skipped),
+            "tokens_skipped": sum(Utils.estimate_tokens(chunks[index]) for index in skipped),
+            "skipped": [
+                {
+                    "chunk": index,
+                    "score": round(scores[index], 3),
+                    "text": " ".join(chunks[index].split())[:PREVIEW_CHARS]
+                }
+                for index in skipped
+            ]
+        }
+        return kept, scores, stats
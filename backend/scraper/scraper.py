@@ -1,9 +1,12 @@
 from fastapi import HTTPException
 import json
 import logging
-from typing import List
+import time
+from typing import List, Optional
+from urllib.parse import urlparse
 
 import torch
+from bs4 import BeautifulSoup
 from pydantic import BaseModel
 from langgraph.graph import StateGraph, END
 from typing_extensions import TypedDict
@@ -12,10 +15,29 @@ from scraper.agents.data_extractor import DataExtractorAgent
 from scraper.agents.hallucination_grader import HallucinationGraderAgent
 from scraper.agents.quality_assurance import QualityAssuranceAgent
 from scraper.agents.response_cleaner import ResponseCleanerAgent
+from scraper.compaction import TokenCompactor
 from scraper.data_fetcher import DataFetcher
+from scraper.dom_clustering import LISTING, PageClusterer, cluster_stats
+from scraper.near_duplicates import FingerprintStore, NearDuplicateFilter
+from scraper.relevance import RelevanceFilter, schema_terms
+from scraper.selector_templates import SelectorTemplateLearner, SelectorTemplateStore, layout_signature
+from scraper.structured_data import StructuredDataMapper
+from scraper.template_blocks import TemplateBlockRemover, estimate_llm_calls
 from core.utils import Utils
+from api.models import JobPriority
+from core.items import content_hash
+from core.job_budget import JobBudget, is_budget_exhausted
+from core.redis_client import get_redis
+from core.schema_cache import LRUCache, schema_fingerprint
+from core.settings import DEFAULT_PAGE_CLUSTER_SIMILARITY, Settings
 import asyncio
 
+settings = Settings()
+
+# Per worker process. Keyed by schema content hash, so a changed schema never hits a stale entry.
+schema_models = LRUCache(settings.SCHEMA_CACHE_MAX_ENTRIES)
+extraction_graphs = LRUCache(settings.SCHEMA_CACHE_MAX_ENTRIES)
+
 
 class GraphState(TypedDict):
     """
@@ -34,6 +56,10 @@ class GraphState(TypedDict):
         logger: logger
         hallucination_check_count: number of hallucination checks done
         quality_check_count: number of quality checks done
+        priority: scheduling lane used when acquiring LLM rate limits
+        budget: deadline, token budget and cancellation state of the job
+        relevance_stats: chunks the relevance filter skipped in the last extraction
+        compaction_stats: tokens of each document before and after compaction in the last extraction
     """
     schema: BaseModel
     question: str
@@ -47,6 +73,10 @@ class GraphState(TypedDict):
     logger: logging.Logger
     hallucination_check_count: int
     quality_check_count: int
+    priority: str
+    budget: Optional[JobBudget]
+    relevance_stats: Optional[dict]
+    compaction_stats: Optional[dict]
 
 
 class Scraper:
@@ -59,17 +89,46 @@ class Scraper:
         logger: logger
         crawl_config: configuration for the crawler
         scraper_config: configuration for the scraper
+        priority: scheduling lane for LLM calls (interactive or bulk)
+        budget: deadline, token budget and cancellation state of the job
     """
-    def __init__(self, schema, urls_to_search, model_type, local_model_name, logger, crawl_config, scraper_config):
+    def __init__(self, schema, urls_to_search, model_type, local_model_name, logger, crawl_config, scraper_config,
+                 priority=JobPriority.interactive, budget=None):
         self.logger = logger
         self.crawl_config = crawl_config
         self.scraper_config = scraper_config
         self.model_type = model_type
         self.local_model_name = local_model_name
+        self.budget = budget
+        self.setup_seconds = 0.0
+        self.graph_cache_hit = False
+        self.template_stats = None
+        self.near_duplicate_stats = None
+        self.duplicate_filter = None
+        self.fingerprint_store = None
+        self.structured_data_stats = None
+        self.selector_template_stats = None
+        self.cluster_stats = None
+        self.relevance_stats = None
+        # Set when skip_unchanged_pages found no page that changed since the previous run
+        self.unchanged = False
+        self.compaction_stats = None
         
         # Create dynamic model from schema definition
+        started_at = time.perf_counter()
+        self.schema_version = None
+        self.schema_def = None
         if isinstance(schema, dict):
-            schema = Utils.create_dynamic_model(schema)
+            schema_def = schema
+            self.schema_def = schema_def
+            self.schema_version = schema_fingerprint(schema_def)
+            if settings.ENABLE_SCHEMA_CACHE:
+                schema = schema_models.get_or_create(
+                    self.schema_version, lambda: Utils.create_dynamic_model(schema_def)
+                )
+            else:
+                schema = Utils.create_dynamic_model(schema_def)
+        self.setup_seconds += time.perf_counter() - started_at
         
         self.state = GraphState(
             schema=schema,
@@ -82,7 +141,11 @@ class Scraper:
             quality=0,
             logger=logger,
             hallucination_check_count=0,
-            quality_check_count=0
+            quality_check_count=0,
+            priority=priority,
+            budget=budget,
+            relevance_stats=None,
+            compaction_stats=None
         )
         # Clear GPU cache before running the model
         torch.cuda.empty_cache()
@@ -91,8 +154,10 @@ class Scraper:
         self.state.schema = schema
 
     @classmethod
-    async def create(cls, schema, urls_to_search, model_type, local_model_name, logger, crawl_config, scraper_config):
-        self = cls(schema, urls_to_search, model_type, local_model_name, logger, crawl_config, scraper_config)
+    async def create(cls, schema, urls_to_search, model_type, local_model_name, logger, crawl_config, scraper_config,
+                     priority=JobPriority.interactive, budget=None):
+        self = cls(schema, urls_to_search, model_type, local_model_name, logger, crawl_config, scraper_config, priority,
+                   budget)
         await self.initialize_fetcher()
         return self
 
@@ -101,7 +166,12 @@ class Scraper:
             self.logger,
             self.crawl_config.get('enable_crawling', False),
             self.crawl_config.get('max_depth', 3),
-            self.crawl_config.get('max_urls_to_search', 100)
+            self.crawl_config.get('max_urls_to_search', 100),
+            budget=self.budget,
+            main_content=self.crawl_config.get('enable_main_content', False),
+            structured_data=self.crawl_config.get('enable_structured_data', False) and self.schema_def is not None,
+            keep_html=self.crawl_config.get('enable_selector_templates', False) and self.schema_def is not None,
+            page_structure=self.crawl_config.get('enable_page_clustering', False)
         )
         await asyncio.sleep(0.1)  # Yield control to ensure DataFetcher initializes asynchronously
 
@@ -113,21 +183,316 @@ class Scraper:
             Extracts data from a document using an extraction team.
 
             Returns:
-                str: The extracted generation text.
+                str: The extracted generation text, or None if no page changed since the previous run (`unchanged`).
             """
-        self.state["documents"] = await self.fetch_data()
-        if not self.state.get("documents"):
+        documents = await self.fetch_data()
+        urls = list(self.fetcher.document_urls)
+        if documents and self.crawl_config.get('enable_near_duplicates', False):
+            urls, documents = self.remove_near_duplicates(urls, documents)
+            if not documents:
+                # Every page was skipped as unchanged, the expected outcome of a recurring run
+                self.unchanged = True
+                self.state["logger"].info("No page changed since the previous run.")
+                self.save_fingerprints()
+                return None
+        if documents and self.fetcher.page_structure:
+            urls, documents = self.cluster_pages(urls, documents)
+        generations = []
+        if documents and self.fetcher.structured_data:
+            urls, documents, generations = self.map_structured_data(urls, documents)
+        if documents and self.fetcher.keep_html:
+            urls, documents, template_generations = self.apply_selector_templates(urls, documents)
+            generations += template_generations
+        if documents and self.crawl_config.get('enable_template_removal', False):
+            urls, documents = self.remove_template_blocks(urls, documents)
+        self.state["documents"] = documents
+        if not self.state.get("documents") and not generations:
             raise HTTPException(status_code=400, detail="Unable to fetch data from provided URLs")
-        
-        extraction_team = self.init_extraction_team()
-        graph = extraction_team.compile()
-        extracted_data = graph.invoke(self.state)
 
-        if not extracted_data or not extracted_data.get("generation"):
-            raise HTTPException(status_code=400, detail="Unable to extract relevant information")
-        
-        self.state["logger"].info(f"Result: {json.dumps(extracted_data['generation'])}")
-        return extracted_data['generation']
+        if self.state["documents"]:
+            graph = self.get_extraction_graph()
+            extracted_data = graph.invoke(self.state)
+            self.relevance_stats = extracted_data.get("relevance_stats") if extracted_data else None
+            self.compaction_stats = extracted_data.get("compaction_stats") if extracted_data else None
+            if self.compaction_stats:
+                for page in self.compaction_stats["per_page"]:
+                    page["url"] = urls[page["page"]] if page["page"] < len(urls) else None
+            if extracted_data and extracted_data.get("generation"):
+                generations.append(extracted_data["generation"])
+            elif not generations:
+                raise HTTPException(status_code=400, detail="Unable to extract relevant information")
+
+        generation = generations[0] if len(generations) == 1 else DataExtractorAgent.combine_results(generations)
+        self.state["logger"].info(f"Result: {json.dumps(generation)}")
+        self.save_fingerprints()
+        return generation
+
+    def extract_documents(self, documents):
+        """Runs the extraction graph on some of the job's documents and returns their generation, if any"""
+        extracted_data = self.get_extraction_graph().invoke({**self.state, "documents": documents})
+        return extracted_data.get("generation") if extracted_data else None
+
+    def chunking(self):
+        """(enable_chunking, chunk_size, chunk_overlap) of the job, as the extractor splits documents"""
+        return (
+            self.crawl_config.get('enable_chunking', True),
+            self.crawl_config.get('chunk_size', 6000),
+            self.crawl_config.get('chunk_overlap', 150)
+        )
+
+    def relevance_filter(self):
+        """Filter of the chunks irrelevant to the schema, or None if the job does not filter them"""
+        if not self.crawl_config.get('enable_relevance_filter', False) or self.schema_def is None:
+            return None
+        return RelevanceFilter(
+            schema_terms(self.schema_def, self.crawl_config.get('relevance_hints')),
+            min_score=self.crawl_config.get('relevance_min_score', 0.1),
+            min_chunks=self.crawl_config.get('relevance_min_chunks', 2)
+        )
+
+    def remove_near_duplicates(self, urls, documents):
+        """
+        Drops pages that are near-duplicates of an earlier page of the crawl and, with skip_unchanged_pages, pages
+        that have not changed since the last successful run with the same schema and URLs.
+        """
+        previous = {}
+        if self.crawl_config.get('skip_unchanged_pages', False) and self.schema_version is not None:
+            scope = content_hash({"schema": self.schema_version, "urls": sorted(self.state.get("urls_to_search", []))})
+            self.fingerprint_store = FingerprintStore(get_redis(), scope, settings.PAGE_FINGERPRINT_TTL_SECONDS)
+            try:
+                previous = self.fingerprint_store.load()
+            except Exception as e:
+                self.state["logger"].warning(f"Failed to load the page fingerprints of the previous run: {e}")
+                self.fingerprint_store = None
+        self.duplicate_filter = NearDuplicateFilter(self.crawl_config.get('near_duplicate_distance', 4), previous)
+        calls_before = estimate_llm_calls(documents, *self.chunking())
+        urls, documents, self.near_duplicate_stats = self.duplicate_filter.filter(urls, documents)
+        self.near_duplicate_stats["llm_calls_avoided"] = calls_before - estimate_llm_calls(documents, *self.chunking())
+        self.state["logger"].info(f"Skipped near-duplicate pages: {self.near_duplicate_stats}")
+        return urls, documents
+
+    def cluster_pages(self, urls, documents):
+        """
+        Groups the pages by template and, with listing_pages_per_cluster, extracts only the first pages of each
+        cluster of listing pages, which mostly repeat what detail pages hold.
+        """
+        clusterer = PageClusterer(self.crawl_config.get('page_cluster_similarity', DEFAULT_PAGE_CLUSTER_SIMILARITY))
+        indices = [index for index, url in enumerate(urls) if url in self.fetcher.page_structures]
+        clusters = clusterer.cluster(
+            [urls[index] for index in indices], [self.fetcher.page_structures[urls[index]] for index in indices]
+        )
+        sample_size = self.crawl_config.get('listing_pages_per_cluster', 0)
+        skipped = set()
+        for cluster in clusters:
+            if sample_size and cluster.kind == LISTING:
+                skipped.update(indices[index] for index in cluster.indices[sample_size:])
+
+        self.cluster_stats = cluster_stats(clusters)
+        self.cluster_stats["pages_sampled_out"] = len(skipped)
+        self.cluster_stats["llm_calls_avoided"] = estimate_llm_calls(
+            [documents[index] for index in sorted(skipped)], *self.chunking()
+        )
+        self.state["logger"].info(f"Clustered pages by template: {self.cluster_stats}")
+        kept = [index for index in range(len(documents)) if index not in skipped]
+        return [urls[index] for index in kept], [documents[index] for index in kept]
+
+    def map_structured_data(self, urls, documents):
+        """
+        Maps the JSON-LD, microdata and OpenGraph data of each page onto the schema. Pages whose required fields it
+        fills are not sent to the LLM; their results are returned with the URLs and documents left to extract.
+        """
+        mapper = StructuredDataMapper(self.schema_def)
+        results, mapped_documents, kept_urls, kept_documents = [], [], [], []
+        self.structured_data_stats = {"pages": len(documents), "pages_with_structured_data": 0, "mapped_urls": []}
+        for url, document in zip(urls, documents):
+            entities = self.fetcher.page_structured_data.get(url) or []
+            result = mapper.map(entities) if entities else None
+            if entities:
+                self.structured_data_stats["pages_with_structured_data"] += 1
+            if result is None:
+                kept_urls.append(url)
+                kept_documents.append(document)
+            else:
+                results.append(result)
+                mapped_documents.append(document)
+                self.structured_data_stats["mapped_urls"].append(url)
+
+        llm_calls_avoided = estimate_llm_calls(mapped_documents, *self.chunking())
+        if mapped_documents and not kept_documents:
+            # No extraction graph runs at all, which also saves the cleaning call and any checks
+            llm_calls_avoided += 1 + sum(
+                bool(self.scraper_config.get(check, False))
+                for check in ('enable_hallucination_check', 'enable_quality_check')
+            )
+        self.structured_data_stats["pages_mapped"] = len(mapped_documents)
+        self.structured_data_stats["llm_calls_avoided"] = llm_calls_avoided
+        self.state["logger"].info(f"Mapped structured data: {self.structured_data_stats}")
+        return kept_urls, kept_documents, results
+
+    def save_fingerprints(self):
+        """Stores the page fingerprints of a run that completed, so the next run can skip unchanged pages"""
+        if self.fingerprint_store is None or (self.budget and self.budget.stopped_reason is not None):
+            return
+        try:
+            self.fingerprint_store.save(self.duplicate_filter.fingerprints)
+        except Exception as e:
+            self.state["logger"].warning(f"Failed to save page fingerprints: {e}")
+
+    def apply_selector_templates(self, urls, documents):
+        """
+        Extracts pages with CSS selectors learned for their site template instead of the LLM.
+
+        Pages are grouped by domain and layout. Groups with a stored template are extracted with it. In groups
+        without one, the LLM extracts the first pages one at a time, a template is learned from them and checked
+        against the LLM result of the next page, and the remaining pages are extracted with it. Pages the template
+        does not fill go to the LLM with the rest of the job.
+        """
+        learner = SelectorTemplateLearner(self.schema_def, settings.SELECTOR_TEMPLATE_MIN_AGREEMENT)
+        store = SelectorTemplateStore(get_redis(), settings.SELECTOR_TEMPLATE_TTL_SECONDS)
+        training_pages = self.crawl_config.get('selector_template_training_pages', 2)
+        stats = {"groups": 0, "templates_learned": 0, "templates_reused": 0, "validation_failures": 0,
+                 "pages_extracted": 0, "pages_extracted_by_llm": 0}
+        soups, groups = {}, {}
+        for index, url in enumerate(urls):
+            if url in self.fetcher.page_html:
+                soups[index] = BeautifulSoup(self.fetcher.page_html[url], "html.parser")
+                groups.setdefault((urlparse(url).netloc, layout_signature(soups[index])), []).append(index)
+        stats["groups"] = len(groups)
+
+        generations, done, template_documents = [], set(), []
+        for (domain, signature), indices in groups.items():
+            template_id = f"{self.schema_version}:{signature}"
+            try:
+                template = store.get(domain, template_id)
+            except Exception as e:
+                self.state["logger"].warning(f"Failed to load the selector template of {domain}: {e}")
+                template = None
+            if template is not None:
+                stats["templates_reused"] += 1
+                pending = indices
+            elif len(indices) >= training_pages + 2:
+                examples = []
+                for index in indices[:training_pages + 1]:
+                    if is_budget_exhausted(self.state):
+                        break
+                    generation = self.extract_documents([documents[index]])
+                    done.add(index)
+                    stats["pages_extracted_by_llm"] += 1
+                    if generation:
+                        generations.append(generation)
+                        examples.append((soups[index], generation))
+                if len(examples) < training_pages + 1:
+                    continue
+                template = learner.learn(examples[:training_pages])
+                holdout_soup, holdout_generation = examples[-1]
+                if template is None or learner.agreement(
+                    template.extract(holdout_soup, learner.fields), holdout_generation
+                ) < settings.SELECTOR_TEMPLATE_MIN_AGREEMENT:
+                    stats["validation_failures"] += 1
+                    continue
+                stats["templates_learned"] += 1
+                try:
+                    store.save(domain, template_id, template)
+                except Exception as e:
+                    self.state["logger"].warning(f"Failed to save the selector template of {domain}: {e}")
+                pending = indices[training_pages + 1:]
+            else:
+                continue
+
+            failures = 0
+            for index in pending:
+                result = template.extract(soups[index], learner.fields)
+                if learner.is_complete(result):
+                    generations.append(result)
+                    done.add(index)
+                    template_documents.append(documents[index])
+                else:
+                    failures += 1
+            if failures * 2 > len(pending):
+                # The site changed its layout under the same structure, learn the template again next time
+                stats["validation_failures"] += 1
+                try:
+                    store.delete(domain, template_id)
+                except Exception as e:
+                    self.state["logger"].warning(f"Failed to delete the selector template of {domain}: {e}")
+
+        stats["pages_extracted"] = len(template_documents)
+        stats["llm_calls_avoided"] = estimate_llm_calls(template_documents, *self.chunking())
+        self.selector_template_stats = stats
+        self.state["logger"].info(f"Applied selector templates: {stats}")
+        kept = [index for index in range(len(documents)) if index not in done]
+        return [urls[index] for index in kept], [documents[index] for index in kept], generations
+
+    def remove_template_blocks(self, urls, documents):
+        """
+        Removes the header, navigation and footer blocks that the crawled pages share, keeping them on one page.
+        """
+        calls_before = estimate_llm_calls(documents, *self.chunking())
+        remover = TemplateBlockRemover(page_fraction=self.crawl_config.get('template_page_fraction', 0.6))
+        documents, self.template_stats = remover.remove(documents)
+        urls = [urls[index] for index in remover.kept_pages]
+        self.template_stats["llm_calls_avoided"] = calls_before - estimate_llm_calls(documents, *self.chunking())
+        self.state["logger"].info(f"Removed template blocks: {self.template_stats}")
+        return urls, documents
+
+    def get_stats(self) -> dict:
+        """
+        Returns statistics about the job, e.g. the budget it used.
+        """
+        stats = {
+            "setup_seconds": round(self.setup_seconds, 4),
+            "graph_cache_hit": self.graph_cache_hit
+        }
+        if self.budget:
+            stats["budget"] = self.budget.to_stats()
+        content_stats = self.fetcher.get_content_stats()
+        if content_stats:
+            stats["content"] = content_stats
+        if self.near_duplicate_stats:
+            stats["near_duplicates"] = self.near_duplicate_stats
+        if self.cluster_stats:
+            stats["clusters"] = self.cluster_stats
+        if self.structured_data_stats:
+            stats["structured_data"] = self.structured_data_stats
+        if self.selector_template_stats:
+            stats["selector_templates"] = self.selector_template_stats
+        if self.template_stats:
+            stats["template"] = self.template_stats
+        if self.relevance_stats:
+            stats["relevance"] = self.relevance_stats
+        if self.compaction_stats:
+            stats["compaction"] = self.compaction_stats
+        return stats
+
+    def get_extraction_graph(self):
+        """
+        Returns the compiled extraction graph. Agents keep no per-job state (the job travels in the graph state), so
+        jobs with the same schema version, model and configuration share one compiled graph.
+        """
+        started_at = time.perf_counter()
+        if not settings.ENABLE_SCHEMA_CACHE or self.schema_version is None:
+            graph = self.init_extraction_team().compile()
+        else:
+            key = content_hash({
+                "schema": self.schema_version,
+                "model_type": str(self.model_type),
+                "model_name": self.local_model_name,
+                "chunking": list(self.chunking()),
+                "compaction": self.crawl_config.get('enable_token_compaction', False),
+                "relevance": [
+                    self.crawl_config.get(key) for key in (
+                        'enable_relevance_filter', 'relevance_hints', 'relevance_min_score', 'relevance_min_chunks'
+                    )
+                ],
+                "scraper_config": self.scraper_config
+            })
+            graph = extraction_graphs.get(key)
+            self.graph_cache_hit = graph is not None
+            if graph is None:
+                graph = self.init_extraction_team().compile()
+                extraction_graphs.set(key, graph)
+        self.setup_seconds += time.perf_counter() - started_at
+        return graph
 
     def init_extraction_team(self) -> StateGraph:
         """
@@ -142,7 +507,10 @@ class Scraper:
             schema=self.state["schema"], 
             enable_chunking=self.crawl_config.get('enable_chunking', True), 
             chunk_size=self.crawl_config.get('chunk_size', 6000), 
-            chunk_overlap_size=self.crawl_config.get('chunk_overlap', 150)
+            chunk_overlap_size=self.crawl_config.get('chunk_overlap', 150),
+            relevance_filter=self.relevance_filter(),
+            compactor=TokenCompactor(settings.COMPACTION_MIN_URL_CHARS)
+            if self.crawl_config.get('enable_token_compaction', False) else None
         )
         response_cleaner_agent = ResponseCleanerAgent(
             model_type=self.model_type,
@@ -214,6 +582,9 @@ def decide_to_regenerate(state) -> str:
 
     state['logger'].info(f"---ASSESS HALLUCINATION CHECK RESULTS. ATTEMPT {state['hallucination_check_count']}---")
 
+    if is_budget_exhausted(state):
+        state['logger'].info("---DECISION: JOB BUDGET EXHAUSTED, KEEP CURRENT ANSWER---")
+        return "quality_assurance"
     if state["are_there_hallucinations"]:
         state['logger'].info(
             "---DECISION: INCLUDES HALLUCINATIONS, RE-GENERATE WITH COMMENTS---"
@@ -236,6 +607,9 @@ def grade_generation(state) -> str:
     """
     state['logger'].info(f"---ASSESS ANSWER QUALITY. ATTEMPT {state['quality_check_count']}---")
 
+    if is_budget_exhausted(state):
+        state['logger'].info("---DECISION: JOB BUDGET EXHAUSTED, KEEP CURRENT ANSWER---")
+        return "useful"
     if state["quality"] >= 6:
         state['logger'].info("---DECISION: QUALITY ACCEPTED---")
         return "useful"
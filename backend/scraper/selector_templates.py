@@ -0,0 +1,352 @@
+import json
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, Tag
+
+from core.items import content_hash
+from scraper.structured_data import coerce, item_fields
+
+# Where a value is read from: the text of an element or one of its attributes
+SOURCES = ("text", "href", "src", "content", "datetime")
+# Longer texts are never a single field value
+MAX_VALUE_CHARS = 300
+# Texts up to this length are also indexed as numbers and dates, e.g. "$249.00" or "2024-07-05"
+MAX_TYPED_VALUE_CHARS = 40
+MAX_SELECTOR_STEPS = 8
+# Levels of the DOM below body that make up the layout signature
+LAYOUT_DEPTH = 6
+CSS_NAME = re.compile(r"^[A-Za-z_][\w-]*$")
+# Class names and ids with long numbers are usually generated per page or per build
+GENERATED_NAME = re.compile(r"\d{3,}")
+TEMPLATE_KEY_PREFIX = "webslayer:selector-templates:"
+
+
+def css_step(tag: Tag, nth: bool = False, with_id: bool = True) -> str:
+    """CSS selector of a tag on its own: its name with its id, or with up to two stable class names"""
+    element_id = tag.get("id")
+    if with_id and element_id and CSS_NAME.match(element_id) and not GENERATED_NAME.search(element_id):
+        return f"{tag.name}#{element_id}"
+    classes = [name for name in tag.get("class") or [] if CSS_NAME.match(name) and not GENERATED_NAME.search(name)]
+    step = tag.name + "".join(f".{name}" for name in classes[:2])
+    if nth:
+        position = 1 + sum(1 for sibling in tag.find_previous_siblings(tag.name))
+        step += f":nth-of-type({position})"
+    return step
+
+
+def selector_candidates(tag: Tag, root: Tag) -> List[str]:
+    """Selectors that find `tag` from `root`, from the most general to the most specific"""
+    chain = []
+    node = tag
+    while node is not None and node is not root and node.name not in ("html", "body", "[document]"):
+        chain.append(node)
+        node = node.parent
+    chain = chain[:MAX_SELECTOR_STEPS]
+    candidates = []
+    for nth in (False, True):
+        for length in range(1, len(chain) + 1):
+            selector = " > ".join(css_step(node, nth) for node in reversed(chain[:length]))
+            if selector not in candidates:
+                candidates.append(selector)
+    return candidates
+
+
+def layout_signature(soup: BeautifulSoup) -> str:
+    """Hash of the distinct tag paths of the top levels of a page. Pages made from one template share it."""
+    paths = set()
+
+    def walk(node: Tag, path: str, depth: int) -> None:
+        for child in node.find_all(True, recursive=False):
+            child_path = f"{path}/{css_step(child, with_id=False)}"
+            paths.add(child_path)
+            if depth < LAYOUT_DEPTH:
+                walk(child, child_path, depth + 1)
+
+    walk(soup.body or soup, "", 1)
+    return content_hash(sorted(paths))[:16]
+
+
+def read(tag: Optional[Tag], source: str) -> Optional[str]:
+    if tag is None:
+        return None
+    if source == "text":
+        return " ".join(tag.get_text(" ").split())
+    value = tag.get(source)
+    return " ".join(value) if isinstance(value, list) else value
+
+
+def normalize(value: Any, field_type: str) -> Any:
+    """Comparable form of a field value: converted to the field type, strings without case and extra whitespace"""
+    if isinstance(value, list):
+        return tuple(normalize(item, field_type) for item in value)
+    value = coerce(value, field_type)
+    return " ".join(value.split()).casefold() if isinstance(value, str) else value
+
+
+def field_type_of(field: dict) -> str:
+    """Type of a field's values, the item type for lists"""
+    field_type = field["field_type"].lower()
+    return (field.get("list_item_type") or "string").lower() if field_type == "list" else field_type
+
+
+class PageIndex:
+    """Elements of a page by the values they hold, to find where an extracted value came from"""
+    def __init__(self, root: Tag):
+        self.values: Dict[Tuple[str, Any], List[Tuple[Tag, str]]] = {}
+        for tag in root.find_all(True):
+            for source in SOURCES:
+                value = read(tag, source)
+                if not value or len(value) > MAX_VALUE_CHARS:
+                    continue
+                kinds = ["string"] + (["float", "date"] if len(value) <= MAX_TYPED_VALUE_CHARS else [])
+                for kind in kinds:
+                    normalized = normalize(value, kind)
+                    if normalized is not None:
+                        self.values.setdefault((kind, normalized), []).append((tag, source))
+
+    def find(self, value: Any, field_type: str) -> List[Tuple[Tag, str]]:
+        """Elements and sources holding `value`, the most deeply nested first"""
+        kind = "float" if field_type in ("integer", "float") else field_type
+        if kind not in ("string", "float", "date"):
+            return []
+        matches = self.values.get((kind, normalize(value, kind)), [])
+        return sorted(matches, key=lambda match: -len(list(match[0].parents)))
+
+
+class SelectorTemplate:
+    """
+    CSS selectors that extract a schema from the pages of one site template.
+
+    Args:
+        fields: per field, the selector and source (text or attribute) of its value, or None for fields left empty
+        item_selector: for list schemas, the selector of the element of each item; field selectors are relative to it
+        list_field: for list schemas, the name of the list
+    """
+    def __init__(self, fields: Dict[str, Optional[dict]], item_selector: Optional[str] = None,
+                 list_field: Optional[str] = None):
+        self.fields = fields
+        self.item_selector = item_selector
+        self.list_field = list_field
+
+    def extract(self, soup: BeautifulSoup, schema_fields: List[dict]) -> dict:
+        if self.item_selector is None:
+            return self.extract_fields(soup, schema_fields)
+        items = [self.extract_fields(root, schema_fields) for root in soup.select(self.item_selector)]
+        return {self.list_field: [item for item in items if any(value is not None for value in item.values())]}
+
+    def extract_fields(self, root: Tag, schema_fields: List[dict]) -> dict:
+        result = {}
+        for field in schema_fields:
+            spec = self.fields.get(field["name"])
+            result[field["name"]] = self.read_field(root, spec, field) if spec else field.get("default_value")
+        return result
+
+    @staticmethod
+    def read_field(root: Tag, spec: dict, field: dict) -> Any:
+        if field["field_type"].lower() == "list":
+            values = [coerce(read(tag, spec["source"]), field_type_of(field)) for tag in root.select(spec["selector"])]
+            return [value for value in values if value is not None] or None
+        return coerce(read(root.select_one(spec["selector"]), spec["source"]), field["field_type"])
+
+    def to_dict(self) -> dict:
+        return {"fields": self.fields, "item_selector": self.item_selector, "list_field": self.list_field}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SelectorTemplate":
+        return cls(data["fields"], data.get("item_selector"), data.get("list_field"))
+
+
+class SelectorTemplateLearner:
+    """
+    Induces a SelectorTemplate from pages of one template and the LLM results for them.
+
+    Every value of a result is looked up in its page, and the candidate selectors of the elements holding it are
+    tried from the most general to the most specific. A field's selector is the first one that reproduces the
+    field's values on at least `min_agreement` of the examples, and the template is only returned if it reproduces
+    the results as a whole as well. For list schemas, the element of each item is the closest common ancestor of
+    the elements of its values, and field selectors are relative to it.
+
+    Args:
+        schema_def: schema dictionary as built by build_schema_dict, optionally wrapped as a list
+        min_agreement: share of values (or items) a template has to reproduce
+    """
+    def __init__(self, schema_def: dict, min_agreement: float = 0.9):
+        self.list_field, self.fields = item_fields(schema_def)
+        self.min_agreement = min_agreement
+
+    def learn(self, examples: List[Tuple[BeautifulSoup, dict]]) -> Optional[SelectorTemplate]:
+        examples = [(soup, result) for soup, result in examples if self.is_complete(result)]
+        if not examples:
+            return None
+        if self.list_field is None:
+            item_selector, pairs = None, examples
+        else:
+            item_selector, pairs = self.learn_items(examples)
+            if item_selector is None:
+                return None
+        fields = self.learn_fields(pairs)
+        if fields is None:
+            return None
+        template = SelectorTemplate(fields, item_selector, self.list_field)
+        for soup, result in examples:
+            if self.agreement(template.extract(soup, self.fields), result) < self.min_agreement:
+                return None
+        return template
+
+    def learn_fields(self, pairs: List[Tuple[Tag, dict]]) -> Optional[Dict[str, Optional[dict]]]:
+        specs = {}
+        indexes = {}
+        for field in self.fields:
+            name, many = field["name"], field["field_type"].lower() == "list"
+            targets = [(root, expected[name]) for root, expected in pairs if expected.get(name) not in (None, "", [])]
+            if not targets:
+                specs[name] = None
+                continue
+            candidates = []
+            for root, value in targets[:3]:
+                index = indexes.setdefault(id(root), PageIndex(root))
+                for tag, source in index.find(value[0] if many else value, field_type_of(field))[:3]:
+                    for selector in selector_candidates(tag, root):
+                        if (selector, source) not in candidates:
+                            candidates.append((selector, source))
+            specs[name] = next((
+                {"selector": selector, "source": source}
+                for selector, source in candidates
+                if self.hit_rate({"selector": selector, "source": source}, field, targets) >= self.min_agreement
+            ), None)
+            if specs[name] is None:
+                return None
+        return specs
+
+    @staticmethod
+    def hit_rate(spec: dict, field: dict, targets: List[Tuple[Tag, Any]]) -> float:
+        kind = field_type_of(field)
+        hits = sum(
+            normalize(SelectorTemplate.read_field(root, spec, field), kind) == normalize(value, kind)
+            for root, value in targets
+        )
+        return hits / len(targets)
+
+    def learn_items(self, examples: List[Tuple[BeautifulSoup, dict]]) -> Tuple[Optional[str], List[Tuple[Tag, dict]]]:
+        """Selector of the item elements, and each item element paired with its expected item"""
+        soup, result = examples[0]
+        roots = [self.item_root(PageIndex(soup), item) for item in result[self.list_field]]
+        roots = [root for root in roots if root is not None]
+        if not roots:
+            return None, []
+        step, _ = Counter(css_step(root, with_id=False) for root in roots).most_common(1)[0]
+        representative = next(root for root in roots if css_step(root, with_id=False) == step)
+        expected_count = len(result[self.list_field])
+        candidates = [
+            selector for selector in selector_candidates(representative, soup)
+            if any(element is representative for element in soup.select(selector))
+        ]
+        if not candidates:
+            return None, []
+        # The most general selector that selects as many elements as there are items
+        selector = min(candidates, key=lambda selector: abs(len(soup.select(selector)) - expected_count))
+        pairs = []
+        for soup, result in examples:
+            elements = soup.select(selector)
+            for item in result[self.list_field]:
+                element = self.best_element(elements, item)
+                if element is not None:
+                    pairs.append((element, item))
+        return selector, pairs
+
+    def item_root(self, index: PageIndex, item: dict) -> Optional[Tag]:
+        """Closest common ancestor of the elements holding the values of an item"""
+        elements = []
+        for field in self.fields:
+            value = item.get(field["name"])
+            if value in (None, "", []):
+                continue
+            matches = index.find(value[0] if isinstance(value, list) else value, field_type_of(field))
+            if matches:
+                elements.append(matches[0][0])
+        if not elements:
+            return None
+        if len(elements) == 1:
+            return elements[0].parent
+        for ancestor in elements[0].parents:
+            if all(any(parent is ancestor for parent in element.parents) for element in elements[1:]):
+                return ancestor
+        return None
+
+    def best_element(self, elements: List[Tag], item: dict) -> Optional[Tag]:
+        """The element whose text holds the most values of an item"""
+        values = [
+            normalize(item.get(field["name"]), "string") for field in self.fields
+            if field["field_type"].lower() in ("string", "date") and item.get(field["name"]) is not None
+        ]
+        best, best_hits = None, 0
+        for element in elements:
+            text = normalize(read(element, "text"), "string") or ""
+            hits = sum(value in text for value in values if value)
+            if hits > best_hits:
+                best, best_hits = element, hits
+        return best
+
+    def is_complete(self, result: Optional[dict]) -> bool:
+        """Whether a result has all required fields, and for list schemas at least one item"""
+        if not isinstance(result, dict):
+            return False
+        if self.list_field is None:
+            return self.has_required_fields(result)
+        items = result.get(self.list_field)
+        return isinstance(items, list) and bool(items) and all(self.has_required_fields(item) for item in items)
+
+    def has_required_fields(self, item: Any) -> bool:
+        return isinstance(item, dict) and all(
+            item.get(field["name"]) not in (None, "", []) for field in self.fields if field.get("required", True)
+        )
+
+    def agreement(self, extracted: dict, expected: dict) -> float:
+        """Share of the expected values (or, for list schemas, items) that the extracted result has too"""
+        if self.list_field is None:
+            names = [field["name"] for field in self.fields if expected.get(field["name"]) not in (None, "", [])]
+            if not names:
+                return 0.0
+            matches = sum(self.item_key(extracted, [name]) == self.item_key(expected, [name]) for name in names)
+            return matches / len(names)
+        names = [field["name"] for field in self.fields]
+        extracted_items = Counter(self.item_key(item, names) for item in extracted.get(self.list_field) or [])
+        expected_items = Counter(self.item_key(item, names) for item in expected.get(self.list_field) or [])
+        total = max(sum(extracted_items.values()), sum(expected_items.values()))
+        return sum((extracted_items & expected_items).values()) / total if total else 0.0
+
+    def item_key(self, item: dict, names: List[str]) -> tuple:
+        fields = {field["name"]: field for field in self.fields}
+        return tuple(normalize(item.get(name), field_type_of(fields[name])) for name in names)
+
+
+class SelectorTemplateStore:
+    """
+    Learned templates of a site, in a Redis hash per domain, so later runs extract its pages without the LLM.
+
+    Args:
+        redis_client: synchronous Redis client
+        ttl_seconds: templates of sites that are not crawled again expire after this
+    """
+    def __init__(self, redis_client, ttl_seconds: int):
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def key(domain: str) -> str:
+        return TEMPLATE_KEY_PREFIX + domain
+
+    def get(self, domain: str, template_id: str) -> Optional[SelectorTemplate]:
+        data = self.redis.hget(self.key(domain), template_id)
+        return SelectorTemplate.from_dict(json.loads(data)) if data else None
+
+    def save(self, domain: str, template_id: str, template: SelectorTemplate) -> None:
+        pipeline = self.redis.pipeline()
+        pipeline.hset(self.key(domain), template_id, json.dumps(template.to_dict()))
+        pipeline.expire(self.key(domain), self.ttl_seconds)
+        pipeline.execute()
+
+    def delete(self, domain: str, template_id: str) -> None:
+        self.redis.hdel(self.key(domain), template_id)
@@ -0,0 +1,322 @@
+import json
+import re
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, Tag
+
+from core.items import content_hash
+
+# Schema.org properties tried for schema fields by name, after the field's own aliases and its name.
+# Keys are field names lowercased without separators, values are property paths into an entity.
+FIELD_SYNONYMS: Dict[str, List[str]] = {
+    "name": ["name", "headline"],
+    "title": ["name", "headline"],
+    "headline": ["headline", "name"],
+    "description": ["description"],
+    "summary": ["description"],
+    "url": ["url"],
+    "link": ["url"],
+    "image": ["image.url", "image"],
+    "date": ["startDate", "datePublished", "dateCreated"],
+    "start": ["startDate"],
+    "startdate": ["startDate"],
+    "starttime": ["startDate"],
+    "end": ["endDate"],
+    "enddate": ["endDate"],
+    "endtime": ["endDate"],
+    "location": ["location.name", "location"],
+    "venue": ["location.name"],
+    "place": ["location.name"],
+    "address": ["location.address", "address"],
+    "city": ["location.address.addressLocality", "address.addressLocality"],
+    "organizer": ["organizer.name", "organizer"],
+    "performer": ["performer.name", "performer"],
+    "price": ["offers.price", "offers.lowPrice", "price"],
+    "currency": ["offers.priceCurrency", "priceCurrency"],
+    "availability": ["offers.availability"],
+    "brand": ["brand.name", "brand"],
+    "sku": ["sku"],
+    "rating": ["aggregateRating.ratingValue"],
+    "reviewcount": ["aggregateRating.reviewCount"],
+    "author": ["author.name", "author"],
+    "published": ["datePublished"],
+    "publisheddate": ["datePublished"],
+    "publishdate": ["datePublished"],
+}
+# OpenGraph properties, and the schema.org property they are also available under
+OPENGRAPH_PROPERTIES = {
+    "og:title": "name",
+    "og:description": "description",
+    "og:url": "url",
+    "og:image": "image",
+    "og:site_name": None,
+    "product:price:amount": "price",
+    "product:price:currency": "priceCurrency",
+    "article:published_time": "datePublished",
+    "article:author": "author",
+}
+# Types that describe the page or site rather than the items it lists
+PAGE_TYPES = {
+    "WebSite", "WebPage", "CollectionPage", "ItemPage", "AboutPage", "ContactPage", "SearchResultsPage",
+    "BreadcrumbList", "SiteNavigationElement", "WPHeader", "WPFooter", "WPSideBar", "SearchAction"
+}
+NUMBER = re.compile(r"-?\d[\d,.]*")
+
+
+def entity_type(entity: dict) -> str:
+    """Schema.org type of an entity without its namespace, e.g. "Event" for "https://schema.org/Event" """
+    types = entity.get("@type") or ""
+    if isinstance(types, list):
+        types = types[0] if types else ""
+    return str(types).rstrip("/").rsplit("/", 1)[-1]
+
+
+def json_ld_entities(soup: BeautifulSoup) -> List[dict]:
+    entities = []
+    for script in soup.find_all("script", type=re.compile(r"ld\+json", re.I)):
+        try:
+            data = json.loads(script.string or script.get_text())
+        except ValueError:
+            continue
+        entities.extend(flatten_json_ld(data))
+    return entities
+
+
+def flatten_json_ld(data: Any) -> List[dict]:
+    """Entities of a JSON-LD document, with @graph containers and item lists replaced by their members"""
+    if isinstance(data, list):
+        return [entity for value in data for entity in flatten_json_ld(value)]
+    if not isinstance(data, dict):
+        return []
+    if "@graph" in data:
+        return flatten_json_ld(data["@graph"])
+    if entity_type(data) == "ItemList":
+        members = data.get("itemListElement") or []
+        members = members if isinstance(members, list) else [members]
+        return flatten_json_ld([
+            member.get("item", member) if entity_type(member) == "ListItem" else member
+            for member in members if isinstance(member, dict)
+        ])
+    return [data]
+
+
+def microdata_entities(soup: BeautifulSoup) -> List[dict]:
+    return [
+        microdata_item(tag) for tag in soup.find_all(attrs={"itemscope": True})
+        if not tag.has_attr("itemprop")
+    ]
+
+
+def microdata_item(scope: Tag) -> dict:
+    item = {"@type": scope.get("itemtype", "")}
+    for tag in microdata_properties(scope):
+        value = microdata_item(tag) if tag.has_attr("itemscope") else microdata_value(tag)
+        for name in tag["itemprop"].split():
+            if name in item:
+                item[name] = (item[name] if isinstance(item[name], list) else [item[name]]) + [value]
+            else:
+                item[name] = value
+    return item
+
+
+def microdata_properties(scope: Tag) -> List[Tag]:
+    """Elements with an itemprop that belong to `scope` rather than to an item nested in it"""
+    properties = []
+    for child in scope.find_all(True, recursive=False):
+        if child.has_attr("itemprop"):
+            properties.append(child)
+        if not child.has_attr("itemscope"):
+            properties.extend(microdata_properties(child))
+    return properties
+
+
+def microdata_value(tag: Tag) -> str:
+    if tag.has_attr("content"):
+        return tag["content"]
+    attribute = {
+        "a": "href", "link": "href", "area": "href", "img": "src", "audio": "src", "video": "src", "source": "src",
+        "time": "datetime", "data": "value", "meter": "value"
+    }.get(tag.name)
+    if attribute and tag.has_attr(attribute):
+        return tag[attribute]
+    return " ".join(tag.get_text(" ").split())
+
+
+def opengraph_entities(soup: BeautifulSoup) -> List[dict]:
+    entity = {}
+    for meta in soup.find_all("meta", content=True):
+        name = meta.get("property") or meta.get("name") or ""
+        if name in OPENGRAPH_PROPERTIES or name == "og:type":
+            entity.setdefault(name, meta["content"])
+    if not entity:
+        return []
+    for name, schema_property in OPENGRAPH_PROPERTIES.items():
+        if schema_property and name in entity:
+            entity.setdefault(schema_property, entity[name])
+    entity["@type"] = entity.get("og:type", "")
+    entity["@source"] = "opengraph"
+    return [entity]
+
+
+def extract_structured_data(soup: BeautifulSoup) -> List[dict]:
+    """Entities a page embeds as JSON-LD, microdata or OpenGraph tags, before scripts and meta tags are cleaned"""
+    return json_ld_entities(soup) + microdata_entities(soup) + opengraph_entities(soup)
+
+
+def lookup(value: Any, path: str) -> Any:
+    """Value at a dotted property path, following the first element of lists on the way"""
+    for key in path.split("."):
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def parse_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = NUMBER.search(str(value))
+    if not match:
+        return None
+    number = match.group().rstrip(".,")
+    if "," in number and "." in number:
+        number = number.replace(",", "")
+    elif "," in number:
+        # 1,299 is a thousands separator, 12,5 a decimal comma
+        number = number.replace(",", "" if re.search(r",\d{3}$", number) else ".")
+    try:
+        return float(number)
+    except ValueError:
+        return None
+
+
+def coerce(value: Any, field_type: str, list_item_type: Optional[str] = None) -> Any:
+    """`value` as the JSON the LLM would return for a field of `field_type`, or None if it does not convert"""
+    if value is None:
+        return None
+    field_type = field_type.lower()
+    if field_type == "list":
+        values = value if isinstance(value, list) else [value]
+        if list_item_type in (None, "schema"):
+            return values if list_item_type is None else None
+        items = [coerce(item, list_item_type) for item in values]
+        return [item for item in items if item is not None] or None
+    if isinstance(value, list):
+        return next((item for item in (coerce(item, field_type) for item in value) if item is not None), None)
+    if field_type == "schema":
+        if not isinstance(value, dict):
+            return None
+        return {key: item for key, item in value.items() if not key.startswith("@")}
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("@value") or value.get("url")
+        return coerce(value, field_type)
+    if field_type == "string":
+        text = " ".join(str(value).split())
+        return text or None
+    if field_type in ("integer", "float"):
+        number = parse_number(value)
+        if number is None:
+            return None
+        return number if field_type == "float" else int(number)
+    if field_type == "boolean":
+        if isinstance(value, bool):
+            return value
+        return {"true": True, "false": False, "yes": True, "no": False}.get(str(value).strip().lower())
+    if field_type == "date":
+        # Dates and datetimes, e.g. 2024-07-05T19:00:00-05:00, are ISO 8601 in structured data
+        try:
+            return date.fromisoformat(str(value).strip()[:10]).isoformat()
+        except ValueError:
+            return None
+    return None
+
+
+def item_fields(schema_def: dict) -> Tuple[Optional[str], List[dict]]:
+    """
+    Name of the list field of a schema wrapped as a list (see build_schema_dict) and the fields of its items, or
+    None and the fields of a plain schema.
+    """
+    fields = schema_def["fields"]
+    if len(fields) == 1 and fields[0].get("list_item_type") == "schema" and fields[0].get("item_schema"):
+        return fields[0]["name"], fields[0]["item_schema"]["fields"]
+    return None, fields
+
+
+def property_paths(field: dict) -> List[str]:
+    """Properties tried for a field: its aliases, its name, its name in camelCase, then FIELD_SYNONYMS"""
+    name = field["name"]
+    camel_case = re.sub(r"[_\s-]+(\w)", lambda match: match.group(1).upper(), name)
+    paths = list(field.get("aliases") or []) + [name, camel_case]
+    paths += FIELD_SYNONYMS.get(re.sub(r"[_\s-]", "", name.lower()), [])
+    return list(dict.fromkeys(paths))
+
+
+class StructuredDataMapper:
+    """
+    Maps the structured data a page embeds onto a schema, so pages that already publish the requested facts do not
+    need the LLM.
+
+    Fields are filled from the first property of an entity that converts to the field type, trying the field's
+    aliases, its name and the schema.org properties usual for its name (see FIELD_SYNONYMS). A page is mapped only
+    if an entity fills every required field. For list schemas, every entity of the best matching type has to, as an
+    entity that does not suggests the page lists items its structured data leaves out.
+
+    Args:
+        schema_def: schema dictionary as built by build_schema_dict, optionally wrapped as a list
+    """
+    def __init__(self, schema_def: dict):
+        self.list_field, fields = item_fields(schema_def)
+        self.fields = [(field, property_paths(field)) for field in fields]
+
+    def map_entity(self, entity: dict) -> Tuple[dict, List[str]]:
+        """Fields filled from an entity, and the required fields it does not fill"""
+        result, missing = {}, []
+        for field, paths in self.fields:
+            value = None
+            for path in paths:
+                value = coerce(lookup(entity, path), field["field_type"], field.get("list_item_type"))
+                if value is not None:
+                    break
+            if value is None:
+                value = field.get("default_value")
+                if field.get("required", True):
+                    missing.append(field["name"])
+            result[field["name"]] = value
+        return result, missing
+
+    def map(self, entities: List[dict]) -> Optional[dict]:
+        """Result of a page in the schema's shape, or None if its structured data does not fill the schema"""
+        if self.list_field is not None:
+            return self.map_items(entities)
+        complete = [result for result, missing in map(self.map_entity, entities) if not missing]
+        if not complete:
+            return None
+        return max(complete, key=lambda result: sum(value is not None for value in result.values()))
+
+    def map_items(self, entities: List[dict]) -> Optional[dict]:
+        # OpenGraph tags and page-level types describe the page, not the items on it
+        entities = [
+            entity for entity in entities
+            if entity.get("@source") != "opengraph" and entity_type(entity) not in PAGE_TYPES
+        ]
+        mapped = [(entity_type(entity), *self.map_entity(entity)) for entity in entities]
+        types = [type_name for type_name, _, missing in mapped if not missing]
+        if not types:
+            return None
+        best_type = max(set(types), key=types.count)
+        items, seen = [], set()
+        for type_name, result, missing in mapped:
+            if type_name != best_type:
+                continue
+            if missing:
+                return None
+            # The same item is often published both as JSON-LD and as microdata
+            if content_hash(result) not in seen:
+                seen.add(content_hash(result))
+                items.append(result)
+        return {self.list_field: items}
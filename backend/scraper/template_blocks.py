@@ -0,0 +1,94 @@
+import hashlib
+import math
+from typing import Dict, List, Set, Tuple
+
+from scraper.chunking import StructuredChunker
+
+# Lines of at least this many characters are also fingerprinted on their own, not only within a shingle
+MIN_SINGLE_LINE_CHARS = 60
+
+
+def normalize_line(line: str) -> str:
+    """Lowercased line with collapsed whitespace. Numbers are kept, so prices and dates never look like template"""
+    return " ".join(line.lower().split())
+
+
+def shingle_hash(lines: Tuple[str, ...]) -> int:
+    return int.from_bytes(hashlib.blake2b("\x1f".join(lines).encode(), digest_size=8).digest(), "big")
+
+
+def estimate_llm_calls(documents: List[str], enable_chunking: bool, chunk_size: int, chunk_overlap: int) -> int:
+    """Extraction calls the documents take, one per chunk, as DataExtractorAgent splits them"""
+    if not enable_chunking:
+        return len(documents)
+    chunker = StructuredChunker(chunk_size, chunk_overlap)
+    return sum(len(chunker.split(document)) for document in documents)
+
+
+class TemplateBlockRemover:
+    """
+    Removes the template (header, navigation, footer, sidebars) that the pages of a crawl share.
+
+    Pages are serialized with one block per line. Every window of `shingle_size` consecutive lines is hashed, and
+    long lines are also hashed on their own; a hash found on at least `page_fraction` of the pages is template. Lines
+    covered by a template hash are removed from every page but the first one that has them, so template content is
+    still extracted once. Short lines that repeat across pages, like field labels, are kept unless their
+    surroundings repeat too.
+
+    Args:
+        page_fraction: share of the pages a block has to appear on to be template
+        min_pages: crawls with fewer pages are left as they are
+        shingle_size: number of consecutive lines hashed together
+    """
+    def __init__(self, page_fraction: float = 0.6, min_pages: int = 3, shingle_size: int = 3):
+        self.page_fraction = page_fraction
+        self.min_pages = min_pages
+        self.shingle_size = shingle_size
+        # Indices of the pages the last call to remove kept
+        self.kept_pages: List[int] = []
+
+    def shingles(self, lines: List[str]) -> List[Tuple[int, int, int]]:
+        """(hash, first line, last line + 1) of every shingle of a page"""
+        normalized = [normalize_line(line) for line in lines]
+        shingles = []
+        for start in range(max(len(lines) - self.shingle_size + 1, 0)):
+            end = start + self.shingle_size
+            shingles.append((shingle_hash(tuple(normalized[start:end])), start, end))
+        for index, line in enumerate(normalized):
+            if len(line) >= MIN_SINGLE_LINE_CHARS:
+                shingles.append((shingle_hash((line,)), index, index + 1))
+        return shingles
+
+    def remove(self, pages: List[str]) -> Tuple[List[str], dict]:
+        """Returns the pages without repeated template lines, leaving out pages that become empty, and stats"""
+        stats = {"pages": len(pages), "lines_removed": 0, "bytes_removed": 0, "pages_emptied": 0}
+        self.kept_pages = list(range(len(pages)))
+        if len(pages) < self.min_pages:
+            return pages, stats
+
+        page_lines = [page.split("\n") for page in pages]
+        page_shingles = [self.shingles(lines) for lines in page_lines]
+        page_counts: Dict[int, int] = {}
+        first_page: Dict[int, int] = {}
+        for page_index, shingles in enumerate(page_shingles):
+            for digest in {digest for digest, _, _ in shingles}:
+                page_counts[digest] = page_counts.get(digest, 0) + 1
+                first_page.setdefault(digest, page_index)
+        min_count = max(2, math.ceil(self.page_fraction * len(pages)))
+        template = {digest for digest, count in page_counts.items() if count >= min_count}
+
+        cleaned, self.kept_pages = [], []
+        for page_index, (lines, shingles) in enumerate(zip(page_lines, page_shingles)):
+            removed: Set[int] = set()
+            for digest, start, end in shingles:
+                if digest in template and first_page[digest] != page_index:
+                    removed.update(range(start, end))
+            kept = [line for index, line in enumerate(lines) if index not in removed]
+            stats["lines_removed"] += len(removed)
+            stats["bytes_removed"] += sum(len(lines[index].encode()) + 1 for index in removed)
+            if any(line.strip() for line in kept):
+                cleaned.append("\n".join(kept))
+                self.kept_pages.append(page_index)
+            else:
+                stats["pages_emptied"] += 1
+        return cleaned, stats
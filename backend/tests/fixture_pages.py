@@ -0,0 +1,406 @@
+"""
+Fixture corpus of pages as the crawler fetches them, for content pipeline tests and benchmarks/content_benchmark.py.
+
+Every page lists `facts`, values an extraction of the page has to return, and `boilerplate`, text that is never
+worth sending to the LLM. Pages of the same site share their template, like pages of a real crawl do, and the event
+and product pages embed schema.org JSON-LD and microdata as many real ones do.
+"""
+from bs4 import BeautifulSoup
+
+
+def city_events_page(title: str, main: str) -> str:
+    """A page of a site with semantic markup: header, nav, aside, main and footer"""
+    return f"""
+<html>
+<head>
+    <title>{title} | City Events</title>
+    <style>.cookie-consent {{ position: fixed; bottom: 0; }}</style>
+    <script>window.dataLayer = window.dataLayer || []; function gtag() {{ dataLayer.push(arguments); }}</script>
+</head>
+<body>
+    <div id="cookie-banner" class="cookie-consent">
+        <p>We use cookies to improve your experience and to show personalised offers.</p>
+        <a href="/privacy">Read our privacy policy</a> <button>Accept all</button>
+    </div>
+    <header class="site-header">
+        <a href="/" class="logo"><span>City Events</span></a>
+        <nav class="main-nav">
+            <ul>
+                <li><a href="/events">All events</a></li>
+                <li><a href="/events/music">Music</a></li>
+                <li><a href="/events/food">Food and drink</a></li>
+                <li><a href="/events/family">Family</a></li>
+                <li><a href="/venues">Venues</a></li>
+                <li><a href="/tickets">Tickets</a></li>
+                <li><a href="/contact">Contact</a></li>
+            </ul>
+        </nav>
+    </header>
+    <div class="layout">
+        <main id="content">
+{main}
+        </main>
+        <aside class="sidebar">
+            <h3>Popular tags</h3>
+            <ul>
+                <li><a href="/tags/outdoor">Outdoor</a></li>
+                <li><a href="/tags/free">Free entry</a></li>
+                <li><a href="/tags/weekend">This weekend</a></li>
+                <li><a href="/tags/kids">Kids</a></li>
+            </ul>
+            <div class="newsletter">
+                <h3>Never miss an event</h3>
+                <p>Subscribe to our newsletter for weekly picks, early-bird tickets and exclusive offers.</p>
+                <form><input type="email" placeholder="Email address"><button>Subscribe</button></form>
+            </div>
+        </aside>
+    </div>
+    <footer class="site-footer">
+        <ul>
+            <li><a href="/about">About us</a></li>
+            <li><a href="/careers">Careers</a></li>
+            <li><a href="/advertise">Advertise with us</a></li>
+            <li><a href="/terms">Terms of use</a></li>
+        </ul>
+        <p>City Events Ltd, 123 Market Street, Springfield. All rights reserved.</p>
+        <p>Follow us on <a href="https://twitter.com/cityevents">Twitter</a> and <a href="https://instagram.com/cityevents">Instagram</a>.</p>
+    </footer>
+</body>
+</html>
+"""
+
+
+CITY_EVENTS_BOILERPLATE = [
+    "We use cookies to improve your experience",
+    "Subscribe to our newsletter",
+    "All rights reserved",
+    "Advertise with us",
+    "Popular tags",
+]
+
+
+def gear_shop_page(title: str, content: str) -> str:
+    """A page of a site with div-only markup, where nothing but class names tells content and chrome apart"""
+    return f"""
+<html>
+<head><title>{title} - Gear Shop</title></head>
+<body>
+    <div class="top-bar">
+        <div class="menu">
+            <a href="/">Home</a> <a href="/tents">Tents</a> <a href="/backpacks">Backpacks</a>
+            <a href="/footwear">Footwear</a> <a href="/sale">Sale</a> <a href="/account">My account</a>
+            <a href="/basket">Basket (0)</a>
+        </div>
+        <div class="promo-strip"><span>Free delivery on orders over $50. Use code TRAIL10 for 10% off.</span></div>
+    </div>
+    <div class="breadcrumbs"><a href="/">Home</a> / <a href="/tents">Tents</a> / <span>{title}</span></div>
+    <div class="wrapper">
+        <div class="left-col">
+            <div class="menu-box">
+                <a href="/tents/1-person">1 person</a><br><a href="/tents/2-person">2 person</a><br>
+                <a href="/tents/family">Family tents</a><br><a href="/tents/accessories">Accessories</a>
+            </div>
+        </div>
+        <div class="main-col">
+{content}
+        </div>
+    </div>
+    <div class="bottom">
+        <div class="social-links">
+            <a href="https://facebook.com/gearshop">Facebook</a> <a href="https://youtube.com/gearshop">YouTube</a>
+        </div>
+        <div class="copyright">Copyright 2024 Gear Shop Inc. Prices include VAT. Registered in England No. 0123456.</div>
+    </div>
+</body>
+</html>
+"""
+
+
+GEAR_SHOP_BOILERPLATE = [
+    "Free delivery on orders over $50",
+    "Copyright 2024 Gear Shop Inc",
+    "Basket (0)",
+]
+
+# Products of the gear shop, as (name, price, weight), for tests of pages that share one product template
+PRODUCTS = [("Trailhead 1", 199.0, "1.0 kg"), ("Trailhead 2", 249.0, "1.2 kg"), ("Summit 3", 399.5, "2.1 kg")]
+
+
+def product_page(name: str, price: float, weight: str) -> BeautifulSoup:
+    """A parsed product page of the gear shop"""
+    return BeautifulSoup(gear_shop_page(name, f"""
+        <div class="product">
+            <h1>{name}</h1>
+            <div class="price-box"><span class="price">${price:.2f}</span> <span class="stock">In stock</span></div>
+            <div class="product-description"><p>The {name} packs down to the size of a water bottle.</p></div>
+            <table class="specs"><tr><td>Weight</td><td>{weight}</td></tr><tr><td>Colour</td><td>Green</td></tr></table>
+        </div>
+    """), "html.parser")
+
+
+def page_builder_page(title: str, content: str) -> str:
+    """A page made with a page builder, which wraps every piece of text in several layers of spans and divs"""
+    return f"""
+<html>
+<head><title>{title}</title></head>
+<body class="page-template-default">
+    <div class="elementor-section elementor-top-section site-header-section">
+        <div class="elementor-container"><div class="elementor-widget-wrap">
+            <div class="elementor-widget elementor-widget-nav-menu"><div class="elementor-widget-container">
+                <nav class="elementor-nav-menu--main"><ul class="elementor-nav-menu">
+                    <li class="menu-item"><a href="/" class="elementor-item"><span class="menu-text">Home</span></a></li>
+                    <li class="menu-item"><a href="/whats-on" class="elementor-item"><span class="menu-text">What's on</span></a></li>
+                    <li class="menu-item"><a href="/hire" class="elementor-item"><span class="menu-text">Venue hire</span></a></li>
+                    <li class="menu-item"><a href="/visit" class="elementor-item"><span class="menu-text">Plan your visit</span></a></li>
+                </ul></nav>
+            </div></div>
+        </div></div>
+    </div>
+    <div class="elementor-section elementor-inner-section">
+        <div class="elementor-container"><div class="elementor-column"><div class="elementor-widget-wrap">
+{content}
+        </div></div></div>
+    </div>
+    <div class="elementor-section site-footer-section">
+        <div class="elementor-container"><div class="elementor-widget-text-editor">
+            <p><span style="font-size: 12px;"><span class="footer-text">The Old Mill Arts Centre is a registered charity, No. 1098765. All rights reserved.</span></span></p>
+        </div></div>
+    </div>
+</body>
+</html>
+"""
+
+
+FIXTURE_PAGES = {
+    "events_listing": {
+        "url": "https://cityevents.example.com/events",
+        "html": city_events_page("Upcoming events", """
+            <h1>Upcoming events in Springfield</h1>
+            <p>Here is everything happening in town over the next months, from book fairs to open-air cinema.
+               Prices are per adult; children under 12 go free to most events.</p>
+            <table class="events">
+                <tr><th>Date</th><th>Event</th><th>Venue</th><th>Price</th></tr>
+                <tr><td>May 20</td><td><a href="/events/spring-book-fair">Spring Book Fair</a></td><td>Downtown Library</td><td>Free</td></tr>
+                <tr><td>June 5</td><td><a href="/events/city-marathon">Annual City Marathon</a></td><td>City Hall Plaza</td><td>$35</td></tr>
+                <tr><td>July 12</td><td><a href="/events/summer-jazz-nights">Summer Jazz Nights</a></td><td>Central Park</td><td>Free</td></tr>
+                <tr><td>August 10</td><td><a href="/events/culinary-delights">Culinary Delights Food Festival</a></td><td>Riverfront Promenade</td><td>$12</td></tr>
+            </table>
+            <p>Looking for something else? Browse events by category or venue using the menu above.</p>
+        """),
+        "facts": [
+            "Spring Book Fair", "May 20", "Downtown Library", "Annual City Marathon", "June 5", "$35",
+            "Summer Jazz Nights", "Central Park", "Culinary Delights Food Festival", "Riverfront Promenade", "$12",
+        ],
+        "boilerplate": CITY_EVENTS_BOILERPLATE,
+    },
+    "event_detail": {
+        "url": "https://cityevents.example.com/events/summer-jazz-nights",
+        "html": city_events_page("Summer Jazz Nights", """
+            <script type="application/ld+json">
+            {
+                "@context": "https://schema.org",
+                "@graph": [
+                    {"@type": "BreadcrumbList", "itemListElement": [{"@type": "ListItem", "position": 1, "name": "Events"}]},
+                    {
+                        "@type": "Event",
+                        "name": "Summer Jazz Nights",
+                        "startDate": "2024-07-05T19:00:00-05:00",
+                        "endDate": "2024-07-26T22:00:00-05:00",
+                        "location": {
+                            "@type": "Place",
+                            "name": "Central Park Bandstand",
+                            "address": {"@type": "PostalAddress", "addressLocality": "Springfield"}
+                        },
+                        "performer": [{"@type": "MusicGroup", "name": "Marcus Reed Quartet"}, {"@type": "Person", "name": "Ana Lima"}],
+                        "offers": {"@type": "Offer", "price": "0", "priceCurrency": "USD"}
+                    }
+                ]
+            }
+            </script>
+            <article class="event">
+                <header class="event-header">
+                    <h1>Summer Jazz Nights</h1>
+                    <p class="event-meta">Every Friday in July, 7pm to 10pm, Central Park Bandstand</p>
+                </header>
+                <p>Enjoy a series of free outdoor jazz concerts every Friday night in July. This year's line-up
+                   features the Marcus Reed Quartet, vocalist Ana Lima and the Springfield Big Band, with a
+                   late-night jam session open to local musicians.</p>
+                <p>Bring a picnic and relax under the stars. Food trucks, a licensed bar and seating for 500 are
+                   available on site, and the bandstand is fully accessible to wheelchair users.</p>
+                <h2>Getting there</h2>
+                <p>Central Park is a ten minute walk from Springfield Central station. Parking is limited, so
+                   please use public transport or the free bike racks at the north gate.</p>
+                <div class="share-buttons">
+                    <a href="https://facebook.com/share">Share on Facebook</a>
+                    <a href="https://twitter.com/share">Share on Twitter</a>
+                </div>
+            </article>
+            <section class="related-events">
+                <h2>You might also like</h2>
+                <ul>
+                    <li><a href="/events/film-fest">Film Fest Under the Stars</a></li>
+                    <li><a href="/events/heritage-craft-fair">Heritage Craft Fair</a></li>
+                    <li><a href="/events/culinary-delights">Culinary Delights Food Festival</a></li>
+                </ul>
+            </section>
+        """),
+        "facts": [
+            "Summer Jazz Nights", "Every Friday in July", "7pm to 10pm", "Central Park Bandstand",
+            "Marcus Reed Quartet", "Ana Lima", "seating for 500",
+        ],
+        "boilerplate": CITY_EVENTS_BOILERPLATE + ["Share on Facebook", "You might also like"],
+    },
+    "events_cards": {
+        "url": "https://cityevents.example.com/events/family",
+        "html": city_events_page("Family events", """
+            <h1>Family events</h1>
+            <ul class="event-cards">
+                <li class="event-card">
+                    <h3><a href="/events/heritage-craft-fair">Heritage Craft Fair</a></h3>
+                    <p>September 3, Old Town Market. Pottery, weaving and woodcarving demonstrations by local artisans.</p>
+                </li>
+                <li class="event-card">
+                    <h3><a href="/events/film-fest">Film Fest Under the Stars</a></h3>
+                    <p>Weekends in October, Hillside Theatre. Indie films and classic cinema in an open-air setting.</p>
+                </li>
+                <li class="event-card">
+                    <h3><a href="/events/pumpkin-trail">Pumpkin Trail</a></h3>
+                    <p>October 28, Westfield Farm. A lantern-lit trail with games and face painting, $8 per child.</p>
+                </li>
+            </ul>
+        """),
+        "facts": [
+            "Heritage Craft Fair", "September 3", "Old Town Market", "Film Fest Under the Stars", "Hillside Theatre",
+            "Pumpkin Trail", "October 28", "Westfield Farm", "$8 per child",
+        ],
+        "boilerplate": CITY_EVENTS_BOILERPLATE,
+    },
+    "product": {
+        "url": "https://gearshop.example.com/tents/trailhead-2",
+        "html": gear_shop_page("Trailhead 2 Tent", """
+            <div class="product" itemscope itemtype="https://schema.org/Product">
+                <h1 itemprop="name">Trailhead 2 Ultralight Tent</h1>
+                <div class="price-box" itemprop="offers" itemscope itemtype="https://schema.org/Offer">
+                    <span class="price" itemprop="price" content="249.00">$249.00</span>
+                    <meta itemprop="priceCurrency" content="USD">
+                    <link itemprop="availability" href="https://schema.org/InStock"><span class="stock">In stock</span>
+                </div>
+                <div class="product-description">
+                    <p>The Trailhead 2 is a freestanding, two-person backpacking tent that packs down to the size of a
+                       water bottle. Its ripstop nylon fly, aluminium poles and two doors make it a favourite for
+                       long-distance hikers, while the fully taped seams keep you dry in a downpour.</p>
+                    <p>Setup takes under three minutes thanks to colour-coded clips, and the mesh inner gives great
+                       ventilation on warm nights.</p>
+                </div>
+                <table class="specs">
+                    <tr><td>Weight</td><td>1.2 kg</td></tr>
+                    <tr><td>Packed size</td><td>45 x 15 cm</td></tr>
+                    <tr><td>Floor area</td><td>2.6 square metres</td></tr>
+                    <tr><td>Hydrostatic head</td><td>3000 mm</td></tr>
+                </table>
+            </div>
+            <div class="reviews">
+                <h2>Customer reviews</h2>
+                <p>Rated 4.6 out of 5 by 212 customers. "Light, roomy and survived a storm on the Pennine Way."</p>
+            </div>
+            <div class="related-products">
+                <a href="/tents/trailhead-1">Trailhead 1</a> <a href="/tents/trailhead-3">Trailhead 3</a>
+                <a href="/tents/summit-2">Summit 2</a> <a href="/accessories/footprint">Trailhead footprint</a>
+            </div>
+        """),
+        "facts": [
+            "Trailhead 2 Ultralight Tent", "$249.00", "In stock", "two-person", "1.2 kg", "45 x 15 cm", "3000 mm",
+            "Rated 4.6 out of 5",
+        ],
+        "boilerplate": GEAR_SHOP_BOILERPLATE,
+    },
+    "philosophers_article": {
+        "url": "https://gearshop.example.com/blog/philosophy-of-walking",
+        "html": gear_shop_page("The philosophy of walking", """
+            <div class="post">
+                <h1>Walking philosophers</h1>
+                <p>Socrates, the classical Greek philosopher and founder of Western philosophy, was famous for
+                   questioning Athenians as he walked through the agora, a habit that gave us the Socratic method.</p>
+                <p>Aristotle taught while strolling the covered walkways of the Lyceum, which is why his followers
+                   were called the Peripatetics. His lectures covered logic, ethics, biology and politics.</p>
+                <p>Centuries later, Friedrich Nietzsche, the German philosopher of the will to power, claimed that
+                   only thoughts reached by walking have any value, and he walked for hours every day.</p>
+            </div>
+        """),
+        "facts": [
+            "Socrates", "Socratic method", "Aristotle", "Lyceum", "Peripatetics", "Friedrich Nietzsche",
+            "will to power",
+        ],
+        "boilerplate": GEAR_SHOP_BOILERPLATE,
+    },
+    "venue_programme": {
+        "url": "https://oldmill.example.org/whats-on",
+        "html": page_builder_page("What's on at the Old Mill", """
+            <div class="elementor-widget elementor-widget-heading"><div class="elementor-widget-container">
+                <h1 class="elementor-heading-title"><span class="highlight"><span>What's on this autumn</span></span></h1>
+            </div></div>
+            <div class="elementor-widget elementor-widget-text-editor"><div class="elementor-widget-container">
+                <p><span style="font-weight: 400;"><span>The Old Mill Arts Centre hosts theatre, music and workshops
+                   all year round. Booking is essential for most events, and members get </span><a href="/members"><span>
+                   priority booking</span></a><span> and 10% off every ticket.</span></span></p>
+            </div></div>
+            <div class="elementor-widget elementor-widget-event-list"><div class="elementor-widget-container">
+                <div class="event-item">
+                    <p><span class="event-date"><span>Saturday 12 October, 7.30pm</span></span></p>
+                    <h3><a href="/events/the-tempest"><span class="event-title"><span>The Tempest</span></span></a></h3>
+                    <p><span><span>Shakespeare's last play, performed by the Mill Players in the main auditorium.</span></span>
+                       <span class="price"><span>Tickets £14, concessions £10</span></span></p>
+                </div>
+                <div class="event-item">
+                    <p><span class="event-date"><span>Thursday 24 October, 8pm</span></span></p>
+                    <h3><a href="/events/folk-night"><span class="event-title"><span>Autumn Folk Night</span></span></a></h3>
+                    <p><span><span>An evening of traditional and new folk music with the Riverside Ceilidh Band.</span></span>
+                       <span class="price"><span>Tickets £12</span></span></p>
+                </div>
+                <div class="event-item">
+                    <p><span class="event-date"><span>Sunday 3 November, 10am</span></span></p>
+                    <h3><a href="/events/pottery-workshop"><span class="event-title"><span>Beginners' Pottery Workshop</span></span></a></h3>
+                    <p><span><span>A hands-on introduction to throwing on the wheel. All materials and firing included.</span></span>
+                       <span class="price"><span>£45 per person</span></span></p>
+                </div>
+            </div></div>
+        """),
+        "facts": [
+            "The Tempest", "Saturday 12 October, 7.30pm", "Tickets £14, concessions £10", "Autumn Folk Night",
+            "Thursday 24 October, 8pm", "Riverside Ceilidh Band", "Beginners' Pottery Workshop", "£45 per person",
+        ],
+        "boilerplate": ["All rights reserved", "Plan your visit"],
+    },
+}
+
+# Pages a crawl reaches that hold none of the facts a schema asks for
+IRRELEVANT_PAGES = {
+    "privacy_policy": {
+        "url": "https://cityevents.example.com/privacy",
+        "html": city_events_page("Privacy policy", """
+            <h1>Privacy policy</h1>
+            <p>City Events Ltd is the controller of the personal data you provide when you create an account,
+               subscribe to our newsletter or contact us. We process it to provide our services, on the basis of
+               your consent or of our legitimate interests.</p>
+            <h2>Cookies</h2>
+            <p>We use strictly necessary cookies to keep you signed in, and with your consent analytics and
+               advertising cookies. You can withdraw your consent at any time in the cookie settings.</p>
+            <h2>Your rights</h2>
+            <p>You have the right to access, rectify and erase your personal data, to restrict or object to its
+               processing and to data portability. To exercise them, write to our data protection officer.</p>
+        """),
+    },
+    "login": {
+        "url": "https://cityevents.example.com/account/login",
+        "html": city_events_page("Sign in", """
+            <h1>Sign in to your account</h1>
+            <form>
+                <label>Email address <input type="email"></label>
+                <label>Password <input type="password"></label>
+                <button>Sign in</button>
+            </form>
+            <p><a href="/account/reset">Forgotten your password?</a> New here? <a href="/account/register">Create
+               an account</a> to save your favourites and get reminders.</p>
+        """),
+    },
+}
@@ -0,0 +1,112 @@
+import unittest
+
+from bs4 import BeautifulSoup
+
+from scraper.chunking import StructuredChunker, parse_blocks
+from scraper.dom_serializer import serialize_dom
+from tests.fixture_pages import FIXTURE_PAGES
+
+
+def page_text(name):
+    return serialize_dom(BeautifulSoup(FIXTURE_PAGES[name]["html"], "html.parser"))
+
+
+class TestChunking(unittest.TestCase):
+    """
+    Test structure-aware chunking of serialized pages.
+    Does not require the containers to be running.
+    """
+
+    def test_blocks(self):
+        text = "\n".join([
+            "# Family events",
+            "- ### [Heritage Craft Fair](/events/heritage-craft-fair)",
+            "September 3, Old Town Market.",
+            "  - Pottery",
+            "- ### [Pumpkin Trail](/events/pumpkin-trail)",
+            "## Prices",
+            "| Event | Price |",
+            "| Pumpkin Trail | $8 |",
+            "Children under 3 go free.",
+        ])
+        blocks = parse_blocks(text)
+        self.assertEqual([block.lines for block in blocks], [
+            ["# Family events", "- ### [Heritage Craft Fair](/events/heritage-craft-fair)",
+             "September 3, Old Town Market.", "  - Pottery"],
+            ["- ### [Pumpkin Trail](/events/pumpkin-trail)"],
+            ["## Prices", "| Event | Price |"],
+            ["| Pumpkin Trail | $8 |"],
+            ["Children under 3 go free."],
+        ])
+        self.assertEqual(blocks[1].headings, ["# Family events"])
+        self.assertEqual(blocks[3].headings, ["# Family events", "## Prices"])
+        self.assertEqual(blocks[3].table_header, "| Event | Price |")
+        self.assertIsNone(blocks[4].table_header)
+
+    def test_blocks_are_never_cut(self):
+        chunker = StructuredChunker(chunk_size=300, chunk_overlap=50)
+        for name, page in FIXTURE_PAGES.items():
+            text = page_text(name)
+            chunks = chunker.split(text)
+            self.assertGreater(len(chunks), 1, name)
+            for chunk in chunks:
+                self.assertLessEqual(len(chunk), 300, name)
+            lines = {line for chunk in chunks for line in chunk.split("\n")}
+            for line in text.split("\n"):
+                if len(line) <= 300:
+                    self.assertIn(line, lines, name)
+            for fact in page["facts"]:
+                self.assertTrue(any(fact in chunk for chunk in chunks), f"{name}: {fact}")
+
+    def test_chunks_repeat_headings_and_table_header_instead_of_items(self):
+        chunks = StructuredChunker(chunk_size=300).split(page_text("events_listing"))
+        rows = [chunk for chunk in chunks if "| May 20 |" in chunk or "| July 12 |" in chunk]
+        self.assertEqual(len(rows), 2)
+        for chunk in rows:
+            self.assertTrue(chunk.startswith("# Upcoming events in Springfield\n| Date | Event | Venue | Price |\n"))
+        data_rows = [
+            line for chunk in chunks for line in chunk.split("\n") if line.startswith("| ") and "Date" not in line
+        ]
+        self.assertEqual(len(data_rows), len(set(data_rows)))
+
+    def test_long_lines_are_split_with_overlap(self):
+        line = " ".join(f"word{index}" for index in range(100))
+        pieces = StructuredChunker(chunk_size=100, chunk_overlap=20).split(line)
+        self.assertGreater(len(pieces), 5)
+        for previous, piece in zip(pieces, pieces[1:]):
+            self.assertLessEqual(len(piece), 100)
+            self.assertIn(piece.split(" ")[0], previous.split(" "))
+        self.assertEqual(StructuredChunker(chunk_size=100).split("Short page"), ["Short page"])
+
+    def test_prefixes_stay_with_the_first_piece_of_a_long_line(self):
+        chunker = StructuredChunker(chunk_size=200)
+        chunks = chunker.split("- " + "x" * 500)
+        self.assertEqual([len(chunk) for chunk in chunks], [200, 200, 102])
+        self.assertTrue(chunks[0].startswith("- x"))
+
+        chunks = chunker.split("# H\n" + "x" * 450)
+        self.assertEqual([len(chunk) for chunk in chunks], [200, 200, 54])
+        self.assertTrue(chunks[0].startswith("# H\nx"))
+        self.assertEqual("".join(chunks).replace("# H\n", ""), "x" * 450)
+
+    def test_every_line_survives_split(self):
+        description = "A long description of the event. " * 17
+        rows = [f"| Event {index} | {description.strip()} | ${index}0 |" for index in range(1, 4)]
+        for text in ["\n".join(rows), "\n".join(["# Events", "Our programme for the season."] + rows)]:
+            for chunk_size in (600, 1000, 1500):
+                chunks = StructuredChunker(chunk_size, 100).split(text)
+                lines = {line for chunk in chunks for line in chunk.split("\n")}
+                for line in text.split("\n"):
+                    self.assertIn(line, lines, f"{chunk_size}: {line[:20]}")
+
+        for name in FIXTURE_PAGES:
+            text = page_text(name)
+            for chunk_size in (120, 200, 500):
+                lines = {line for chunk in StructuredChunker(chunk_size).split(text) for line in chunk.split("\n")}
+                for line in text.split("\n"):
+                    if len(line) <= chunk_size:
+                        self.assertIn(line, lines, f"{name} {chunk_size}: {line[:20]}")
+
+
+if __name__ == "__main__":
+    unittest.main()
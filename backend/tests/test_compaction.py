@@ -0,0 +1,72 @@
+import unittest
+
+from scraper.compaction import TokenCompactor, collapse_whitespace, strip_tracking
+
+
+class TestCompaction(unittest.TestCase):
+    """
+    Test the compaction of page text before it is sent to the LLM.
+    Does not require the containers to be running.
+    """
+
+    def test_strip_tracking(self):
+        self.assertEqual(
+            strip_tracking("https://example.com/events?id=7&utm_source=news&utm_medium=email&fbclid=abc"),
+            "https://example.com/events?id=7"
+        )
+        self.assertEqual(strip_tracking("https://example.com/?gclid=1"), "https://example.com/")
+        self.assertEqual(strip_tracking("/events?page=2&sort=date"), "/events?page=2&sort=date")
+
+    def test_compact_page(self):
+        text = "# Events  \n\n\n- [Fair](/events/fair?utm_campaign=spring)   today\n  - Pottery\t and  glass\n"
+        compacted, cleaned = TokenCompactor().compact_page(text)
+        self.assertEqual(compacted, "# Events\n- [Fair](/events/fair) today\n  - Pottery and glass")
+        self.assertEqual(cleaned, 1)
+        self.assertEqual(collapse_whitespace("a  b"), "a b")
+
+    def test_repeated_long_urls_are_referenced(self):
+        long_url = "https://tickets.example.com/events/heritage-craft-fair"
+        text = "\n".join([
+            f"- [Heritage Craft Fair]({long_url})",
+            f"[Buy tickets]({long_url})",
+            "[Home](/)",
+            "[Home](/)",
+            "[Contact](https://example.com/about/contact-us)",
+        ])
+        compacted, references = TokenCompactor(min_url_chars=24).compact_chunk(text)
+        self.assertEqual(references, {"@1": long_url})
+        self.assertEqual(compacted, "\n".join([
+            "- [Heritage Craft Fair](@1)",
+            "[Buy tickets](@1)",
+            "[Home](/)",
+            "[Home](/)",
+            "[Contact](https://example.com/about/contact-us)",
+            "Links:",
+            f"@1 = {long_url}",
+        ]))
+        self.assertLess(len(compacted), len(text))
+
+        self.assertEqual(TokenCompactor().compact_chunk(text + "\nFollow @2024events")[1], {"@1": long_url})
+        self.assertEqual(TokenCompactor().compact_chunk(text + "\nRoom @2"), (text + "\nRoom @2", {}))
+        self.assertEqual(TokenCompactor(min_url_chars=60).compact_chunk(text), (text, {}))
+
+    def test_rehydrate(self):
+        references = {"@1": "https://tickets.example.com/a", "@2": "https://tickets.example.com/b"}
+        result = {
+            "events": [
+                {"name": "Fair", "url": "@1", "links": ["(@2)", "@3"], "price": 8},
+                {"name": "Trail", "url": "see @2.", "contact": "info@1example.com"},
+            ]
+        }
+        self.assertEqual(TokenCompactor.rehydrate(result, references), {
+            "events": [
+                {"name": "Fair", "url": "https://tickets.example.com/a",
+                 "links": ["(https://tickets.example.com/b)", "@3"], "price": 8},
+                {"name": "Trail", "url": "see https://tickets.example.com/b.", "contact": "info@1example.com"},
+            ]
+        })
+        self.assertIs(TokenCompactor.rehydrate(result, {}), result)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import asyncio
+import unittest
+
+from sqlalchemy import create_engine, text
+
+from core.database.db_metrics import DatabaseMetrics, current_operation, db_metrics, instrument_engine, instrument_operations
+
+
+@instrument_operations
+class ExampleAdapter:
+    async def get_things(self):
+        return current_operation.get()
+
+    async def _helper(self):
+        return current_operation.get()
+
+
+class TestDatabaseMetrics(unittest.TestCase):
+    """
+    Test pool and query instrumentation.
+    Does not require the containers to be running.
+    """
+
+    def setUp(self):
+        db_metrics.reset()
+
+    def test_operations_are_named_after_public_methods(self):
+        adapter = ExampleAdapter()
+        self.assertEqual(asyncio.run(adapter.get_things()), "ExampleAdapter.get_things")
+        self.assertEqual(asyncio.run(adapter._helper()), "other")
+        self.assertEqual(current_operation.get(), "other")
+
+    def test_queries_are_recorded_by_operation(self):
+        engine = create_engine("sqlite://")
+        instrument_engine(engine)
+        token = current_operation.set("ExampleAdapter.get_things")
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+        finally:
+            current_operation.reset(token)
+
+        stats = db_metrics.snapshot()["queries"]["ExampleAdapter.get_things"]
+        self.assertEqual(stats["count"], 2)
+        self.assertGreaterEqual(stats["max_seconds"], 0)
+
+    def test_checkouts(self):
+        metrics = DatabaseMetrics()
+        metrics.record_checkout(0.5, 3)
+        metrics.record_checkout(0.1, 1)
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["peak_checked_out"], 3)
+        self.assertEqual(snapshot["checkout_wait"]["count"], 2)
+        self.assertAlmostEqual(snapshot["checkout_wait"]["mean_seconds"], 0.3)
+        self.assertEqual(snapshot["checkout_wait"]["max_seconds"], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
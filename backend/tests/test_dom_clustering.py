@@ -0,0 +1,54 @@
+import unittest
+
+from bs4 import BeautifulSoup
+
+from scraper.dom_clustering import DETAIL, LISTING, PageClusterer, PageStructure, cluster_stats
+from tests.fixture_pages import FIXTURE_PAGES, PRODUCTS, product_page
+
+
+def structure(name):
+    return PageStructure.from_soup(BeautifulSoup(FIXTURE_PAGES[name]["html"], "html.parser"))
+
+
+class TestDomClustering(unittest.TestCase):
+    """
+    Test clustering of crawled pages by template.
+    Does not require the containers to be running.
+    """
+
+    def test_pages_of_one_template_are_similar(self):
+        products = [PageStructure.from_soup(product_page(*product)) for product in PRODUCTS]
+        self.assertGreater(products[0].similarity(products[1]), 0.9)
+        self.assertGreater(structure("product").similarity(products[0]), 0.7)
+        # Templates of one site only share their header and footer, and other sites share nothing
+        self.assertLess(structure("events_listing").similarity(structure("event_detail")), 0.7)
+        self.assertLess(structure("product").similarity(structure("events_listing")), 0.1)
+
+    def test_listing_and_detail_pages(self):
+        for name in ("events_listing", "events_cards", "venue_programme"):
+            self.assertEqual(structure(name).kind, LISTING, name)
+        # Navigation, related links and spec tables are not listed items
+        for name in ("event_detail", "product", "philosophers_article"):
+            self.assertEqual(structure(name).kind, DETAIL, name)
+
+    def test_pages_are_clustered_by_template(self):
+        names = ["events_listing", "product", "event_detail", "events_listing", "product", "venue_programme"]
+        urls = [f"https://example.com/{index}" for index in range(len(names))]
+        pages = [structure(name) for name in names]
+        pages[4] = PageStructure.from_soup(product_page(*PRODUCTS[0]))
+        clusters = PageClusterer(min_similarity=0.7).cluster(urls, pages)
+
+        self.assertEqual([cluster.indices for cluster in clusters], [[0, 3], [1, 4], [2], [5]])
+        self.assertEqual([cluster.kind for cluster in clusters], [LISTING, DETAIL, DETAIL, LISTING])
+        stats = cluster_stats(clusters)
+        self.assertEqual(stats["pages"], 6)
+        self.assertEqual(stats["clusters"][0], {"id": 0, "kind": LISTING, "size": 2, "urls": [urls[0], urls[3]]})
+
+    def test_similarity_one_only_groups_identical_structures(self):
+        pages = [structure("events_listing"), structure("events_cards"), structure("events_listing")]
+        clusters = PageClusterer(min_similarity=1.0).cluster(["a", "b", "c"], pages)
+        self.assertEqual([cluster.urls for cluster in clusters], [["a", "c"], ["b"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
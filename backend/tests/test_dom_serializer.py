@@ -0,0 +1,73 @@
+import unittest
+
+from bs4 import BeautifulSoup
+
+from scraper.dom_serializer import serialize_dom
+from tests.fixture_pages import FIXTURE_PAGES
+
+
+def serialize(html: str) -> str:
+    return serialize_dom(BeautifulSoup(html, "html.parser"))
+
+
+class TestDomSerializer(unittest.TestCase):
+    """
+    Test the single-pass DOM serializer.
+    Does not require the containers to be running.
+    """
+
+    def test_nested_matches_are_written_once(self):
+        text = serialize('<p><span>Opening night</span> at <a href="/venue"><span>The Old Mill</span></a></p>')
+        self.assertEqual(text, "Opening night at [The Old Mill](/venue)")
+
+    def test_structure_markers(self):
+        html = """
+            <h2>Programme</h2>
+            <ul><li>Friday<ul><li>Opening concert</li></ul></li><li>Saturday</li></ul>
+            <ol><li>Register</li><li>Collect badge</li></ol>
+            <table><tr><th>Day</th><th>Price</th></tr><tr><td>Friday</td><td><b>$10</b></td></tr></table>
+            <p>Line one<br>Line two</p>
+        """
+        self.assertEqual(serialize(html).split("\n"), [
+            "## Programme",
+            "- Friday",
+            "  - Opening concert",
+            "- Saturday",
+            "1. Register",
+            "2. Collect badge",
+            "| Day | Price |",
+            "| Friday | $10 |",
+            "Line one",
+            "Line two",
+        ])
+
+    def test_list_item_starting_with_heading(self):
+        text = serialize('<ul><li><h3><a href="/e/1">Craft Fair</a></h3><p>September 3</p></li></ul>')
+        self.assertEqual(text.split("\n"), ["- ### [Craft Fair](/e/1)", "September 3"])
+
+    def test_skips_scripts_comments_and_controls(self):
+        html = """
+            <div><!-- tracking --><script>var x = 1;</script><style>p {}</style>
+            <p>Visible</p><button>Accept all</button><a href="javascript:void(0)">Menu</a> <a href="#top">Top</a></div>
+        """
+        self.assertEqual(serialize(html).split("\n"), ["Visible", "Menu Top"])
+
+    def test_repeated_long_lines_are_written_once(self):
+        notice = "Booking is essential for all workshops this season."
+        text = serialize(f"<p>{notice}</p><p>Free</p><p>{notice}</p><p>Free</p>")
+        self.assertEqual(text.split("\n"), [notice, "Free", "Free"])
+
+    def test_every_text_node_once(self):
+        for name, page in FIXTURE_PAGES.items():
+            with self.subTest(page=name):
+                soup = BeautifulSoup(page["html"], "html.parser")
+                text = serialize(page["html"])
+                for fact in page["facts"]:
+                    self.assertIn(fact, text)
+                for node in soup.find_all(string=True):
+                    if node.parent.name not in ("script", "style", "title") and len(node.strip()) >= 30:
+                        self.assertLessEqual(text.count(node.strip()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from core.items import content_hash, item_key, split_list_content
+
+
+class TestItems(unittest.TestCase):
+    """
+    Test item hashing for the item store.
+    Does not require the containers to be running.
+    """
+
+    def test_content_hash_ignores_key_order(self):
+        self.assertEqual(content_hash({"a": 1, "b": [1, 2]}), content_hash({"b": [1, 2], "a": 1}))
+        self.assertNotEqual(content_hash({"a": 1}), content_hash({"a": 2}))
+
+    def test_item_key_uses_key_fields(self):
+        first = {"url": "https://example.com/1", "price": 10}
+        changed = {"url": "https://example.com/1", "price": 12}
+        other = {"url": "https://example.com/2", "price": 10}
+        self.assertEqual(item_key(first, ["url"]), item_key(changed, ["url"]))
+        self.assertNotEqual(item_key(first, ["url"]), item_key(other, ["url"]))
+
+    def test_item_key_falls_back_to_content(self):
+        item = {"title": "Event"}
+        self.assertEqual(item_key(item, []), content_hash(item))
+        self.assertEqual(item_key(item, ["url"]), content_hash(item))
+
+    def test_split_list_content(self):
+        self.assertEqual(split_list_content({"events": [{"a": 1}]}), ("events", [{"a": 1}]))
+        self.assertEqual(split_list_content({"events": []}), ("events", []))
+        self.assertIsNone(split_list_content({"name": "Socrates"}))
+        self.assertIsNone(split_list_content({"events": [{"a": 1}], "other": []}))
+        self.assertIsNone(split_list_content({"tags": ["a", "b"]}))
+
+
+if __name__ == '__main__':
+    unittest.main()
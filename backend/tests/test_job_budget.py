@@ -0,0 +1,67 @@
+import unittest
+
+from core.job_budget import JobBudget, JobBudgetExceeded
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    def __init__(self):
+        self.keys = set()
+
+    def exists(self, key):
+        return key in self.keys
+
+
+class TestJobBudget(unittest.TestCase):
+    """
+    Test job budget tracking.
+    Does not require the containers to be running.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_unlimited_budget_is_never_exhausted(self):
+        budget = JobBudget(clock=self.clock)
+        budget.record_tokens(10 ** 9)
+        self.clock.now = 10 ** 6
+        self.assertFalse(budget.is_exhausted())
+        self.assertIsNone(budget.to_stats()["stopped_reason"])
+
+    def test_deadline(self):
+        budget = JobBudget(deadline_seconds=60, clock=self.clock)
+        self.clock.now = 59
+        self.assertFalse(budget.is_exhausted())
+        self.assertEqual(budget.remaining_seconds(), 1)
+        self.clock.now = 60
+        self.assertTrue(budget.is_exhausted())
+        self.assertEqual(budget.stopped_reason, JobBudget.DEADLINE)
+
+    def test_token_budget_checks_upcoming_call(self):
+        budget = JobBudget(max_llm_tokens=1000, clock=self.clock)
+        budget.record_tokens(800)
+        budget.ensure_available(200)
+        with self.assertRaises(JobBudgetExceeded):
+            budget.ensure_available(201)
+        self.assertEqual(budget.stopped_reason, JobBudget.TOKEN_BUDGET)
+
+    def test_cancellation_flag(self):
+        redis = FakeRedis()
+        budget = JobBudget(job_id="job", redis_client=redis, clock=self.clock)
+        self.assertFalse(budget.is_exhausted())
+
+        redis.keys.add("webslayer:job:cancel:job")
+        self.clock.now = 5
+        self.assertTrue(budget.is_exhausted())
+        self.assertEqual(budget.stopped_reason, JobBudget.CANCELLED)
+
+
+if __name__ == "__main__":
+    unittest.main()
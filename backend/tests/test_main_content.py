@@ -0,0 +1,61 @@
+import unittest
+
+from bs4 import BeautifulSoup
+
+from scraper.main_content import MainContentExtractor
+from tests.fixture_pages import FIXTURE_PAGES
+
+
+def text_of(soup: BeautifulSoup) -> str:
+    return " ".join(soup.get_text(" ").split())
+
+
+class TestMainContentExtractor(unittest.TestCase):
+    """
+    Test main-content extraction on the fixture corpus.
+    Does not require the containers to be running.
+    """
+
+    def extract(self, html: str) -> str:
+        return text_of(MainContentExtractor().extract(BeautifulSoup(html, "html.parser")))
+
+    def test_keeps_facts_and_drops_boilerplate(self):
+        for name, page in FIXTURE_PAGES.items():
+            with self.subTest(page=name):
+                full_text = text_of(BeautifulSoup(page["html"], "html.parser"))
+                text = self.extract(page["html"])
+                for fact in page["facts"]:
+                    self.assertIn(fact, text)
+                for snippet in page["boilerplate"]:
+                    self.assertNotIn(snippet, text)
+                self.assertLess(len(text), len(full_text))
+
+    def test_keeps_data_lists_and_drops_link_lists(self):
+        html = """
+            <body>
+                <div class="content">
+                    <p>The festival runs for three days, with concerts, workshops, food stalls and a craft market.</p>
+                    <p>Tickets are available online and at the gate, with discounts for students and families.</p>
+                    <p>All venues are within walking distance of the old town, and shuttle buses run every hour.</p>
+                </div>
+                <ul class="schedule"><li>Friday: opening concert at 8pm</li><li>Saturday: workshops from 10am</li></ul>
+                <ul class="links"><li><a href="/a">Archive</a></li><li><a href="/b">Press</a></li><li><a href="/c">Jobs</a></li></ul>
+            </body>
+        """
+        text = self.extract(html)
+        self.assertIn("opening concert at 8pm", text)
+        self.assertNotIn("Archive", text)
+
+    def test_short_pages_only_lose_boilerplate(self):
+        html = """
+            <body>
+                <nav><a href="/">Home</a></nav>
+                <div><span>Open today 9am to 5pm</span></div>
+                <footer>All rights reserved</footer>
+            </body>
+        """
+        self.assertEqual(self.extract(html), "Open today 9am to 5pm")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+
+from bs4 import BeautifulSoup
+
+from scraper.dom_serializer import serialize_dom
+from scraper.near_duplicates import (
+    FingerprintIndex, FingerprintStore, NearDuplicateFilter, hamming_distance, simhash
+)
+from tests.fixture_pages import FIXTURE_PAGES
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def delete(self, key):
+        self.commands.append(lambda: self.redis.hashes.pop(key, None))
+
+    def hset(self, key, mapping):
+        self.commands.append(lambda: self.redis.hashes.setdefault(key, {}).update(mapping))
+
+    def expire(self, key, seconds):
+        self.commands.append(lambda: self.redis.ttls.__setitem__(key, seconds))
+
+    def execute(self):
+        for command in self.commands:
+            command()
+
+
+class FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+        self.ttls = {}
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+def page_text(name):
+    return serialize_dom(BeautifulSoup(FIXTURE_PAGES[name]["html"], "html.parser"))
+
+
+def templated_event_page(title, date, venue, price, description, navigation=True):
+    """An event page of a site whose navigation has far more text than the event itself"""
+    sections = range(60) if navigation else []
+    links = "".join(f'<li><a href="/section/{index}">Section {index} highlights</a></li>' for index in sections)
+    return serialize_dom(BeautifulSoup(f"""
+        <html><body>
+        <header><nav><ul>{links}</ul></nav></header>
+        <main><h1>{title}</h1><p>Date: {date}</p><p>Venue: {venue}</p><p>Price: {price}</p><p>{description}</p></main>
+        <footer><p>City Events Ltd, 123 Market Street, Springfield. All rights reserved.</p></footer>
+        </body></html>
+    """, "html.parser"))
+
+
+class TestNearDuplicates(unittest.TestCase):
+    """
+    Test near-duplicate page detection.
+    Does not require the containers to be running.
+    """
+
+    def setUp(self):
+        self.detail = page_text("event_detail")
+        self.print_view = self.detail + "\nPrinted from the city events website"
+        self.listing = page_text("events_listing")
+
+    def test_simhash_distance(self):
+        self.assertEqual(simhash(self.detail), simhash(self.detail))
+        self.assertLessEqual(hamming_distance(simhash(self.detail), simhash(self.print_view)), 6)
+        self.assertGreater(hamming_distance(simhash(self.detail), simhash(self.listing)), 12)
+
+    def test_index_finds_fingerprints_within_distance(self):
+        index = FingerprintIndex(max_distance=3)
+        index.add(0b1011 << 40, "a")
+        self.assertEqual(index.find((0b1011 << 40) ^ 0b111), "a")
+        self.assertIsNone(index.find((0b1011 << 40) ^ 0b1111))
+        # Bands do not divide 64 bits evenly for every distance
+        index = FingerprintIndex(max_distance=4)
+        index.add(1 << 63, "b")
+        self.assertEqual(index.find((1 << 63) ^ 1), "b")
+
+    def test_duplicates_of_earlier_pages_are_skipped(self):
+        urls = ["https://example.com/a", "https://example.com/a?print=1", "https://example.com/events"]
+        kept_urls, kept_documents, stats = NearDuplicateFilter().filter(
+            urls, [self.detail, self.print_view, self.listing]
+        )
+        self.assertEqual(kept_urls, [urls[0], urls[2]])
+        self.assertEqual(kept_documents, [self.detail, self.listing])
+        self.assertEqual(stats["duplicates"], 1)
+        self.assertEqual(stats["skipped"], [{"url": urls[1], "reason": "duplicate", "duplicate_of": urls[0]}])
+
+    def test_distinct_pages_on_one_template_are_kept(self):
+        jazz_night = (
+            "Jazz Night", "June 14, 8 pm", "Blue Room, 5 River Road", "$25",
+            "An evening of live jazz with the Springfield Quartet and guests."
+        )
+        pages = [
+            templated_event_page(*jazz_night),
+            templated_event_page(
+                "Pottery Class", "June 20, 10 am", "Clay Studio, 18 Mill Lane", "$40",
+                "Learn to throw bowls and mugs on the wheel, all materials included."
+            ),
+            templated_event_page(
+                "Food Market", "June 22, 9 am", "Old Town Square", "Free",
+                "Local farmers, bakers and street food stalls gather in the square."
+            ),
+        ]
+        urls = ["https://example.com/jazz", "https://example.com/pottery", "https://example.com/food"]
+        kept_urls, _, stats = NearDuplicateFilter().filter(urls, pages)
+        self.assertEqual(kept_urls, urls)
+        self.assertEqual(stats["duplicates"], 0)
+
+        # The print view has the content without the navigation
+        print_view = templated_event_page(*jazz_night, navigation=False)
+        kept_urls, _, stats = NearDuplicateFilter().filter(urls + [urls[0] + "?print=1"], pages + [print_view])
+        self.assertEqual(kept_urls, urls)
+        self.assertEqual(stats["skipped"][0]["duplicate_of"], urls[0])
+
+    def test_distance_zero_only_skips_identical_pages(self):
+        documents = [self.detail, self.print_view, self.detail]
+        kept_urls, _, _ = NearDuplicateFilter(max_distance=0).filter(["a", "b", "c"], documents)
+        self.assertEqual(kept_urls, ["a", "b"])
+
+    def test_unchanged_pages_are_skipped_on_the_next_run(self):
+        store = FingerprintStore(FakeRedis(), "scope", ttl_seconds=60)
+        urls = ["https://example.com/a", "https://example.com/events"]
+        first_run = NearDuplicateFilter(previous=store.load())
+        kept_urls, _, _ = first_run.filter(urls, [self.detail, self.listing])
+        self.assertEqual(kept_urls, urls)
+        store.save(first_run.fingerprints)
+
+        edited_listing = self.listing.replace("Free", "Sold out", 1)
+        kept_urls, _, stats = NearDuplicateFilter(previous=store.load()).filter(urls, [self.detail, edited_listing])
+        self.assertEqual(kept_urls, [urls[1]])
+        self.assertEqual(stats["unchanged"], 1)
+        self.assertEqual(store.redis.ttls[store.key], 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+
+from api.models import JobPriority, ModelType
+from core.rate_limiter import (
+    BucketSpec, InMemoryTokenBucketBackend, LLMRateLimiter, RateLimitTimeoutError, RedisTokenBucketBackend
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class RecordingRedis:
+    """Records the scripts registered and the arguments they are called with"""
+    def __init__(self):
+        self.calls = []
+
+    def register_script(self, script):
+        def call(keys, args):
+            self.calls.append((script, keys, args))
+            return 0
+        return call
+
+
+class TestLLMRateLimiter(unittest.TestCase):
+    """
+    Test the LLM rate limiter using the in-memory backend.
+    Does not require the containers to be running.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = self.create_limiter()
+
+    def create_limiter(self, **kwargs):
+        options = {
+            "default_requests_per_minute": 60,
+            "default_tokens_per_minute": 6000,
+            "bulk_reserve": 0.5,
+            "max_wait_seconds": 120,
+        }
+        options.update(kwargs)
+        return LLMRateLimiter(
+            backend=InMemoryTokenBucketBackend(),
+            clock=self.clock.time,
+            sleep=self.clock.sleep,
+            **options
+        )
+
+    def test_acquire_within_budget_does_not_wait(self):
+        for _ in range(10):
+            waited = self.limiter.acquire(ModelType.claude, "claude", "key", tokens=100)
+            self.assertEqual(waited, 0)
+
+    def test_acquire_waits_when_requests_exhausted(self):
+        limiter = self.create_limiter(default_requests_per_minute=2)
+        limiter.acquire(ModelType.openai, "gpt", "key", tokens=1)
+        limiter.acquire(ModelType.openai, "gpt", "key", tokens=1)
+        waited = limiter.acquire(ModelType.openai, "gpt", "key", tokens=1)
+        self.assertGreaterEqual(waited, 30)
+
+    def test_acquire_waits_when_tokens_exhausted(self):
+        self.limiter.acquire(ModelType.openai, "gpt", "key", tokens=6000)
+        waited = self.limiter.acquire(ModelType.openai, "gpt", "key", tokens=3000)
+        self.assertGreaterEqual(waited, 30)
+
+    def test_recorded_usage_is_charged(self):
+        self.limiter.acquire(ModelType.openai, "gpt", "key", tokens=1000)
+        self.limiter.record_usage(ModelType.openai, "gpt", "key", tokens=5000)
+        waited = self.limiter.acquire(ModelType.openai, "gpt", "key", tokens=1000)
+        self.assertGreater(waited, 0)
+
+    def test_bulk_lane_keeps_reserve_for_interactive(self):
+        self.limiter.acquire(ModelType.claude, "claude", "key", tokens=3000)
+
+        # Interactive jobs may use the reserved half of the bucket
+        waited = self.limiter.acquire(ModelType.claude, "claude", "key", tokens=2000, priority=JobPriority.interactive)
+        self.assertEqual(waited, 0)
+
+        # Bulk jobs wait until the bucket refills above the reserve
+        waited = self.limiter.acquire(ModelType.claude, "claude", "key", tokens=500, priority=JobPriority.bulk)
+        self.assertGreater(waited, 0)
+
+    def test_buckets_are_separate_per_model_and_key(self):
+        self.limiter.acquire(ModelType.openai, "gpt", "key", tokens=6000)
+        self.assertEqual(self.limiter.acquire(ModelType.openai, "gpt-mini", "key", tokens=6000), 0)
+        self.assertEqual(self.limiter.acquire(ModelType.openai, "gpt", "other-key", tokens=6000), 0)
+        self.assertEqual(self.limiter.acquire(ModelType.claude, "gpt", "key", tokens=6000), 0)
+
+    def test_model_specific_limits_override_defaults(self):
+        limiter = self.create_limiter(limits={"OpenAI:gpt": {"requests_per_minute": 1}})
+        limiter.acquire(ModelType.openai, "gpt", "key", tokens=1)
+        self.assertGreater(limiter.acquire(ModelType.openai, "gpt", "key", tokens=1), 0)
+        self.assertEqual(limiter.get_limits(ModelType.openai, "other")["requests_per_minute"], 60)
+
+    def test_ollama_is_not_limited(self):
+        limiter = self.create_limiter(default_requests_per_minute=1)
+        for _ in range(5):
+            self.assertEqual(limiter.acquire(ModelType.ollama, "llama", None, tokens=100000), 0)
+
+    def test_timeout_raises(self):
+        limiter = self.create_limiter(default_requests_per_minute=1, max_wait_seconds=10)
+        limiter.acquire(ModelType.gemini, "gemini", "key", tokens=1)
+        with self.assertRaises(RateLimitTimeoutError):
+            limiter.acquire(ModelType.gemini, "gemini", "key", tokens=1)
+
+    def test_redis_buckets_use_the_server_clock(self):
+        client = RecordingRedis()
+        backend = RedisTokenBucketBackend(client)
+        backend.try_acquire([BucketSpec("requests", 60, 1, 1), BucketSpec("tokens", 6000, 100, 50)], 0.5, now=1e12)
+        backend.consume("tokens", 6000, 100, 20, now=1e12)
+        for script, _, args in client.calls:
+            self.assertIn("redis.call('TIME')", script)
+            self.assertNotIn(1e12, args)
+        self.assertEqual(client.calls[0][2], [0.5, 60, 1, 1, 6000, 100, 50])
+        self.assertEqual(client.calls[1][2], [6000, 100, 20])
+
+
+if __name__ == "__main__":
+    unittest.main()
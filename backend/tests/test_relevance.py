@@ -0,0 +1,87 @@
+import unittest
+
+from bs4 import BeautifulSoup
+
+from scraper.dom_serializer import serialize_dom
+from scraper.main_content import MainContentExtractor
+from scraper.relevance import DATE_TERM, PRICE_TERM, RelevanceFilter, schema_terms, tokenize
+from tests.fixture_pages import FIXTURE_PAGES, IRRELEVANT_PAGES
+
+EVENT_SCHEMA = {
+    "name": "event_list",
+    "fields": [{
+        "name": "event", "field_type": "list", "list_item_type": "schema", "description": "List of event items",
+        "item_schema": {"name": "event", "fields": [
+            {"name": "title", "field_type": "string"},
+            {"name": "startDate", "field_type": "string", "description": "When it starts"},
+            {"name": "venue_name", "field_type": "string", "aliases": ["location.name"]},
+            {"name": "ticket_price", "field_type": "string"},
+        ]}
+    }]
+}
+EVENT_PAGES = ["events_listing", "event_detail", "events_cards"]
+
+
+def main_content(page):
+    return serialize_dom(MainContentExtractor().extract(BeautifulSoup(page["html"], "html.parser")))
+
+
+class TestRelevance(unittest.TestCase):
+    """
+    Test the schema relevance filter of chunks.
+    Does not require the containers to be running.
+    """
+
+    def test_schema_terms(self):
+        terms = schema_terms(EVENT_SCHEMA, hints=["Concerts and festivals"])
+        for term in ("event", "title", "start", "venue", "location", "ticket", "price", "concert", "festival"):
+            self.assertIn(term, terms)
+        self.assertIn(DATE_TERM, terms)
+        self.assertIn(PRICE_TERM, terms)
+        # Words every schema has say nothing about a chunk
+        self.assertNotIn("list", terms)
+        self.assertNotIn("name", terms)
+
+    def test_dates_and_prices_are_matched_by_shape(self):
+        terms = tokenize("Every Friday in July, 7pm to 10pm. Tickets $35, concessions 12.50 EUR")
+        self.assertEqual(terms.count(DATE_TERM), 3)
+        self.assertEqual(terms.count(PRICE_TERM), 2)
+        self.assertNotIn(DATE_TERM, tokenize("Rated 4.6 out of 5 by 212 customers"))
+
+    def test_irrelevant_chunks_are_skipped(self):
+        pages = [FIXTURE_PAGES[name] for name in EVENT_PAGES] + list(IRRELEVANT_PAGES.values())
+        chunks = [main_content(page) for page in pages]
+        kept, scores, stats = RelevanceFilter(schema_terms(EVENT_SCHEMA), min_score=0.1, min_chunks=1).filter(chunks)
+
+        self.assertEqual(sorted(kept), [0, 1, 2])
+        self.assertEqual(kept[0], scores.index(max(scores)))
+        self.assertEqual(stats["chunks"], 5)
+        self.assertEqual(stats["chunks_skipped"], 2)
+        self.assertEqual([skipped["chunk"] for skipped in stats["skipped"]], [3, 4])
+        self.assertGreater(stats["tokens_skipped"], 0)
+
+    def test_chunks_of_relevant_pages_are_kept(self):
+        detail = main_content(FIXTURE_PAGES["event_detail"]).split("\n")
+        listing = main_content(FIXTURE_PAGES["events_listing"])
+        chunks = [listing] + detail + [main_content(IRRELEVANT_PAGES["login"])]
+        pages = [0] + [1] * len(detail) + [2]
+        relevance_filter = RelevanceFilter(schema_terms(EVENT_SCHEMA), min_score=0.1, min_chunks=1)
+
+        kept, _, _ = relevance_filter.filter(chunks)
+        self.assertNotIn(chunks.index(next(line for line in detail if "seating for 500" in line)), kept)
+        kept, _, _ = relevance_filter.filter(chunks, pages)
+        self.assertEqual(sorted(kept), list(range(1 + len(detail))))
+
+    def test_safety_floor(self):
+        chunks = [main_content(page) for page in IRRELEVANT_PAGES.values()] + ["Summer Jazz Nights, July 12, $35"]
+        kept, _, stats = RelevanceFilter(schema_terms(EVENT_SCHEMA), min_score=1.0, min_chunks=2).filter(chunks)
+        self.assertEqual(len(kept), 2)
+        self.assertEqual(kept[0], 2)
+        # Chunks are never dropped on a query none of them matches
+        kept, _, stats = RelevanceFilter(["philosopher"], min_score=1.0, min_chunks=1).filter(chunks)
+        self.assertEqual(sorted(kept), [0, 1, 2])
+        self.assertEqual(stats["chunks_skipped"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
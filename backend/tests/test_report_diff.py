@@ -0,0 +1,61 @@
+import unittest
+
+from core.report_diff import diff_versions, item_key_values, item_versions, merge_patch
+
+
+class TestReportDiff(unittest.TestCase):
+    """
+    Test diffing the items of two reports.
+    Does not require the containers to be running.
+    """
+
+    def diff(self, base, new, key_fields):
+        base_versions, contents = item_versions(base, key_fields, "base")
+        new_versions, new_contents = item_versions(new, key_fields, "new")
+        contents.update(new_contents)
+        diff = diff_versions(base_versions, new_versions)
+        return (
+            [contents[ref] for ref in diff.added],
+            [contents[ref] for ref in diff.removed],
+            [(contents[base_ref], contents[new_ref]) for base_ref, new_ref in diff.changed],
+            diff.unchanged_count
+        )
+
+    def test_added_removed_changed(self):
+        base = {"events": [{"url": "a", "price": 1}, {"url": "b", "price": 2}, {"url": "c", "price": 3}]}
+        new = {"events": [{"url": "a", "price": 1}, {"url": "b", "price": 5}, {"url": "d", "price": 4}]}
+        added, removed, changed, unchanged = self.diff(base, new, ["url"])
+        self.assertEqual(added, [{"url": "d", "price": 4}])
+        self.assertEqual(removed, [{"url": "c", "price": 3}])
+        self.assertEqual(changed, [({"url": "b", "price": 2}, {"url": "b", "price": 5})])
+        self.assertEqual(unchanged, 1)
+
+    def test_without_key_fields_changes_are_added_and_removed(self):
+        added, removed, changed, unchanged = self.diff({"events": [{"a": 1}]}, {"events": [{"a": 2}]}, [])
+        self.assertEqual((added, removed, changed, unchanged), ([{"a": 2}], [{"a": 1}], [], 0))
+
+    def test_repeated_keys(self):
+        base = {"events": [{"id": 1, "v": "x"}, {"id": 1, "v": "y"}]}
+        new = {"events": [{"id": 1, "v": "y"}, {"id": 1, "v": "z"}, {"id": 1, "v": "w"}]}
+        added, removed, changed, unchanged = self.diff(base, new, ["id"])
+        self.assertEqual(unchanged, 1)
+        self.assertEqual(changed, [({"id": 1, "v": "x"}, {"id": 1, "v": "z"})])
+        self.assertEqual((added, removed), ([{"id": 1, "v": "w"}], []))
+
+    def test_non_list_content_is_one_item(self):
+        added, removed, changed, unchanged = self.diff({"title": "a"}, {"title": "b"}, [])
+        self.assertEqual((added, removed), ([{"title": "b"}], [{"title": "a"}]))
+
+    def test_merge_patch(self):
+        old = {"a": 1, "b": {"c": 1, "d": 2}, "e": [1], "f": 0}
+        new = {"a": 1, "b": {"c": 1, "d": 3}, "e": [1, 2], "g": "new"}
+        self.assertEqual(merge_patch(old, new), {"b": {"d": 3}, "e": [1, 2], "f": None, "g": "new"})
+
+    def test_item_key_values(self):
+        self.assertEqual(item_key_values({"url": "a", "price": 1}, ["url"]), {"url": "a"})
+        self.assertIsNone(item_key_values({"price": 1}, ["url"]))
+        self.assertIsNone(item_key_values({"url": "a"}, []))
+
+
+if __name__ == "__main__":
+    unittest.main()
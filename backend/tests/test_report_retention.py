@@ -0,0 +1,30 @@
+import unittest
+from datetime import date, datetime, timezone
+
+from core.report_retention import ReportPartition, add_months
+
+
+class TestReportRetention(unittest.TestCase):
+    """
+    Test the partition bookkeeping of report retention.
+    Does not require the containers to be running.
+    """
+
+    def test_add_months(self):
+        self.assertEqual(add_months(date(2024, 11, 15), 1), date(2024, 12, 1))
+        self.assertEqual(add_months(date(2024, 11, 15), 2), date(2025, 1, 1))
+        self.assertEqual(add_months(date(2024, 1, 31), -1), date(2023, 12, 1))
+
+    def test_partition_from_name(self):
+        partition = ReportPartition.from_name("reports_p202412")
+        self.assertEqual(partition.refs_name, "report_item_refs_p202412")
+        self.assertEqual(partition.start, datetime(2024, 12, 1, tzinfo=timezone.utc))
+        self.assertEqual(partition.end, datetime(2025, 1, 1, tzinfo=timezone.utc))
+
+    def test_other_tables_are_not_partitions(self):
+        self.assertIsNone(ReportPartition.from_name("reports_default"))
+        self.assertIsNone(ReportPartition.from_name("reports_unpartitioned"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+import orjson
+
+from core.report_storage import ZSTD, content_digest, decode_content, encode_content, iter_decompressed
+
+
+class TestReportStorage(unittest.TestCase):
+    """
+    Test compression of report content.
+    Does not require the containers to be running.
+    """
+
+    def setUp(self):
+        self.content = {"events": [{"title": f"Event {i}", "description": "Lorem ipsum " * 20} for i in range(200)]}
+
+    def test_small_content_stored_inline(self):
+        encoded = encode_content(self.content, compress=True, threshold=10 * 1024 * 1024)
+        self.assertEqual(encoded.content, self.content)
+        self.assertIsNone(encoded.compressed)
+        self.assertEqual((encoded.content_hash, encoded.size), content_digest(self.content))
+
+    def test_large_content_compressed(self):
+        encoded = encode_content(self.content, compress=True, threshold=1024)
+        self.assertIsNone(encoded.content)
+        self.assertEqual(encoded.encoding, ZSTD)
+        self.assertLess(len(encoded.compressed), encoded.size)
+        self.assertEqual(decode_content(encoded.compressed, encoded.encoding), self.content)
+        self.assertEqual(b"".join(iter_decompressed(encoded.compressed, encoded.encoding)), orjson.dumps(self.content))
+
+    def test_compression_disabled(self):
+        encoded = encode_content(self.content, compress=False, threshold=0)
+        self.assertIsNone(encoded.compressed)
+
+    def test_unknown_encoding(self):
+        with self.assertRaises(ValueError):
+            decode_content(b"", "brotli")
+
+
+if __name__ == '__main__':
+    unittest.main()
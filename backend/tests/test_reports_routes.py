@@ -3,6 +3,9 @@ import unittest
 import requests
 from datetime import datetime, timedelta, timezone
 from copy import deepcopy
+import csv
+import io
+import json
 
 from api.examples.schema_examples import SCHEMA_EXAMPLES
 
@@ -86,6 +89,101 @@ class TestReportsRoutes(TestCase):
         self.assertGreater(len(filtered_reports), 0)
         self.assertEqual(filtered_reports[0]["schema_name"], self.philosophers_schema["name"])
 
+    def test_list_reports_paginated(self):
+        """Test paging through reports with the cursor of the previous page"""
+        report_names = [f"{self.test_report['name']}_page_{i}" for i in range(3)]
+        try:
+            for report_name in report_names:
+                report = deepcopy(self.test_report)
+                report["name"] = report_name
+                response = requests.post(f"{self.reports_url}/", json=report)
+                self.assertEqual(response.status_code, 200)
+
+            params = {"schema_name": self.philosophers_schema["name"], "limit": 2, "include_total": True}
+            first_page = requests.get(f"{self.reports_url}/", params=params)
+            self.assertEqual(first_page.status_code, 200)
+            self.assertEqual(len(first_page.json()), 2)
+            self.assertIn("X-Total-Count-Estimate", first_page.headers)
+            self.assertIn("X-Next-Cursor", first_page.headers)
+
+            params["cursor"] = first_page.headers["X-Next-Cursor"]
+            second_page = requests.get(f"{self.reports_url}/", params=params)
+            self.assertEqual(second_page.status_code, 200)
+            self.assertEqual(len(second_page.json()), 1)
+            self.assertNotIn("X-Next-Cursor", second_page.headers)
+
+            names = [report["name"] for report in first_page.json() + second_page.json()]
+            self.assertEqual(sorted(names), sorted(report_names))
+        finally:
+            for report_name in report_names:
+                requests.delete(f"{self.reports_url}/{report_name}")
+
+    def test_list_reports_invalid_cursor_400(self):
+        """Test that a malformed cursor is rejected"""
+        response = requests.get(f"{self.reports_url}/", params={"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_report_items_round_trip(self):
+        """Test that list-shaped reports kept in the item store are returned unchanged"""
+        report_names = [f"{self.test_report['name']}_run_{i}" for i in range(2)]
+        try:
+            for report_name in report_names:
+                report = deepcopy(self.test_report)
+                report["name"] = report_name
+                response = requests.post(f"{self.reports_url}/", json=report)
+                self.assertEqual(response.status_code, 200)
+
+            for report_name in report_names:
+                get_response = requests.get(f"{self.reports_url}/{report_name}")
+                self.assertEqual(get_response.status_code, 200)
+                self.assertEqual(get_response.json()["content"], self.test_report["content"])
+        finally:
+            for report_name in report_names:
+                requests.delete(f"{self.reports_url}/{report_name}")
+
+    def test_query_report_items(self):
+        """Test searching inside report content"""
+        report = deepcopy(self.test_report)
+        report["content"]["philosophers_schema"].append({
+            "name": "Plato",
+            "description": "Student of Socrates and founder of the Academy",
+            "area_of_expertise": "Metaphysics"
+        })
+        response = requests.post(f"{self.reports_url}/", json=report)
+        self.assertEqual(response.status_code, 200)
+
+        query = {
+            "schema_name": self.philosophers_schema["name"],
+            "where": '@.name == "Plato"',
+            "fields": ["name"]
+        }
+        query_response = requests.post(f"{self.reports_url}/query", json=query)
+        self.assertEqual(query_response.status_code, 200)
+        items = query_response.json()
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items[0]["report_name"], report["name"])
+        self.assertEqual(items[0]["item_index"], 1)
+        self.assertEqual(items[0]["item"], {"name": "Plato"})
+
+        contains_response = requests.post(f"{self.reports_url}/query", json={
+            "schema_name": self.philosophers_schema["name"],
+            "contains": {"area_of_expertise": "Metaphysics"}
+        })
+        self.assertEqual(contains_response.status_code, 200)
+        self.assertEqual([item["item"]["name"] for item in contains_response.json()], ["Plato"])
+
+        text_response = requests.post(f"{self.reports_url}/query", json={
+            "schema_name": self.philosophers_schema["name"],
+            "text": "socratic method"
+        })
+        self.assertEqual(text_response.status_code, 200)
+        self.assertEqual([item["item"]["name"] for item in text_response.json()], ["Socrates"])
+
+    def test_query_report_items_invalid_path_400(self):
+        """Test that a malformed JSON path is rejected"""
+        response = requests.post(f"{self.reports_url}/query", json={"where": "@.name === "})
+        self.assertEqual(response.status_code, 400)
+
     def test_create_blank_report_422(self):
         """Test creating a report with empty content"""
         blank_report = {
@@ -145,6 +243,32 @@ class TestReportsRoutes(TestCase):
         philosopher = content['philosophers_schema'][0]
         self.assertEqual(philosopher['name'], 'Socrates')
 
+    def test_export_report(self):
+        """Test streaming a report as NDJSON and gzip-compressed CSV"""
+        response = requests.post(f"{self.reports_url}/", json=self.test_report)
+        self.assertEqual(response.status_code, 200)
+
+        ndjson_response = requests.get(f"{self.reports_url}/export/{self.test_report['name']}", params={"format": "ndjson"})
+        self.assertEqual(ndjson_response.status_code, 200)
+        self.assertEqual(ndjson_response.headers["content-type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in ndjson_response.text.splitlines()]
+        self.assertEqual(lines, self.test_report["content"]["philosophers_schema"])
+
+        csv_response = requests.get(
+            f"{self.reports_url}/export/{self.test_report['name']}",
+            params={"format": "csv", "encoding": "gzip"}
+        )
+        self.assertEqual(csv_response.status_code, 200)
+        self.assertEqual(csv_response.headers["content-encoding"], "gzip")
+        rows = list(csv.DictReader(io.StringIO(csv_response.text)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["name"], "Socrates")
+
+    def test_export_report_not_found_404(self):
+        """Test exporting a report that does not exist"""
+        response = requests.get(f"{self.reports_url}/export/non_existent_report")
+        self.assertEqual(response.status_code, 404)
+
     def test_create_report_with_timestamp_200(self):
         """Test that timestamp is auto-generated regardless of provided value"""
         # Create report with future timestamp
@@ -199,5 +323,99 @@ class TestReportsRoutes(TestCase):
         # Clean up
         requests.delete(f"{self.reports_url}/{self.test_report['name']}")
 
+    def test_report_diff(self):
+        """Test diffing two runs of a schema with a key field"""
+        schema = deepcopy(self.philosophers_schema)
+        schema["name"] = "philosophers_diff_schema"
+        for field in schema["fields"]:
+            field["is_key"] = field["name"] == "name"
+        response = requests.post(f"{self.schema_url}/", json=schema)
+        self.assertEqual(response.status_code, 200)
+
+        socrates = self.test_report["content"]["philosophers_schema"][0]
+        plato = {**socrates, "name": "Plato", "description": "Student of Socrates"}
+        aristotle = {**socrates, "name": "Aristotle", "description": "Student of Plato"}
+        runs = [
+            ("test_philosophers_diff_base", [socrates, plato]),
+            ("test_philosophers_diff_new", [{**socrates, "description": "Athenian philosopher"}, aristotle])
+        ]
+        try:
+            for report_name, items in runs:
+                report = {"name": report_name, "schema_name": schema["name"], "content": {"philosophers": items}}
+                response = requests.post(f"{self.reports_url}/", json=report)
+                self.assertEqual(response.status_code, 200)
+
+            diff_response = requests.get(f"{self.reports_url}/{runs[1][0]}/diff/{runs[0][0]}")
+            self.assertEqual(diff_response.status_code, 200)
+            diff = diff_response.json()
+            self.assertEqual(diff["key_fields"], ["name"])
+            self.assertEqual(diff["added"], [aristotle])
+            self.assertEqual(diff["removed"], [{"name": "Plato"}])
+            self.assertEqual(diff["changed"], [{"key": {"name": "Socrates"}, "patch": {"description": "Athenian philosopher"}}])
+            self.assertEqual(diff["unchanged_count"], 0)
+
+            stored_response = requests.get(f"{self.reports_url}/{runs[1][0]}/diff")
+            self.assertEqual(stored_response.status_code, 200)
+            self.assertEqual(stored_response.json()["base_report_name"], runs[0][0])
+            self.assertEqual(stored_response.json()["changed"], diff["changed"])
+
+            first_run_response = requests.get(f"{self.reports_url}/{runs[0][0]}/diff")
+            self.assertEqual(first_run_response.status_code, 404)
+        finally:
+            for report_name, _ in runs:
+                requests.delete(f"{self.reports_url}/{report_name}")
+            requests.delete(f"{self.schema_url}/{schema['name']}")
+
+    def test_bulk_create_and_delete_reports(self):
+        """Test creating and deleting many reports in one request"""
+        names = [f"test_philosophers_bulk_{index}" for index in range(3)]
+        reports = [{**self.test_report, "name": name} for name in names]
+        reports.append({**self.test_report, "name": names[0]})
+        reports.append({**self.test_report, "name": "test_philosophers_bulk_invalid", "schema_name": "missing_schema"})
+        try:
+            response = requests.post(f"{self.reports_url}/bulk", json={"reports": reports})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["created"], 3)
+            statuses = [result["status"] for result in response.json()["results"]]
+            self.assertEqual(statuses, ["created", "created", "created", "invalid", "invalid"])
+
+            get_response = requests.get(f"{self.reports_url}/{names[1]}")
+            self.assertEqual(get_response.status_code, 200)
+            self.assertEqual(get_response.json()["content"], self.test_report["content"])
+
+            repeat_response = requests.post(f"{self.reports_url}/bulk", json={"reports": reports[:1]})
+            self.assertEqual(repeat_response.json()["results"][0]["status"], "exists")
+        finally:
+            delete_response = requests.post(
+                f"{self.reports_url}/bulk-delete", json={"names": names + ["test_philosophers_bulk_missing"]}
+            )
+            self.assertEqual(delete_response.status_code, 200)
+            self.assertEqual(delete_response.json()["deleted"], 3)
+            self.assertEqual(delete_response.json()["results"][-1]["status"], "not_found")
+
+        missing_response = requests.get(f"{self.reports_url}/{names[0]}")
+        self.assertEqual(missing_response.status_code, 404)
+
+    def test_retention_policy_crud(self):
+        """Test setting, listing and deleting a schema's retention policy"""
+        schema_name = self.philosophers_schema['name']
+        try:
+            response = requests.put(f"{self.reports_url}/retention/{schema_name}", json={"retention_days": 30})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), {"schema_name": schema_name, "retention_days": 30})
+
+            list_response = requests.get(f"{self.reports_url}/retention")
+            self.assertEqual(list_response.status_code, 200)
+            self.assertIn({"schema_name": schema_name, "retention_days": 30}, list_response.json())
+
+            invalid_response = requests.put(f"{self.reports_url}/retention/{schema_name}", json={"retention_days": 0})
+            self.assertEqual(invalid_response.status_code, 422)
+        finally:
+            delete_response = requests.delete(f"{self.reports_url}/retention/{schema_name}")
+            self.assertEqual(delete_response.status_code, 200)
+
+        missing_response = requests.delete(f"{self.reports_url}/retention/{schema_name}")
+        self.assertEqual(missing_response.status_code, 404)
+
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
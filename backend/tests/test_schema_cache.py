@@ -0,0 +1,65 @@
+import unittest
+
+from api.models import SchemaDefinition, SchemaField
+from core.schema_cache import LRUCache, SchemaCache, schema_fingerprint
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSchemaCache(unittest.TestCase):
+    """
+    Test the process-wide schema cache.
+    Does not require the containers to be running.
+    """
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = SchemaCache(ttl_seconds=60, max_entries=2, clock=self.clock)
+        self.schema = SchemaDefinition(
+            name="events",
+            fields=[SchemaField(name="title", field_type="string", description="Event title")]
+        )
+
+    def test_cached_until_ttl(self):
+        self.assertIsNone(self.cache.get_cached("events"))
+        self.cache.put(self.schema)
+        self.assertEqual(self.cache.get_cached("events"), self.schema)
+
+        self.clock.now = 61
+        self.assertIsNone(self.cache.get_cached("events"))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_evict(self):
+        self.cache.put(self.schema)
+        self.cache.evict("events")
+        self.assertIsNone(self.cache.get_cached("events"))
+
+        self.cache.put(self.schema)
+        self.cache.evict()
+        self.assertIsNone(self.cache.get_cached("events"))
+
+    def test_lru_eviction(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (1, None, 3))
+        self.assertEqual(cache.get_or_create("d", lambda: 4), 4)
+        self.assertEqual(len(cache), 2)
+
+    def test_fingerprint_changes_with_schema(self):
+        schema_dict = self.schema.to_dict()
+        self.assertEqual(schema_fingerprint(schema_dict), schema_fingerprint(self.schema.to_dict()))
+        schema_dict["fields"][0]["description"] = "Name of the event"
+        self.assertNotEqual(schema_fingerprint(schema_dict), schema_fingerprint(self.schema.to_dict()))
+
+
+if __name__ == "__main__":
+    unittest.main()
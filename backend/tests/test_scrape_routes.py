@@ -3,6 +3,7 @@ import unittest
 import requests
 from copy import deepcopy
 import time
+import uuid
 
 from api.examples.schema_examples import SCHEMA_EXAMPLES
 from api.models import ModelType
@@ -149,6 +150,79 @@ class TestScrapingRoutes(TestCase):
         response = requests.post(f"{self.scrape_url}/start", json=job_request)
         self.assertEqual(response.status_code, 404)
 
+    def test_start_identical_jobs_coalesced(self):
+        """Test that an identical request attaches to the job already in flight"""
+        job_request = self.get_job_request_with_list_no_crawl()
+
+        first_response = requests.post(f"{self.scrape_url}/start", json=job_request)
+        self.assertEqual(first_response.status_code, 200)
+        first_job = first_response.json()
+        self.assertFalse(first_job["coalesced"])
+        self.assertIn("estimated_wait_seconds", first_job)
+
+        second_response = requests.post(f"{self.scrape_url}/start", json=job_request)
+        self.assertEqual(second_response.status_code, 200)
+        second_job = second_response.json()
+        self.assertTrue(second_job["coalesced"])
+        self.assertEqual(second_job["job_id"], first_job["job_id"])
+
+        # A different request is not coalesced
+        job_request["crawl_config"]["max_urls"] = 4
+        third_response = requests.post(f"{self.scrape_url}/start", json=job_request)
+        self.assertEqual(third_response.status_code, 200)
+        self.assertFalse(third_response.json()["coalesced"])
+        self.assertNotEqual(third_response.json()["job_id"], first_job["job_id"])
+
+    def test_cancel_job(self):
+        """Test cancelling a running job"""
+        job_request = self.get_job_request_with_list_no_crawl()
+        job_request["deadline_seconds"] = 600
+        start_response = requests.post(f"{self.scrape_url}/start", json=job_request)
+        self.assertEqual(start_response.status_code, 200)
+        job_id = start_response.json()["job_id"]
+
+        cancel_response = requests.delete(f"{self.scrape_url}/{job_id}")
+        self.assertEqual(cancel_response.status_code, 200)
+        self.assertEqual(cancel_response.json()["status"], "cancelling")
+
+        for _ in range(30):
+            status_data = requests.get(f"{self.scrape_url}/{job_id}").json()
+            if status_data["status"] != "pending":
+                break
+            time.sleep(2)
+        self.assertEqual(status_data["status"], "cancelled")
+
+    def test_cancel_unknown_job_404(self):
+        """Test cancelling a job id that was never submitted"""
+        cancel_response = requests.delete(f"{self.scrape_url}/{uuid.uuid4()}")
+        self.assertEqual(cancel_response.status_code, 404)
+
+    def test_start_batch(self):
+        """Test starting a batch of jobs and reading its aggregate status"""
+        valid_job = self.get_job_request_with_list_no_crawl()
+        valid_job["urls"] = ["https://www.webpagetest.org/blank.html"]
+        invalid_job = self.get_job_request_with_list_no_crawl()
+        invalid_job["schema_name"] = "non_existent_schema"
+
+        response = requests.post(f"{self.scrape_url}/batch", json={"jobs": [valid_job, invalid_job]})
+        self.assertEqual(response.status_code, 200)
+        batch = response.json()
+        self.assertEqual(batch["total"], 2)
+        self.assertEqual(batch["rejected"], 1)
+        self.assertIsNotNone(batch["jobs"][0]["job_id"])
+        self.assertEqual(batch["jobs"][1]["status"], "rejected")
+
+        status_response = requests.get(f"{self.scrape_url}/batch/{batch['batch_id']}")
+        self.assertEqual(status_response.status_code, 200)
+        status_data = status_response.json()
+        self.assertEqual(status_data["total"], 2)
+        self.assertEqual(status_data["jobs"][0]["job_id"], batch["jobs"][0]["job_id"])
+        self.assertEqual(status_data["counts"].get("rejected"), 1)
+
+    def test_get_batch_not_found_404(self):
+        response = requests.get(f"{self.scrape_url}/batch/non_existent_batch")
+        self.assertEqual(response.status_code, 404)
+
     def test_start_job_invalid_request_422(self):
         """Test starting job with invalid request data"""
         job_request = self.get_job_request_with_list_no_crawl()
@@ -0,0 +1,133 @@
+import unittest
+
+from bs4 import BeautifulSoup
+
+from scraper.selector_templates import (
+    SelectorTemplate, SelectorTemplateLearner, SelectorTemplateStore, layout_signature
+)
+from tests.fixture_pages import PRODUCTS, city_events_page, product_page
+
+PRODUCT_SCHEMA = {
+    "name": "product",
+    "fields": [
+        {"name": "name", "field_type": "string", "required": True},
+        {"name": "price", "field_type": "float", "required": True},
+        {"name": "weight", "field_type": "string", "required": False},
+    ]
+}
+EVENT_LIST_SCHEMA = {
+    "name": "event_list",
+    "fields": [{
+        "name": "event", "field_type": "list", "list_item_type": "schema", "required": True,
+        "item_schema": {"name": "event", "fields": [
+            {"name": "title", "field_type": "string", "required": True},
+            {"name": "venue", "field_type": "string", "required": True},
+            {"name": "url", "field_type": "string", "required": False},
+        ]}
+    }]
+}
+EVENT_PAGES = [
+    [("Spring Book Fair", "Downtown Library"), ("Annual City Marathon", "City Hall Plaza")],
+    [("Summer Jazz Nights", "Central Park"), ("Film Fest", "Hillside Theatre"), ("Craft Fair", "Old Town Market")],
+    [("Culinary Delights", "Riverfront Promenade")],
+]
+
+
+def events_page(events):
+    rows = "".join(
+        f'<tr><td><a href="/events/{index}">{title}</a></td><td>{venue}</td></tr>'
+        for index, (title, venue) in enumerate(events)
+    )
+    return BeautifulSoup(city_events_page("Events", f"""
+        <h1>Upcoming events</h1>
+        <table class="events"><tr><th>Event</th><th>Venue</th></tr>{rows}</table>
+    """), "html.parser")
+
+
+def events_result(events):
+    return {"event": [
+        {"title": title, "venue": venue, "url": f"/events/{index}"} for index, (title, venue) in enumerate(events)
+    ]}
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def hset(self, key, field, value):
+        self.commands.append(lambda: self.redis.hashes.setdefault(key, {}).__setitem__(field, value))
+
+    def expire(self, key, seconds):
+        self.commands.append(lambda: None)
+
+    def execute(self):
+        for command in self.commands:
+            command()
+
+
+class FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    def hdel(self, key, field):
+        self.hashes.get(key, {}).pop(field, None)
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class TestSelectorTemplates(unittest.TestCase):
+    """
+    Test learning CSS selector templates from LLM results.
+    Does not require the containers to be running.
+    """
+
+    def test_detail_pages(self):
+        pages = [product_page(*product) for product in PRODUCTS]
+        learner = SelectorTemplateLearner(PRODUCT_SCHEMA)
+        results = [{"name": name, "price": price, "weight": weight} for name, price, weight in PRODUCTS]
+        template = learner.learn(list(zip(pages[:2], results[:2])))
+        self.assertIsNotNone(template)
+        self.assertEqual(template.extract(pages[2], learner.fields), results[2])
+        self.assertEqual(len({layout_signature(page) for page in pages}), 1)
+
+    def test_listing_pages(self):
+        pages = [events_page(events) for events in EVENT_PAGES]
+        learner = SelectorTemplateLearner(EVENT_LIST_SCHEMA)
+        template = learner.learn([(pages[0], events_result(EVENT_PAGES[0])), (pages[1], events_result(EVENT_PAGES[1]))])
+        self.assertIsNotNone(template)
+        extracted = template.extract(pages[2], learner.fields)
+        self.assertEqual(extracted, events_result(EVENT_PAGES[2]))
+        self.assertEqual(learner.agreement(extracted, events_result(EVENT_PAGES[2])), 1.0)
+
+    def test_values_missing_from_the_page_are_not_learned(self):
+        pages = [product_page(*product) for product in PRODUCTS[:2]]
+        # The LLM rephrased the names, so no selector reproduces them
+        results = [{"name": f"{name} tent", "price": price, "weight": None} for name, price, _ in PRODUCTS[:2]]
+        self.assertIsNone(SelectorTemplateLearner(PRODUCT_SCHEMA).learn(list(zip(pages, results))))
+
+    def test_different_layouts_have_different_signatures(self):
+        self.assertNotEqual(layout_signature(product_page(*PRODUCTS[0])), layout_signature(events_page(EVENT_PAGES[0])))
+
+    def test_incomplete_results_are_detected(self):
+        learner = SelectorTemplateLearner(EVENT_LIST_SCHEMA)
+        self.assertTrue(learner.is_complete(events_result(EVENT_PAGES[0])))
+        self.assertFalse(learner.is_complete({"event": []}))
+        self.assertFalse(learner.is_complete({"event": [{"title": "Film Fest", "venue": None}]}))
+
+    def test_store(self):
+        store = SelectorTemplateStore(FakeRedis(), ttl_seconds=60)
+        template = SelectorTemplate({"name": {"selector": "h1", "source": "text"}, "price": None})
+        store.save("gearshop.example.com", "schema:layout", template)
+        self.assertEqual(store.get("gearshop.example.com", "schema:layout").to_dict(), template.to_dict())
+        self.assertIsNone(store.get("cityevents.example.com", "schema:layout"))
+        store.delete("gearshop.example.com", "schema:layout")
+        self.assertIsNone(store.get("gearshop.example.com", "schema:layout"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+
+from bs4 import BeautifulSoup
+
+from scraper.structured_data import StructuredDataMapper, coerce, extract_structured_data
+from tests.fixture_pages import FIXTURE_PAGES
+
+EVENT_SCHEMA = {
+    "name": "event",
+    "fields": [
+        {"name": "title", "field_type": "string", "required": True},
+        {"name": "start_date", "field_type": "date", "required": True},
+        {"name": "venue", "field_type": "string", "required": True},
+        {"name": "city", "field_type": "string", "required": False},
+        {"name": "ticket_price", "field_type": "float", "required": True, "aliases": ["offers.price"]},
+        {"name": "performers", "field_type": "list", "list_item_type": "string", "required": False,
+         "aliases": ["performer"]},
+    ]
+}
+PRODUCT_SCHEMA = {
+    "name": "product",
+    "fields": [
+        {"name": "name", "field_type": "string", "required": True},
+        {"name": "price", "field_type": "float", "required": True},
+        {"name": "currency", "field_type": "string", "required": True},
+        {"name": "weight", "field_type": "string", "required": False},
+    ]
+}
+
+
+def list_schema(schema):
+    return {
+        "name": f"{schema['name']}_list",
+        "fields": [{
+            "name": schema["name"], "field_type": "list", "required": True, "list_item_type": "schema",
+            "item_schema": schema
+        }]
+    }
+
+
+def entities_of(html):
+    return extract_structured_data(BeautifulSoup(html, "html.parser"))
+
+
+class TestStructuredData(unittest.TestCase):
+    """
+    Test mapping embedded structured data onto schemas.
+    Does not require the containers to be running.
+    """
+
+    def test_json_ld_event(self):
+        result = StructuredDataMapper(EVENT_SCHEMA).map(entities_of(FIXTURE_PAGES["event_detail"]["html"]))
+        self.assertEqual(result, {
+            "title": "Summer Jazz Nights",
+            "start_date": "2024-07-05",
+            "venue": "Central Park Bandstand",
+            "city": "Springfield",
+            "ticket_price": 0.0,
+            "performers": ["Marcus Reed Quartet", "Ana Lima"],
+        })
+
+    def test_microdata_product(self):
+        result = StructuredDataMapper(PRODUCT_SCHEMA).map(entities_of(FIXTURE_PAGES["product"]["html"]))
+        self.assertEqual(
+            result, {"name": "Trailhead 2 Ultralight Tent", "price": 249.0, "currency": "USD", "weight": None}
+        )
+
+    def test_pages_missing_required_fields_are_not_mapped(self):
+        self.assertIsNone(StructuredDataMapper(EVENT_SCHEMA).map(entities_of(FIXTURE_PAGES["product"]["html"])))
+        schema = {"name": "product", "fields": PRODUCT_SCHEMA["fields"] + [
+            {"name": "sku", "field_type": "string", "required": True}
+        ]}
+        self.assertIsNone(StructuredDataMapper(schema).map(entities_of(FIXTURE_PAGES["product"]["html"])))
+
+    def test_opengraph(self):
+        html = """<html><head>
+            <meta property="og:type" content="article">
+            <meta property="og:title" content="Walking philosophers">
+            <meta property="article:published_time" content="2024-03-01T08:00:00Z">
+        </head><body></body></html>"""
+        schema = {"name": "article", "fields": [
+            {"name": "headline", "field_type": "string", "required": True},
+            {"name": "published", "field_type": "date", "required": True},
+        ]}
+        self.assertEqual(
+            StructuredDataMapper(schema).map(entities_of(html)),
+            {"headline": "Walking philosophers", "published": "2024-03-01"}
+        )
+        # OpenGraph describes the page, not the items a list schema asks for
+        self.assertIsNone(StructuredDataMapper(list_schema(schema)).map(entities_of(html)))
+
+    def test_list_schema_items(self):
+        html = """<script type="application/ld+json">{"@type": "ItemList", "itemListElement": [
+            {"@type": "ListItem", "item": {"@type": "Product", "name": "Trailhead 1", "offers": {"price": "199", "priceCurrency": "USD"}}},
+            {"@type": "ListItem", "item": {"@type": "Product", "name": "Trailhead 2", "offers": {"price": "249", "priceCurrency": "USD"}}}
+        ]}</script>
+        <div itemscope itemtype="https://schema.org/Product"><span itemprop="name">Trailhead 1</span>
+            <div itemprop="offers" itemscope><meta itemprop="price" content="199"><meta itemprop="priceCurrency" content="USD"></div>
+        </div>"""
+        result = StructuredDataMapper(list_schema(PRODUCT_SCHEMA)).map(entities_of(html))
+        self.assertEqual([item["name"] for item in result["product"]], ["Trailhead 1", "Trailhead 2"])
+
+    def test_list_schema_with_incomplete_items_is_not_mapped(self):
+        html = """<script type="application/ld+json">[
+            {"@type": "Product", "name": "Trailhead 1", "offers": {"price": "199", "priceCurrency": "USD"}},
+            {"@type": "Product", "name": "Trailhead 2"}
+        ]</script>"""
+        self.assertIsNone(StructuredDataMapper(list_schema(PRODUCT_SCHEMA)).map(entities_of(html)))
+
+    def test_coerce(self):
+        self.assertEqual(coerce("$1,299.00", "float"), 1299.0)
+        self.assertEqual(coerce("12,5", "float"), 12.5)
+        self.assertEqual(coerce("4.6", "integer"), 4)
+        self.assertEqual(coerce({"@type": "Place", "name": "Hall"}, "string"), "Hall")
+        self.assertEqual(coerce("2024-07-05T19:00:00-05:00", "date"), "2024-07-05")
+        self.assertIsNone(coerce("next Friday", "date"))
+        self.assertEqual(coerce("true", "boolean"), True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from bs4 import BeautifulSoup
+
+from scraper.dom_serializer import serialize_dom
+from scraper.template_blocks import TemplateBlockRemover, estimate_llm_calls
+from tests.fixture_pages import CITY_EVENTS_BOILERPLATE, FIXTURE_PAGES
+
+CITY_EVENTS_PAGES = ["events_listing", "event_detail", "events_cards"]
+
+
+class TestTemplateBlockRemover(unittest.TestCase):
+    """
+    Test cross-page template removal within a crawl.
+    Does not require the containers to be running.
+    """
+
+    def setUp(self):
+        self.pages = [
+            serialize_dom(BeautifulSoup(FIXTURE_PAGES[name]["html"], "html.parser")) for name in CITY_EVENTS_PAGES
+        ]
+
+    def test_template_kept_on_first_page_only(self):
+        cleaned, stats = TemplateBlockRemover().remove(self.pages)
+        self.assertEqual(len(cleaned), 3)
+        for name, page in zip(CITY_EVENTS_PAGES, cleaned):
+            for fact in FIXTURE_PAGES[name]["facts"]:
+                self.assertIn(fact, page)
+        for snippet in CITY_EVENTS_BOILERPLATE:
+            self.assertIn(snippet, cleaned[0])
+            self.assertNotIn(snippet, cleaned[1])
+            self.assertNotIn(snippet, cleaned[2])
+        self.assertEqual(stats["bytes_removed"], sum(map(len, self.pages)) - sum(map(len, cleaned)))
+
+    def test_repeated_labels_are_kept(self):
+        pages = [f"# Product {i}\nPrice\n${i}9.00\nIn stock\nDescription of product {i}, model {chr(65 + i)}" for i in range(4)]
+        cleaned, stats = TemplateBlockRemover().remove(pages)
+        self.assertEqual(cleaned, pages)
+        self.assertEqual(stats["lines_removed"], 0)
+
+    def test_small_crawls_are_left_alone(self):
+        cleaned, stats = TemplateBlockRemover(min_pages=3).remove(self.pages[:2])
+        self.assertEqual(cleaned, self.pages[:2])
+        self.assertEqual(stats["bytes_removed"], 0)
+
+    def test_pages_that_are_only_template_are_dropped(self):
+        template = "\n".join(f"- [Link {i}](/link/{i})" for i in range(5))
+        pages = [template + "\nWelcome to our site, here is what is on", template, template]
+        cleaned, stats = TemplateBlockRemover().remove(pages)
+        self.assertEqual(cleaned, [pages[0]])
+        self.assertEqual(stats["pages_emptied"], 2)
+
+    def test_estimate_llm_calls(self):
+        documents = ["a" * 100, "b" * 2500]
+        self.assertEqual(estimate_llm_calls(documents, True, 1000, 100), 4)
+        self.assertEqual(estimate_llm_calls(documents, False, 1000, 100), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()